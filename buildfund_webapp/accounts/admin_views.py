@@ -5,12 +5,15 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import Count, Q
 
 from accounts.permissions import IsAdmin
 from accounts.serializers import UserSerializer
+from applications.models import Application
 from borrowers.models import BorrowerProfile
 from lenders.models import LenderProfile
+from products.models import Product
+from projects.models import Project
 
 User = get_user_model()
 
@@ -146,3 +149,27 @@ BuildFund Team
             "lenders": lenders,
             "admins": admins,
         })
+    
+    @action(detail=False, methods=["get"])
+    def platform_stats(self, request):
+        """Get project, product and application counts for the admin dashboard."""
+        projects = Project.objects.aggregate(
+            total=Count("id"),
+            pending=Count("id", filter=Q(status="pending_review")),
+            approved=Count("id", filter=Q(status="approved")),
+        )
+        products = Product.objects.aggregate(
+            total=Count("id"),
+            pending=Count("id", filter=Q(status="pending")),
+            active=Count("id", filter=Q(status="active")),
+        )
+        
+        return Response({
+            "total_projects": projects["total"],
+            "pending_projects": projects["pending"],
+            "approved_projects": projects["approved"],
+            "total_products": products["total"],
+            "pending_products": products["pending"],
+            "active_products": products["active"],
+            "total_applications": Application.objects.count(),
+        })
@@ -5,4 +5,8 @@ class AccountsConfig(AppConfig):
     """Configuration for the accounts app."""
 
     default_auto_field = "django.db.models.BigAutoField"
-    name = "accounts"
\ No newline at end of file
+    name = "accounts"
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import accounts.signals  # noqa
@@ -0,0 +1,65 @@
+"""Token authentication with the token lookup served from the Django cache.
+
+DRF's ``TokenAuthentication`` reads ``authtoken_token`` joined to the user
+on every request.  ``CachedTokenAuthentication`` keeps the token's user in
+the cache for ``AUTH_TOKEN_CACHE_TTL`` seconds, keyed by a digest of the
+token.  Only the user's non-secret columns are cached, never the token key
+or the password hash; the user is rebuilt from them with the password
+deferred.  ``accounts.signals`` evicts the entry when the token is deleted
+(logout) or its user is saved, e.g. deactivated or given a new password.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Bump when the cached user fields change, so entries in the old shape are ignored
+TOKEN_FORMAT_VERSION = 2
+
+# Never written to the cache; loaded from the database if something reads them
+SECRET_USER_FIELDS = frozenset({"password"})
+
+
+def token_cache_key(key: str) -> str:
+    return f"accounts:token:v{TOKEN_FORMAT_VERSION}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def _cached_user_fields():
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.name not in SECRET_USER_FIELDS
+    ]
+
+
+def invalidate_token(key: str) -> None:
+    cache_key = token_cache_key(key)
+    cache.delete(cache_key)
+    transaction.on_commit(lambda: cache.delete(cache_key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that only queries the database on a cache miss."""
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        fields = _cached_user_fields()
+        values = cache.get(cache_key)
+        if values is None:
+            # Raises AuthenticationFailed for unknown tokens and inactive users
+            user, token = super().authenticate_credentials(key)
+            cache.set(
+                cache_key,
+                [getattr(user, name) for name in fields],
+                getattr(settings, "AUTH_TOKEN_CACHE_TTL", 300),
+            )
+            return user, token
+        user = get_user_model().from_db(DEFAULT_DB_ALIAS, fields, values)
+        token = Token(key=key, user=user)
+        token._state.adding = False
+        return user, token
@@ -0,0 +1,101 @@
+"""Benchmark per-request authentication and role resolution: legacy lookups vs the cached principal."""
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from accounts.authentication import CachedTokenAuthentication
+from accounts.models import Role, UserRole
+from accounts.principal import get_principal
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Create one user per role inside a rolled-back transaction and compare the "
+        "authentication and permission work done per request: token lookup plus "
+        "UserRole/profile queries, against the cached token and request principal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Simulated requests per user (default: 2000).')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                keys = self._seed()
+                self._run(keys, options['requests'])
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Synthetic data rolled back.")
+
+    def _seed(self):
+        from borrowers.models import BorrowerProfile
+        from consultants.models import ConsultantProfile
+        from lenders.models import LenderProfile
+
+        User = get_user_model()
+        keys = {}
+        for role in (Role.LENDER, Role.BORROWER, Role.CONSULTANT, Role.ADMIN):
+            user = User.objects.create(username=f'bench-request-auth-{role.lower()}')
+            UserRole.objects.create(user=user, role=Role.objects.get_or_create(name=role)[0])
+            if role == Role.LENDER:
+                LenderProfile.objects.create(user=user, organisation_name='Bench Lender', contact_email='lender@bench.invalid')
+            elif role == Role.BORROWER:
+                BorrowerProfile.objects.create(user=user, company_name='Bench Borrower')
+            elif role == Role.CONSULTANT:
+                ConsultantProfile.objects.create(
+                    user=user, organisation_name='Bench Consultant',
+                    primary_service='solicitor', contact_email='consultant@bench.invalid',
+                )
+            keys[role] = Token.objects.create(user=user).key
+        return keys
+
+    def _run(self, keys, n_requests):
+        def legacy(key):
+            # TokenAuthentication, then the checks views made before the principal:
+            # IsAdmin's UserRole query and a hasattr() profile query per role tried
+            user, _ = TokenAuthentication().authenticate_credentials(key)
+            is_admin = user.is_superuser or user.userrole_set.filter(role__name=Role.ADMIN).exists()
+            return (
+                is_admin,
+                hasattr(user, 'lenderprofile'),
+                hasattr(user, 'borrowerprofile'),
+                hasattr(user, 'consultantprofile'),
+            )
+
+        def cached(key):
+            user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+            principal = get_principal(user)
+            return principal.is_admin, principal.is_lender, principal.is_borrower, principal.is_consultant
+
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        for role, key in keys.items():
+            if legacy(key) != cached(key):
+                self.stdout.write(self.style.ERROR(f"Result mismatch for {role}: {legacy(key)} != {cached(key)}"))
+            for label, resolve in (('legacy', legacy), ('cached', cached)):
+                # Warm up, so the cached path is measured on cache hits
+                resolve(key)
+                queries.clear()
+                with connection.execute_wrapper(count):
+                    started = time.perf_counter()
+                    for _ in range(n_requests):
+                        resolve(key)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{role:10s} {label:6s} {len(queries) / n_requests:4.1f} queries/request  "
+                    f"{elapsed / n_requests * 1e6:8.1f} µs/request"
+                )
@@ -0,0 +1,93 @@
+"""Benchmark request throttling: DRF's timestamp history vs windowed counters, on the throttle cache."""
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+import time
+from types import SimpleNamespace
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from rest_framework import throttling
+
+from core.cache import THROTTLE_CACHE
+from core.throttles import UserRateThrottle
+
+
+class LegacyThrottle(throttling.UserRateThrottle):
+    """DRF's ``UserRateThrottle`` on the same cache: one list of request timestamps per client."""
+
+    cache_format = 'benchmark_legacy_%(scope)s_%(ident)s'
+
+    @property
+    def cache(self):
+        return caches[THROTTLE_CACHE]
+
+
+class WindowedThrottle(UserRateThrottle):
+    cache_format = 'benchmark_windowed_%(scope)s_%(ident)s'
+
+
+THROTTLES = (('legacy', LegacyThrottle), ('windowed', WindowedThrottle))
+
+
+def _request(ident):
+    return SimpleNamespace(user=SimpleNamespace(is_authenticated=True, pk=ident), META={})
+
+
+def _hammer(args):
+    """Send ``n`` requests through a throttle; returns how many were allowed."""
+    throttle_class, rate, ident, n = args
+    throttle_class = type(throttle_class.__name__, (throttle_class,), {'rate': rate})
+    request = _request(ident)
+    return sum(throttle_class().allow_request(request, None) for _ in range(n))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's timestamp-history throttle with the windowed counter throttle on the "
+        "configured throttle cache: time and storage per client, and how many requests "
+        "get through a shared limit when several worker processes throttle at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests from one client (default: 2000).')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent worker processes (default: 8).')
+        parser.add_argument('--limit', type=int, default=200, help='Shared limit in the worker run (default: 200).')
+
+    def handle(self, *args, **options):
+        cache = caches[THROTTLE_CACHE]
+        self.stdout.write(f"Throttle cache: {type(cache).__module__}.{type(cache).__name__}")
+        run = int(time.time())
+
+        for label, throttle_class in THROTTLES:
+            # A rate high enough that every request is allowed and recorded
+            ident = f'{run}-single'
+            n = options['requests']
+            started = time.perf_counter()
+            _hammer((throttle_class, f'{n}/hour', ident, n))
+            elapsed = time.perf_counter() - started
+            throttle = throttle_class()
+            key = throttle.cache_format % {'scope': throttle.scope, 'ident': ident}
+            if label == 'legacy':
+                stored = len(pickle.dumps(cache.get(key, [])))
+            else:
+                window = int(time.time() // 3600)
+                stored = sum(len(pickle.dumps(cache.get(f'{key}:3600:{w}', 0))) for w in (window - 1, window))
+            self.stdout.write(
+                f"{label:8s} {elapsed / n * 1e6:8.1f} µs/request  {stored:7d} bytes stored after {n} requests"
+            )
+
+        if options['workers'] < 2 or 'fork' not in multiprocessing.get_all_start_methods():
+            return
+        workers, limit = options['workers'], options['limit']
+        per_worker = limit
+        context = multiprocessing.get_context('fork')
+        for label, throttle_class in THROTTLES:
+            jobs = [(throttle_class, f'{limit}/hour', f'{run}-shared', per_worker)] * workers
+            with context.Pool(workers) as pool:
+                allowed = sum(pool.map(_hammer, jobs))
+            self.stdout.write(
+                f"{label:8s} {allowed:6d} of {workers * per_worker} requests allowed from {workers} "
+                f"workers against a limit of {limit}"
+            )
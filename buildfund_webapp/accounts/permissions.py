@@ -3,29 +3,25 @@
 This module defines reusable permission classes for checking if a
 requesting user has a particular system role.  These classes can be
 imported by viewsets in other apps without creating circular
-dependencies.
+dependencies.  Roles and profiles are read from the request principal
+(``accounts.principal``), so checks cost no queries once it is cached.
 """
 from __future__ import annotations
 
 from rest_framework import permissions
-from accounts.models import Role
+from accounts.principal import get_principal
 
 
 class IsAdmin(permissions.BasePermission):
     """
     Allows access only to users with the Admin role or superuser status.
 
-    The permission checks the authenticated user's associated roles via
-    ``UserRole``.  Superusers automatically satisfy this permission.
+    The permission checks the roles on the request principal, which come
+    from ``UserRole``.  Superusers automatically satisfy this permission.
     """
 
     def has_permission(self, request, view) -> bool:
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-        if user.is_superuser:
-            return True
-        return user.userrole_set.filter(role__name=Role.ADMIN).exists()
+        return get_principal(request.user).is_admin
 
 
 class IsLender(permissions.BasePermission):
@@ -36,7 +32,7 @@ class IsLender(permissions.BasePermission):
     """
 
     def has_permission(self, request, view) -> bool:
-        return request.user.is_authenticated and hasattr(request.user, "lenderprofile")
+        return get_principal(request.user).is_lender
 
 
 class IsBorrower(permissions.BasePermission):
@@ -45,4 +41,4 @@ class IsBorrower(permissions.BasePermission):
     """
 
     def has_permission(self, request, view) -> bool:
-        return request.user.is_authenticated and hasattr(request.user, "borrowerprofile")
\ No newline at end of file
+        return get_principal(request.user).is_borrower
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""Request principal: who the user is, resolved once and shared across workers.
+
+Permission classes and ``get_queryset`` methods need the user's roles and
+which profile (lender, borrower, consultant) they have.  Asking the
+database each time costs a ``UserRole`` query plus one query per
+``hasattr(user, "lenderprofile")``-style check, on every request.
+
+``get_principal(user)`` returns a ``Principal`` holding the role names and
+profile ids.  It is built with two queries, kept in the Django cache for
+``PRINCIPAL_CACHE_TTL`` seconds and stored on the user object, so further
+checks in the same request are attribute reads.  ``accounts.signals``
+drops the cached principal when the user, a role assignment or a profile
+changes.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Role, UserRole
+
+# Bump when the fields of Principal change, so entries in the old shape are ignored
+PRINCIPAL_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The requesting user's roles and profile ids."""
+
+    user_id: Optional[int]
+    roles: FrozenSet[str] = frozenset()
+    is_superuser: bool = False
+    lender_profile_id: Optional[int] = None
+    borrower_profile_id: Optional[int] = None
+    consultant_profile_id: Optional[int] = None
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.user_id is not None
+
+    @property
+    def is_admin(self) -> bool:
+        """Superusers and holders of the Admin role."""
+        return self.is_superuser or Role.ADMIN in self.roles
+
+    @property
+    def is_lender(self) -> bool:
+        return self.lender_profile_id is not None
+
+    @property
+    def is_borrower(self) -> bool:
+        return self.borrower_profile_id is not None
+
+    @property
+    def is_consultant(self) -> bool:
+        return self.consultant_profile_id is not None
+
+    def has_role(self, name: str) -> bool:
+        return name in self.roles
+
+
+ANONYMOUS = Principal(user_id=None)
+
+
+def principal_cache_key(user_id) -> str:
+    return f"accounts:principal:v{PRINCIPAL_FORMAT_VERSION}:{user_id}"
+
+
+def load_principal(user) -> Principal:
+    """Build a user's principal from the database."""
+    profile_ids = type(user).objects.filter(pk=user.pk).values(
+        "lenderprofile__id", "borrowerprofile__id", "consultantprofile__id"
+    ).first() or {}
+    roles = UserRole.objects.filter(user_id=user.pk).values_list("role__name", flat=True)
+    return Principal(
+        user_id=user.pk,
+        roles=frozenset(roles),
+        is_superuser=user.is_superuser,
+        lender_profile_id=profile_ids.get("lenderprofile__id"),
+        borrower_profile_id=profile_ids.get("borrowerprofile__id"),
+        consultant_profile_id=profile_ids.get("consultantprofile__id"),
+    )
+
+
+def get_principal(user) -> Principal:
+    """The principal for ``user`` (``request.user``); anonymous users get ``ANONYMOUS``."""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+    principal = user.__dict__.get("_principal")
+    if principal is None:
+        key = principal_cache_key(user.pk)
+        principal = cache.get(key)
+        if principal is None:
+            principal = load_principal(user)
+            cache.set(key, principal, getattr(settings, "PRINCIPAL_CACHE_TTL", 300))
+        user._principal = principal
+    return principal
+
+
+def invalidate_principal(user_id) -> None:
+    """Forget a user's cached principal, now and again once the transaction commits."""
+    if user_id is None:
+        return
+    key = principal_cache_key(user_id)
+    cache.delete(key)
+    # A request reading before the commit may have cached the old state meanwhile
+    transaction.on_commit(lambda: cache.delete(key))
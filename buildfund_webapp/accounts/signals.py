@@ -0,0 +1,41 @@
+"""Signals evicting cached tokens and principals when what they describe changes."""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from borrowers.models import BorrowerProfile
+from consultants.models import ConsultantProfile
+from lenders.models import LenderProfile
+
+from .authentication import invalidate_token
+from .models import UserRole
+from .principal import invalidate_principal
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_auth(sender, instance, **kwargs):
+    """Users can be deactivated or promoted; re-read them on their next request."""
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return  # Logging in changes nothing either cache holds
+    invalidate_principal(instance.pk)
+    for key in Token.objects.filter(user_id=instance.pk).values_list("key", flat=True):
+        invalidate_token(key)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=LenderProfile)
+@receiver(post_delete, sender=LenderProfile)
+@receiver(post_save, sender=BorrowerProfile)
+@receiver(post_delete, sender=BorrowerProfile)
+@receiver(post_save, sender=ConsultantProfile)
+@receiver(post_delete, sender=ConsultantProfile)
+def invalidate_principal_on_change(sender, instance, **kwargs):
+    invalidate_principal(instance.user_id)
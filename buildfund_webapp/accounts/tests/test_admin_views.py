@@ -0,0 +1,50 @@
+"""Tests for the admin dashboard's server-side counts and status filters."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from deals.tests.factories import make_deals
+from products.models import Product
+from projects.models import Project
+
+
+class PlatformStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        fixtures = make_deals(3, "stats")
+        projects = [deal.application.project for deal in fixtures["deals"]]
+        Project.objects.filter(pk=projects[0].pk).update(status="pending_review")
+        Project.objects.filter(pk__in=[p.pk for p in projects[1:]]).update(status="approved")
+        Product.objects.update(status="pending")
+        self.admin = get_user_model().objects.create_superuser(username="stats-admin", password="x")
+        self.client = APIClient(HTTP_HOST="localhost")
+        self.client.force_authenticate(self.admin)
+
+    def test_counts_come_from_the_whole_table(self):
+        response = self.client.get("/api/accounts/admin/users/platform_stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            "total_projects": 3,
+            "pending_projects": 1,
+            "approved_projects": 2,
+            "total_products": 1,
+            "pending_products": 1,
+            "active_products": 0,
+            "total_applications": 3,
+        })
+
+    def test_non_admins_are_refused(self):
+        self.client.force_authenticate(get_user_model().objects.create_user(username="stats-user"))
+        response = self.client.get("/api/accounts/admin/users/platform_stats/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_endpoints_filter_by_status(self):
+        response = self.client.get("/api/projects/", {"status": "pending_review"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get("/api/products/", {"status": "active"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 0)
@@ -0,0 +1,46 @@
+"""Tests for cached token authentication."""
+from __future__ import annotations
+
+import pickle
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from accounts.authentication import CachedTokenAuthentication, token_cache_key
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="token-user", password="s3cret-pass")
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_cache_hit_needs_no_queries(self):
+        self.auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.username, "token-user")
+        self.assertEqual(token.key, self.token.key)
+
+    def test_cache_holds_neither_the_key_nor_the_password_hash(self):
+        self.auth.authenticate_credentials(self.token.key)
+        cached = pickle.dumps(cache.get(token_cache_key(self.token.key)))
+        self.assertNotIn(self.token.key.encode(), cached)
+        self.assertNotIn(self.user.password.encode(), cached)
+
+    def test_password_is_loaded_on_demand(self):
+        self.auth.authenticate_credentials(self.token.key)
+        user, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertTrue(user.check_password("s3cret-pass"))
+
+    def test_deactivated_user_is_rejected(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
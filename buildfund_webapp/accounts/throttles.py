@@ -1,8 +1,13 @@
-"""Custom throttling classes for authentication endpoints."""
+"""Custom throttling classes for authentication endpoints.
+
+They count requests in the shared ``throttle`` cache (see ``core.throttles``),
+so a limit holds across all worker processes.
+"""
 from __future__ import annotations
 
 from django.conf import settings
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+from core.throttles import AnonRateThrottle, UserRateThrottle
 
 
 class LoginRateThrottle(AnonRateThrottle):
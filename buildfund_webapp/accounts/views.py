@@ -30,6 +30,7 @@ class RoleListView(generics.ListAPIView):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = None
 
 
 class CurrentUserView(generics.RetrieveAPIView):
@@ -0,0 +1,132 @@
+"""Chat-completion backends used by the underwriter report service.
+
+``UNDERWRITER_LLM_BACKEND`` selects the backend: ``openai`` (default) calls
+the OpenAI API; ``fake`` returns a schema-conforming report built from the
+prompt's input data, so the generation pipeline can be run and load-tested
+offline.
+"""
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict
+
+from django.conf import settings
+
+
+class OpenAIChatBackend:
+    """Call the OpenAI chat completions API in JSON mode."""
+
+    def __init__(self, model: str = "gpt-4"):
+        from openai import OpenAI
+
+        api_key = settings.OPENAI_API_KEY
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY is not configured")
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        # Low temperature for deterministic output
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.2,
+            response_format={"type": "json_object"},  # Force JSON output
+        )
+        return response.choices[0].message.content
+
+
+class FakeChatBackend:
+    """Offline stand-in that echoes the input data into a valid report."""
+
+    model = "fake"
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return json.dumps(self._report(self._input_data(user_prompt)))
+
+    @staticmethod
+    def _input_data(user_prompt: str) -> Dict[str, Any]:
+        """Extract the input JSON embedded after "Input data:" in the prompt."""
+        _, _, tail = user_prompt.partition("Input data:")
+        start = tail.find("{")
+        if start < 0:
+            return {}
+        try:
+            data, _ = json.JSONDecoder().raw_decode(tail[start:])
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def _report(data: Dict[str, Any]) -> Dict[str, Any]:
+        meta = data.get("meta") or {}
+        company = data.get("company") or {}
+        funding = data.get("funding_requirement") or {}
+        company_name = company.get("company_name") or "Not provided"
+        amount = funding.get("loan_amount") or 0
+        term = funding.get("term_months") or 0
+        return {
+            "meta": {
+                "report_version": "fake-1",
+                "generated_at": datetime.now(dt_timezone.utc).isoformat(),
+                "application_id": meta.get("application_id") or 0,
+            },
+            "executiveSummary": {
+                "borrower_name": company_name,
+                "facility_amount": amount,
+                "facility_term": term,
+                "recommendation": "Not provided",
+                "risk_rating": "Not provided",
+                "key_highlights": [],
+            },
+            "facilityRequest": {
+                "amount": amount,
+                "term_months": term,
+                "purpose": "Not provided",
+                "security": funding.get("security") or "Not provided",
+                "repayment_method": funding.get("repayment_method") or "Not provided",
+            },
+            "borrowerCompanyOverview": {
+                "company_name": company_name,
+                "company_number": company.get("company_number") or "Not provided",
+                "company_status": company.get("company_status") or "Not provided",
+                "incorporation_date": company.get("incorporation_date") or "Not provided",
+                "trading_address": company.get("trading_address") or "Not provided",
+                "sic_codes": company.get("sic_codes") or [],
+            },
+            "applicantsAndGuarantors": [],
+            "financialOverview": {},
+            "strengths": [],
+            "risksAndMitigants": [],
+            "queries": ["Generated by the offline fake LLM backend"],
+            "conditionsPrecedent": [],
+            "suggestedCovenants": [],
+            "documentsReviewed": [],
+            "recommendation": {
+                "decision": "Not provided",
+                "rationale": "Not provided",
+                "conditions": [],
+            },
+            "disclaimer": "Test report generated without a language model.",
+            "plainTextNarrative": f"Offline test report for {company_name}.",
+        }
+
+
+def get_llm_backend():
+    """Return the configured chat backend."""
+    backend = getattr(settings, "UNDERWRITER_LLM_BACKEND", "openai")
+    if backend == "fake":
+        return FakeChatBackend(latency_seconds=getattr(settings, "UNDERWRITER_FAKE_LLM_LATENCY", 0.0))
+    if backend == "openai":
+        return OpenAIChatBackend()
+    raise ValueError(f"Unknown UNDERWRITER_LLM_BACKEND '{backend}'")
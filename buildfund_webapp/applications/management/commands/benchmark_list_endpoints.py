@@ -0,0 +1,140 @@
+"""Benchmark list endpoint payloads: unpaginated full responses vs pages with sparse fieldsets."""
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+EXPAND_ALL = "project_details,borrower_details,lender_details,product_details"
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed applications, deals and messages inside a rolled-back transaction and compare "
+        "response size and latency of the unpaginated list endpoints with paginated, "
+        "sparse-fieldset responses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applications', type=int, default=500, help='Applications/deals to seed (default: 500).')
+        parser.add_argument('--messages', type=int, default=2000, help='Messages to seed (default: 2000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per case (default: 5).')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = self._seed(options['applications'], options['messages'])
+                self._run(user, options['repeat'])
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Synthetic data rolled back.")
+
+    def _seed(self, n_applications, n_messages):
+        from applications.models import Application
+        from borrowers.models import BorrowerProfile
+        from deals.models import Deal
+        from lenders.models import LenderProfile
+        from messaging.models import Message
+        from products.models import Product
+        from projects.models import Project
+
+        User = get_user_model()
+        started = time.perf_counter()
+        lender_user = User.objects.create(username='bench-lists-lender')
+        lender = LenderProfile.objects.create(
+            user=lender_user, organisation_name='Bench Lender', contact_email='lender@bench.invalid',
+        )
+        borrower_user = User.objects.create(username='bench-lists-borrower')
+        borrower = BorrowerProfile.objects.create(user=borrower_user, company_name='Bench Borrower')
+        product = Product.objects.create(
+            lender=lender, name='Bench Product', funding_type='development_finance',
+            property_type='residential', min_loan_amount=1, max_loan_amount=10 ** 8,
+            interest_rate_min=1, interest_rate_max=10, term_min_months=1, term_max_months=36,
+            repayment_structure='interest_only',
+        )
+        projects = Project.objects.bulk_create([
+            Project(
+                borrower=borrower, address=f'{i} Bench Street', town='Bench', county='Bench', postcode='BE1 1NC',
+                loan_amount_required=1000000, funding_type='development_finance', property_type='residential',
+                development_extent='new_build', tenure='freehold', repayment_method='sale',
+                description='Ground-up residential scheme. ' * 20,
+            )
+            for i in range(n_applications)
+        ], batch_size=1000)
+        applications = Application.objects.bulk_create([
+            Application(
+                project=project, lender=lender, product=product,
+                proposed_loan_amount=1000000, proposed_term_months=12, notes='Bench application.',
+            )
+            for project in projects
+        ], batch_size=1000)
+        Deal.objects.bulk_create([
+            Deal(
+                application=application, deal_id=f'BENCH-LIST-{i:06d}', lender=lender,
+                borrower_company=borrower, facility_type='development',
+            )
+            for i, application in enumerate(applications)
+        ], batch_size=1000)
+        Message.objects.bulk_create([
+            Message(
+                application=applications[i % len(applications)], sender=borrower_user, recipient=lender_user,
+                subject=f'Message {i}', body='Please find the updated schedule attached. ' * 5,
+            )
+            for i in range(n_messages)
+        ], batch_size=1000)
+        self.stdout.write(
+            f"Seeded {n_applications} applications/deals and {n_messages} messages "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return lender_user
+
+    def _run(self, user, repeat):
+        from applications.views import ApplicationViewSet
+        from deals.views import DealViewSet
+        from messaging.views import MessageViewSet
+
+        cases = [
+            ('applications', ApplicationViewSet, [
+                ('before: all rows, all fields', {'pagination_class': None}, {'expand': EXPAND_ALL}),
+                ('after: default page', {}, {}),
+                ('after: page, ?expand=project_details', {}, {'expand': 'project_details'}),
+                ('after: page, ?fields=id,status,project', {}, {'fields': 'id,status,project'}),
+            ]),
+            ('deals', DealViewSet, [
+                ('before: all rows', {'pagination_class': None}, {}),
+                ('after: cursor page', {}, {}),
+                ('after: cursor page, ?fields=', {}, {'fields': 'deal_id,status,lender_name'}),
+            ]),
+            ('messages', MessageViewSet, [
+                ('before: all rows', {'pagination_class': None}, {}),
+                ('after: cursor page', {}, {}),
+                ('after: cursor page, ?fields=', {}, {'fields': 'id,subject,is_read,created_at'}),
+            ]),
+        ]
+        factory = APIRequestFactory()
+        for endpoint, viewset, variants in cases:
+            self.stdout.write(f"--- {endpoint} ---")
+            for label, initkwargs, params in variants:
+                view = viewset.as_view({'get': 'list'}, **initkwargs)
+                timings, size = [], 0
+                for _ in range(repeat):
+                    request = factory.get(f'/api/{endpoint}/', params, HTTP_HOST='localhost')
+                    force_authenticate(request, user=user)
+                    started = time.perf_counter()
+                    response = view(request)
+                    response.render()
+                    timings.append((time.perf_counter() - started) * 1000)
+                    size = len(response.content)
+                data = response.data
+                rows = len(data['results']) if isinstance(data, dict) and 'results' in data else len(data)
+                self.stdout.write(
+                    f"{label:42s} rows={rows:5d} bytes={size:9d} median={statistics.median(timings):8.1f}ms"
+                )
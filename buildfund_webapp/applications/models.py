@@ -85,17 +85,16 @@ class Application(models.Model):
             self.status_changed_at = timezone.now()
             self.save(update_fields=["status", "status_feedback", "status_changed_at", "updated_at"])
             
-            # Generate underwriter report if status changed to "submitted"
+            # Queue underwriter report generation if status changed to "submitted"
             if old_status != 'submitted' and new_status == 'submitted':
                 try:
                     from .underwriter_service import UnderwriterReportService
-                    service = UnderwriterReportService()
-                    service.generate_report(self, created_by=None)  # System-generated
+                    UnderwriterReportService.enqueue_report(self, created_by=None)  # System-generated
                 except Exception as e:
                     # Log error but don't fail the status update
                     import logging
                     logger = logging.getLogger(__name__)
-                    logger.error(f"Failed to generate underwriter report on submission: {e}", exc_info=True)
+                    logger.error(f"Failed to queue underwriter report on submission: {e}", exc_info=True)
             
             # Create Deal if status changed to "accepted"
             if old_status != 'accepted' and new_status == 'accepted':
@@ -298,6 +297,16 @@ class UnderwriterReport(models.Model):
     # Generation metadata
     generation_error = models.TextField(blank=True, help_text="Error message if generation failed")
     input_data_snapshot = models.JSONField(default=dict, blank=True, help_text="Snapshot of input data used")
+    input_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 of the canonical input data and prompt/schema version"
+    )
+    served_from_cache = models.BooleanField(
+        default=False,
+        help_text="True if report_json was reused from an earlier report with the same input hash"
+    )
     
     class Meta:
         ordering = ['-version', '-created_at']
@@ -246,11 +246,13 @@ class ReportInputBuilder:
         documents = []
         
         try:
-            from documents.models import Document
+            from documents.models import Document, deferred_document_fields
             from applications.models import ApplicationDocument
             
             # Get documents linked to this application
-            app_docs = ApplicationDocument.objects.filter(application=self.application).select_related('document', 'document__document_type')
+            app_docs = ApplicationDocument.objects.filter(application=self.application).select_related(
+                'document', 'document__document_type'
+            ).defer(*deferred_document_fields())
             
             for app_doc in app_docs:
                 doc = app_doc.document
@@ -0,0 +1,117 @@
+"""Caching for underwriter report generation.
+
+Two layers avoid repeated work:
+
+* Report input sections built by ``ReportInputBuilder`` are memoised in the
+  ``aggregates`` cache, keyed by stamps of the rows each section reads: their
+  ``updated_at``, or a digest of the linked documents.  Stamps come from the
+  database, so an evicted cache entry can only cause a rebuild, never bring
+  back a stale section.
+* LLM output is content-addressed: a report's ``input_hash`` is a SHA-256 of
+  the canonicalised input JSON plus the prompt/schema version, and a ready
+  report with the same hash is reused instead of calling the LLM again.
+
+Hit and miss counters for both layers are kept in the cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache import caches
+
+from core.cache import AGGREGATE_CACHE, incr_with_expiry
+
+# Memoised sections under stamps that no longer match are left to expire
+SECTION_MEMO_TIMEOUT = 60 * 60 * 24
+
+STAT_NAMES = ('section_hits', 'section_misses', 'llm_hits', 'llm_misses')
+
+# Input fields that change on every build and must not affect the hash
+VOLATILE_INPUT_FIELDS = {('meta', 'generated_at')}
+
+
+# ----------------------------------------------------------------------
+# Source row stamps
+# ----------------------------------------------------------------------
+
+def row_stamp(updated_at: Any) -> str:
+    """Stamp for a row with an ``updated_at`` column ('' if there is no row)."""
+    return updated_at.isoformat() if updated_at is not None else ''
+
+
+def rows_stamp(rows: Iterable[Iterable[Any]]) -> str:
+    """Stamp for a set of rows without ``updated_at``: a digest of the values read."""
+    return hashlib.sha256(canonical_json(sorted(list(row) for row in rows)).encode()).hexdigest()[:16]
+
+
+# ----------------------------------------------------------------------
+# Section memo
+# ----------------------------------------------------------------------
+
+def section_memo_key(section: str, stamps: Dict[str, Any]) -> str:
+    stamp = ':'.join(f'{scope}={pk}@{row}' for scope, (pk, row) in sorted(stamps.items()))
+    return f'underwriter_input:section:{section}:{stamp}'
+
+
+def get_section(key: str) -> Optional[Any]:
+    value = caches[AGGREGATE_CACHE].get(key)
+    record('section_hits' if value is not None else 'section_misses')
+    return value
+
+
+def set_section(key: str, value: Any) -> None:
+    caches[AGGREGATE_CACHE].set(key, value, SECTION_MEMO_TIMEOUT)
+
+
+# ----------------------------------------------------------------------
+# Content addressing
+# ----------------------------------------------------------------------
+
+def canonical_json(data: Any) -> str:
+    """Serialise JSON deterministically (sorted keys, no whitespace)."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def input_hash(input_data: Dict[str, Any], prompt_version: str) -> str:
+    """Return the content address of a report input under a prompt version."""
+    stable = {
+        section: (
+            {k: v for k, v in value.items() if (section, k) not in VOLATILE_INPUT_FIELDS}
+            if isinstance(value, dict) else value
+        )
+        for section, value in input_data.items()
+    }
+    digest = hashlib.sha256()
+    digest.update(prompt_version.encode())
+    digest.update(b'\0')
+    digest.update(canonical_json(stable).encode())
+    return digest.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Counters
+# ----------------------------------------------------------------------
+
+def _stat_key(name: str) -> str:
+    return f'underwriter_cache:stats:{name}'
+
+
+def record(name: str) -> None:
+    incr_with_expiry(caches[AGGREGATE_CACHE], _stat_key(name), None)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters and hit rates for both cache layers."""
+    values = caches[AGGREGATE_CACHE].get_many([_stat_key(name) for name in STAT_NAMES])
+    stats = {name: values.get(_stat_key(name), 0) for name in STAT_NAMES}
+    for layer in ('section', 'llm'):
+        total = stats[f'{layer}_hits'] + stats[f'{layer}_misses']
+        stats[f'{layer}_hit_rate'] = round(stats[f'{layer}_hits'] / total, 4) if total else None
+    stats['llm_calls_saved'] = stats['llm_hits']
+    return stats
+
+
+def reset_stats() -> None:
+    caches[AGGREGATE_CACHE].delete_many([_stat_key(name) for name in STAT_NAMES])
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from core.validators import validate_numeric_input, sanitize_string
 
 from .models import Application
@@ -9,7 +10,7 @@ from projects.models import Project
 from products.models import Product
 
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class ApplicationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializes Application model for API operations."""
 
     project_details = serializers.SerializerMethodField()
@@ -46,6 +47,8 @@ class ApplicationSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "created_at", "updated_at", "lender", "status_changed_at"]
+        # Full nested profiles; list responses include them only when asked via ?expand=
+        expandable_fields = ["project_details", "borrower_details", "lender_details", "product_details"]
     
     def get_project_details(self, obj):
         """Return full project details for lenders viewing borrower enquiries."""
@@ -6,36 +6,75 @@ from decimal import Decimal
 from typing import Dict, Any, List, Optional
 from django.utils import timezone
 from django.conf import settings
+from django.db.models import Min, Sum
 
-from borrowers.models import BorrowerProfile
+from borrowers.models import BankCashflowMonth, BorrowerProfile
 from projects.models import Project
 from applications.models import Application, ApplicationDocument
+from applications import report_cache
+from documents.models import deferred_document_fields
 
 
 class ReportInputBuilder:
     """Builds structured input data for underwriter report generation."""
     
-    def __init__(self, application: Application):
+    # Section -> (builder method, source rows it reads).  Sections are memoised
+    # per source-row stamp; see applications/report_cache.py.  ``meta`` is
+    # rebuilt every time because it carries the generation timestamp.
+    SECTIONS = [
+        ('meta', '_build_meta', None),
+        ('company', '_build_company_data', ('borrower',)),
+        ('directors_and_shareholders', '_build_directors_shareholders', ('borrower',)),
+        ('applicants_and_guarantors', '_build_applicants_guarantors', ('borrower',)),
+        ('financial_overview', '_build_financial_overview', ('borrower',)),
+        ('bank_data_summary', '_build_bank_data_summary', ('borrower',)),
+        ('funding_requirement', '_build_funding_requirement', ('application', 'project', 'product')),
+        ('linked_project_data', '_build_linked_project_data', ('project',)),
+        ('lender_and_product_data', '_build_lender_and_product_data', ('application', 'lender', 'product')),
+        ('documents_index', '_build_documents_index', ('documents', 'borrower')),
+        ('derived_metrics', '_build_derived_metrics', ('application', 'project', 'borrower')),
+        ('data_completeness', '_build_data_completeness', ('borrower', 'project', 'documents')),
+    ]
+    
+    def __init__(self, application: Application, use_memo: bool = True):
         self.application = application
         self.borrower_profile = application.project.borrower
         self.project = application.project
         self.lender = application.lender
+        self.use_memo = use_memo
     
     def build(self) -> Dict[str, Any]:
         """Build complete input data structure for report generation."""
+        stamps = self._source_stamps() if self.use_memo else {}
+        data = {}
+        for section, method, sources in self.SECTIONS:
+            if not sources or not self.use_memo:
+                data[section] = getattr(self, method)()
+                continue
+            key = report_cache.section_memo_key(section, {scope: stamps[scope] for scope in sources})
+            value = report_cache.get_section(key)
+            if value is None:
+                value = getattr(self, method)()
+                report_cache.set_section(key, value)
+            data[section] = value
+        return data
+    
+    def _source_stamps(self) -> Dict[str, tuple]:
+        """Return (pk, stamp) for every source row the sections read, in two queries."""
+        updated = Application.objects.filter(pk=self.application.pk).values(
+            'updated_at', 'project__updated_at', 'project__borrower__updated_at',
+            'lender__updated_at', 'product__updated_at',
+        ).first() or {}
+        documents = ApplicationDocument.objects.filter(application=self.application).values_list(
+            'document_id', 'document__file_name', 'document__document_type_id',
+        )
         return {
-            'meta': self._build_meta(),
-            'company': self._build_company_data(),
-            'directors_and_shareholders': self._build_directors_shareholders(),
-            'applicants_and_guarantors': self._build_applicants_guarantors(),
-            'financial_overview': self._build_financial_overview(),
-            'bank_data_summary': self._build_bank_data_summary(),
-            'funding_requirement': self._build_funding_requirement(),
-            'linked_project_data': self._build_linked_project_data(),
-            'lender_and_product_data': self._build_lender_and_product_data(),
-            'documents_index': self._build_documents_index(),
-            'derived_metrics': self._build_derived_metrics(),
-            'data_completeness': self._build_data_completeness(),
+            'borrower': (self.borrower_profile.pk, report_cache.row_stamp(updated.get('project__borrower__updated_at'))),
+            'project': (self.project.pk if self.project else None, report_cache.row_stamp(updated.get('project__updated_at'))),
+            'application': (self.application.pk, report_cache.row_stamp(updated.get('updated_at'))),
+            'documents': (self.application.pk, report_cache.rows_stamp(documents)),
+            'lender': (self.lender.pk if self.lender else None, report_cache.row_stamp(updated.get('lender__updated_at'))),
+            'product': (self.application.product_id, report_cache.row_stamp(updated.get('product__updated_at'))),
         }
     
     def _build_meta(self) -> Dict[str, Any]:
@@ -224,6 +263,7 @@ class ReportInputBuilder:
                     'total_balance': sum(float(acc.get('balance', 0)) for acc in accounts if acc.get('balance')),
                     'account_count': len(accounts),
                 },
+                'cashflow': self._build_cashflow_summary(),
             }
         elif method == 'pdf_upload':
             statements = self.borrower_profile.bank_statements or []
@@ -239,6 +279,43 @@ class ReportInputBuilder:
                 'note': 'No bank data available',
             }
     
+    def _build_cashflow_summary(self, months: int = 12) -> Optional[Dict[str, Any]]:
+        """Summarise the synced transaction ledger's monthly aggregates across the borrower's accounts."""
+        rows = list(
+            BankCashflowMonth.objects.filter(account__borrower=self.borrower_profile, account__is_active=True)
+            .values('month')
+            .annotate(
+                inflows=Sum('inflows'),
+                outflows=Sum('outflows'),
+                min_balance=Min('min_balance'),
+                bounced_count=Sum('bounced_count'),
+                transaction_count=Sum('transaction_count'),
+            )
+            .order_by('-month')[:months]
+        )
+        if not rows:
+            return None
+        rows.reverse()
+        balances = [row['min_balance'] for row in rows if row['min_balance'] is not None]
+        return {
+            'months': [
+                {
+                    'month': row['month'].strftime('%Y-%m'),
+                    'inflows': float(row['inflows']),
+                    'outflows': float(row['outflows']),
+                    'net': float(row['inflows'] - row['outflows']),
+                    'min_balance': float(row['min_balance']) if row['min_balance'] is not None else None,
+                    'bounced_items': row['bounced_count'],
+                    'transaction_count': row['transaction_count'],
+                }
+                for row in rows
+            ],
+            'average_monthly_inflows': float(sum(row['inflows'] for row in rows) / len(rows)),
+            'average_monthly_outflows': float(sum(row['outflows'] for row in rows) / len(rows)),
+            'lowest_balance': float(min(balances)) if balances else None,
+            'bounced_items': sum(row['bounced_count'] for row in rows),
+        }
+    
     def _build_funding_requirement(self) -> Dict[str, Any]:
         """Build funding requirement from application."""
         return {
@@ -300,7 +377,9 @@ class ReportInputBuilder:
     
     def _build_documents_index(self) -> List[Dict[str, Any]]:
         """Build documents index (names and types only)."""
-        app_docs = ApplicationDocument.objects.filter(application=self.application).select_related('document')
+        app_docs = ApplicationDocument.objects.filter(application=self.application).select_related('document').defer(
+            *deferred_document_fields()
+        )
         
         company_docs = self.borrower_profile.company_documents or {}
         personal_docs = self.borrower_profile.personal_documents or {}
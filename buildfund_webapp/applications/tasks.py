@@ -0,0 +1,33 @@
+"""Background tasks for the applications app."""
+from __future__ import annotations
+
+from tasks.registry import PermanentTaskError, register_task
+
+from .models import UnderwriterReport
+from .underwriter_service import GENERATE_REPORT_TASK, UnderwriterReportService
+
+
+@register_task(GENERATE_REPORT_TASK, max_attempts=3, retry_delay_seconds=30)
+def generate_underwriter_report(report_id: int, use_cache: bool = True):
+    """Run the build/LLM/validate/retry cycle for a queued report."""
+    report = UnderwriterReport.objects.select_related('application', 'lender').filter(pk=report_id).first()
+    if report is None:
+        raise PermanentTaskError(f"Underwriter report {report_id} no longer exists")
+    if report.status == 'ready':
+        return {'report_id': report.id, 'status': report.status}
+    if report.status == 'failed':
+        # A previous attempt failed; this is the queue's retry
+        report.status = 'generating'
+        report.generation_error = ''
+        report.save(update_fields=['status', 'generation_error', 'updated_at'])
+    
+    try:
+        service = UnderwriterReportService()
+    except ValueError as e:
+        report.status = 'failed'
+        report.generation_error = str(e)
+        report.save(update_fields=['status', 'generation_error', 'updated_at'])
+        raise PermanentTaskError(str(e))
+    
+    service.run_generation(report, use_cache=use_cache)
+    return {'report_id': report.id, 'status': report.status}
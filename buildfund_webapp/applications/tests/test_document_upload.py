@@ -0,0 +1,39 @@
+"""Tests for uploading application documents."""
+from __future__ import annotations
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from applications.models import ApplicationDocument
+from deals.tests.factories import make_deals
+from documents.models import Document
+from documents.storage import BaseDocumentStorage
+
+
+class FailingStorage(BaseDocumentStorage):
+    def save(self, content):
+        raise OSError("No space left on device")
+
+
+class DocumentUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.application = make_deals(1, "upload")["deals"][0].application
+        self.client = APIClient(HTTP_HOST="localhost")
+        self.client.force_authenticate(get_user_model().objects.create_superuser(username="upload-admin", password="x"))
+
+    def test_storage_failure_creates_no_record(self):
+        upload = SimpleUploadedFile("statement.pdf", b"%PDF-1.4 test", content_type="application/pdf")
+        with mock.patch("documents.storage.get_document_storage", return_value=FailingStorage()):
+            response = self.client.post(
+                f"/api/applications/{self.application.id}/documents/", {"files": [upload]}, format="multipart",
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("statement.pdf", response.data["error"])
+        self.assertFalse(Document.objects.exists())
+        self.assertFalse(ApplicationDocument.objects.exists())
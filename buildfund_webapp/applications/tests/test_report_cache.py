@@ -0,0 +1,40 @@
+"""Tests for the underwriter report input memo."""
+from __future__ import annotations
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from applications import report_cache
+from applications.models import Application
+from applications.services import ReportInputBuilder
+from core.cache import AGGREGATE_CACHE
+from deals.tests.factories import make_deals
+
+
+class FundingInputBuilder(ReportInputBuilder):
+    """Only the sections that read the application and project."""
+
+    SECTIONS = [entry for entry in ReportInputBuilder.SECTIONS if entry[0] in ("meta", "funding_requirement")]
+
+
+class ReportInputMemoTests(TestCase):
+    def setUp(self):
+        caches[AGGREGATE_CACHE].clear()
+        self.application = make_deals(1, prefix="report")["deals"][0].application
+
+    def _build(self):
+        application = Application.objects.select_related("project__borrower", "lender", "product").get(pk=self.application.pk)
+        return FundingInputBuilder(application).build()
+
+    def test_second_build_is_served_from_the_memo(self):
+        first = self._build()
+        report_cache.reset_stats()
+        second = self._build()
+        self.assertEqual(first["funding_requirement"], second["funding_requirement"])
+        self.assertEqual(report_cache.cache_stats()["section_misses"], 0)
+
+    def test_changed_source_row_rebuilds_its_sections(self):
+        self._build()
+        self.application.proposed_loan_amount = 2500
+        self.application.save()
+        self.assertEqual(self._build()["funding_requirement"]["loan_amount"], 2500.0)
@@ -1,15 +1,32 @@
 """Service for generating underwriter reports using OpenAI."""
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-from typing import Dict, Any, Optional
-from django.conf import settings
-from openai import OpenAI
+import time
+from typing import Dict, Any, Optional, Tuple
+from django.db import transaction
 
+from tasks.backends import enqueue
+from tasks.models import BackgroundTask
+from . import report_cache
+from .llm_backends import get_llm_backend
 from .models import Application, UnderwriterReport
 from .services import ReportInputBuilder
 
+# Registered in applications/tasks.py
+GENERATE_REPORT_TASK = 'applications.generate_underwriter_report'
+
+# Long-polling holds a web worker, so keep the wait well under the gunicorn timeout
+STATUS_MAX_WAIT_SECONDS = 25
+STATUS_POLL_INTERVAL_SECONDS = 0.5
+
+
+def report_task_reference(report_id: int) -> str:
+    """Return the task reference used to look up a report's generation task."""
+    return f"underwriter_report:{report_id}"
+
 
 # Strict JSON output schema
 REPORT_SCHEMA = {
@@ -175,30 +192,116 @@ Input data:
 
 Now generate the report."""
     
-    def __init__(self):
-        api_key = settings.OPENAI_API_KEY
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY is not configured")
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-4"  # or "gpt-4-turbo-preview" for latest
+    def __init__(self, llm=None):
+        self.llm = llm or get_llm_backend()
+        self.model = self.llm.model
+        self.client = getattr(self.llm, 'client', None)
     
-    def generate_report(self, application: Application, created_by=None) -> UnderwriterReport:
-        """Generate an underwriter report for an application."""
-        # Get next version number
+    @property
+    def prompt_version(self) -> str:
+        """Fingerprint of everything besides the input that shapes the LLM output."""
+        digest = hashlib.sha256(report_cache.canonical_json([
+            self.model, self.SYSTEM_PROMPT, self.USER_PROMPT_TEMPLATE, REPORT_SCHEMA,
+        ]).encode())
+        return digest.hexdigest()[:16]
+    
+    @staticmethod
+    def find_cached_report(input_hash: str, exclude_id: Optional[int] = None) -> Optional[UnderwriterReport]:
+        """Return the most recent ready report generated from identical input."""
+        reports = UnderwriterReport.objects.filter(input_hash=input_hash, status='ready')
+        if exclude_id:
+            reports = reports.exclude(pk=exclude_id)
+        return reports.order_by('-id').only('id', 'report_json', 'plain_text_narrative').first()
+    
+    @staticmethod
+    def create_pending_report(application: Application, created_by=None) -> UnderwriterReport:
+        """Create the next report version in ``generating`` status."""
         latest = UnderwriterReport.objects.filter(
             application=application,
             lender=application.lender
         ).order_by('-version').first()
         next_version = (latest.version + 1) if latest else 1
         
-        # Create report record with generating status
-        report = UnderwriterReport.objects.create(
+        return UnderwriterReport.objects.create(
             application=application,
             lender=application.lender,
             version=next_version,
             status='generating',
             created_by=created_by,
         )
+    
+    @staticmethod
+    def enqueue_report(application: Application, created_by=None,
+                       use_cache: bool = True) -> Tuple[UnderwriterReport, BackgroundTask]:
+        """
+        Create a ``generating`` report and queue its generation.
+        
+        Returns immediately; the task worker runs the build/LLM/validate/retry
+        cycle.  Raises ValueError if the LLM backend is not configured.
+        """
+        get_llm_backend()  # Fail fast on missing configuration
+        with transaction.atomic():
+            report = UnderwriterReportService.create_pending_report(application, created_by)
+            task = enqueue(
+                GENERATE_REPORT_TASK,
+                {'report_id': report.id, 'use_cache': use_cache},
+                reference=report_task_reference(report.id),
+            )
+        return report, task
+    
+    @staticmethod
+    def generation_status(report: UnderwriterReport) -> Dict[str, Any]:
+        """
+        Describe a report's generation progress for status polling.
+        
+        A report marked failed while its task still has retries pending is
+        reported as ``generating``.
+        """
+        task = BackgroundTask.objects.filter(
+            reference=report_task_reference(report.id)
+        ).order_by('-id').first()
+        retrying = report.status == 'failed' and task is not None and not task.is_finished
+        return {
+            'report_id': report.id,
+            'version': report.version,
+            'status': 'generating' if retrying else report.status,
+            'error': '' if retrying else report.generation_error,
+            'retrying': retrying,
+            'served_from_cache': report.served_from_cache,
+            'task': {
+                'id': task.id,
+                'status': task.status,
+                'attempts': task.attempts,
+                'max_attempts': task.max_attempts,
+            } if task else None,
+            'updated_at': report.updated_at.isoformat(),
+        }
+    
+    @staticmethod
+    def wait_for_report(report: UnderwriterReport, timeout: float) -> UnderwriterReport:
+        """Long-poll until the report leaves ``generating`` or the (capped) timeout passes."""
+        deadline = time.monotonic() + min(timeout, STATUS_MAX_WAIT_SECONDS)
+        while time.monotonic() < deadline:
+            status = UnderwriterReportService.generation_status(report)['status']
+            if status != 'generating':
+                break
+            time.sleep(STATUS_POLL_INTERVAL_SECONDS)
+            report.refresh_from_db()
+        return report
+    
+    def generate_report(self, application: Application, created_by=None) -> UnderwriterReport:
+        """Generate an underwriter report for an application synchronously."""
+        report = self.create_pending_report(application, created_by)
+        return self.run_generation(report)
+    
+    def run_generation(self, report: UnderwriterReport, use_cache: bool = True) -> UnderwriterReport:
+        """
+        Build input data, call the LLM, validate and store the result on a report.
+        
+        With ``use_cache`` an identical earlier input (same content hash and
+        prompt version) reuses that report's output instead of calling the LLM.
+        """
+        application = report.application
         
         try:
             # Build input data
@@ -207,32 +310,34 @@ Now generate the report."""
             
             # Store input snapshot
             report.input_data_snapshot = input_data
+            report.input_hash = report_cache.input_hash(input_data, self.prompt_version)
             report.save()
             
+            if use_cache:
+                cached = self.find_cached_report(report.input_hash, exclude_id=report.id)
+                report_cache.record('llm_hits' if cached else 'llm_misses')
+                if cached:
+                    report.report_json = cached.report_json
+                    report.plain_text_narrative = cached.plain_text_narrative
+                    report.served_from_cache = True
+                    report.status = 'ready'
+                    report.save()
+                    return report
+            
             # Build prompts
             user_prompt = self.USER_PROMPT_TEMPLATE.format(
                 REPORT_INPUT_JSON=json.dumps(input_data, indent=2)
             )
             
-            # Call OpenAI with low temperature for deterministic output
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.2,
-                response_format={"type": "json_object"},  # Force JSON output
-            )
+            content = self.llm.complete(self.SYSTEM_PROMPT, user_prompt)
             
             # Parse response
-            content = response.choices[0].message.content
             report_json = json.loads(content)
             
             # Validate against schema (basic check)
             if not self._validate_schema(report_json):
                 # Retry with corrective prompt
-                return self._retry_generation(application, report, input_data, created_by)
+                return self._retry_generation(application, report, input_data, report.created_by)
             
             # Extract plain text narrative
             plain_text = report_json.get('plainTextNarrative', '')
@@ -268,17 +373,7 @@ Now generate the report again, ensuring strict schema compliance.""".format(
         )
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": corrective_prompt}
-                ],
-                temperature=0.2,
-                response_format={"type": "json_object"},
-            )
-            
-            content = response.choices[0].message.content
+            content = self.llm.complete(self.SYSTEM_PROMPT, corrective_prompt)
             report_json = json.loads(content)
             
             plain_text = report_json.get('plainTextNarrative', '')
@@ -299,7 +394,3 @@ Now generate the report again, ensuring strict schema compliance.""".format(
         """Basic schema validation (check required top-level keys)."""
         required_keys = REPORT_SCHEMA.get('required', [])
         return all(key in data for key in required_keys)
-
-        thread.start()
-        
-        return report
\ No newline at end of file
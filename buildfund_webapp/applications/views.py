@@ -10,10 +10,14 @@ from .models import Application, ApplicationStatusHistory, ApplicationDocument,
 from .serializers import ApplicationSerializer
 from .analysis import BorrowerAnalysisReport
 from .underwriter_service import UnderwriterReportService
-from documents.models import Document, DocumentType
+from . import report_cache
+from documents.models import Document, DocumentType, deferred_document_fields
+from documents.pagination import DocumentCursorPagination
 from documents.services import DocumentValidationService, DocumentAIAssessmentService
+from documents.responses import document_response
 from rest_framework.parsers import MultiPartParser, FormParser
 from accounts.auth_views import verify_password
+from accounts.principal import get_principal
 
 
 class ApplicationViewSet(viewsets.ModelViewSet):
@@ -23,20 +27,20 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
+        principal = get_principal(self.request.user)
         try:
             # Lenders see their own applications/enquiries; borrowers see applications/enquiries for their projects
-            if hasattr(user, "lenderprofile"):
-                return Application.objects.filter(lender=user.lenderprofile).select_related(
-                    "project", "project__borrower", "project__borrower__user", "product", "lender", "lender__user"
+            if principal.is_lender:
+                return Application.objects.filter(lender_id=principal.lender_profile_id).select_related(
+                    "project", "project__borrower", "project__borrower__user", "product", "lender", "lender__user", "deal"
                 )
-            if hasattr(user, "borrowerprofile"):
-                return Application.objects.filter(project__borrower=user.borrowerprofile).select_related(
-                    "project", "project__borrower", "project__borrower__user", "product", "lender", "lender__user"
+            if principal.is_borrower:
+                return Application.objects.filter(project__borrower_id=principal.borrower_profile_id).select_related(
+                    "project", "project__borrower", "project__borrower__user", "product", "lender", "lender__user", "deal"
                 )
             # admins see all
             return Application.objects.all().select_related(
-                "project", "project__borrower", "project__borrower__user", "product", "lender", "lender__user"
+                "project", "project__borrower", "project__borrower__user", "product", "lender", "lender__user", "deal"
             )
         except Exception as e:
             import logging
@@ -72,25 +76,25 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         """Allow access only to users with a lender profile."""
 
         def has_permission(self, request, view) -> bool:
-            return hasattr(request.user, "lenderprofile")
+            return get_principal(request.user).is_lender
 
     class AdminOrOwnerPermission(permissions.BasePermission):
         """Allow admin or the lender who owns the application."""
 
         def has_object_permission(self, request, view, obj) -> bool:
-            return request.user.is_superuser or (
-                hasattr(request.user, "lenderprofile") and obj.lender == request.user.lenderprofile
-            )
+            principal = get_principal(request.user)
+            return principal.is_superuser or (principal.is_lender and obj.lender_id == principal.lender_profile_id)
     
     class AdminOrOwnerOrBorrowerPermission(permissions.BasePermission):
         """Allow admin, the lender who owns the application, or the borrower whose project it is."""
 
         def has_object_permission(self, request, view, obj) -> bool:
-            if request.user.is_superuser:
+            principal = get_principal(request.user)
+            if principal.is_superuser:
                 return True
-            if hasattr(request.user, "lenderprofile") and obj.lender == request.user.lenderprofile:
+            if principal.is_lender and obj.lender_id == principal.lender_profile_id:
                 return True
-            if hasattr(request.user, "borrowerprofile") and obj.project.borrower == request.user.borrowerprofile:
+            if principal.is_borrower and obj.project.borrower_id == principal.borrower_profile_id:
                 return True
             return False
     
@@ -224,16 +228,15 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             changed_by=user
         )
         
-        # Generate underwriter report if status changed to "submitted"
+        # Queue underwriter report generation if status changed to "submitted"
         if old_status != 'submitted' and new_status == 'submitted':
             try:
-                service = UnderwriterReportService()
-                service.generate_report(application, created_by=None)  # System-generated
+                UnderwriterReportService.enqueue_report(application, created_by=None)  # System-generated
             except Exception as e:
                 # Log error but don't fail the status update
                 import logging
                 logger = logging.getLogger(__name__)
-                logger.error(f"Failed to generate underwriter report on submission: {e}", exc_info=True)
+                logger.error(f"Failed to queue underwriter report on submission: {e}", exc_info=True)
         
         # Send email notifications
         try:
@@ -313,10 +316,12 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             )
         
         if request.method == "GET":
-            # List documents with validation and assessment info
+            # List document metadata with validation info, a page at a time
             app_docs = ApplicationDocument.objects.filter(
                 application=application
-            ).select_related("document", "document__document_type", "uploaded_by").order_by("-uploaded_at")
+            ).select_related("document", "document__document_type", "uploaded_by").defer(*deferred_document_fields())
+            paginator = DocumentCursorPagination()
+            page = paginator.paginate_queryset(app_docs, request, view=self)
             
             documents_data = [
                 {
@@ -335,10 +340,10 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                     "validation_notes": ad.document.validation_notes,
                     "is_required": ad.is_required,
                 }
-                for ad in app_docs
+                for ad in page
             ]
             
-            return Response(documents_data)
+            return paginator.get_paginated_response(documents_data)
         
         elif request.method == "POST":
             # Upload new document with validation and AI assessment
@@ -370,17 +375,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 # Validate document
                 validation_result = validation_service.validate_document(file, document_type)
                 
-                # Read file content for storage (for small files)
-                file_content = None
-                try:
-                    if file.size <= 10 * 1024 * 1024:  # Only store files up to 10MB in database
-                        file_content = file.read()
-                        file.seek(0)  # Reset file pointer for potential re-reading
-                except Exception as e:
-                    print(f"Error reading file content: {e}")
-                
-                # Create document record
-                document = Document.objects.create(
+                # Create document record, streaming the upload into document storage
+                document = Document(
                     owner=user,
                     file_name=file.name,
                     file_size=file.size,
@@ -391,8 +387,23 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                     validation_status="valid" if validation_result["valid"] else "invalid",
                     validation_score=validation_result["score"],
                     validation_notes=validation_result["notes"],
-                    file_content=file_content,  # Store file content if available
                 )
+                try:
+                    file.seek(0)
+                    document.store_content(file)
+                except Exception:
+                    # Without its content the record would be undownloadable, so don't create it
+                    import logging
+                    logger = logging.getLogger(__name__)
+                    logger.exception(f"Failed to store upload '{file.name}' for application {application.id}")
+                    return Response(
+                        {
+                            "error": f"Could not store '{file.name}'. Please try again.",
+                            "documents": uploaded_docs,
+                        },
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    )
+                document.save()
                 
                 # Perform AI assessment (async in production)
                 try:
@@ -444,9 +455,6 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="documents/(?P<doc_id>[^/.]+)/download")
     def download_document(self, request, pk=None, doc_id=None):
         """Download or view a document from an application."""
-        from django.http import HttpResponse
-        import base64
-        
         application = self.get_object()
         
         # Check permissions - borrower, lender, or admin
@@ -464,18 +472,17 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            app_doc = ApplicationDocument.objects.select_related("document").get(
+            app_doc = ApplicationDocument.objects.select_related("document").defer(
+                *deferred_document_fields()
+            ).get(
                 id=doc_id,
                 application=application
             )
             document = app_doc.document
             
             # Check if document has file content
-            if document.file_content:
-                # Return file content
-                response = HttpResponse(document.file_content, content_type=document.file_type)
-                response['Content-Disposition'] = f'attachment; filename="{document.file_name}"'
-                return response
+            if document.has_content:
+                return document_response(request, document, disposition="attachment")
             else:
                 # If no file content, return document metadata with download link
                 # In production, this would generate a pre-signed URL from S3
@@ -495,9 +502,6 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="documents/(?P<doc_id>[^/.]+)/view")
     def view_document(self, request, pk=None, doc_id=None):
         """View a document inline (for PDFs, images, etc.)."""
-        from django.http import HttpResponse
-        import base64
-        
         application = self.get_object()
         
         # Check permissions - borrower, lender, or admin
@@ -515,17 +519,17 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            app_doc = ApplicationDocument.objects.select_related("document").get(
+            app_doc = ApplicationDocument.objects.select_related("document").defer(
+                *deferred_document_fields()
+            ).get(
                 id=doc_id,
                 application=application
             )
             document = app_doc.document
             
             # Check if document has file content
-            if document.file_content:
-                # Return file content for inline viewing
-                response = HttpResponse(document.file_content, content_type=document.file_type)
-                response['Content-Disposition'] = f'inline; filename="{document.file_name}"'
+            if document.has_content:
+                response = document_response(request, document, disposition="inline")
                 # Add CORS headers if needed
                 response['Access-Control-Allow-Origin'] = '*'
                 return response
@@ -587,7 +591,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         # Get all documents for this application
         app_docs = ApplicationDocument.objects.filter(
             application=application
-        ).select_related("document")
+        ).select_related("document").defer(*deferred_document_fields())
         
         documents = [ad.document for ad in app_docs]
         
@@ -798,7 +802,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         # Get all documents for this application
         app_docs = ApplicationDocument.objects.filter(
             application=application
-        ).select_related("document", "document__document_type")
+        ).select_related("document", "document__document_type").defer(*deferred_document_fields())
         
         documents = [
             {
@@ -982,6 +986,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 "plain_text_narrative": report.plain_text_narrative,
                 "created_at": report.created_at.isoformat(),
                 "created_by": report.created_by.email if report.created_by else "System",
+                "served_from_cache": report.served_from_cache,
             }
             
             # Include input data snapshot only for admins
@@ -1024,15 +1029,20 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            service = UnderwriterReportService()
-            report = service.generate_report(application, created_by=user)
+            # Generation runs on the task worker; clients poll underwriter-report/status
+            # ``force`` bypasses the content-addressed output cache
+            force = str(request.data.get("force", "")).lower() in ("1", "true", "yes")
+            report, task = UnderwriterReportService.enqueue_report(
+                application, created_by=user, use_cache=not force
+            )
             
             return Response({
-                "message": "Report generated successfully",
+                "message": "Report generation queued",
                 "report_id": report.id,
                 "version": report.version,
                 "status": report.status,
-            }, status=status.HTTP_201_CREATED)
+                "task_id": task.id,
+            }, status=status.HTTP_202_ACCEPTED)
         except ValueError as e:
             return Response(
                 {"error": str(e)},
@@ -1044,6 +1054,62 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=True, methods=["get"], url_path="underwriter-report/status")
+    def underwriter_report_status(self, request, pk=None):
+        """
+        Get the generation status of an underwriter report.
+        
+        Defaults to the latest version; pass ``report_id`` for a specific one.
+        ``wait`` (seconds, capped) long-polls until the report leaves
+        ``generating``.
+        """
+        application = self.get_object()
+        user = request.user
+        
+        # Check permissions
+        is_lender = hasattr(user, "lenderprofile") and application.lender == user.lenderprofile
+        is_borrower = hasattr(user, "borrowerprofile") and application.project.borrower == user.borrowerprofile
+        is_admin = user.is_superuser
+        
+        if not (is_lender or is_borrower or is_admin):
+            return Response(
+                {"error": "You do not have permission to view this report"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        reports = UnderwriterReport.objects.filter(application=application, lender=application.lender)
+        report_id = request.query_params.get("report_id")
+        if report_id:
+            report = reports.filter(id=report_id).first()
+        else:
+            report = reports.order_by('-version').first()
+        if not report:
+            return Response(
+                {"error": "Report not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            wait = float(request.query_params.get("wait", 0))
+        except ValueError:
+            wait = 0
+        if wait > 0:
+            report = UnderwriterReportService.wait_for_report(report, wait)
+        
+        return Response(UnderwriterReportService.generation_status(report))
+    
+    @action(detail=False, methods=["get"], url_path="underwriter-report-cache-stats")
+    def underwriter_report_cache_stats(self, request):
+        """Hit/miss counters for the report input memo and LLM output cache (admin only)."""
+        if not request.user.is_superuser:
+            return Response(
+                {"error": "Only administrators can view cache statistics"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        stats = report_cache.cache_stats()
+        stats["reports_served_from_cache"] = UnderwriterReport.objects.filter(served_from_cache=True).count()
+        return Response(stats)
+    
     @action(detail=True, methods=["post"], url_path="lock-underwriter-report")
     def lock_underwriter_report(self, request, pk=None):
         """Lock underwriter report (admin only)."""
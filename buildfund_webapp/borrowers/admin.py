@@ -1,7 +1,7 @@
 """Admin configuration for borrowers app."""
 
 from django.contrib import admin
-from .models import BorrowerProfile
+from .models import BankAccount, BorrowerProfile
 
 
 @admin.register(BorrowerProfile)
@@ -12,4 +12,11 @@ class BorrowerProfileAdmin(admin.ModelAdmin):
         "company_name",
         "registration_number",
         "last_name",
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(BankAccount)
+class BankAccountAdmin(admin.ModelAdmin):
+    list_display = ("borrower", "bank_id", "account_id", "balance", "last_synced_at", "is_active")
+    list_filter = ("is_active",)
+    exclude = ("oauth_token", "oauth_token_secret")
@@ -1,24 +1,40 @@
 """Service for automatically processing and saving Companies House data to borrower profile."""
 from __future__ import annotations
 
-from typing import Dict, Any, List
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from documents.models import Document, DocumentType
+from verification.dossier import CompanyDossierError, CompanyDossierService
 from verification.services import HMRCVerificationService
 
+logger = logging.getLogger(__name__)
+
+# Accounts filings downloaded per import
+ACCOUNTS_DOCUMENTS_LIMIT = 3
+
 
 class CompanyDataProcessor:
     """Processes and saves Companies House data to borrower profile."""
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self.hmrc_service = HMRCVerificationService()
+        self.dossier_service = CompanyDossierService(self.hmrc_service)
+        # The shared session also caps concurrent requests per process
+        self.max_workers = max_workers or getattr(settings, "COMPANIES_HOUSE_MAX_CONCURRENCY", 8)
     
-    @transaction.atomic
     def process_and_save_company_data(self, borrower_profile, company_number: str) -> Dict[str, Any]:
         """
         Automatically fetch, process, and save all company data from Companies House.
         
+        Company data comes from the company's dossier (rebuilt with concurrent
+        API calls when expired) and accounts documents are streamed to
+        document storage in parallel; nothing is written to the profile until
+        every call has finished, and then in a single transaction.
+        
         Returns:
             Dict with processing results and saved data
         """
@@ -32,43 +48,36 @@ class CompanyDataProcessor:
         }
         
         try:
-            # 1. Get company info
-            company_info = self.hmrc_service.get_company_info(company_number)
+            fetched = self._fetch_company_data(company_number)
+            
+            # 1. Company info
+            company_info = fetched["company_info"]
             if "error" in company_info:
                 results["errors"].append(f"Failed to get company info: {company_info.get('error')}")
                 return results
             
             results["company_info"] = company_info
             
-            # 2. Get and process directors
-            officers_data = self.hmrc_service.get_company_officers(company_number)
-            if "error" not in officers_data:
-                directors = self._process_directors(officers_data)
+            # 2. Directors
+            if "error" not in fetched["officers"]:
+                directors = self._process_directors(fetched["officers"])
                 results["directors"] = directors
                 borrower_profile.directors_data = directors
             
-            # 3. Get and process shareholders/PSCs
-            pscs_data = self.hmrc_service.get_company_pscs(company_number)
-            if "error" not in pscs_data:
-                shareholders = self._process_shareholders(pscs_data)
+            # 3. Shareholders/PSCs
+            if "error" not in fetched["pscs"]:
+                shareholders = self._process_shareholders(fetched["pscs"])
                 results["shareholders"] = shareholders
                 borrower_profile.shareholders_data = shareholders
             
-            # 4. Get filing history and save accounts documents
-            filing_history = self.hmrc_service.get_company_filing_history(company_number)
-            if "error" not in filing_history:
-                accounts_docs = self._save_accounts_documents(borrower_profile, company_number, filing_history)
-                results["accounts_documents"] = accounts_docs
-            
-            # 5. Get and summarize charges
-            charges_data = self.hmrc_service.get_company_charges(company_number)
-            if "error" not in charges_data:
-                charges_summary = self.hmrc_service.summarize_charges(charges_data)
+            # 4. Charges
+            if "error" not in fetched["charges"]:
+                charges_summary = self.hmrc_service.summarize_charges(fetched["charges"])
                 results["charges_summary"] = charges_summary
                 # Store charges summary in dedicated field
                 borrower_profile.charges_summary = charges_summary
             
-            # 6. Store full company data
+            # 5. Full company data
             borrower_profile.company_data = {
                 **(borrower_profile.company_data or {}),
                 "company_info": company_info,
@@ -79,13 +88,64 @@ class CompanyDataProcessor:
             borrower_profile.registration_number = company_number
             borrower_profile.company_name = company_info.get("company_name", "")
             
-            borrower_profile.save()
+            # 6. Save everything at once
+            with transaction.atomic():
+                results["accounts_documents"] = self._save_accounts_documents(
+                    borrower_profile, company_number, fetched["accounts_downloads"]
+                )
+                borrower_profile.save()
             
         except Exception as e:
             results["errors"].append(f"Error processing company data: {str(e)}")
         
         return results
     
+    def _fetch_company_data(self, company_number: str) -> Dict[str, Any]:
+        """
+        Read the company's dossier and stream its latest accounts documents to storage.
+        
+        The dossier is a single lookup when a fresh snapshot exists; otherwise
+        it is rebuilt with every Companies House call made concurrently.  The
+        document downloads then run in parallel, so the import takes about as
+        long as the slowest chain of calls.
+        """
+        try:
+            dossier = self.dossier_service.get(company_number)
+        except CompanyDossierError as e:
+            return {"company_info": {"error": str(e)}}
+        fetched = {
+            name: dossier.sources.get(name, {"error": "Not available"})
+            for name in ("company_info", "officers", "pscs", "charges")
+        }
+        filings = self._select_accounts_filings(dossier.details)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="companies-house") as pool:
+            download_futures = [
+                (filing, pool.submit(self._save_accounts_document, company_number, filing["transaction_id"]))
+                for filing in filings
+            ]
+            fetched["accounts_downloads"] = [(filing, future.result()) for filing, future in download_futures]
+        return fetched
+    
+    @staticmethod
+    def _select_accounts_filings(details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the dossier's latest accounts filings that have a transaction id."""
+        return [
+            filing for filing in details.get("accounts_documents", []) if filing.get("transaction_id")
+        ][:ACCOUNTS_DOCUMENTS_LIMIT]
+    
+    def _save_accounts_document(self, company_number: str, transaction_id: str) -> Dict[str, Any]:
+        """
+        Stream one accounts document to storage.
+        
+        A storage failure is returned as an error like a failed download, so
+        one document cannot abort the rest of the import.
+        """
+        try:
+            return self.hmrc_service.save_company_document(company_number, transaction_id)
+        except Exception as e:
+            logger.exception(f"Failed to store accounts document {transaction_id} for company {company_number}")
+            return {"error": f"Could not store document: {e}"}
+    
     def _process_directors(self, officers_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Process officers data to extract active directors with full details."""
         directors = []
@@ -143,89 +203,63 @@ class CompanyDataProcessor:
         
         return shareholders
     
-    def _save_accounts_documents(self, borrower_profile, company_number: str, filing_history: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Automatically download and save accounts documents from filing history."""
+    def _save_accounts_documents(self, borrower_profile, company_number: str, downloads) -> List[Dict[str, Any]]:
+        """Create Document records for accounts documents already streamed to storage."""
         saved_documents = []
-        
-        if "items" not in filing_history:
+        if not downloads:
             return saved_documents
         
-        # Find accounts documents (last 3 years)
-        accounts_filings = []
-        for filing in filing_history["items"]:
-            category = filing.get("category", "").lower()
-            if "accounts" in category or "micro" in category:
-                accounts_filings.append(filing)
-        
-        # Sort by date and take last 3
-        accounts_filings = sorted(accounts_filings, key=lambda x: x.get("date", ""), reverse=True)[:3]
-        
         # Get or create accounts document type
         accounts_doc_type, _ = DocumentType.objects.get_or_create(
             name="Company Accounts",
             defaults={"category": "company", "description": "Companies House accounts filings"}
         )
         
-        for filing in accounts_filings:
-            transaction_id = filing.get("transaction_id")
-            if not transaction_id:
+        documents = []
+        for filing, download in downloads:
+            transaction_id = filing["transaction_id"]
+            if "error" in download:
+                logger.error(f"Failed to download accounts document {transaction_id}: {download['error']}")
                 continue
             
-            try:
-                # Download document
-                doc_result = self.hmrc_service.get_company_document(company_number, transaction_id)
-                if "error" in doc_result:
-                    continue
-                
-                # Create document record
-                import base64
-                from io import BytesIO
-                from django.core.files.base import ContentFile
-                
-                document_data = base64.b64decode(doc_result["document_data"])
-                filename = doc_result.get("filename", f"accounts_{transaction_id}.pdf")
-                
-                # Create document
-                document = Document.objects.create(
-                    file_name=filename,
-                    file_size=len(document_data),
-                    file_type="application/pdf",
-                    document_type=accounts_doc_type,
-                    uploaded_by=borrower_profile.user,
-                )
-                
-                # Save file content
-                document.file.save(filename, ContentFile(document_data), save=True)
-                
-                # Link to borrower profile
-                borrower_profile.documents.add(document)
-                
-                # Store in company_documents JSON
-                if not borrower_profile.company_documents:
-                    borrower_profile.company_documents = {}
-                if "accounts" not in borrower_profile.company_documents:
-                    borrower_profile.company_documents["accounts"] = []
-                
-                borrower_profile.company_documents["accounts"].append({
-                    "document_id": document.id,
-                    "transaction_id": transaction_id,
-                    "description": filing.get("description", ""),
-                    "date": filing.get("date", ""),
-                    "filename": filename,
-                })
-                
-                saved_documents.append({
-                    "document_id": document.id,
-                    "filename": filename,
-                    "date": filing.get("date", ""),
-                    "description": filing.get("description", ""),
-                })
-                
-            except Exception as e:
-                # Log error but continue with other documents
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to save accounts document {transaction_id}: {e}")
-                continue
+            filename = download["filename"]
+            document = Document.objects.create(
+                owner=borrower_profile.user,
+                file_name=filename,
+                file_size=download["file_size"],
+                file_type=download["content_type"],
+                upload_path=f"companies_house/{company_number}/{transaction_id}.pdf",
+                description=filing.get("description", ""),
+                document_type=accounts_doc_type,
+                validation_status="valid",  # Companies House documents are pre-validated
+                storage_key=download["storage_key"],
+                content_sha256=download["content_sha256"],
+            )
+            documents.append(document)
+            
+            # Store in company_documents JSON
+            if not borrower_profile.company_documents:
+                borrower_profile.company_documents = {}
+            if "accounts" not in borrower_profile.company_documents:
+                borrower_profile.company_documents["accounts"] = []
+            
+            borrower_profile.company_documents["accounts"].append({
+                "document_id": document.id,
+                "transaction_id": transaction_id,
+                "description": filing.get("description", ""),
+                "date": filing.get("date", ""),
+                "filename": filename,
+            })
+            
+            saved_documents.append({
+                "document_id": document.id,
+                "filename": filename,
+                "date": filing.get("date", ""),
+                "description": filing.get("description", ""),
+            })
+        
+        # Link to borrower profile
+        if documents:
+            borrower_profile.documents.add(*documents)
         
         return saved_documents
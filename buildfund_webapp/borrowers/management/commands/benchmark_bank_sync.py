@@ -0,0 +1,177 @@
+"""Benchmark the Open Banking transaction sync against a local OBP stub server."""
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from borrowers.models import BankAccount, BorrowerProfile
+
+BANK_ID = "bench-bank"
+ACCOUNT_ID = "bench-account"
+OBP_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data."""
+
+
+class _Ledger:
+    """Synthetic OBP transaction history, oldest first."""
+
+    def __init__(self, count, months, seed=0):
+        self.rng = random.Random(seed)
+        self.items = []
+        self.balance = 25_000.0
+        self.now = datetime.now(dt_timezone.utc)
+        start = self.now - timedelta(days=30 * months)
+        step = (self.now - start) / max(count, 1)
+        for i in range(count):
+            self.append(start + step * i)
+
+    def append(self, posted):
+        bounced = self.rng.random() < 0.003
+        amount = round(self.rng.uniform(-1500, 1700), 2)
+        self.balance += amount
+        self.items.append((posted, {
+            "id": f"tx-{len(self.items):08d}",
+            "other_account": {"holder": {"name": f"Counterparty {self.rng.randint(1, 200)}"}},
+            "details": {
+                "type": "RETURNED" if bounced else ("CREDIT" if amount > 0 else "DEBIT"),
+                "description": "Returned payment" if bounced else "Card payment",
+                "posted": posted.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "completed": posted.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "value": {"currency": "GBP", "amount": f"{amount:.2f}"},
+                "new_balance": {"currency": "GBP", "amount": f"{self.balance:.2f}"},
+            },
+        }))
+
+    def page(self, query):
+        from_date = query.get("from_date", [None])[0]
+        items = self.items
+        if from_date:
+            since = datetime.strptime(from_date, OBP_DATE_FORMAT).replace(tzinfo=dt_timezone.utc)
+            items = [item for item in items if item[0] >= since]
+        if "limit" in query:
+            offset = int(query.get("offset", ["0"])[0])
+            items = items[offset:offset + int(query["limit"][0])]
+        return [item for _, item in items]
+
+
+def _stub_handler(ledger, latency, per_item_latency):
+    transactions_re = re.compile(rf"^/obp/v5\.1\.0/banks/{BANK_ID}/accounts/{ACCOUNT_ID}/transactions$")
+    account_re = re.compile(rf"^/obp/v5\.1\.0/banks/{BANK_ID}/accounts/{ACCOUNT_ID}/account$")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if transactions_re.match(url.path):
+                items = ledger.page(parse_qs(url.query))
+                # Upstream cost grows with the number of transactions returned
+                time.sleep(latency + per_item_latency * len(items))
+                payload = {"transactions": items}
+            elif account_re.match(url.path):
+                time.sleep(latency)
+                payload = {"balance": {"currency": "GBP", "amount": f"{ledger.balance:.2f}"}}
+            else:
+                payload = {}
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a stub Open Bank Project server and compare a full transaction pull with the "
+        "incremental ledger sync and the report's cashflow summary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=20_000, help='History size (default: 20000).')
+        parser.add_argument('--months', type=int, default=24, help='Months of history (default: 24).')
+        parser.add_argument('--new', type=int, default=150, help='Transactions added before the incremental sync.')
+        parser.add_argument('--latency-ms', type=int, default=100, help='Latency per API call (default: 100).')
+        parser.add_argument('--page-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        ledger = _Ledger(options['transactions'], options['months'])
+        handler = _stub_handler(ledger, options['latency_ms'] / 1000, 0.00002)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ.setdefault("OBP_CONSUMER_KEY", "benchmark")
+        os.environ.setdefault("OBP_CONSUMER_SECRET", "benchmark")
+
+        try:
+            self._run(ledger, f"http://127.0.0.1:{server.server_port}", options)
+        finally:
+            server.shutdown()
+
+    def _run(self, ledger, base_url, options):
+        from applications.services import ReportInputBuilder
+        from borrowers.bank_sync import BankTransactionSyncService
+        from borrowers.services import OpenBankingService
+
+        open_banking = OpenBankingService()
+        open_banking.base_url = base_url
+        service = BankTransactionSyncService(open_banking, page_size=options['page_size'])
+
+        started = time.perf_counter()
+        full = open_banking.get_transactions("token", "secret", ACCOUNT_ID, bank_id=BANK_ID)
+        full_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"full pull (legacy)     {full_ms:7.0f}ms  {len(full)} transactions")
+
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create(username="bench-bank-sync")
+                profile = BorrowerProfile.objects.create(user=user, bank_data_method='open_banking')
+                account = BankAccount.objects.create(
+                    borrower=profile, bank_id=BANK_ID, account_id=ACCOUNT_ID,
+                    oauth_token="token", oauth_token_secret="secret",
+                )
+
+                started = time.perf_counter()
+                result = service.sync_account(account)
+                self.stdout.write(
+                    f"initial sync           {(time.perf_counter() - started) * 1000:7.0f}ms  "
+                    f"{result.inserted} inserted over {result.pages} pages, {result.months} months aggregated"
+                )
+
+                for i in range(options['new']):
+                    ledger.append(ledger.now + timedelta(minutes=i + 1))
+                started = time.perf_counter()
+                result = service.sync_account(account)
+                self.stdout.write(
+                    f"incremental sync       {(time.perf_counter() - started) * 1000:7.0f}ms  "
+                    f"{result.fetched} fetched, {result.inserted} inserted, {result.months} months aggregated"
+                )
+
+                started = time.perf_counter()
+                summary = ReportInputBuilder._build_cashflow_summary(SimpleNamespace(borrower_profile=profile))
+                self.stdout.write(
+                    f"report cashflow        {(time.perf_counter() - started) * 1000:7.1f}ms  "
+                    f"{len(summary['months'])} months, {summary['bounced_items']} bounced items, no bank API calls"
+                )
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Synthetic data rolled back.")
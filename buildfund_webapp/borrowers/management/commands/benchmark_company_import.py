@@ -0,0 +1,160 @@
+"""Benchmark the Companies House import against a local stub server with injected latency."""
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from borrowers.models import BorrowerProfile
+from core.cache import API_CACHE
+from documents.storage import _load_storage
+
+COMPANY_NUMBER = "00000001"
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data."""
+
+
+def _stub_handler(latency, document_latency, document_size):
+    """Build a request handler that serves canned Companies House responses after a delay."""
+    filings = [
+        {"transaction_id": f"TX{i}", "category": "accounts", "date": f"202{i}-03-31", "description": "accounts"}
+        for i in range(5)
+    ]
+    payloads = {
+        "": {"company_name": "BENCH LIMITED", "company_number": COMPANY_NUMBER, "company_status": "active"},
+        "/officers": {"items": [{"name": "DOE, Jane", "officer_role": "director"}]},
+        "/persons-with-significant-control": {"items": [{"name": "Jane Doe", "natures_of_control": []}]},
+        "/charges": {"items": [{"charge_code": "1", "created_on": "2020-01-01"}]},
+        "/filing-history": {"items": filings},
+    }
+    document = os.urandom(document_size)
+    document_re = re.compile(r"^/company/\w+/filing-history/(\w+)/document$")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            match = document_re.match(self.path)
+            if match:
+                time.sleep(document_latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(document)))
+                self.send_header("Content-Disposition", f'attachment; filename="{match.group(1)}.pdf"')
+                self.end_headers()
+                self.wfile.write(document)
+                return
+            time.sleep(latency)
+            body = json.dumps(payloads.get(self.path[len(f"/company/{COMPANY_NUMBER}"):], {})).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a stub Companies House server with injected latency and compare sequential "
+        "calls with the concurrent CompanyDataProcessor import and the company dossier."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency-ms', type=int, default=200, help='Latency per API call (default: 200).')
+        parser.add_argument(
+            '--document-latency-ms', type=int, default=400, help='Latency per document download (default: 400).'
+        )
+        parser.add_argument('--document-kb', type=int, default=512, help='Size of each document (default: 512).')
+
+    def handle(self, *args, **options):
+        latency = options['latency_ms'] / 1000
+        document_latency = options['document_latency_ms'] / 1000
+        handler = _stub_handler(latency, document_latency, options['document_kb'] * 1024)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ.setdefault("HMRC_API_KEY", "benchmark")
+
+        try:
+            with tempfile.TemporaryDirectory() as storage_root, override_settings(
+                COMPANIES_HOUSE_API_URL=f"http://127.0.0.1:{server.server_port}",
+                DOCUMENT_STORAGE_ROOT=storage_root,
+                # Measure upstream calls, not the Companies House response cache
+                CACHES={**settings.CACHES, API_CACHE: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+            ):
+                _load_storage.cache_clear()
+                self._run(latency, document_latency)
+        finally:
+            _load_storage.cache_clear()
+            server.shutdown()
+
+    def _run(self, latency, document_latency):
+        from borrowers.company_service import ACCOUNTS_DOCUMENTS_LIMIT, CompanyDataProcessor
+        from verification.dossier import CompanyDossierService
+
+        processor = CompanyDataProcessor()
+        service = processor.hmrc_service
+        self.stdout.write(
+            f"Stub latency {latency * 1000:.0f}ms per call, {document_latency * 1000:.0f}ms per document; "
+            f"slowest chain ~{(latency + document_latency) * 1000:.0f}ms"
+        )
+
+        # Sequential baseline: the calls one after another, as the import used to make them
+        started = time.perf_counter()
+        sources = {
+            "company_info": service.get_company_info(COMPANY_NUMBER),
+            "officers": service.get_company_officers(COMPANY_NUMBER),
+            "pscs": service.get_company_pscs(COMPANY_NUMBER),
+            "filing_history": service.get_company_filing_history(COMPANY_NUMBER),
+            "charges": service.get_company_charges(COMPANY_NUMBER),
+        }
+        # Select filings from the dossier details, by the same rule as the import
+        details = CompanyDossierService(service).build_details(COMPANY_NUMBER, sources)
+        for filing in processor._select_accounts_filings(details):
+            service.save_company_document(COMPANY_NUMBER, filing["transaction_id"])
+        sequential_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"sequential calls     {sequential_ms:7.0f}ms")
+
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create(username="bench-company-import")
+                profile = BorrowerProfile.objects.create(user=user)
+                started = time.perf_counter()
+                results = processor.process_and_save_company_data(profile, COMPANY_NUMBER)
+                concurrent_ms = (time.perf_counter() - started) * 1000
+                self.stdout.write(
+                    f"concurrent import    {concurrent_ms:7.0f}ms  "
+                    f"({len(results['accounts_documents'])}/{ACCOUNTS_DOCUMENTS_LIMIT} documents saved, "
+                    f"{len(results['errors'])} errors)"
+                )
+                for error in results['errors']:
+                    self.stdout.write(self.style.ERROR(error))
+
+                # Company details endpoint: rebuild the dossier, then read the stored snapshot
+                dossier_service = CompanyDossierService(service)
+                started = time.perf_counter()
+                dossier = dossier_service.get(COMPANY_NUMBER, refresh=True)
+                self.stdout.write(
+                    f"dossier rebuild      {(time.perf_counter() - started) * 1000:7.0f}ms  "
+                    f"(v{dossier.version}, missing: {', '.join(dossier.missing) or 'none'})"
+                )
+                started = time.perf_counter()
+                dossier_service.get(COMPANY_NUMBER)
+                self.stdout.write(f"dossier snapshot     {(time.perf_counter() - started) * 1000:7.1f}ms")
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Synthetic data rolled back.")
@@ -0,0 +1,56 @@
+"""Sync Open Banking transactions for every borrower with active bank accounts.
+
+Intended to run on a schedule (e.g. nightly)::
+
+    python manage.py sync_bank_transactions
+    python manage.py sync_bank_transactions --borrower 42 --enqueue
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from borrowers.bank_sync import BankTransactionSyncService
+from borrowers.models import BorrowerProfile
+from borrowers.tasks import SYNC_BANK_TRANSACTIONS_TASK
+from tasks.backends import enqueue
+
+
+class Command(BaseCommand):
+    help = "Incrementally sync Open Banking transactions into the local ledger and refresh cashflow aggregates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--borrower', type=int, action='append', help='Borrower profile id (repeatable).')
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Queue one background task per borrower instead of syncing inline.',
+        )
+
+    def handle(self, *args, **options):
+        borrowers = BorrowerProfile.objects.filter(bank_accounts__is_active=True).distinct()
+        if options['borrower']:
+            borrowers = borrowers.filter(pk__in=options['borrower'])
+
+        if options['enqueue']:
+            count = 0
+            for borrower_id in borrowers.values_list('pk', flat=True):
+                enqueue(SYNC_BANK_TRANSACTIONS_TASK, {'borrower_id': borrower_id}, reference=f'borrower_profile:{borrower_id}')
+                count += 1
+            self.stdout.write(self.style.SUCCESS(f"Queued bank sync for {count} borrowers."))
+            return
+
+        service = BankTransactionSyncService()
+        started = time.perf_counter()
+        inserted = failed = 0
+        for borrower in borrowers:
+            for account_id, result in service.sync_borrower(borrower).items():
+                if 'error' in result:
+                    failed += 1
+                    self.stderr.write(f"borrower {borrower.pk} account {account_id}: {result['error']}")
+                else:
+                    inserted += result['inserted']
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {inserted} transactions, {failed} accounts failed in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.30 on 2026-10-16 20:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrowers', '0002_add_solicitor_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bank_id', models.CharField(max_length=64)),
+                ('account_id', models.CharField(max_length=128)),
+                ('label', models.CharField(blank=True, max_length=255)),
+                ('account_type', models.CharField(blank=True, max_length=50)),
+                ('currency', models.CharField(default='GBP', max_length=3)),
+                ('balance', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('oauth_token', models.CharField(blank=True, max_length=255)),
+                ('oauth_token_secret', models.CharField(blank=True, max_length=255)),
+                ('last_posted_at', models.DateTimeField(blank=True, null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('sync_error', models.TextField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('borrower', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_accounts', to='borrowers.borrowerprofile')),
+            ],
+            options={
+                'unique_together': {('borrower', 'bank_id', 'account_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='BankTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_id', models.CharField(max_length=64)),
+                ('posted_at', models.DateTimeField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('balance_after', models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+                ('transaction_type', models.CharField(blank=True, max_length=40)),
+                ('description', models.CharField(blank=True, max_length=140)),
+                ('counterparty', models.CharField(blank=True, max_length=100)),
+                ('is_bounced', models.BooleanField(default=False)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='borrowers.bankaccount')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['account', 'posted_at'], name='borrowers_b_account_8a1e91_idx')],
+                'unique_together': {('account', 'transaction_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='BankCashflowMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('inflows', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('outflows', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('min_balance', models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+                ('closing_balance', models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+                ('bounced_count', models.PositiveIntegerField(default=0)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cashflow_months', to='borrowers.bankaccount')),
+            ],
+            options={
+                'ordering': ['account', 'month'],
+                'unique_together': {('account', 'month')},
+            },
+        ),
+    ]
@@ -125,4 +125,77 @@ class BorrowerProfile(models.Model):
     
     def is_approved(self):
         """Check if profile is approved."""
-        return self.status == 'approved'
\ No newline at end of file
+        return self.status == 'approved'
+
+class BankAccount(models.Model):
+    """An Open Banking account whose transactions are synced into the local ledger."""
+
+    borrower = models.ForeignKey(BorrowerProfile, on_delete=models.CASCADE, related_name='bank_accounts')
+    bank_id = models.CharField(max_length=64)
+    account_id = models.CharField(max_length=128)
+    label = models.CharField(max_length=255, blank=True)
+    account_type = models.CharField(max_length=50, blank=True)
+    currency = models.CharField(max_length=3, default='GBP')
+    balance = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+
+    # OAuth 1.0a access token (encrypt in production)
+    oauth_token = models.CharField(max_length=255, blank=True)
+    oauth_token_secret = models.CharField(max_length=255, blank=True)
+
+    # Sync cursor: transactions are requested from the last posted timestamp seen
+    last_posted_at = models.DateTimeField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    sync_error = models.TextField(blank=True)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('borrower', 'bank_id', 'account_id')
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"BankAccount({self.bank_id}/{self.account_id})"
+
+
+class BankTransaction(models.Model):
+    """A posted transaction on a synced bank account."""
+
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='transactions')
+    transaction_id = models.CharField(max_length=64)
+    posted_at = models.DateTimeField()
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=14, decimal_places=2, null=True)
+    transaction_type = models.CharField(max_length=40, blank=True)
+    description = models.CharField(max_length=140, blank=True)
+    counterparty = models.CharField(max_length=100, blank=True)
+    is_bounced = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('account', 'transaction_id')
+        indexes = [
+            models.Index(fields=['account', 'posted_at']),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"BankTransaction({self.transaction_id}, {self.amount})"
+
+
+class BankCashflowMonth(models.Model):
+    """Monthly cashflow aggregates for a bank account, recomputed after each sync."""
+
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='cashflow_months')
+    month = models.DateField(help_text="First day of the month")
+    inflows = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outflows = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    min_balance = models.DecimalField(max_digits=14, decimal_places=2, null=True)
+    closing_balance = models.DecimalField(max_digits=14, decimal_places=2, null=True)
+    bounced_count = models.PositiveIntegerField(default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('account', 'month')
+        ordering = ['account', 'month']
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"BankCashflowMonth({self.account_id}, {self.month:%Y-%m})"
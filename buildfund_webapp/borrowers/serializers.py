@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 
 from .models import BorrowerProfile
 
 
-class BorrowerProfileSerializer(serializers.ModelSerializer):
+class BorrowerProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializes BorrowerProfile for API representation."""
     
     user = serializers.SerializerMethodField()
@@ -4,8 +4,12 @@ from __future__ import annotations
 import os
 import requests
 from typing import Dict, Any, Optional, List
+from urllib.parse import parse_qsl, urlencode
 from django.conf import settings
 
+from core.http import get_client
+from verification.companies_house import CompaniesHouseClient, CompaniesHouseError
+
 
 class CompaniesHouseService:
     """Service for interacting with Companies House API."""
@@ -19,17 +23,9 @@ class CompaniesHouseService:
                 "Get your API key from https://developer.company-information.service.gov.uk/"
             )
         self.api_key = api_key.strip()  # Remove any whitespace
-        self.base_url = "https://api.company-information.service.gov.uk"
-        # Companies House Public Data API uses HTTP Basic Auth
-        # Format: API key as username, empty password (api_key:)
+        # Shared client: HTTP Basic Auth, pooled connections and the response cache
         # Reference: https://developer-specs.company-information.service.gov.uk/companies-house-public-data-api/reference
-        import base64
-        credentials = f"{self.api_key}:"
-        encoded_credentials = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
-        self.headers = {
-            "Authorization": f"Basic {encoded_credentials}",
-            "Accept": "application/json"
-        }
+        self.client = CompaniesHouseClient(self.api_key)
     
     def search_company(self, query: str) -> List[Dict[str, Any]]:
         """
@@ -41,32 +37,23 @@ class CompaniesHouseService:
         Returns:
             List of company search results
         """
-        url = f"{self.base_url}/search/companies"
         params = {"q": query, "items_per_page": 10}
         
         try:
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self.client.get_json("/search/companies", params=params)
             return data.get("items", [])
-        except requests.HTTPError as e:
-            if e.response.status_code == 401:
-                error_detail = ""
-                try:
-                    error_data = e.response.json()
-                    error_detail = f" - {error_data.get('error', '')}"
-                except:
-                    pass
+        except CompaniesHouseError as e:
+            if e.status_code == 401:
+                error_detail = f" - {e.data['error']}" if e.data.get("error") else ""
                 raise Exception(
                     f"Companies House API authentication failed{error_detail}. "
                     "Please verify your API key is correct and activated at "
                     "https://developer.company-information.service.gov.uk/"
                 )
-            elif e.response.status_code == 403:
+            elif e.status_code == 403:
                 raise Exception("Companies House API access forbidden. Please check your API key permissions.")
-            else:
-                raise Exception(f"Companies House API error (HTTP {e.response.status_code}): {str(e)}")
-        except requests.RequestException as e:
+            elif e.status_code:
+                raise Exception(f"Companies House API error (HTTP {e.status_code}): {str(e)}")
             raise Exception(f"Companies House API error: {str(e)}")
     
     def get_company_profile(self, company_number: str) -> Dict[str, Any]:
@@ -81,13 +68,9 @@ class CompaniesHouseService:
         """
         # Companies House Public Data API endpoint for company profile
         # Reference: https://developer-specs.company-information.service.gov.uk/companies-house-public-data-api/reference/company-profile/company-profile
-        url = f"{self.base_url}/company/{company_number}"
-        
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            return self.client.get_json(f"/company/{company_number}")
+        except CompaniesHouseError as e:
             raise Exception(f"Companies House API error: {str(e)}")
     
     def get_company_officers(self, company_number: str) -> List[Dict[str, Any]]:
@@ -102,14 +85,10 @@ class CompaniesHouseService:
         """
         # Companies House Public Data API endpoint for company officers
         # Reference: https://developer-specs.company-information.service.gov.uk/companies-house-public-data-api/reference/officers/list
-        url = f"{self.base_url}/company/{company_number}/officers"
-        
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self.client.get_json(f"/company/{company_number}/officers")
             return data.get("items", [])
-        except requests.RequestException as e:
+        except CompaniesHouseError as e:
             raise Exception(f"Companies House API error: {str(e)}")
     
     def get_company_psc(self, company_number: str) -> List[Dict[str, Any]]:
@@ -122,14 +101,10 @@ class CompaniesHouseService:
         Returns:
             List of PSC entries
         """
-        url = f"{self.base_url}/company/{company_number}/persons-with-significant-control"
-        
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self.client.get_json(f"/company/{company_number}/persons-with-significant-control")
             return data.get("items", [])
-        except requests.RequestException as e:
+        except CompaniesHouseError as e:
             raise Exception(f"Companies House API error: {str(e)}")
     
     def get_filing_history(self, company_number: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -143,17 +118,14 @@ class CompaniesHouseService:
         Returns:
             List of filing history items
         """
-        url = f"{self.base_url}/company/{company_number}/filing-history"
         params = {"items_per_page": 200}  # Get more items
         if category:
             params["category"] = category
         
         try:
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = self.client.get_json(f"/company/{company_number}/filing-history", params=params, timeout=15)
             return data.get("items", [])
-        except requests.RequestException as e:
+        except CompaniesHouseError as e:
             raise Exception(f"Companies House API error: {str(e)}")
     
     def get_filing_document(self, company_number: str, transaction_id: str) -> bytes:
@@ -167,12 +139,11 @@ class CompaniesHouseService:
         Returns:
             Document content as bytes
         """
-        url = f"{self.base_url}/company/{company_number}/filing-history/{transaction_id}/document"
+        path = f"/company/{company_number}/filing-history/{transaction_id}/document"
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=30, stream=True)
-            response.raise_for_status()
-            return response.content
+            with self.client.stream(path) as response:
+                return response.content
         except requests.RequestException as e:
             raise Exception(f"Failed to download document: {str(e)}")
     
@@ -381,6 +352,30 @@ class OpenBankingService:
                 "OBP_CONSUMER_KEY and OBP_CONSUMER_SECRET environment variables are required. "
                 "Get your credentials from https://apisandbox.openbankproject.com/"
             )
+        self.http = get_client("open_banking")
+    
+    def _auth(self, **kwargs):
+        """OAuth 1.0a request signer; requests go through the shared pooled client."""
+        try:
+            from requests_oauthlib import OAuth1
+        except ImportError:
+            raise Exception(
+                "requests-oauthlib is required for Open Banking. "
+                "Install it with: pip install requests-oauthlib"
+            )
+        return OAuth1(self.consumer_key, client_secret=self.consumer_secret, **kwargs)
+    
+    def _fetch_token(self, url: str, auth) -> Dict[str, str]:
+        """POST to an OAuth token endpoint and decode the form-encoded token response."""
+        response = self.http.post(url, auth=auth, endpoint=url[len(self.base_url):])
+        response.raise_for_status()
+        return dict(parse_qsl(response.text))
+    
+    def _get(self, url: str, oauth_token: str, oauth_token_secret: str, endpoint: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        auth = self._auth(resource_owner_key=oauth_token, resource_owner_secret=oauth_token_secret)
+        response = self.http.get(url, params=params, auth=auth, endpoint=endpoint)
+        response.raise_for_status()
+        return response.json()
     
     def get_authorization_url(self, borrower_id: str, redirect_uri: str) -> Dict[str, Any]:
         """
@@ -394,33 +389,21 @@ class OpenBankingService:
             Dictionary with authorization_url and oauth_token_secret (to store temporarily)
         """
         try:
-            from requests_oauthlib import OAuth1Session
-            
-            # Create OAuth1 session
-            oauth = OAuth1Session(
-                self.consumer_key,
-                client_secret=self.consumer_secret,
-                callback_uri=redirect_uri
-            )
-            
             # Step 1: Get request token
-            request_token_response = oauth.fetch_request_token(self.oauth_initiate_url)
+            request_token_response = self._fetch_token(
+                self.oauth_initiate_url, self._auth(callback_uri=redirect_uri)
+            )
             oauth_token = request_token_response.get('oauth_token')
             oauth_token_secret = request_token_response.get('oauth_token_secret')
             
             # Step 2: Get authorization URL
-            authorization_url = oauth.authorization_url(self.oauth_authorize_url)
+            authorization_url = f"{self.oauth_authorize_url}?{urlencode({'oauth_token': oauth_token})}"
             
             return {
                 'authorization_url': authorization_url,
                 'oauth_token': oauth_token,
                 'oauth_token_secret': oauth_token_secret,  # Store temporarily for token exchange
             }
-        except ImportError:
-            raise Exception(
-                "requests-oauthlib is required for Open Banking. "
-                "Install it with: pip install requests-oauthlib"
-            )
         except Exception as e:
             raise Exception(f"Failed to get authorization URL: {str(e)}")
     
@@ -437,19 +420,15 @@ class OpenBankingService:
             Access token data
         """
         try:
-            from requests_oauthlib import OAuth1Session
-            
-            # Create OAuth1 session with request token
-            oauth = OAuth1Session(
-                self.consumer_key,
-                client_secret=self.consumer_secret,
-                resource_owner_key=oauth_token,
-                resource_owner_secret=oauth_token_secret,
-                verifier=oauth_verifier
-            )
-            
             # Exchange for access token
-            access_token_response = oauth.fetch_access_token(self.oauth_token_url)
+            access_token_response = self._fetch_token(
+                self.oauth_token_url,
+                self._auth(
+                    resource_owner_key=oauth_token,
+                    resource_owner_secret=oauth_token_secret,
+                    verifier=oauth_verifier,
+                ),
+            )
             
             return {
                 'oauth_token': access_token_response.get('oauth_token'),
@@ -470,20 +449,8 @@ class OpenBankingService:
             List of account information
         """
         try:
-            from requests_oauthlib import OAuth1Session
-            
-            oauth = OAuth1Session(
-                self.consumer_key,
-                client_secret=self.consumer_secret,
-                resource_owner_key=oauth_token,
-                resource_owner_secret=oauth_token_secret
-            )
-            
-            # Get accounts
             url = f"{self.base_url}/obp/v5.1.0/my/accounts"
-            response = oauth.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(url, oauth_token, oauth_token_secret, endpoint="accounts")
             
             return data.get('accounts', [])
         except Exception as e:
@@ -503,19 +470,8 @@ class OpenBankingService:
             Account balance information
         """
         try:
-            from requests_oauthlib import OAuth1Session
-            
-            oauth = OAuth1Session(
-                self.consumer_key,
-                client_secret=self.consumer_secret,
-                resource_owner_key=oauth_token,
-                resource_owner_secret=oauth_token_secret
-            )
-            
             url = f"{self.base_url}/obp/v5.1.0/banks/{bank_id}/accounts/{account_id}/account"
-            response = oauth.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url, oauth_token, oauth_token_secret, endpoint="account")
         except Exception as e:
             raise Exception(f"Failed to get account balance: {str(e)}")
     
@@ -535,15 +491,6 @@ class OpenBankingService:
             List of transactions
         """
         try:
-            from requests_oauthlib import OAuth1Session
-            
-            oauth = OAuth1Session(
-                self.consumer_key,
-                client_secret=self.consumer_secret,
-                resource_owner_key=oauth_token,
-                resource_owner_secret=oauth_token_secret
-            )
-            
             url = f"{self.base_url}/obp/v5.1.0/banks/{bank_id}/accounts/{account_id}/transactions"
             params = {}
             if from_date:
@@ -551,10 +498,21 @@ class OpenBankingService:
             if to_date:
                 params['to_date'] = to_date
             
-            response = oauth.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(url, oauth_token, oauth_token_secret, endpoint="transactions", params=params)
             
             return data.get('transactions', [])
         except Exception as e:
             raise Exception(f"Failed to get transactions: {str(e)}")
+    
+    def get_transactions_page(self, oauth_token: str, oauth_token_secret: str, account_id: str, bank_id: str = "rbs", from_date: Optional[str] = None, limit: int = 500, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get one page of account transactions, oldest first, for incremental sync.
+        
+        Unlike ``get_transactions``, request errors are raised unchanged.
+        """
+        url = f"{self.base_url}/obp/v5.1.0/banks/{bank_id}/accounts/{account_id}/transactions"
+        params = {'sort_direction': 'ASC', 'limit': limit, 'offset': offset}
+        if from_date:
+            params['from_date'] = from_date
+        data = self._get(url, oauth_token, oauth_token_secret, endpoint="transactions", params=params)
+        return data.get('transactions', [])
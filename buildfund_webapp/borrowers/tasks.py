@@ -0,0 +1,23 @@
+"""Background tasks for the borrowers app."""
+from __future__ import annotations
+
+from tasks.registry import PermanentTaskError, register_task
+
+from .models import BorrowerProfile
+
+SYNC_BANK_TRANSACTIONS_TASK = 'borrowers.sync_bank_transactions'
+
+
+@register_task(SYNC_BANK_TRANSACTIONS_TASK, max_attempts=3, retry_delay_seconds=60)
+def sync_bank_transactions(borrower_id: int):
+    """Pull new Open Banking transactions for a borrower into the local ledger."""
+    from .bank_sync import BankTransactionSyncService
+    
+    borrower = BorrowerProfile.objects.filter(pk=borrower_id).first()
+    if borrower is None:
+        raise PermanentTaskError(f"Borrower profile {borrower_id} no longer exists")
+    try:
+        service = BankTransactionSyncService()
+    except ValueError as e:
+        raise PermanentTaskError(str(e))
+    return service.sync_borrower(borrower)
@@ -0,0 +1,63 @@
+"""Tests for the incremental Open Banking transaction sync."""
+from __future__ import annotations
+
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from borrowers.bank_sync import BankTransactionSyncService
+from borrowers.models import BankAccount, BankCashflowMonth, BorrowerProfile
+
+
+def _transaction(n, posted):
+    return {
+        "id": f"tx-{n}",
+        "details": {"posted": posted, "value": {"amount": "10.00"}, "new_balance": {"amount": "100.00"}},
+    }
+
+
+class FakeOpenBanking:
+    """Serves fixed pages and can fail on a given page once."""
+
+    def __init__(self, transactions, fail_at_offset=None):
+        self.transactions = transactions
+        self.fail_at_offset = fail_at_offset
+
+    def get_account_balance(self, *args, **kwargs):
+        return {"balance": {"amount": "100.00", "currency": "GBP"}}
+
+    def get_transactions_page(self, *args, from_date=None, limit=500, offset=0, **kwargs):
+        if offset == self.fail_at_offset:
+            self.fail_at_offset = None
+            raise ConnectionError("bank unavailable")
+        return self.transactions[offset:offset + limit]
+
+
+class BankTransactionSyncTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create(username="sync-borrower")
+        borrower = BorrowerProfile.objects.create(user=user, company_name="Sync Borrower")
+        self.account = BankAccount.objects.create(borrower=borrower, bank_id="rbs", account_id="acc-1")
+        self.transactions = (
+            [_transaction(i, f"2026-01-{10 + i}T09:00:00Z") for i in range(3)]
+            + [_transaction(i, f"2026-02-{10 + i}T09:00:00Z") for i in range(3, 6)]
+        )
+
+    def test_rerun_after_a_failed_page_aggregates_every_month(self):
+        bank = FakeOpenBanking(self.transactions, fail_at_offset=3)
+        service = BankTransactionSyncService(bank, page_size=3)
+        with self.assertRaises(ConnectionError):
+            service.sync_account(self.account)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.transactions.count(), 3)
+        self.assertEqual(
+            list(BankCashflowMonth.objects.filter(account=self.account).values_list("month", flat=True)),
+            [date(2026, 1, 1)],
+        )
+
+        result = service.sync_account(self.account)
+        self.assertEqual(result.inserted, 3)
+        self.assertEqual(self.account.transactions.count(), 6)
+        months = dict(BankCashflowMonth.objects.filter(account=self.account).values_list("month", "transaction_count"))
+        self.assertEqual(months, {date(2026, 1, 1): 3, date(2026, 2, 1): 3})
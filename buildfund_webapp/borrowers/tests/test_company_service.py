@@ -0,0 +1,88 @@
+"""Tests for the Companies House import into borrower profiles."""
+from __future__ import annotations
+
+import hashlib
+from contextlib import contextmanager
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from borrowers.company_service import CompanyDataProcessor
+from borrowers.models import BorrowerProfile
+from documents.storage import BaseDocumentStorage, StoredBlob, iter_chunks
+
+COMPANY_NUMBER = "00000001"
+
+
+class FakeResponse:
+    def __init__(self, transaction_id):
+        self.content = f"%PDF {transaction_id}".encode()
+        self.headers = {"Content-Type": "application/pdf"}
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+
+class FakeClient:
+    @contextmanager
+    def stream(self, path):
+        yield FakeResponse(path.split("/")[-2])
+
+
+class FlakyStorage(BaseDocumentStorage):
+    """Keeps blobs in memory but fails to store one document."""
+
+    def __init__(self, failing_transaction_id):
+        self.failing = failing_transaction_id.encode()
+        self.blobs = {}
+
+    def save(self, content):
+        data = b"".join(iter_chunks(content))
+        if self.failing in data:
+            raise OSError("No space left on device")
+        key = hashlib.sha256(data).hexdigest()
+        self.blobs[key] = data
+        return StoredBlob(key=key, size=len(data), sha256=key)
+
+
+class CompanyImportTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create(username="import-borrower")
+        self.profile = BorrowerProfile.objects.create(user=user)
+        self.processor = CompanyDataProcessor(max_workers=2)
+        service = self.processor.hmrc_service
+        service.client = FakeClient()
+        service.get_company_info = lambda number: {"company_name": "IMPORT LIMITED", "company_number": number}
+        service.get_company_officers = lambda number: {"items": [{"name": "DOE, Jane", "officer_role": "director"}]}
+        service.get_company_pscs = lambda number: {"items": [{"name": "Jane Doe", "natures_of_control": []}]}
+        service.get_company_charges = lambda number: {"items": []}
+        service.get_company_filing_history = lambda number: {"items": [
+            {"transaction_id": f"TX{i}", "category": "accounts", "date": f"202{i}-03-31", "description": "accounts"}
+            for i in range(3)
+        ]}
+
+    def test_a_failed_document_write_keeps_the_rest_of_the_import(self):
+        with mock.patch("verification.services.get_document_storage", return_value=FlakyStorage("TX1")), \
+                self.assertLogs("borrowers.company_service", "ERROR") as logs:
+            results = self.processor.process_and_save_company_data(self.profile, COMPANY_NUMBER)
+
+        self.assertIn("TX1", logs.output[0])
+        self.assertEqual(results["errors"], [])
+        self.assertEqual([doc["filename"] for doc in results["accounts_documents"]], ["document_TX2.pdf", "document_TX0.pdf"])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.company_name, "IMPORT LIMITED")
+        self.assertEqual(len(self.profile.directors_data), 1)
+        self.assertEqual(len(self.profile.shareholders_data), 1)
+        self.assertIsNotNone(self.profile.charges_summary)
+        self.assertEqual(self.profile.documents.count(), 2)
+
+    def test_filings_are_selected_from_the_dossier(self):
+        details = {"accounts_documents": [
+            {"transaction_id": "TX3"}, {"transaction_id": ""}, {"transaction_id": "TX2"},
+            {"transaction_id": "TX1"}, {"transaction_id": "TX0"},
+        ]}
+        self.assertEqual(
+            [filing["transaction_id"] for filing in CompanyDataProcessor._select_accounts_filings(details)],
+            ["TX3", "TX2", "TX1"],
+        )
@@ -33,6 +33,8 @@ class BorrowerProfileViewSet(
 
     serializer_class = BorrowerProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    # The list holds at most the user's own profile
+    pagination_class = None
 
     def get_queryset(self):
         return BorrowerProfile.objects.filter(user=self.request.user)
@@ -294,7 +296,7 @@ class BorrowerProfileViewSet(
             )
             
             # Create Document record
-            document = Document.objects.create(
+            document = Document(
                 owner=request.user,
                 file_name=filename or f"companies_house_{transaction_id}.pdf",
                 file_size=len(file_content),
@@ -302,9 +304,10 @@ class BorrowerProfileViewSet(
                 upload_path=f"companies_house/{company_number}/{transaction_id}.pdf",
                 description=description,
                 document_type=doc_type,
-                file_content=file_content,  # Store file content for small files
                 validation_status='valid',  # Companies House documents are pre-validated
             )
+            document.store_content(file_content)
+            document.save()
             
             # Add to profile's documents
             profile.documents.add(document)
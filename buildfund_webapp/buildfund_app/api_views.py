@@ -1,10 +1,13 @@
 ﻿"""API root view for BuildFund."""
 from __future__ import annotations
 
+from django.http import HttpResponse
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
+from core.http import render_metrics
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -31,3 +34,10 @@ def api_root(request):
             'onboarding': '/api/onboarding/',
         }
     })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """Outbound integration metrics for this worker process, in the Prometheus text format."""
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -73,6 +73,8 @@ INSTALLED_APPS = [
     "funding_requests",
     # Deal Progression module
     "deals",
+    # Background task queue
+    "tasks",
 ]
 
 MIDDLEWARE = [
@@ -220,12 +222,46 @@ if not HMRC_API_KEY:
         UserWarning
     )
 
+# Companies House API endpoint (overridable for local stub servers) and the
+# maximum number of concurrent requests made to it from one process.
+COMPANIES_HOUSE_API_URL = os.environ.get(
+    "COMPANIES_HOUSE_API_URL", "https://api.company-information.service.gov.uk"
+)
+COMPANIES_HOUSE_MAX_CONCURRENCY = int(os.environ.get("COMPANIES_HOUSE_MAX_CONCURRENCY", "8"))
+# Company dossiers (verification.dossier) are rebuilt after COMPANY_DOSSIER_TTL
+# seconds, or COMPANY_DOSSIER_PARTIAL_TTL if an optional section was missing;
+# optional sections not fetched within COMPANY_DOSSIER_DEADLINE seconds are left out.
+COMPANY_DOSSIER_TTL = int(os.environ.get("COMPANY_DOSSIER_TTL", str(6 * 60 * 60)))
+COMPANY_DOSSIER_PARTIAL_TTL = int(os.environ.get("COMPANY_DOSSIER_PARTIAL_TTL", "300"))
+COMPANY_DOSSIER_DEADLINE = float(os.environ.get("COMPANY_DOSSIER_DEADLINE", "4"))
+
+# Onboarding chat turns returned per page; older turns are read with
+# /api/onboarding/chat-history/ so a long conversation is never loaded whole.
+ONBOARDING_HISTORY_PAGE_SIZE = int(os.environ.get("ONBOARDING_HISTORY_PAGE_SIZE", "50"))
+
+# Google geocoding responses are cached for GEOCODE_CACHE_TTL seconds; each
+# process also keeps up to GEOCODE_CACHE_MAX_ENTRIES of them in memory.
+GEOCODE_CACHE_TTL = int(os.environ.get("GEOCODE_CACHE_TTL", str(30 * 24 * 60 * 60)))
+GEOCODE_CACHE_MAX_ENTRIES = int(os.environ.get("GEOCODE_CACHE_MAX_ENTRIES", "10000"))
+# Local postcode index built by `python manage.py load_postcode_index`;
+# postcode lookups fall back to Google when the file does not exist.
+POSTCODE_INDEX_PATH = Path(os.environ.get("POSTCODE_INDEX_PATH", BASE_DIR / "data" / "postcodes.idx"))
+
+# Transactions requested per page when syncing Open Banking accounts.
+OPEN_BANKING_SYNC_PAGE_SIZE = int(os.environ.get("OPEN_BANKING_SYNC_PAGE_SIZE", "500"))
+
 # API key for OpenAI ChatGPT (underwriting report generation).
 # This key MUST be provided via environment variables and **never**
 # committed to version control.  When not provided, the underwriting
 # endpoints will return a 500 error until a key is configured.
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
+
+# Chat backend for underwriter reports: "openai", or "fake" to run the
+# generation pipeline offline (e.g. for load testing).
+UNDERWRITER_LLM_BACKEND = os.environ.get("UNDERWRITER_LLM_BACKEND", "openai")
+UNDERWRITER_FAKE_LLM_LATENCY = float(os.environ.get("UNDERWRITER_FAKE_LLM_LATENCY", "0"))
+
+if not OPENAI_API_KEY and UNDERWRITER_LLM_BACKEND == "openai":
     # Don't fail on startup, but log a warning
     import warnings
     warnings.warn(
@@ -235,6 +271,96 @@ if not OPENAI_API_KEY:
         UserWarning
     )
 
+##########################################################
+# Outbound HTTP
+##########################################################
+
+# Options for the pooled clients in core.http, per third-party service;
+# "default" applies to every service.  Metrics are served at /api/metrics/.
+OUTBOUND_HTTP = {
+    "default": {
+        "pool_size": int(os.environ.get("OUTBOUND_HTTP_POOL_SIZE", "10")),
+        "max_retries": int(os.environ.get("OUTBOUND_HTTP_MAX_RETRIES", "2")),
+        "backoff": float(os.environ.get("OUTBOUND_HTTP_BACKOFF", "0.2")),
+        "breaker_threshold": int(os.environ.get("OUTBOUND_HTTP_BREAKER_THRESHOLD", "5")),
+        "breaker_reset": float(os.environ.get("OUTBOUND_HTTP_BREAKER_RESET", "30")),
+    },
+    "companies_house": {
+        "pool_size": COMPANIES_HOUSE_MAX_CONCURRENCY,
+        "max_concurrency": COMPANIES_HOUSE_MAX_CONCURRENCY,
+    },
+}
+
+##########################################################
+# Background tasks
+##########################################################
+
+# Queue backend; tasks are executed by `python manage.py run_task_worker`.
+# Use "tasks.backends.ImmediateBackend" to run tasks inline without a worker.
+TASKS_BACKEND = os.environ.get("TASKS_BACKEND", "tasks.backends.DatabaseBackend")
+# Seconds before a running task whose worker died is picked up again
+TASKS_VISIBILITY_TIMEOUT = int(os.environ.get("TASKS_VISIBILITY_TIMEOUT", "600"))
+
+##########################################################
+# Caches
+##########################################################
+
+# Every alias is shared by all gunicorn workers (see core.cache for what
+# each holds).  With REDIS_URL set they live in Redis; otherwise
+# CACHE_BACKEND picks "file" (under CACHE_DIR), "db" (tables created by
+# `python manage.py createcachetable`) or "locmem" (one process only, for
+# development).  The database cache cannot increment atomically, so with
+# "db" the throttle counters stay in files.
+REDIS_URL = os.environ.get("REDIS_URL", "")
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "redis" if REDIS_URL else "file")
+CACHE_DIR = Path(os.environ.get("CACHE_DIR", BASE_DIR / "cache"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "50000"))
+CACHE_ALIASES = ("default", "throttle", "api", "aggregates")
+
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": f"buildfund:{alias}",
+        }
+        for alias in CACHE_ALIASES
+    }
+elif CACHE_BACKEND == "locmem":
+    CACHES = {
+        alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": alias}
+        for alias in CACHE_ALIASES
+    }
+else:
+    CACHES = {
+        alias: {
+            "BACKEND": "core.cache.LockingFileBasedCache",
+            "LOCATION": str(CACHE_DIR / alias),
+            "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+        }
+        for alias in CACHE_ALIASES
+    }
+    if CACHE_BACKEND == "db":
+        CACHES.update({
+            alias: {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": f"buildfund_cache_{alias}",
+                "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+            }
+            for alias in CACHE_ALIASES
+            if alias != "throttle"
+        })
+
+##########################################################
+# Document storage
+##########################################################
+
+# Uploaded document bytes are kept outside the database in this backend.
+DOCUMENT_STORAGE_BACKEND = os.environ.get(
+    "DOCUMENT_STORAGE_BACKEND", "documents.storage.LocalContentAddressedStorage"
+)
+DOCUMENT_STORAGE_ROOT = Path(os.environ.get("DOCUMENT_STORAGE_ROOT", BASE_DIR / "document_storage"))
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
@@ -250,7 +376,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -258,8 +384,8 @@ REST_FRAMEWORK = {
     ],
     # In development, disable throttling to avoid 429 errors during testing
     "DEFAULT_THROTTLE_CLASSES": [] if DEBUG else [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "core.throttles.AnonRateThrottle",
+        "core.throttles.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         # In development, use very lenient limits; in production, use stricter limits
@@ -271,7 +397,17 @@ REST_FRAMEWORK = {
         "verification": "1000/hour" if DEBUG else "20/hour",  # Verification requests per user
     },
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.openapi.AutoSchema",
+    # Every list endpoint is paginated; time-ordered feeds override this with cursor pagination
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.StandardPagination",
+    "PAGE_SIZE": int(os.environ.get("API_PAGE_SIZE", "50")),
 }
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", "200"))
+
+# Authenticated API tokens and request principals (role names and profile
+# ids, see accounts.principal) are cached for these many seconds; signals
+# evict them when a token, user, role or profile changes.
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", "300"))
+PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", "300"))
 
 # CORS configuration
 # Only allow requests from the specified frontâ€‘end domain(s)
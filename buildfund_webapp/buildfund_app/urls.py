@@ -10,11 +10,12 @@ from __future__ import annotations
 from django.contrib import admin
 from django.urls import include, path
 from accounts.auth_views import CustomObtainAuthToken
-from buildfund_app.api_views import api_root
+from buildfund_app.api_views import api_root, metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", api_root, name="api-root"),
+    path("api/metrics/", metrics, name="metrics"),
     path("api/auth/token/", CustomObtainAuthToken.as_view(), name="api-token"),
     path("api/accounts/", include("accounts.urls")),
     path("api/borrowers/", include("borrowers.urls")),
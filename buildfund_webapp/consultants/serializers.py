@@ -1,9 +1,10 @@
 """Serializers for consultants app."""
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from .models import ConsultantProfile, ConsultantService, ConsultantQuote, ConsultantAppointment
 
 
-class ConsultantProfileSerializer(serializers.ModelSerializer):
+class ConsultantProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ConsultantProfile."""
     
     user_email = serializers.EmailField(source="user.email", read_only=True)
@@ -64,7 +65,7 @@ class ConsultantProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at", "verified_at"]
 
 
-class ConsultantServiceSerializer(serializers.ModelSerializer):
+class ConsultantServiceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ConsultantService."""
     
     application_id = serializers.IntegerField(source="application.id", read_only=True)
@@ -95,7 +96,7 @@ class ConsultantServiceSerializer(serializers.ModelSerializer):
         return obj.quotes.count()
 
 
-class ConsultantQuoteSerializer(serializers.ModelSerializer):
+class ConsultantQuoteSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ConsultantQuote."""
     
     consultant_name = serializers.CharField(source="consultant.organisation_name", read_only=True)
@@ -129,7 +130,7 @@ class ConsultantQuoteSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "submitted_at", "reviewed_at", "accepted_at"]
 
 
-class ConsultantAppointmentSerializer(serializers.ModelSerializer):
+class ConsultantAppointmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ConsultantAppointment."""
     
     consultant_name = serializers.CharField(source="consultant.organisation_name", read_only=True)
@@ -6,6 +6,8 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django.db.models import Q
 from django.utils import timezone
 
+from accounts.principal import get_principal
+
 from .models import ConsultantProfile, ConsultantService, ConsultantQuote, ConsultantAppointment
 from .serializers import (
     ConsultantProfileSerializer,
@@ -24,10 +26,11 @@ class ConsultantProfileViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        principal = get_principal(user)
         service_type = self.request.query_params.get('service_type')
         
         # For lender inviting consultants, show all active verified consultants
-        if hasattr(user, 'lenderprofile') or user.is_staff:
+        if principal.is_lender or user.is_staff:
             qs = ConsultantProfile.objects.filter(is_active=True, is_verified=True)
             if service_type:
                 # Filter by service type (valuer, monitoring_surveyor, solicitor)
@@ -41,7 +44,7 @@ class ConsultantProfileViewSet(viewsets.ModelViewSet):
             return qs
         
         # Consultants see their own profile
-        if hasattr(user, "consultantprofile"):
+        if principal.is_consultant:
             return ConsultantProfile.objects.filter(user=user)
         
         return ConsultantProfile.objects.none()
@@ -110,7 +113,8 @@ class ConsultantServiceViewSet(viewsets.ReadOnlyModelViewSet):
         user = self.request.user
         # Consultants see services they can quote on
         # Borrowers/Lenders see services for their applications
-        if hasattr(user, "consultantprofile"):
+        principal = get_principal(user)
+        if principal.is_consultant:
             consultant = user.consultantprofile
             # Filter by consultant's services_offered
             qs = ConsultantService.objects.filter(status__in=["pending", "quotes_received"])
@@ -132,13 +136,13 @@ class ConsultantServiceViewSet(viewsets.ReadOnlyModelViewSet):
                 qs = qs.filter(geographic_filter)
             
             return qs
-        elif hasattr(user, "borrowerprofile"):
+        elif principal.is_borrower:
             return ConsultantService.objects.filter(
-                application__project__borrower=user.borrowerprofile
+                application__project__borrower_id=principal.borrower_profile_id
             )
-        elif hasattr(user, "lenderprofile"):
+        elif principal.is_lender:
             return ConsultantService.objects.filter(
-                application__lender=user.lenderprofile
+                application__lender_id=principal.lender_profile_id
             )
         elif user.is_staff:
             return ConsultantService.objects.all()
@@ -171,18 +175,19 @@ class ConsultantQuoteViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        if hasattr(user, "consultantprofile"):
+        principal = get_principal(user)
+        if principal.is_consultant:
             # Consultants see their own quotes
-            return ConsultantQuote.objects.filter(consultant=user.consultantprofile)
-        elif hasattr(user, "borrowerprofile"):
+            return ConsultantQuote.objects.filter(consultant_id=principal.consultant_profile_id)
+        elif principal.is_borrower:
             # Borrowers see quotes for their applications
             return ConsultantQuote.objects.filter(
-                service__application__project__borrower=user.borrowerprofile
+                service__application__project__borrower_id=principal.borrower_profile_id
             )
-        elif hasattr(user, "lenderprofile"):
+        elif principal.is_lender:
             # Lenders see quotes for their applications
             return ConsultantQuote.objects.filter(
-                service__application__lender=user.lenderprofile
+                service__application__lender_id=principal.lender_profile_id
             )
         elif user.is_staff:
             return ConsultantQuote.objects.all()
@@ -258,15 +263,16 @@ class ConsultantAppointmentViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        if hasattr(user, "consultantprofile"):
-            return ConsultantAppointment.objects.filter(consultant=user.consultantprofile)
-        elif hasattr(user, "borrowerprofile"):
+        principal = get_principal(user)
+        if principal.is_consultant:
+            return ConsultantAppointment.objects.filter(consultant_id=principal.consultant_profile_id)
+        elif principal.is_borrower:
             return ConsultantAppointment.objects.filter(
-                service__application__project__borrower=user.borrowerprofile
+                service__application__project__borrower_id=principal.borrower_profile_id
             )
-        elif hasattr(user, "lenderprofile"):
+        elif principal.is_lender:
             return ConsultantAppointment.objects.filter(
-                service__application__lender=user.lenderprofile
+                service__application__lender_id=principal.lender_profile_id
             )
         elif user.is_staff:
             return ConsultantAppointment.objects.all()
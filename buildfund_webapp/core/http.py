@@ -0,0 +1,327 @@
+"""Shared outbound HTTP client for third-party integrations.
+
+Each integration (Google Maps, Companies House, Open Banking) gets one
+``ServiceClient`` per worker process from ``get_client(name)``, so
+connections are kept alive and reused across requests.  A client adds:
+
+* a keep-alive connection pool sized per service, with an optional cap on
+  concurrent requests;
+* retries of idempotent requests on connection errors and 429/502/503/504
+  responses, with exponential backoff and full jitter (``Retry-After`` is
+  honoured when the upstream sends it);
+* a circuit breaker that fails fast with ``CircuitOpenError`` after
+  repeated upstream failures, then lets a single trial request through;
+* per-endpoint latency histograms and request/error counters, rendered in
+  the Prometheus text format by ``render_metrics()``.
+
+Options come from the ``OUTBOUND_HTTP`` setting: ``"default"`` applies to
+every service and per-service entries override it.
+"""
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+DEFAULT_OPTIONS = {
+    "pool_size": 10,
+    "max_concurrency": None,
+    "timeout": 10,
+    "max_retries": 2,
+    "backoff": 0.2,
+    "max_backoff": 5.0,
+    "breaker_threshold": 5,
+    "breaker_reset": 30.0,
+}
+RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[^/]+$")
+
+_clients: Dict[str, "ServiceClient"] = {}
+_clients_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without contacting the upstream while its circuit breaker is open."""
+
+
+def endpoint_label(url: str) -> str:
+    """Collapse identifier-like path segments so metrics are kept per endpoint, not per resource."""
+    path = urlsplit(url).path or "/"
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial request."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class EndpointMetrics:
+    """Latency histogram and outcome counters for one endpoint."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.responses: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.retries = 0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+class ServiceClient:
+    """Pooled, instrumented HTTP client for one upstream service."""
+
+    def __init__(self, name: str, **options):
+        self.name = name
+        self.options = {**DEFAULT_OPTIONS, **options}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.options["pool_size"])
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        max_concurrency = self.options["max_concurrency"]
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.breaker = CircuitBreaker(self.options["breaker_threshold"], self.options["breaker_reset"])
+        self._metrics: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._metrics_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the service's concurrent request slots, if it has a cap."""
+        if self._slots is None:
+            yield
+            return
+        with self._slots:
+            yield
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: Optional[str] = None,
+        retries: Optional[int] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request through the pool, retrying and recording metrics.
+
+        ``endpoint`` overrides the metrics label derived from the URL path.
+        Error responses are returned, not raised; connection errors and an
+        open circuit raise ``requests.RequestException`` subclasses.
+        """
+        return self._send(method, url, endpoint, retries, True, kwargs)
+
+    def _send(self, method, url, endpoint, retries, hold_slot, kwargs) -> requests.Response:
+        method = method.upper()
+        label = endpoint or endpoint_label(url)
+        kwargs.setdefault("timeout", self.options["timeout"])
+        if retries is None:
+            retries = self.options["max_retries"] if method in RETRY_METHODS else 0
+
+        attempt = 0
+        response = error = None
+        while True:
+            if not self.breaker.allow():
+                self._record(method, label, error="circuit_open")
+                # A retry refused by the breaker reports the failure that tripped it
+                if response is not None:
+                    return response
+                if error is not None:
+                    raise error
+                raise CircuitOpenError(f"Circuit open for {self.name}; not calling {label}")
+            if response is not None:
+                response.close()
+            response = error = None
+            started = time.perf_counter()
+            delay = None
+            try:
+                if hold_slot:
+                    with self.slot():
+                        response = self.session.request(method, url, **kwargs)
+                else:
+                    response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as exc:
+                error = exc
+                self.breaker.record_failure()
+                self._record(method, label, elapsed=time.perf_counter() - started, error=type(exc).__name__)
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                self._record(method, label, elapsed=time.perf_counter() - started, status_code=response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = min(float(retry_after), self.options["max_backoff"])
+            attempt += 1
+            self._record_retry(method, label)
+            time.sleep(self.backoff(attempt) if delay is None else delay)
+
+    @contextmanager
+    def stream(self, url: str, *, endpoint: Optional[str] = None, **kwargs):
+        """Stream a response body, holding a concurrency slot until the caller has read it."""
+        with self.slot():
+            kwargs["stream"] = True
+            with self._send("GET", url, endpoint, None, False, kwargs) as response:
+                yield response
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry ``attempt``."""
+        ceiling = min(self.options["max_backoff"], self.options["backoff"] * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def _endpoint_metrics(self, method: str, label: str) -> EndpointMetrics:
+        key = (method, label)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics.setdefault(key, EndpointMetrics())
+        return metrics
+
+    def _record(self, method, label, elapsed=None, status_code=None, error=None) -> None:
+        with self._metrics_lock:
+            metrics = self._endpoint_metrics(method, label)
+            if elapsed is not None:
+                metrics.observe(elapsed)
+            if status_code is not None:
+                code = f"{status_code // 100}xx"
+                metrics.responses[code] = metrics.responses.get(code, 0) + 1
+            if error is not None:
+                metrics.errors[error] = metrics.errors.get(error, 0) + 1
+
+    def _record_retry(self, method, label) -> None:
+        with self._metrics_lock:
+            self._endpoint_metrics(method, label).retries += 1
+
+    def snapshot(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Return a copy of the per-endpoint metrics as (method, endpoint, values) tuples."""
+        with self._metrics_lock:
+            return [
+                (method, label, {
+                    "buckets": list(m.buckets),
+                    "count": m.count,
+                    "sum": m.total,
+                    "responses": dict(m.responses),
+                    "errors": dict(m.errors),
+                    "retries": m.retries,
+                })
+                for (method, label), m in sorted(self._metrics.items())
+            ]
+
+
+def client_options(name: str) -> Dict[str, Any]:
+    configured = getattr(settings, "OUTBOUND_HTTP", {})
+    return {**configured.get("default", {}), **configured.get(name, {})}
+
+
+def get_client(name: str) -> ServiceClient:
+    """Return the process-wide client for a service, creating it on first use."""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = ServiceClient(name, **client_options(name))
+    return client
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_metrics() -> str:
+    """Render outbound request metrics for this process in the Prometheus text format."""
+    lines = [
+        "# HELP outbound_request_duration_seconds Latency of outbound requests to third-party services.",
+        "# TYPE outbound_request_duration_seconds histogram",
+    ]
+    counters = [
+        "# HELP outbound_responses_total Outbound responses by status class.",
+        "# TYPE outbound_responses_total counter",
+    ]
+    errors = [
+        "# HELP outbound_errors_total Outbound requests that failed without a response.",
+        "# TYPE outbound_errors_total counter",
+    ]
+    retries = [
+        "# HELP outbound_retries_total Outbound requests retried.",
+        "# TYPE outbound_retries_total counter",
+    ]
+    breakers = [
+        "# HELP outbound_circuit_open Whether the service's circuit breaker is open (1) or not (0).",
+        "# TYPE outbound_circuit_open gauge",
+    ]
+    for name, client in sorted(_clients.items()):
+        service = _escape(name)
+        for method, label, values in client.snapshot():
+            labels = f'service="{service}",method="{method}",endpoint="{_escape(label)}"'
+            cumulative = 0
+            for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), values["buckets"]):
+                cumulative += count
+                lines.append(f'outbound_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"outbound_request_duration_seconds_sum{{{labels}}} {values['sum']:.6f}")
+            lines.append(f"outbound_request_duration_seconds_count{{{labels}}} {values['count']}")
+            for code, count in sorted(values["responses"].items()):
+                counters.append(f'outbound_responses_total{{{labels},code="{code}"}} {count}')
+            for error, count in sorted(values["errors"].items()):
+                errors.append(f'outbound_errors_total{{{labels},error="{error}"}} {count}')
+            if values["retries"]:
+                retries.append(f"outbound_retries_total{{{labels}}} {values['retries']}")
+        breakers.append(f'outbound_circuit_open{{service="{service}"}} {int(client.breaker.state == CircuitBreaker.OPEN)}')
+    return "\n".join(lines + counters + errors + retries + breakers) + "\n"
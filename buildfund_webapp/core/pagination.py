@@ -0,0 +1,36 @@
+"""Platform-wide pagination classes for the REST API.
+
+``StandardPagination`` is the ``DEFAULT_PAGINATION_CLASS``: page-number
+pages with a total ``count``, for lists the UI shows counts or page links
+for.  Time-ordered feeds use a ``CursorPagination`` subclass instead
+(``NewestFirstCursorPagination`` here, ``DealCursorPagination`` and
+``DocumentCursorPagination`` in their apps), which avoids the count query
+and stays stable while rows are added between page loads.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class StandardPagination(PageNumberPagination):
+    """Page-number pagination with a client-selectable ``page_size``."""
+
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Pages of an unordered queryset can overlap or skip rows
+        if isinstance(queryset, QuerySet) and not queryset.ordered:
+            queryset = queryset.order_by('pk')
+        return super().paginate_queryset(queryset, request, view=view)
+
+
+class NewestFirstCursorPagination(CursorPagination):
+    """Cursor pagination for feeds ordered by creation time, newest first."""
+
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+    ordering = ('-created_at', '-id')
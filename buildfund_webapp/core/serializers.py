@@ -0,0 +1,101 @@
+"""Serializer helpers shared across apps."""
+from __future__ import annotations
+
+from typing import Optional, Set
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+
+def _query_names(request, param: str) -> Optional[Set[str]]:
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=`` and ``?expand=`` support for the serializer a view responds with.
+
+    ``?fields=id,status`` limits each object to the named fields.  Fields
+    listed in ``Meta.expandable_fields`` are expensive to build (nested
+    serializers or extra queries per row), so list responses leave them out
+    unless they are named in ``?expand=`` (or ``?fields=``); detail
+    responses keep them.  Only GET requests are trimmed, and serializers
+    nested inside the response are left whole.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.method not in ("GET", "HEAD") or not self._is_response_serializer():
+            return fields
+
+        only = _query_names(request, "fields")
+        expand = _query_names(request, "expand") or set()
+        if only is not None:
+            keep = only | expand
+        elif isinstance(self.parent, serializers.ListSerializer):
+            keep = set(fields) - (set(getattr(self.Meta, "expandable_fields", ())) - expand)
+        else:
+            return fields
+        for name in list(fields):
+            if name not in keep:
+                del fields[name]
+        return fields
+
+    def _is_response_serializer(self) -> bool:
+        """True for the top-level serializer (or list child) of the view's own serializer class."""
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return False
+        view = self.context.get("view")
+        try:
+            serializer_class = view.get_serializer_class()
+        except (AttributeError, AssertionError):
+            return False
+        return isinstance(self, serializer_class)
+
+
+class PrefetchDeclarationMixin:
+    """
+    Lets a serializer declare the related rows and annotations its fields read.
+
+    ``Meta.select_related``, ``Meta.prefetch_related`` and ``Meta.annotations``
+    map a field name to what that field needs::
+
+        class Meta:
+            select_related = {'lender_name': ['lender']}
+            prefetch_related = {'attachments': [Prefetch('attachments', queryset=...)]}
+            annotations = {'message_count': {'message_total': Count('messages')}}
+
+    ``setup_queryset()`` applies the entries for the fields being rendered,
+    so fields trimmed by ``?fields=``/``?expand=`` cost nothing;
+    ``core.views.DeclaredQuerysetMixin`` calls it for the view's queryset.
+    Fields read annotations and ``to_attr`` prefetches with ``getattr`` and
+    fall back to a query, so instances loaded elsewhere still serialize.
+    """
+
+    def setup_queryset(self, queryset: QuerySet) -> QuerySet:
+        meta = getattr(self, "Meta", None)
+        names = set(self.fields)
+        select_related, prefetch_related, annotations = [], [], {}
+        for name, lookups in getattr(meta, "select_related", {}).items():
+            if name in names:
+                select_related.extend(lookup for lookup in lookups if lookup not in select_related)
+        for name, lookups in getattr(meta, "prefetch_related", {}).items():
+            if name in names:
+                prefetch_related.extend(lookup for lookup in lookups if lookup not in prefetch_related)
+        for name, expressions in getattr(meta, "annotations", {}).items():
+            if name in names:
+                annotations.update(expressions)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
@@ -0,0 +1,25 @@
+"""Helpers for tests that count or inspect the SQL a request runs.
+
+``CaptureQueriesContext`` reads ``connection.queries``, which the test
+client's ``request_started`` signal clears, so queries made inside a
+request are lost.  ``capture_sql`` records them with an execute wrapper.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from django.db import connection
+
+
+@contextmanager
+def capture_sql() -> Iterator[List[str]]:
+    """Collect the SQL of every query run on the default connection inside the block."""
+    statements: List[str] = []
+
+    def record(execute, sql, params, many, context):
+        statements.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield statements
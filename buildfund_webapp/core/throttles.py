@@ -1,7 +1,73 @@
-"""Custom throttle classes for paid API endpoints."""
+"""Throttle classes counting requests in the shared ``throttle`` cache.
+
+DRF's throttles keep a list of request timestamps per client and rewrite
+it on every request: the entry grows with the request rate, and workers
+writing at the same time overwrite each other's requests.  These throttles
+keep one counter per client and window of the throttle's duration,
+incremented atomically with ``incr_with_expiry``.  The previous window's
+count is weighted by how much of it the sliding window still covers, so a
+client cannot double its rate across a window boundary.
+"""
 from __future__ import annotations
 
-from rest_framework.throttling import UserRateThrottle
+from django.core.cache import caches
+from rest_framework import throttling
+
+from .cache import THROTTLE_CACHE, incr_with_expiry
+
+
+class WindowedRateThrottle(throttling.SimpleRateThrottle):
+    """``SimpleRateThrottle`` storing two counters per client instead of a timestamp history."""
+
+    cache_alias = THROTTLE_CACHE
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, elapsed = divmod(self.now, self.duration)
+        current_key = self._window_key(int(window))
+        # Kept for two windows: the next window still weighs this one
+        count = incr_with_expiry(self.cache, current_key, 2 * self.duration)
+        previous = self.cache.get(self._window_key(int(window) - 1), 0)
+        if previous * (1 - elapsed / self.duration) + count <= self.num_requests:
+            return True
+
+        # Refused requests do not count against the client
+        incr_with_expiry(self.cache, current_key, 2 * self.duration, delta=-1)
+        self._wait = self._seconds_until_allowed(count - 1, previous, elapsed)
+        return self.throttle_failure()
+
+    def wait(self):
+        return self._wait
+
+    def _window_key(self, window: int) -> str:
+        # The duration keeps throttles sharing a scope but not a rate apart
+        return f"{self.key}:{self.duration}:{window}"
+
+    def _seconds_until_allowed(self, count, previous, elapsed):
+        room = self.num_requests - count - 1
+        if room < 0 or not previous:
+            return self.duration - elapsed
+        # When the previous window's weight has decayed enough to fit one more request
+        return max(0.0, self.duration * (1 - room / previous) - elapsed)
+
+
+class AnonRateThrottle(WindowedRateThrottle, throttling.AnonRateThrottle):
+    """Limits anonymous clients by IP address, as DRF's ``AnonRateThrottle``."""
+
+
+class UserRateThrottle(WindowedRateThrottle, throttling.UserRateThrottle):
+    """Limits authenticated users by id and anonymous clients by IP, as DRF's ``UserRateThrottle``."""
 
 
 class PaidAPIThrottle(UserRateThrottle):
@@ -0,0 +1,24 @@
+"""View mixins shared across apps."""
+from __future__ import annotations
+
+from rest_framework import serializers
+
+
+class DeclaredQuerysetMixin:
+    """
+    Apply the serializer's ``PrefetchDeclarationMixin`` declarations to the view's queryset.
+
+    Hooked into ``filter_queryset`` so it covers ``list`` and ``get_object``
+    without touching each view's ``get_queryset``.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.setup_serializer_queryset(queryset, many=self.action == "list")
+
+    def setup_serializer_queryset(self, queryset, many=False):
+        serializer = self.get_serializer(many=many)
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        setup = getattr(serializer, "setup_queryset", None)
+        return setup(queryset) if setup is not None else queryset
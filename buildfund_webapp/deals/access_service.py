@@ -0,0 +1,258 @@
+"""Service for maintaining and querying the DealAccess index.
+
+Deal visibility for consultants comes from four relationships: an active
+DealParty, a ProviderEnquiry sent to their firm, a ProviderQuote on such an
+enquiry, and a DealProviderSelection.  The DealAccess table stores the result
+as one row per (user, deal) with a reason bitmask so that viewsets can scope
+querysets with a single indexed lookup instead of a multi-join DISTINCT.
+
+Every reason makes the deal itself visible, but a deal's child resources
+(parties, tasks, CPs, requisitions, drawdowns, messages, documents) are
+only shown to named parties, as before the index existed: a firm that was
+only sent an enquiry, or has quoted, sees the deal but not its workings.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
+
+from .models import (
+    Deal, DealAccess, DealParty, DealProviderSelection, ProviderEnquiry, ProviderQuote
+)
+
+logger = logging.getLogger(__name__)
+
+AccessKey = Tuple[int, int]  # (deal_id, user_id)
+
+# Reasons that give access to a deal's child resources, not just the deal
+CHILD_RESOURCE_REASONS = DealAccess.REASON_PARTY
+
+
+class DealAccessService:
+    """Maintain the DealAccess index and resolve deal visibility from it."""
+
+    # ------------------------------------------------------------------
+    # Queryset scoping
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _entries(user, reasons: Optional[int] = None) -> QuerySet:
+        entries = DealAccess.objects.filter(user=user)
+        if reasons is not None:
+            entries = entries.annotate(granted=F('reasons').bitand(reasons)).filter(granted__gt=0)
+        return entries
+
+    @staticmethod
+    def indexed_deal_ids(user, reasons: Optional[int] = None) -> QuerySet:
+        """Return a subquery of deal ids the index grants the user, optionally for some reasons only."""
+        return DealAccessService._entries(user, reasons).values('deal_id')
+
+    @staticmethod
+    def accessible_deals(user) -> QuerySet:
+        """
+        Return deals whose child resources a non-admin user may see.
+
+        Lenders and borrowers see deals they own; everyone else must be a
+        named party on the deal, resolved through the DealAccess index.
+        """
+        return Deal.objects.filter(
+            Q(lender__user=user) |
+            Q(borrower_company__user=user) |
+            Q(id__in=DealAccessService.indexed_deal_ids(user, CHILD_RESOURCE_REASONS))
+        )
+
+    @staticmethod
+    def user_has_indexed_access(user, deal) -> bool:
+        """Check whether the index grants the user access to a deal's child resources."""
+        return DealAccessService._entries(user, CHILD_RESOURCE_REASONS).filter(deal=deal).exists()
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compute_reasons(deal_id: int, user_id: int) -> int:
+        """Compute the access reason bitmask for a single (deal, user) pair."""
+        reasons = 0
+        if DealParty.objects.filter(
+            deal_id=deal_id,
+            appointment_status='active',
+        ).filter(
+            Q(user_id=user_id) | Q(consultant_profile__user_id=user_id)
+        ).exists():
+            reasons |= DealAccess.REASON_PARTY
+        if ProviderEnquiry.objects.filter(deal_id=deal_id, provider_firm__user_id=user_id).exists():
+            reasons |= DealAccess.REASON_ENQUIRY
+        if ProviderQuote.objects.filter(
+            enquiry__deal_id=deal_id,
+            enquiry__provider_firm__user_id=user_id,
+        ).exists():
+            reasons |= DealAccess.REASON_QUOTE
+        if DealProviderSelection.objects.filter(deal_id=deal_id, provider_firm__user_id=user_id).exists():
+            reasons |= DealAccess.REASON_SELECTION
+        return reasons
+
+    @staticmethod
+    def refresh(keys: Iterable[AccessKey]) -> None:
+        """Recompute and upsert (or remove) index rows for the given keys."""
+        from consultants.models import ConsultantProfile
+
+        for deal_id, user_id in set(keys):
+            if not deal_id or not user_id:
+                continue
+            if not Deal.objects.filter(pk=deal_id).exists():
+                # Deal was deleted; its index rows cascade with it
+                continue
+            reasons = DealAccessService.compute_reasons(deal_id, user_id)
+            if not reasons:
+                DealAccess.objects.filter(deal_id=deal_id, user_id=user_id).delete()
+                continue
+            consultant_profile_id = ConsultantProfile.objects.filter(
+                user_id=user_id
+            ).values_list('id', flat=True).first()
+            DealAccess.objects.update_or_create(
+                deal_id=deal_id,
+                user_id=user_id,
+                defaults={
+                    'reasons': reasons,
+                    'consultant_profile_id': consultant_profile_id,
+                },
+            )
+
+    @staticmethod
+    def schedule_refresh(keys: Iterable[AccessKey]) -> None:
+        """
+        Refresh index rows once the current transaction commits.
+
+        Deferring to commit keeps cascaded deletes (e.g. deleting a Deal and
+        its enquiries) from re-creating rows for a deal that is going away.
+        """
+        keys = {key for key in keys if key[0] and key[1]}
+        if not keys:
+            return
+
+        def _refresh():
+            try:
+                DealAccessService.refresh(keys)
+            except Exception as e:
+                logger.error(f"Failed to refresh deal access index for {sorted(keys)}: {e}", exc_info=True)
+
+        transaction.on_commit(_refresh)
+
+    # ------------------------------------------------------------------
+    # Key extraction for signal handlers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def keys_for_party(party: DealParty) -> Set[AccessKey]:
+        """Return the index keys affected by a DealParty row."""
+        keys = set()
+        if party.user_id:
+            keys.add((party.deal_id, party.user_id))
+        if party.consultant_profile_id:
+            keys.add((party.deal_id, DealAccessService._consultant_user_id(party.consultant_profile_id)))
+        return keys
+
+    @staticmethod
+    def keys_for_enquiry(enquiry: ProviderEnquiry) -> Set[AccessKey]:
+        """Return the index keys affected by a ProviderEnquiry row."""
+        return {(enquiry.deal_id, DealAccessService._consultant_user_id(enquiry.provider_firm_id))}
+
+    @staticmethod
+    def keys_for_quote(quote: ProviderQuote) -> Set[AccessKey]:
+        """Return the index keys affected by a ProviderQuote row."""
+        enquiry = ProviderEnquiry.objects.filter(
+            pk=quote.enquiry_id
+        ).values('deal_id', 'provider_firm__user_id').first()
+        if not enquiry:
+            return set()
+        return {(enquiry['deal_id'], enquiry['provider_firm__user_id'])}
+
+    @staticmethod
+    def keys_for_selection(selection: DealProviderSelection) -> Set[AccessKey]:
+        """Return the index keys affected by a DealProviderSelection row."""
+        return {(selection.deal_id, DealAccessService._consultant_user_id(selection.provider_firm_id))}
+
+    @staticmethod
+    def _consultant_user_id(consultant_profile_id: Optional[int]) -> Optional[int]:
+        from consultants.models import ConsultantProfile
+
+        if not consultant_profile_id:
+            return None
+        return ConsultantProfile.objects.filter(
+            pk=consultant_profile_id
+        ).values_list('user_id', flat=True).first()
+
+    # ------------------------------------------------------------------
+    # Full rebuild / verification
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def expected_index() -> Dict[AccessKey, int]:
+        """Compute the full expected index from source tables in four queries."""
+        expected: Dict[AccessKey, int] = {}
+
+        def _add(rows, bit):
+            for deal_id, user_id in rows:
+                if deal_id and user_id:
+                    expected[(deal_id, user_id)] = expected.get((deal_id, user_id), 0) | bit
+
+        active_parties = DealParty.objects.filter(appointment_status='active')
+        _add(active_parties.filter(user__isnull=False).values_list('deal_id', 'user_id'), DealAccess.REASON_PARTY)
+        _add(
+            active_parties.filter(consultant_profile__isnull=False).values_list('deal_id', 'consultant_profile__user_id'),
+            DealAccess.REASON_PARTY,
+        )
+        _add(ProviderEnquiry.objects.values_list('deal_id', 'provider_firm__user_id'), DealAccess.REASON_ENQUIRY)
+        _add(
+            ProviderQuote.objects.values_list('enquiry__deal_id', 'enquiry__provider_firm__user_id'),
+            DealAccess.REASON_QUOTE,
+        )
+        _add(DealProviderSelection.objects.values_list('deal_id', 'provider_firm__user_id'), DealAccess.REASON_SELECTION)
+        return expected
+
+    @staticmethod
+    def verify() -> Dict[str, list]:
+        """
+        Compare the stored index against the source tables.
+
+        Returns ``missing`` (expected but absent), ``stale`` (present but not
+        expected) and ``mismatched`` (present with the wrong reasons) keys.
+        """
+        expected = DealAccessService.expected_index()
+        actual = {
+            (deal_id, user_id): reasons
+            for deal_id, user_id, reasons in DealAccess.objects.values_list('deal_id', 'user_id', 'reasons').iterator()
+        }
+        return {
+            'missing': sorted(set(expected) - set(actual)),
+            'stale': sorted(set(actual) - set(expected)),
+            'mismatched': sorted(key for key in set(expected) & set(actual) if expected[key] != actual[key]),
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(batch_size: int = 1000) -> int:
+        """Rebuild the whole index from source tables; returns the row count."""
+        from consultants.models import ConsultantProfile
+
+        expected = DealAccessService.expected_index()
+        profile_by_user = dict(ConsultantProfile.objects.values_list('user_id', 'id'))
+
+        DealAccess.objects.all().delete()
+        DealAccess.objects.bulk_create(
+            (
+                DealAccess(
+                    deal_id=deal_id,
+                    user_id=user_id,
+                    consultant_profile_id=profile_by_user.get(user_id),
+                    reasons=reasons,
+                )
+                for (deal_id, user_id), reasons in expected.items()
+            ),
+            batch_size=batch_size,
+        )
+        return len(expected)
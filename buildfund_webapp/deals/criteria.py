@@ -0,0 +1,256 @@
+"""Compiled stage entry/exit criteria for the deal workflow engine.
+
+Stage criteria are free-text strings in ``workflow_templates`` and
+``provider_workflow_templates`` (and copied onto ``DealStage`` rows).  Rather
+than re-parsing each string and issuing a query per criterion, every string is
+compiled once into a typed predicate.  Predicates are evaluated against a
+``DealState`` that is loaded for a deal (or a whole queryset of deals) in a
+single prefetch pass.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db.models import Prefetch, QuerySet
+
+from .models import Deal, DealCP, DealParty, DealProviderSelection, DealStage, ProviderDeliverable
+from .provider_workflow_templates import PROVIDER_STAGE_TEMPLATES
+from .workflow_templates import STAGE_TEMPLATES
+
+SATISFIED_CP_STATUSES = ('satisfied', 'approved')
+
+
+# ============================================================================
+# Deal state
+# ============================================================================
+
+class DealState:
+    """In-memory view of the deal rows that stage criteria depend on."""
+
+    def __init__(self, deal: Deal):
+        self.deal = deal
+        self.facility_type = deal.facility_type
+        self.stages: Dict[int, DealStage] = {stage.stage_number: stage for stage in deal.stages.all()}
+        self.active_parties: Set[Tuple[str, str, bool]] = {
+            (party.party_type, party.acting_for_party, party.is_active_lender_solicitor)
+            for party in deal.parties.all()
+            if party.appointment_status == 'active'
+        }
+        mandatory_cps = [cp for cp in deal.conditions_precedent.all() if cp.is_mandatory]
+        self.mandatory_cps_total = len(mandatory_cps)
+        self.mandatory_cps_satisfied = sum(1 for cp in mandatory_cps if cp.status in SATISFIED_CP_STATUSES)
+        self.approved_deliverables: Set[Tuple[str, str]] = {
+            (deliverable.role_type, deliverable.deliverable_type)
+            for deliverable in deal.provider_deliverables.all()
+            if deliverable.status == 'approved'
+        }
+        self.selected_roles: Set[str] = {selection.role_type for selection in deal.provider_selections.all()}
+
+    @staticmethod
+    def prefetch(queryset: QuerySet) -> QuerySet:
+        """Attach the prefetches ``DealState`` needs to a Deal queryset."""
+        return queryset.prefetch_related(
+            'stages',
+            Prefetch('parties', queryset=DealParty.objects.only(
+                'id', 'deal_id', 'party_type', 'acting_for_party', 'appointment_status', 'is_active_lender_solicitor',
+            )),
+            Prefetch('conditions_precedent', queryset=DealCP.objects.only('id', 'deal_id', 'is_mandatory', 'status')),
+            Prefetch('provider_deliverables', queryset=ProviderDeliverable.objects.only(
+                'id', 'deal_id', 'role_type', 'deliverable_type', 'status',
+            )),
+            Prefetch('provider_selections', queryset=DealProviderSelection.objects.only('id', 'deal_id', 'role_type')),
+        )
+
+    @classmethod
+    def load(cls, deal: Deal) -> 'DealState':
+        """Load the state for a single deal in one prefetch pass."""
+        return cls(cls.prefetch(Deal.objects.filter(pk=deal.pk)).get())
+
+    @property
+    def current_stage(self) -> Optional[DealStage]:
+        """Return the prefetched instance of the deal's current stage."""
+        for stage in self.stages.values():
+            if stage.pk == self.deal.current_stage_id:
+                return stage
+        return None
+
+    def stage_completed(self, stage_number: int) -> bool:
+        stage = self.stages.get(stage_number)
+        return stage is not None and stage.status == 'completed'
+
+    def mark_stage_completed(self, stage_number: int) -> None:
+        """Reflect a stage completed during the current transition."""
+        stage = self.stages.get(stage_number)
+        if stage is not None:
+            stage.status = 'completed'
+
+    @property
+    def all_mandatory_cps_satisfied(self) -> bool:
+        return self.mandatory_cps_total > 0 and self.mandatory_cps_satisfied == self.mandatory_cps_total
+
+
+# ============================================================================
+# Predicates
+# ============================================================================
+
+class Criterion:
+    """A compiled stage criterion."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def evaluate(self, state: DealState) -> bool:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.text!r})"
+
+
+class AlwaysMet(Criterion):
+    """Criterion with no automated check; treated as met."""
+
+    def evaluate(self, state: DealState) -> bool:
+        return True
+
+
+class StageCompleted(Criterion):
+    """A numbered deal stage has been completed."""
+
+    def __init__(self, text: str, stage_number: int):
+        super().__init__(text)
+        self.stage_number = stage_number
+
+    def evaluate(self, state: DealState) -> bool:
+        return state.stage_completed(self.stage_number)
+
+
+class MandatoryCPsSatisfied(Criterion):
+    """All mandatory CPs are satisfied; optionally requires the legals stage to exist."""
+
+    def __init__(self, text: str, requires_legal_stage: bool = False):
+        super().__init__(text)
+        self.requires_legal_stage = requires_legal_stage
+
+    def evaluate(self, state: DealState) -> bool:
+        if self.requires_legal_stage and 6 not in state.stages:
+            return False
+        return state.all_mandatory_cps_satisfied
+
+
+class PartyAppointed(Criterion):
+    """An active party of the given type is appointed."""
+
+    def __init__(self, text: str, party_type: str, lender_solicitor: bool = False):
+        super().__init__(text)
+        self.party_type = party_type
+        self.lender_solicitor = lender_solicitor
+
+    def evaluate(self, state: DealState) -> bool:
+        for party_type, acting_for_party, is_active_lender_solicitor in state.active_parties:
+            if party_type != self.party_type:
+                continue
+            if self.lender_solicitor and not (acting_for_party == 'lender' and is_active_lender_solicitor):
+                continue
+            return True
+        return False
+
+
+class DeliverableApproved(Criterion):
+    """A provider deliverable of the given role and type has been approved."""
+
+    def __init__(self, text: str, role_type: str, deliverable_type: str):
+        super().__init__(text)
+        self.role_type = role_type
+        self.deliverable_type = deliverable_type
+
+    def evaluate(self, state: DealState) -> bool:
+        return (self.role_type, self.deliverable_type) in state.approved_deliverables
+
+
+class ProviderSelected(Criterion):
+    """A provider has been selected for the role."""
+
+    def __init__(self, text: str, role_type: str):
+        super().__init__(text)
+        self.role_type = role_type
+
+    def evaluate(self, state: DealState) -> bool:
+        return self.role_type in state.selected_roles
+
+
+# ============================================================================
+# Compiler
+# ============================================================================
+
+_STAGE_KEYWORDS: List[Tuple[Tuple[str, ...], int]] = [
+    (('kick-off',), 1),
+    (('kyc', 'aml'), 2),
+    (('due diligence',), 3),
+    (('third-party', 'reports'), 4),
+    (('offer', 'facility letter'), 5),
+]
+
+
+@lru_cache(maxsize=None)
+def compile_criterion(text: str) -> Criterion:
+    """
+    Compile a free-text criterion into a predicate.
+
+    Keyword rules are applied in the same order the workflow engine has
+    always used, so existing templates keep their meaning.
+    """
+    lower = text.lower()
+
+    # Stage completions
+    if 'stage' in lower or 'completed' in lower:
+        for keywords, stage_number in _STAGE_KEYWORDS:
+            if any(keyword in lower for keyword in keywords):
+                return StageCompleted(text, stage_number)
+        if 'mandatory cps' in lower or 'legals' in lower:
+            return MandatoryCPsSatisfied(text, requires_legal_stage=True)
+
+    # Party appointments
+    if 'solicitor appointed' in lower:
+        return PartyAppointed(text, 'solicitor', lender_solicitor=True)
+    if 'valuer appointed' in lower:
+        return PartyAppointed(text, 'valuer')
+    if 'ims' in lower or 'monitoring surveyor' in lower:
+        return PartyAppointed(text, 'monitoring_surveyor')
+
+    # Provider deliverables
+    if 'valuation' in lower and ('final' in lower or 'issued' in lower or 'approved' in lower):
+        return DeliverableApproved(text, 'valuer', 'valuation_report')
+    if 'legal' in lower and 'cp' in lower and ('satisfied' in lower or 'ready' in lower):
+        return MandatoryCPsSatisfied(text)
+    if 'drawdown' in lower and 'certificate' in lower:
+        # Certificates are checked per drawdown; at deal level the IMS must be selected
+        return ProviderSelected(text, 'monitoring_surveyor')
+
+    return AlwaysMet(text)
+
+
+def _template_criteria() -> Iterable[str]:
+    for templates in (STAGE_TEMPLATES, PROVIDER_STAGE_TEMPLATES):
+        for stages in templates.values():
+            for stage in stages:
+                yield from stage.get('entry_criteria', [])
+                yield from stage.get('exit_criteria', [])
+
+
+# Compile every template criterion once at import time
+COMPILED_CRITERIA: Dict[str, Criterion] = {text: compile_criterion(text) for text in _template_criteria()}
+
+
+def evaluate_criteria(criteria: Iterable[str], state: DealState) -> Tuple[bool, List[str]]:
+    """Evaluate criteria strings against a deal state; returns (all met, unmet criteria)."""
+    unmet = [text for text in criteria if not compile_criterion(text).evaluate(state)]
+    return len(unmet) == 0, unmet
+
+
+def get_next_stage(state: DealState) -> Optional[DealStage]:
+    """Return the stage after the deal's current stage, if any."""
+    current = state.current_stage
+    if current is None:
+        return None
+    return state.stages.get(current.stage_number + 1)
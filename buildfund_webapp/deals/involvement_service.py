@@ -0,0 +1,117 @@
+"""Service for resolving a consultant's involvement across a set of deals.
+
+The consultant "my deals" view needs to know, for every deal on the page,
+how the consultant is involved (party, enquiry, quote, selection) along with
+their role type, party details and enquiry status.  Rather than querying
+each relationship per deal, this service loads each relationship once for
+the whole deal set and folds the rows into per-deal dictionaries, so the
+number of queries stays fixed regardless of how many deals are resolved.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable
+
+from django.db.models import Exists, OuterRef
+
+from .models import DealParty, DealProviderSelection, ProviderEnquiry, ProviderQuote
+
+
+class ConsultantInvolvementService:
+    """Resolve consultant involvement for many deals in a fixed number of queries."""
+
+    @staticmethod
+    def empty_involvement() -> Dict[str, Any]:
+        """Return the involvement dictionary for a deal with no matching rows."""
+        return {
+            'via_party': False,
+            'via_enquiry': False,
+            'via_quote': False,
+            'via_selection': False,
+        }
+
+    @staticmethod
+    def resolve(consultant_profile, deal_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Resolve involvement details for each deal id.
+
+        Returns a mapping of deal primary key to::
+
+            {
+                'involvement': {...},  # flags plus party/enquiry details
+                'role_type': str | None,
+            }
+
+        Three queries are issued in total (parties, enquiries with a quote
+        EXISTS annotation, selections), independent of the number of deals.
+        """
+        deal_ids = list(deal_ids)
+        resolved: Dict[int, Dict[str, Any]] = {
+            deal_id: {
+                'involvement': ConsultantInvolvementService.empty_involvement(),
+                'role_type': None,
+            }
+            for deal_id in deal_ids
+        }
+        if not deal_ids:
+            return resolved
+
+        # Parties: the first party row (by pk) supplies the party details,
+        # while any active row sets the via_party flag.
+        first_party: Dict[int, Dict[str, Any]] = {}
+        parties = DealParty.objects.filter(
+            deal_id__in=deal_ids,
+            consultant_profile=consultant_profile,
+        ).order_by('pk').values('deal_id', 'party_type', 'acting_for_party', 'appointment_status')
+        for party in parties:
+            deal_id = party['deal_id']
+            first_party.setdefault(deal_id, party)
+            if party['appointment_status'] == 'active':
+                resolved[deal_id]['involvement']['via_party'] = True
+
+        # Enquiries: most recently sent enquiry supplies status/role, and the
+        # quote EXISTS subquery drives the via_quote flag.
+        first_enquiry: Dict[int, Dict[str, Any]] = {}
+        enquiries = ProviderEnquiry.objects.filter(
+            deal_id__in=deal_ids,
+            provider_firm=consultant_profile,
+        ).annotate(
+            has_quote=Exists(ProviderQuote.objects.filter(enquiry=OuterRef('pk')))
+        ).order_by('-sent_at', '-pk').values('deal_id', 'status', 'role_type', 'has_quote')
+        for enquiry in enquiries:
+            deal_id = enquiry['deal_id']
+            involvement = resolved[deal_id]['involvement']
+            involvement['via_enquiry'] = True
+            if enquiry['has_quote']:
+                involvement['via_quote'] = True
+            first_enquiry.setdefault(deal_id, enquiry)
+
+        # Selections: one per (deal, role_type); lowest role_type wins to
+        # match the model's default ordering.
+        first_selection: Dict[int, str] = {}
+        selections = DealProviderSelection.objects.filter(
+            deal_id__in=deal_ids,
+            provider_firm=consultant_profile,
+        ).order_by('deal_id', 'role_type').values_list('deal_id', 'role_type')
+        for deal_id, role_type in selections:
+            resolved[deal_id]['involvement']['via_selection'] = True
+            first_selection.setdefault(deal_id, role_type)
+
+        for deal_id, entry in resolved.items():
+            involvement = entry['involvement']
+            role_type = first_selection.get(deal_id)
+
+            party = first_party.get(deal_id)
+            if party:
+                role_type = role_type or party['party_type']
+                involvement['party_type'] = party['party_type']
+                involvement['acting_for_party'] = party['acting_for_party']
+                involvement['appointment_status'] = party['appointment_status']
+
+            enquiry = first_enquiry.get(deal_id)
+            if enquiry:
+                involvement['enquiry_status'] = enquiry['status']
+                involvement['enquiry_role_type'] = enquiry['role_type']
+
+            entry['role_type'] = role_type
+
+        return resolved
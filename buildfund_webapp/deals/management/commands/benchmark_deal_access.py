@@ -0,0 +1,156 @@
+"""Benchmark consultant deal scoping: legacy multi-join query vs the DealAccess index."""
+from __future__ import annotations
+
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from deals.access_service import DealAccessService
+from deals.models import Deal, DealParty, DealProviderSelection, ProviderEnquiry, ProviderQuote
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic deals inside a rolled-back transaction and compare the legacy "
+        "consultant visibility query with the DealAccess index lookup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deals', type=int, default=10000, help='Number of synthetic deals (default: 10000).')
+        parser.add_argument('--consultants', type=int, default=50, help='Number of synthetic consultants (default: 50).')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query (default: 20).')
+        parser.add_argument('--explain', action='store_true', help='Print query plans for both queries.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                consultants = self._seed(options['deals'], options['consultants'])
+                self._run(consultants, options['repeat'], options['explain'])
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Synthetic data rolled back.")
+
+    def _seed(self, n_deals, n_consultants):
+        from applications.models import Application
+        from borrowers.models import BorrowerProfile
+        from consultants.models import ConsultantProfile
+        from lenders.models import LenderProfile
+        from products.models import Product
+        from projects.models import Project
+
+        User = get_user_model()
+        rng = random.Random(42)
+        started = time.perf_counter()
+
+        lender_user = User.objects.create(username='bench-deal-access-lender')
+        lender = LenderProfile.objects.create(user=lender_user, organisation_name='Bench Lender', contact_email='lender@bench.invalid')
+        borrower_user = User.objects.create(username='bench-deal-access-borrower')
+        borrower = BorrowerProfile.objects.create(user=borrower_user, company_name='Bench Borrower')
+        product = Product.objects.create(
+            lender=lender, name='Bench Product', funding_type='development_finance',
+            property_type='residential', min_loan_amount=1, max_loan_amount=10 ** 8,
+            interest_rate_min=1, interest_rate_max=10, term_min_months=1, term_max_months=36,
+            repayment_structure='interest_only',
+        )
+
+        consultants = []
+        for i in range(n_consultants):
+            user = User.objects.create(username=f'bench-deal-access-consultant-{i}')
+            consultants.append(ConsultantProfile.objects.create(
+                user=user, organisation_name=f'Bench Consultant {i}',
+                primary_service='solicitor', contact_email=f'c{i}@bench.invalid',
+            ))
+
+        projects = Project.objects.bulk_create([
+            Project(
+                borrower=borrower, address='1 Bench Street', town='Bench', county='Bench', postcode='BE1 1NC',
+                loan_amount_required=1000000, funding_type='development_finance', property_type='residential',
+                development_extent='new_build', tenure='freehold', repayment_method='sale',
+            )
+            for _ in range(n_deals)
+        ], batch_size=1000)
+        applications = Application.objects.bulk_create([
+            Application(project=project, lender=lender, product=product, proposed_loan_amount=1000000, proposed_term_months=12)
+            for project in projects
+        ], batch_size=1000)
+        deals = Deal.objects.bulk_create([
+            Deal(
+                application=application, deal_id=f'BENCH-{i:06d}', lender=lender,
+                borrower_company=borrower, facility_type='development',
+            )
+            for i, application in enumerate(applications)
+        ], batch_size=1000)
+
+        # Each consultant touches a few deals through each relationship type
+        parties, enquiries, selections = [], [], []
+        for consultant in consultants:
+            for deal in rng.sample(deals, min(len(deals), 20)):
+                parties.append(DealParty(
+                    deal=deal, consultant_profile=consultant, party_type='solicitor',
+                    appointment_status='active',
+                ))
+            for deal in rng.sample(deals, min(len(deals), 40)):
+                enquiries.append(ProviderEnquiry(deal=deal, provider_firm=consultant, role_type='solicitor'))
+            for deal in rng.sample(deals, min(len(deals), 10)):
+                selections.append(DealProviderSelection(deal=deal, provider_firm=consultant, role_type='solicitor'))
+        DealParty.objects.bulk_create(parties, batch_size=1000)
+        enquiries = ProviderEnquiry.objects.bulk_create(enquiries, batch_size=1000)
+        ProviderQuote.objects.bulk_create([
+            ProviderQuote(enquiry=enquiry, role_type=enquiry.role_type, price_gbp=1000, lead_time_days=10)
+            for enquiry in enquiries[::2]
+        ], batch_size=1000)
+        DealProviderSelection.objects.bulk_create(selections, batch_size=1000, ignore_conflicts=True)
+
+        rows = DealAccessService.rebuild()
+        self.stdout.write(
+            f"Seeded {n_deals} deals, {n_consultants} consultants and {rows} index rows "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return consultants
+
+    def _run(self, consultants, repeat, explain):
+        def legacy(consultant):
+            # The pre-index DealViewSet consultant query: four joins OR-ed together with DISTINCT
+            return (
+                Deal.objects.filter(parties__consultant_profile=consultant, parties__appointment_status='active') |
+                Deal.objects.filter(provider_enquiries__provider_firm=consultant) |
+                Deal.objects.filter(
+                    provider_enquiries__provider_firm=consultant, provider_enquiries__quotes__isnull=False
+                ) |
+                Deal.objects.filter(provider_selections__provider_firm=consultant)
+            ).distinct()
+
+        def indexed(consultant):
+            return Deal.objects.filter(access_entries__user_id=consultant.user_id)
+
+        sample = consultants[0]
+        legacy_ids = set(legacy(sample).values_list('id', flat=True))
+        indexed_ids = set(indexed(sample).values_list('id', flat=True))
+        if legacy_ids != indexed_ids:
+            self.stdout.write(self.style.ERROR(
+                f"Result mismatch: legacy={len(legacy_ids)} indexed={len(indexed_ids)}"
+            ))
+
+        for label, build in (('legacy', legacy), ('indexed', indexed)):
+            if explain:
+                self.stdout.write(f"--- {label} plan ---")
+                self.stdout.write(build(sample).explain())
+            timings = []
+            for i in range(repeat):
+                consultant = consultants[i % len(consultants)]
+                started = time.perf_counter()
+                list(build(consultant).values_list('id', flat=True))
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f"{label:8s} median={timings[len(timings) // 2]:.2f}ms "
+                f"p95={timings[int(len(timings) * 0.95) - 1 if len(timings) > 1 else 0]:.2f}ms "
+                f"rows={len(legacy_ids if label == 'legacy' else indexed_ids)}"
+            )
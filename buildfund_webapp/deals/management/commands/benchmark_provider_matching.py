@@ -0,0 +1,131 @@
+"""Benchmark provider matching: per-object scoring vs the capability index."""
+from __future__ import annotations
+
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from consultants.models import ConsultantProfile
+from deals.provider_matching_service import (
+    ROLE_TO_SERVICE_TYPES, ProviderCapabilityIndex, provider_profile_score,
+)
+
+COUNTIES = [
+    'Greater London', 'Kent', 'Surrey', 'Essex', 'Hampshire', 'West Midlands', 'Greater Manchester',
+    'Merseyside', 'West Yorkshire', 'Bristol', 'Devon', 'Norfolk', 'Suffolk', 'Oxfordshire', 'Cheshire',
+]
+QUALIFICATIONS = ['rics', 'rics_monitoring', 'rics_valuation', 'sra', 'cilex']
+
+
+class _Rollback(Exception):
+    """Raised to discard the synthetic benchmark data."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic consultants inside a rolled-back transaction and compare per-object "
+        "provider scoring with the capability index (single deal and many deals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--providers', type=int, default=5000, help='Synthetic consultants (default: 5000).')
+        parser.add_argument('--deals', type=int, default=200, help='Deals scored in the bulk run (default: 200).')
+        parser.add_argument('--limit', type=int, default=10, help='Top-k per deal (default: 10).')
+        parser.add_argument('--role', default='valuer', choices=sorted(ROLE_TO_SERVICE_TYPES))
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options['providers'])
+                self._run(options['role'], options['deals'], options['limit'])
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Synthetic data rolled back.")
+
+    def _seed(self, n_providers):
+        User = get_user_model()
+        rng = random.Random(7)
+        started = time.perf_counter()
+        users = User.objects.bulk_create([
+            User(username=f'bench-matching-{i}') for i in range(n_providers)
+        ], batch_size=1000)
+        services = [key for key, _ in ConsultantProfile.SERVICE_TYPES]
+        ConsultantProfile.objects.bulk_create([
+            ConsultantProfile(
+                user=user,
+                organisation_name=f'Bench Provider {i}',
+                contact_email=f'p{i}@bench.invalid',
+                primary_service=rng.choice(services),
+                services_offered=rng.sample(services, rng.randint(1, 2)),
+                geographic_coverage=[] if rng.random() < 0.1 else rng.sample(COUNTIES, rng.randint(1, 4)),
+                qualifications=rng.sample(QUALIFICATIONS, rng.randint(0, 2)),
+                years_of_experience=rng.choice([None, 1, 3, 5, 12]),
+                current_capacity=rng.randint(0, 20),
+                max_capacity=20,
+                is_active=True,
+                is_verified=True,
+            )
+            for i, user in enumerate(users)
+        ], batch_size=1000)
+        self.stdout.write(f"Seeded {n_providers} providers in {time.perf_counter() - started:.1f}s")
+
+    @staticmethod
+    def _legacy_top_k(role, location, limit):
+        """Load every profile, filter and score each in Python, then sort."""
+        service_types = ROLE_TO_SERVICE_TYPES[role]
+        scored = []
+        for provider in ConsultantProfile.objects.filter(is_active=True, is_verified=True):
+            if not any(st in (provider.services_offered or []) for st in service_types):
+                continue
+            coverage = provider.geographic_coverage or []
+            if location and coverage and location not in coverage:
+                continue
+            if not provider.has_capacity():
+                continue
+            score = provider_profile_score(
+                role, provider.services_offered, provider.qualifications, provider.years_of_experience,
+                provider.current_capacity, provider.max_capacity,
+            )
+            if location:
+                score += 20.0 if location in coverage else 15.0
+            scored.append((min(100.0, score), -provider.id))
+        scored.sort(reverse=True)
+        return [(-neg_id, score) for score, neg_id in scored[:limit]]
+
+    def _run(self, role, n_deals, limit):
+        rng = random.Random(11)
+        locations = [rng.choice(COUNTIES) for _ in range(n_deals)]
+
+        started = time.perf_counter()
+        index = ProviderCapabilityIndex.build()
+        build_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"Index build: {build_ms:.1f}ms for {len(index)} providers")
+
+        # Single deal
+        started = time.perf_counter()
+        legacy = self._legacy_top_k(role, locations[0], limit)
+        legacy_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        indexed = [(index.ids[pos], score) for pos, score in index.top_k(role, locations[0], limit)]
+        indexed_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"single deal  legacy={legacy_ms:.1f}ms indexed={indexed_ms:.2f}ms")
+        if [pid for pid, _ in legacy] != [pid for pid, _ in indexed]:
+            self.stdout.write(self.style.ERROR("Top-k mismatch between legacy and indexed scoring"))
+
+        # Many deals (lender dashboard): legacy sampled, indexed run in full
+        sample = min(n_deals, 10)
+        started = time.perf_counter()
+        for location in locations[:sample]:
+            self._legacy_top_k(role, location, limit)
+        legacy_per_deal = (time.perf_counter() - started) * 1000 / sample
+        started = time.perf_counter()
+        for location in locations:
+            index.top_k(role, location, limit)
+        indexed_total = (time.perf_counter() - started) * 1000
+        self.stdout.write(
+            f"{n_deals} deals  legacy~={legacy_per_deal * n_deals:.0f}ms (extrapolated from {sample}) "
+            f"indexed={indexed_total:.1f}ms"
+        )
@@ -0,0 +1,42 @@
+"""Rebuild or verify the DealAccess index from its source tables."""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from deals.access_service import DealAccessService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DealAccess index, or verify it against parties, enquiries, quotes and selections."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only report differences between the index and source tables; do not write.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert when rebuilding (default: 1000).',
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            report = DealAccessService.verify()
+            problems = sum(len(keys) for keys in report.values())
+            for label, keys in report.items():
+                self.stdout.write(f"{label}: {len(keys)}")
+                for deal_id, user_id in keys[:20]:
+                    self.stdout.write(f"  deal={deal_id} user={user_id}")
+            if problems:
+                self.stdout.write(self.style.WARNING(
+                    f"DealAccess index has {problems} discrepancies; run without --verify to rebuild."
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS("DealAccess index is consistent."))
+            return
+
+        count = DealAccessService.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt DealAccess index with {count} rows."))
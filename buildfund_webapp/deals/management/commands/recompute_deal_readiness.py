@@ -0,0 +1,49 @@
+"""Recompute completion readiness counters and scores for all deals in batches."""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from deals.models import Deal
+from deals.readiness_service import ReadinessService
+
+
+class Command(BaseCommand):
+    help = "Rebuild DealReadiness counters and stored readiness scores from source rows, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Deals per batch (default: 500).',
+        )
+        parser.add_argument(
+            '--deal',
+            action='append',
+            dest='deal_ids',
+            help='Deal reference (e.g. DEAL-001) to recompute; may be repeated. Defaults to all deals.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        deals = Deal.objects.order_by('pk')
+        if options['deal_ids']:
+            deals = deals.filter(deal_id__in=options['deal_ids'])
+
+        started = time.perf_counter()
+        total = 0
+        last_pk = 0
+        # Keyset batching keeps each batch query cheap on large tables
+        while True:
+            batch = list(deals.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            total += ReadinessService.recompute(batch)
+            last_pk = batch[-1]
+            self.stdout.write(f"Recomputed {total} deals...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed readiness for {total} deals in {time.perf_counter() - started:.1f}s."
+        ))
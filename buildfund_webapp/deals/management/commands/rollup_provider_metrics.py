@@ -0,0 +1,72 @@
+"""Precompute rolling PerformanceMetric rollups for every provider firm.
+
+Intended to run on a schedule (e.g. a daily cron entry)::
+
+    python manage.py rollup_provider_metrics
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from consultants.models import ConsultantProfile
+from deals.provider_metrics_service import ROLLUP_WINDOWS, ProviderMetricsService
+
+
+class Command(BaseCommand):
+    help = "Upsert rolling 30/90/365-day provider PerformanceMetric rollups for all provider firms, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Provider firms per chunk (default: 200).',
+        )
+        parser.add_argument(
+            '--window',
+            action='append',
+            type=int,
+            dest='windows',
+            help=f'Window length in days; may be repeated. Defaults to {", ".join(map(str, ROLLUP_WINDOWS))}.',
+        )
+        parser.add_argument(
+            '--provider',
+            action='append',
+            type=int,
+            dest='provider_ids',
+            help='ConsultantProfile id to roll up; may be repeated. Defaults to all provider firms.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        windows = tuple(options['windows'] or ROLLUP_WINDOWS)
+        firms = ConsultantProfile.objects.order_by('pk')
+        if options['provider_ids']:
+            firms = firms.filter(pk__in=options['provider_ids'])
+
+        started = time.perf_counter()
+        run_started_at = timezone.now()
+        firm_count = 0
+        row_count = 0
+        last_pk = 0
+        # Keyset batching keeps each chunk query cheap on large tables
+        while True:
+            chunk = list(firms.filter(pk__gt=last_pk).values_list('pk', flat=True)[:chunk_size])
+            if not chunk:
+                break
+            row_count += ProviderMetricsService.rollup_performance_metrics(chunk, windows, now=run_started_at)
+            firm_count += len(chunk)
+            last_pk = chunk[-1]
+            self.stdout.write(f"Rolled up {firm_count} provider firms...")
+
+        pruned = ProviderMetricsService.prune_rollups(
+            run_started_at, windows, provider_firm_ids=options['provider_ids']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {row_count} rollup rows for {firm_count} provider firms "
+            f"({pruned} stale rows removed) in {time.perf_counter() - started:.1f}s."
+        ))
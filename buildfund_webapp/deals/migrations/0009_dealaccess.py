@@ -0,0 +1,91 @@
+# Generated by Django 4.2.30 on 2026-10-16 19:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_deal_access(apps, schema_editor):
+    """Backfill the DealAccess index from existing parties, enquiries, quotes and selections."""
+    DealAccess = apps.get_model('deals', 'DealAccess')
+    DealParty = apps.get_model('deals', 'DealParty')
+    ProviderEnquiry = apps.get_model('deals', 'ProviderEnquiry')
+    ProviderQuote = apps.get_model('deals', 'ProviderQuote')
+    DealProviderSelection = apps.get_model('deals', 'DealProviderSelection')
+    ConsultantProfile = apps.get_model('consultants', 'ConsultantProfile')
+
+    expected = {}
+
+    def add(rows, bit):
+        for deal_id, user_id in rows:
+            if deal_id and user_id:
+                expected[(deal_id, user_id)] = expected.get((deal_id, user_id), 0) | bit
+
+    active_parties = DealParty.objects.filter(appointment_status='active')
+    add(active_parties.filter(user__isnull=False).values_list('deal_id', 'user_id'), 1)
+    add(active_parties.filter(consultant_profile__isnull=False).values_list('deal_id', 'consultant_profile__user_id'), 1)
+    add(ProviderEnquiry.objects.values_list('deal_id', 'provider_firm__user_id'), 2)
+    add(ProviderQuote.objects.values_list('enquiry__deal_id', 'enquiry__provider_firm__user_id'), 4)
+    add(DealProviderSelection.objects.values_list('deal_id', 'provider_firm__user_id'), 8)
+
+    profile_by_user = dict(ConsultantProfile.objects.values_list('user_id', 'id'))
+    DealAccess.objects.bulk_create(
+        [
+            DealAccess(
+                deal_id=deal_id,
+                user_id=user_id,
+                consultant_profile_id=profile_by_user.get(user_id),
+                reasons=reasons,
+            )
+            for (deal_id, user_id), reasons in expected.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('consultants', '0001_initial'),
+        ('deals', '0008_add_provider_metrics_to_performance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DealAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reasons', models.PositiveIntegerField(default=0, help_text='Bitmask of access reasons (party, enquiry, quote, selection)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Deal Access',
+                'verbose_name_plural': 'Deal Access Entries',
+            },
+        ),
+        migrations.AddField(
+            model_name='dealaccess',
+            name='consultant_profile',
+            field=models.ForeignKey(blank=True, help_text='Consultant profile of the user, if any', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deal_access_entries', to='consultants.consultantprofile'),
+        ),
+        migrations.AddField(
+            model_name='dealaccess',
+            name='deal',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_entries', to='deals.deal'),
+        ),
+        migrations.AddField(
+            model_name='dealaccess',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deal_access_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='dealaccess',
+            index=models.Index(fields=['consultant_profile', 'deal'], name='deals_deala_consult_ce6fe8_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dealaccess',
+            unique_together={('user', 'deal')},
+        ),
+        migrations.RunPython(populate_deal_access, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-16 19:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0009_dealaccess'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DealReadiness',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mandatory_cps_total', models.PositiveIntegerField(default=0)),
+                ('mandatory_cps_satisfied', models.PositiveIntegerField(default=0)),
+                ('mandatory_cps_cleared', models.PositiveIntegerField(default=0, help_text='Mandatory CPs that are satisfied or approved')),
+                ('critical_tasks_total', models.PositiveIntegerField(default=0)),
+                ('critical_tasks_completed', models.PositiveIntegerField(default=0)),
+                ('legal_tasks_total', models.PositiveIntegerField(default=0)),
+                ('legal_tasks_completed', models.PositiveIntegerField(default=0)),
+                ('kyc_stages_total', models.PositiveIntegerField(default=0)),
+                ('kyc_stages_completed', models.PositiveIntegerField(default=0)),
+                ('valuer_selections', models.PositiveIntegerField(default=0)),
+                ('valuation_reports_approved', models.PositiveIntegerField(default=0)),
+                ('ims_selections', models.PositiveIntegerField(default=0)),
+                ('ims_initial_reports_approved', models.PositiveIntegerField(default=0)),
+                ('lender_solicitor_selections', models.PositiveIntegerField(default=0)),
+                ('open_requisitions', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='readiness', to='deals.deal')),
+            ],
+            options={
+                'verbose_name': 'Deal Readiness',
+                'verbose_name_plural': 'Deal Readiness Counters',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-16 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0010_dealreadiness'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performancemetric',
+            name='rollup_key',
+            field=models.CharField(blank=True, help_text='Upsert key for precomputed rollups (firm, role, metric, window)', max_length=100, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='performancemetric',
+            name='window_days',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Rolling window length for precomputed rollups; empty for ad-hoc periods', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='performancemetric',
+            index=models.Index(fields=['provider_firm', 'window_days'], name='deals_perfo_provide_434ed9_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-16 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0011_performancemetric_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dealdecision',
+            index=models.Index(fields=['deal', '-created_at'], name='deals_deald_deal_id_3c4178_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dealtask',
+            index=models.Index(fields=['deal', '-created_at'], name='deals_dealt_deal_id_d17148_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0012_timeline_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performancemetric',
+            index=models.Index(fields=['provider_firm', 'role_type', 'metric_type', '-period_end'], name='deals_perfo_provide_88ba5c_idx'),
+        ),
+    ]
@@ -378,6 +378,7 @@ class DealTask(models.Model):
             models.Index(fields=['deal', 'status']),
             models.Index(fields=['assignee_user', 'status']),
             models.Index(fields=['due_date']),
+            models.Index(fields=['deal', '-created_at']),
         ]
     
     def __str__(self) -> str:
@@ -870,6 +871,9 @@ class DealDecision(models.Model):
     
     class Meta:
         ordering = ['deal', '-created_at']
+        indexes = [
+            models.Index(fields=['deal', '-created_at']),
+        ]
     
     def __str__(self) -> str:
         return f"{self.decision_type} - {self.deal}"
@@ -1112,6 +1116,20 @@ class PerformanceMetric(models.Model):
     period_start = models.DateField()
     period_end = models.DateField()
     
+    # Rolling rollups (precomputed by the rollup_provider_metrics command)
+    window_days = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Rolling window length for precomputed rollups; empty for ad-hoc periods"
+    )
+    rollup_key = models.CharField(
+        max_length=100,
+        null=True,
+        blank=True,
+        unique=True,
+        help_text="Upsert key for precomputed rollups (firm, role, metric, window)"
+    )
+    
     calculated_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -1119,6 +1137,7 @@ class PerformanceMetric(models.Model):
         indexes = [
             models.Index(fields=['law_firm', 'metric_type', '-period_end']),
             models.Index(fields=['provider_firm', 'role_type', 'metric_type', '-period_end']),
+            models.Index(fields=['provider_firm', 'window_days']),
         ]
     
     def __str__(self) -> str:
@@ -1597,3 +1616,130 @@ class ProviderAppointment(models.Model):
     
     def __str__(self) -> str:
         return f"Appointment: {self.get_role_type_display()} for {self.deal} - {self.get_status_display()}"
+
+
+# ============================================================================
+# Access Index
+# ============================================================================
+
+class DealAccess(models.Model):
+    """
+    Denormalized index of which users can see which deals, and why.
+    
+    Consultant visibility is derived from four relationships (active party,
+    enquiry, quote, provider selection).  Resolving those with joins on every
+    request is expensive, so this table keeps one row per (user, deal) with a
+    bitmask of access reasons.  It is maintained by signals in
+    ``deals.signals`` and can be rebuilt with ``manage.py rebuild_deal_access``.
+    """
+    
+    REASON_PARTY = 1
+    REASON_ENQUIRY = 2
+    REASON_QUOTE = 4
+    REASON_SELECTION = 8
+    
+    REASON_LABELS = {
+        REASON_PARTY: 'party',
+        REASON_ENQUIRY: 'enquiry',
+        REASON_QUOTE: 'quote',
+        REASON_SELECTION: 'selection',
+    }
+    
+    deal = models.ForeignKey(
+        Deal,
+        related_name="access_entries",
+        on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="deal_access_entries",
+        on_delete=models.CASCADE
+    )
+    consultant_profile = models.ForeignKey(
+        "consultants.ConsultantProfile",
+        related_name="deal_access_entries",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        help_text="Consultant profile of the user, if any"
+    )
+    reasons = models.PositiveIntegerField(
+        default=0,
+        help_text="Bitmask of access reasons (party, enquiry, quote, selection)"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Deal Access"
+        verbose_name_plural = "Deal Access Entries"
+        unique_together = [('user', 'deal')]
+        indexes = [
+            models.Index(fields=['consultant_profile', 'deal']),
+        ]
+    
+    def __str__(self) -> str:
+        return f"Access: user {self.user_id} on {self.deal_id} ({', '.join(self.reason_labels)})"
+    
+    @property
+    def reason_labels(self) -> list[str]:
+        """Return the human-readable access reasons set in the bitmask."""
+        return [label for bit, label in self.REASON_LABELS.items() if self.reasons & bit]
+
+
+# ============================================================================
+# Completion Readiness Counters
+# ============================================================================
+
+class DealReadiness(models.Model):
+    """
+    Per-deal counters behind the completion readiness score.
+    
+    Each field counts the rows of one readiness component (mandatory CPs,
+    critical tasks, provider selections and deliverables, open requisitions).
+    Signals in ``deals.signals`` apply deltas as source rows change, so the
+    score can be derived without querying the source tables.  Counters can be
+    rebuilt with ``manage.py recompute_deal_readiness``.
+    """
+    
+    deal = models.OneToOneField(
+        Deal,
+        related_name="readiness",
+        on_delete=models.CASCADE
+    )
+    
+    # Conditions precedent
+    mandatory_cps_total = models.PositiveIntegerField(default=0)
+    mandatory_cps_satisfied = models.PositiveIntegerField(default=0)
+    mandatory_cps_cleared = models.PositiveIntegerField(
+        default=0,
+        help_text="Mandatory CPs that are satisfied or approved"
+    )
+    
+    # Tasks
+    critical_tasks_total = models.PositiveIntegerField(default=0)
+    critical_tasks_completed = models.PositiveIntegerField(default=0)
+    legal_tasks_total = models.PositiveIntegerField(default=0)
+    legal_tasks_completed = models.PositiveIntegerField(default=0)
+    
+    # Stages
+    kyc_stages_total = models.PositiveIntegerField(default=0)
+    kyc_stages_completed = models.PositiveIntegerField(default=0)
+    
+    # Provider selections and deliverables
+    valuer_selections = models.PositiveIntegerField(default=0)
+    valuation_reports_approved = models.PositiveIntegerField(default=0)
+    ims_selections = models.PositiveIntegerField(default=0)
+    ims_initial_reports_approved = models.PositiveIntegerField(default=0)
+    lender_solicitor_selections = models.PositiveIntegerField(default=0)
+    
+    # Requisitions
+    open_requisitions = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Deal Readiness"
+        verbose_name_plural = "Deal Readiness Counters"
+    
+    def __str__(self) -> str:
+        return f"Readiness counters for {self.deal_id}"
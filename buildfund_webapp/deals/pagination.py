@@ -0,0 +1,17 @@
+"""Pagination classes for Deal Progression endpoints."""
+from __future__ import annotations
+
+from rest_framework.pagination import CursorPagination
+
+
+class DealCursorPagination(CursorPagination):
+    """
+    Cursor pagination for deal lists, newest accepted deals first.
+
+    Cursor pagination keeps page fetches constant-cost on large deal sets
+    and stays stable while new deals are accepted between page loads.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-accepted_at', '-id')
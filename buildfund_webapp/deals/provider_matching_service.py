@@ -1,15 +1,199 @@
 """Service for matching providers to deals."""
 from __future__ import annotations
 
-from typing import List, Dict, Any
-from django.db.models import Q
+import heapq
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.core.cache import caches
+
 from consultants.models import ConsultantProfile
+from core.cache import AGGREGATE_CACHE, incr_with_expiry
 from .models import Deal, ProviderEnquiry
 
+# Map role_type to the consultant service types that can fill it
+ROLE_TO_SERVICE_TYPES: Dict[str, List[str]] = {
+    'valuer': ['valuation_surveyor', 'valuation_and_monitoring_surveyor'],
+    'monitoring_surveyor': ['monitoring_surveyor', 'valuation_and_monitoring_surveyor'],
+    'solicitor': ['solicitor'],
+}
+
+# Cache key holding the index version; bumped whenever a ConsultantProfile changes
+INDEX_VERSION_CACHE_KEY = 'deals:provider_capability_index:version'
+# Rebuild the in-process index at least this often even without a version bump
+INDEX_MAX_AGE_SECONDS = 300
+
+
+def provider_profile_score(
+    role_type: str,
+    services_offered: Optional[List[str]],
+    qualifications: Optional[List[str]],
+    years_of_experience: Optional[int],
+    current_capacity: int,
+    max_capacity: int,
+) -> float:
+    """Score the deal-independent part of a match (service, qualifications, experience, capacity)."""
+    score = 0.0
+
+    # Service type match (required, 30 points)
+    matching_service_types = ROLE_TO_SERVICE_TYPES.get(role_type, [])
+    if any(st in (services_offered or []) for st in matching_service_types):
+        score += 30.0
+
+    # Qualification match (25 points) - basic check
+    # For valuer/monitoring_surveyor, prefer RICS
+    qualifications = qualifications or []
+    if role_type in ['valuer', 'monitoring_surveyor']:
+        if 'rics' in qualifications:
+            score += 25.0
+        elif 'rics_monitoring' in qualifications or 'rics_valuation' in qualifications:
+            score += 20.0
+    elif role_type == 'solicitor':
+        if 'sra' in qualifications:
+            score += 25.0
+        elif 'cilex' in qualifications:
+            score += 20.0
+
+    # Experience match (15 points)
+    if years_of_experience:
+        if years_of_experience >= 5:
+            score += 15.0
+        elif years_of_experience >= 3:
+            score += 10.0
+        else:
+            score += 5.0
+
+    # Capacity (10 points)
+    if max_capacity > 0:
+        capacity_ratio = current_capacity / max_capacity
+        score += (1.0 - capacity_ratio) * 10.0
+
+    return score
+
+
+def deal_location(deal: Deal) -> str:
+    """Return the location string providers' geographic coverage is matched against."""
+    if deal.application and deal.application.project:
+        project = deal.application.project
+        return project.county or project.postcode or ''
+    return ''
+
+
+class ProviderCapabilityIndex:
+    """
+    Columnar snapshot of active, verified consultants for matching.
+
+    Each provider is a row position.  For every role the deal-independent
+    part of the score is precomputed into an ``array`` column (negative for
+    providers that cannot take the role or have no capacity), and geographic
+    coverage is stored as an inverted index from location to positions, so
+    scoring a deal only adds the geographic bonus to candidate positions.
+    """
+
+    INELIGIBLE = -1.0
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], version: Optional[int] = None):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.ids = array('q')
+        self.names: List[str] = []
+        self.primary_services: List[str] = []
+        self.base_scores: Dict[str, array] = {role: array('d') for role in ROLE_TO_SERVICE_TYPES}
+        self.eligible: Dict[str, List[int]] = {role: [] for role in ROLE_TO_SERVICE_TYPES}
+        self.nationwide: Set[int] = set()
+        self.coverage: Dict[str, Set[int]] = {}
+
+        for position, row in enumerate(rows):
+            self.ids.append(row['id'])
+            self.names.append(row['organisation_name'])
+            self.primary_services.append(row['primary_service'])
+            has_capacity = row['current_capacity'] < row['max_capacity']
+            services = row['services_offered'] or []
+            for role, service_types in ROLE_TO_SERVICE_TYPES.items():
+                if has_capacity and any(st in services for st in service_types):
+                    self.base_scores[role].append(provider_profile_score(
+                        role, services, row['qualifications'], row['years_of_experience'],
+                        row['current_capacity'], row['max_capacity'],
+                    ))
+                    self.eligible[role].append(position)
+                else:
+                    self.base_scores[role].append(self.INELIGIBLE)
+            coverage = row['geographic_coverage'] or []
+            if not coverage:
+                self.nationwide.add(position)
+            for location in coverage:
+                self.coverage.setdefault(location, set()).add(position)
+
+    @classmethod
+    def build(cls, version: Optional[int] = None) -> 'ProviderCapabilityIndex':
+        """Build the index from the database in a single query."""
+        rows = ConsultantProfile.objects.filter(
+            is_active=True,
+            is_verified=True,
+        ).order_by('id').values(
+            'id', 'organisation_name', 'primary_service', 'services_offered', 'geographic_coverage',
+            'qualifications', 'years_of_experience', 'current_capacity', 'max_capacity',
+        )
+        return cls(rows.iterator(chunk_size=2000), version=version)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def top_k(self, role_type: str, location: str, limit: int) -> List[Tuple[int, float]]:
+        """
+        Return the ``limit`` best (position, score) pairs for a role and location.
+
+        All candidates are scored before selection, so the result is the true
+        top-k; ties are broken by provider id for stable ordering.
+        """
+        base = self.base_scores.get(role_type)
+        if base is None or limit <= 0:
+            return []
+
+        if location:
+            # Providers covering the location (+20) or nationwide (+15)
+            local = self.coverage.get(location, set())
+            candidates = [(i, base[i] + 20.0) for i in local if base[i] >= 0]
+            candidates += [(i, base[i] + 15.0) for i in self.nationwide if base[i] >= 0 and i not in local]
+        else:
+            candidates = [(i, base[i]) for i in self.eligible[role_type]]
+
+        ids = self.ids
+        best = heapq.nlargest(limit, candidates, key=lambda c: (c[1], -ids[c[0]]))
+        return [(position, min(100.0, score)) for position, score in best]
+
+
+_index_lock = threading.Lock()
+_index: Optional[ProviderCapabilityIndex] = None
+
+
+def get_capability_index() -> ProviderCapabilityIndex:
+    """Return the process-wide capability index, rebuilding it when stale."""
+    global _index
+    version = caches[AGGREGATE_CACHE].get(INDEX_VERSION_CACHE_KEY, 0)
+    index = _index
+    if index is not None and index.version == version and time.monotonic() - index.built_at < INDEX_MAX_AGE_SECONDS:
+        return index
+    with _index_lock:
+        index = _index
+        if index is None or index.version != version or time.monotonic() - index.built_at >= INDEX_MAX_AGE_SECONDS:
+            index = ProviderCapabilityIndex.build(version=version)
+            _index = index
+    return index
+
+
+def invalidate_capability_index() -> None:
+    """Mark the capability index stale in every process sharing the cache."""
+    global _index
+    incr_with_expiry(caches[AGGREGATE_CACHE], INDEX_VERSION_CACHE_KEY, None)
+    _index = None
+
 
 class DealProviderMatchingService:
     """Service for matching providers to deal requirements."""
-    
+
     def find_matching_providers(
         self,
         deal: Deal,
@@ -18,7 +202,7 @@ class DealProviderMatchingService:
     ) -> List[Dict[str, Any]]:
         """
         Find providers that match the deal requirements for a specific role.
-        
+
         Matching criteria:
         1. Service type match (role_type)
         2. Geographic coverage (deal location)
@@ -26,61 +210,56 @@ class DealProviderMatchingService:
         4. Experience
         5. Capacity
         """
-        # Start with active, verified consultants
-        providers = ConsultantProfile.objects.filter(
-            is_active=True,
-            is_verified=True
-        )
-        
-        # Map role_type to service types
-        role_to_service_map = {
-            'valuer': ['valuation_surveyor', 'valuation_and_monitoring_surveyor'],
-            'monitoring_surveyor': ['monitoring_surveyor', 'valuation_and_monitoring_surveyor'],
-            'solicitor': ['solicitor'],
-        }
-        matching_service_types = role_to_service_map.get(role_type, [])
-        
-        # Filter by service type
-        if matching_service_types:
-            service_filter = Q()
-            for service_type in matching_service_types:
-                service_filter |= Q(services_offered__contains=[service_type])
-            providers = providers.filter(service_filter)
-        
-        # Filter by geographic coverage
-        # Get deal location from application project
-        if deal.application and deal.application.project:
-            project = deal.application.project
-            deal_location = project.county or project.postcode or ''
-            
-            if deal_location:
-                # Check if provider covers this location
-                providers = providers.filter(
-                    Q(geographic_coverage__contains=[deal_location]) |
-                    Q(geographic_coverage=[])  # Empty means nationwide
-                )
-        
-        # Filter by capacity
-        providers_list = list(providers)
-        providers_with_capacity = [
-            p for p in providers_list
-            if p.has_capacity()
-        ]
-        
-        # Calculate match scores and sort
-        results = []
-        for provider in providers_with_capacity[:limit]:
-            score = self.calculate_match_score(deal, role_type, provider)
-            results.append({
-                'provider': provider,
+        index = get_capability_index()
+        best = index.top_k(role_type, deal_location(deal), limit)
+        profiles = ConsultantProfile.objects.in_bulk([index.ids[position] for position, _ in best])
+        return [
+            {
+                'provider': profiles[index.ids[position]],
                 'match_score': score,
-            })
-        
-        # Sort by match score (descending)
-        results.sort(key=lambda x: x['match_score'], reverse=True)
-        
+            }
+            for position, score in best
+            if index.ids[position] in profiles
+        ]
+
+    def match_deals(
+        self,
+        deals: Iterable[Deal],
+        role_type: str,
+        limit: int = 5
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Score many deals against the provider pool in one call.
+
+        Returns a mapping of deal primary key to lightweight match summaries
+        (no per-provider queries); deals sharing a location share one scoring
+        pass.
+        """
+        deal_ids = [deal.pk for deal in deals]
+        locations = {
+            row['pk']: row['application__project__county'] or row['application__project__postcode'] or ''
+            for row in Deal.objects.filter(pk__in=deal_ids).values(
+                'pk', 'application__project__county', 'application__project__postcode',
+            )
+        }
+        index = get_capability_index()
+        by_location: Dict[str, List[Dict[str, Any]]] = {}
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        for deal_id in deal_ids:
+            location = locations.get(deal_id, '')
+            if location not in by_location:
+                by_location[location] = [
+                    {
+                        'provider_id': index.ids[position],
+                        'organisation_name': index.names[position],
+                        'primary_service': index.primary_services[position],
+                        'match_score': score,
+                    }
+                    for position, score in index.top_k(role_type, location, limit)
+                ]
+            results[deal_id] = by_location[location]
         return results
-    
+
     def calculate_match_score(
         self,
         deal: Deal,
@@ -91,55 +270,21 @@ class DealProviderMatchingService:
         Calculate a match score (0-100) for a provider-deal-role combination.
         Higher score = better match.
         """
-        score = 0.0
-        
-        # Service type match (required, 30 points)
-        role_to_service_map = {
-            'valuer': ['valuation_surveyor', 'valuation_and_monitoring_surveyor'],
-            'monitoring_surveyor': ['monitoring_surveyor', 'valuation_and_monitoring_surveyor'],
-            'solicitor': ['solicitor'],
-        }
-        matching_service_types = role_to_service_map.get(role_type, [])
-        
-        if any(st in (provider.services_offered or []) for st in matching_service_types):
-            score += 30.0
-        
+        score = provider_profile_score(
+            role_type,
+            provider.services_offered,
+            provider.qualifications,
+            provider.years_of_experience,
+            provider.current_capacity,
+            provider.max_capacity,
+        )
+
         # Geographic match (20 points)
-        if deal.application and deal.application.project:
-            project = deal.application.project
-            deal_location = project.county or project.postcode or ''
-            
-            if deal_location:
-                if deal_location in (provider.geographic_coverage or []):
-                    score += 20.0
-                elif not provider.geographic_coverage:  # Nationwide
-                    score += 15.0
-        
-        # Qualification match (25 points) - basic check
-        # For valuer/monitoring_surveyor, prefer RICS
-        if role_type in ['valuer', 'monitoring_surveyor']:
-            if 'rics' in (provider.qualifications or []):
-                score += 25.0
-            elif 'rics_monitoring' in (provider.qualifications or []) or 'rics_valuation' in (provider.qualifications or []):
-                score += 20.0
-        elif role_type == 'solicitor':
-            if 'sra' in (provider.qualifications or []):
-                score += 25.0
-            elif 'cilex' in (provider.qualifications or []):
+        location = deal_location(deal)
+        if location:
+            if location in (provider.geographic_coverage or []):
                 score += 20.0
-        
-        # Experience match (15 points)
-        if provider.years_of_experience:
-            if provider.years_of_experience >= 5:
+            elif not provider.geographic_coverage:  # Nationwide
                 score += 15.0
-            elif provider.years_of_experience >= 3:
-                score += 10.0
-            else:
-                score += 5.0
-        
-        # Capacity (10 points)
-        if provider.max_capacity > 0:
-            capacity_ratio = provider.current_capacity / provider.max_capacity
-            score += (1.0 - capacity_ratio) * 10.0
-        
+
         return min(100.0, score)
@@ -1,13 +1,21 @@
 """
 Service for calculating provider performance metrics and SLA tracking.
+
+Metrics are computed in the database: per-observation durations are
+annotated (with subqueries where the start time lives on another table) and
+reduced with Avg/Min/Max/Count grouped by provider firm, so every firm's
+metrics come from a fixed number of queries.  Medians use PERCENTILE_CONT on
+PostgreSQL and a streamed pass over ordered durations elsewhere.
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from django.db import connection, transaction
+from django.db.models import (
+    Aggregate, Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, OuterRef, Q, QuerySet, Subquery,
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.db.models import Q, Avg, Count, Min, Max, F, ExpressionWrapper, DurationField
-from django.db.models.functions import Extract
-from statistics import median
 
 from .models import (
     ProviderEnquiry, ProviderQuote, DealProviderSelection,
@@ -15,56 +23,370 @@ from .models import (
 )
 from consultants.models import ConsultantProfile
 
+HOUR_SECONDS = 3600
+DAY_SECONDS = 3600 * 24
+
+PROVIDER_METRIC_TYPES = [
+    'quote_response_time',
+    'quote_acceptance_rate',
+    'deliverable_delivery_time',
+    'deliverable_rework_count',
+    'appointment_lead_time',
+]
+
+MetricKey = Tuple[int, Optional[str]]  # (provider_firm_id, role_type)
+
+# Rolling windows precomputed by the rollup_provider_metrics command
+ROLLUP_WINDOWS = (30, 90, 365)
+# Rollups older than this are reported as stale (the job is expected to run daily)
+ROLLUP_STALE_AFTER = timedelta(hours=26)
+ROLLUP_VALUE_FIELDS = ['average_value', 'median_value', 'min_value', 'max_value', 'count']
+
+
+class PercentileCont(Aggregate):
+    """PERCENTILE_CONT(p) WITHIN GROUP (ORDER BY expr) - PostgreSQL only."""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile=0.5, **extra):
+        super().__init__(expression, percentile=percentile, **extra)
+
+
+def _supports_percentile() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def _empty_duration_metric() -> Dict[str, Any]:
+    return {
+        'average_value': 0,
+        'median_value': 0,
+        'min_value': 0,
+        'max_value': 0,
+        'count': 0,
+    }
+
+
+def _empty_metric(metric_type: str) -> Dict[str, Any]:
+    if metric_type == 'quote_acceptance_rate':
+        return {
+            'average_value': 0,
+            'median_value': None,
+            'min_value': None,
+            'max_value': None,
+            'count': 0,
+            'accepted_count': 0,
+        }
+    if metric_type == 'deliverable_rework_count':
+        return {
+            'average_value': 0,
+            'median_value': None,
+            'min_value': None,
+            'max_value': None,
+            'count': 0,
+            'rework_rate': 0,
+        }
+    return _empty_duration_metric()
+
+
+def rollup_key(provider_firm_id: int, role_type: Optional[str], metric_type: str, window_days: int) -> str:
+    """Return the upsert key of a precomputed rollup row."""
+    return f"{provider_firm_id}:{role_type or '*'}:{metric_type}:{window_days}"
+
+
+def _metric_from_row(row: PerformanceMetric) -> Dict[str, Any]:
+    """Rebuild the live metric shape from a stored rollup row."""
+    values = {field: getattr(row, field) for field in ROLLUP_VALUE_FIELDS}
+    if row.metric_type == 'quote_acceptance_rate':
+        values['accepted_count'] = round(row.average_value * row.count / 100)
+    elif row.metric_type == 'deliverable_rework_count':
+        values['rework_rate'] = row.average_value / row.count * 100 if row.count else 0
+    return values
+
+
+def _seconds(value) -> float:
+    if value is None:
+        return 0
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    # Some backends return raw microseconds for duration aggregates
+    return float(value) / 1_000_000
+
 
 class ProviderMetricsService:
     """Service for calculating provider performance metrics."""
     
+    # ------------------------------------------------------------------
+    # Batched computation
+    # ------------------------------------------------------------------
+    
     @staticmethod
-    def calculate_quote_response_time(provider_firm: ConsultantProfile, role_type: Optional[str] = None, 
-                                     period_start: Optional[datetime] = None, 
-                                     period_end: Optional[datetime] = None) -> Dict[str, Any]:
+    def compute_metrics(period_start: Optional[datetime] = None,
+                        period_end: Optional[datetime] = None,
+                        role_type: Optional[str] = None,
+                        provider_firm_ids: Optional[Iterable[int]] = None,
+                        by_role: bool = False,
+                        metric_types: Optional[Iterable[str]] = None,
+                        deliverable_type: Optional[str] = None) -> Dict[MetricKey, Dict[str, Dict[str, Any]]]:
         """
-        Calculate quote response time metrics for a provider firm.
-        Returns: average, median, min, max in hours, and count.
+        Compute provider metrics for many firms in one batched pass.
+        
+        Returns ``{(provider_firm_id, role_type): {metric_type: values}}``.
+        ``role_type`` in the key is the row's role when ``by_role`` is set,
+        otherwise the ``role_type`` filter (or None).  Every requested metric
+        is present for every firm that has data for any of them (and for
+        every firm in ``provider_firm_ids``, if given).
         """
-        enquiries = ProviderEnquiry.objects.filter(provider_firm=provider_firm)
+        metric_types = list(metric_types or PROVIDER_METRIC_TYPES)
+        provider_firm_ids = list(provider_firm_ids) if provider_firm_ids is not None else None
+        
+        calculators = {
+            'quote_response_time': ProviderMetricsService._batch_quote_response_time,
+            'quote_acceptance_rate': ProviderMetricsService._batch_quote_acceptance_rate,
+            'deliverable_delivery_time': ProviderMetricsService._batch_deliverable_delivery_time,
+            'deliverable_rework_count': ProviderMetricsService._batch_deliverable_rework_count,
+            'appointment_lead_time': ProviderMetricsService._batch_appointment_lead_time,
+        }
         
-        if role_type:
-            enquiries = enquiries.filter(role_type=role_type)
+        per_metric: Dict[str, Dict[MetricKey, Dict[str, Any]]] = {}
+        for metric_type in metric_types:
+            kwargs = {'deliverable_type': deliverable_type} if metric_type == 'deliverable_delivery_time' else {}
+            per_metric[metric_type] = calculators[metric_type](
+                period_start, period_end, role_type, provider_firm_ids, by_role, **kwargs
+            )
+        
+        keys = {key for values in per_metric.values() for key in values}
+        if provider_firm_ids is not None and not by_role:
+            keys |= {(firm_id, role_type) for firm_id in provider_firm_ids}
         
+        return {
+            key: {
+                metric_type: per_metric[metric_type].get(key) or _empty_metric(metric_type)
+                for metric_type in metric_types
+            }
+            for key in keys
+        }
+    
+    @staticmethod
+    def _scope(queryset: QuerySet, firm_field: str, role_field: str, date_field: str,
+               period_start, period_end, role_type, provider_firm_ids) -> QuerySet:
+        if role_type:
+            queryset = queryset.filter(**{role_field: role_type})
         if period_start:
-            enquiries = enquiries.filter(sent_at__gte=period_start)
+            queryset = queryset.filter(**{f'{date_field}__gte': period_start})
         if period_end:
-            enquiries = enquiries.filter(sent_at__lte=period_end)
+            queryset = queryset.filter(**{f'{date_field}__lte': period_end})
+        if provider_firm_ids is not None:
+            queryset = queryset.filter(**{f'{firm_field}__in': provider_firm_ids})
+        return queryset
+    
+    @staticmethod
+    def _duration_stats(queryset: QuerySet, firm_field: str, role_field: str, by_role: bool,
+                        role_type: Optional[str], unit_seconds: int) -> Dict[MetricKey, Dict[str, Any]]:
+        """
+        Aggregate a queryset annotated with ``duration`` per firm (and role).
         
-        # Get enquiries that have quotes
-        enquiries_with_quotes = enquiries.filter(quotes__isnull=False).distinct()
+        Average/min/max/count come from one GROUP BY query.  Medians come from
+        PERCENTILE_CONT where supported, otherwise from a single ordered scan
+        that keeps only the middle values of each group.
+        """
+        group_fields = [firm_field, role_field] if by_role else [firm_field]
+        aggregates = {
+            'avg': Avg('duration'),
+            'min': Min('duration'),
+            'max': Max('duration'),
+            'n': Count('pk'),
+        }
+        if _supports_percentile():
+            aggregates['median'] = PercentileCont('duration', output_field=DurationField())
+        
+        rows = queryset.values(*group_fields).order_by().annotate(**aggregates)
+        
+        def _key(row) -> MetricKey:
+            return (row[firm_field], row[role_field] if by_role else role_type)
+        
+        stats: Dict[MetricKey, Dict[str, Any]] = {}
+        for row in rows:
+            stats[_key(row)] = {
+                'average_value': _seconds(row['avg']) / unit_seconds,
+                'median_value': _seconds(row['median']) / unit_seconds if 'median' in row else None,
+                'min_value': _seconds(row['min']) / unit_seconds,
+                'max_value': _seconds(row['max']) / unit_seconds,
+                'count': row['n'],
+            }
         
-        response_times = []
-        for enquiry in enquiries_with_quotes:
-            quote = enquiry.quotes.order_by('submitted_at').first()
-            if quote and quote.submitted_at and enquiry.sent_at:
-                delta = quote.submitted_at - enquiry.sent_at
-                hours = delta.total_seconds() / 3600
-                response_times.append(hours)
+        if stats and not _supports_percentile():
+            counts = {key: values['count'] for key, values in stats.items()}
+            for key, median in ProviderMetricsService._streamed_medians(
+                queryset, group_fields, counts, _key
+            ).items():
+                stats[key]['median_value'] = median / unit_seconds
         
-        if not response_times:
-            return {
-                'average_value': 0,
-                'median_value': 0,
-                'min_value': 0,
-                'max_value': 0,
-                'count': 0,
+        return stats
+    
+    @staticmethod
+    def _streamed_medians(queryset: QuerySet, group_fields: List[str], counts: Dict[MetricKey, int],
+                          key_for_row) -> Dict[MetricKey, float]:
+        """Medians (in seconds) from one ordered scan, holding at most two values per group."""
+        medians: Dict[MetricKey, float] = {}
+        current_key = None
+        position = 0
+        lower = None
+        rows = queryset.values(*group_fields, 'duration').order_by(*group_fields, 'duration')
+        for row in rows.iterator(chunk_size=2000):
+            key = key_for_row(row)
+            if key != current_key:
+                current_key, position, lower = key, 0, None
+            n = counts.get(key, 0)
+            value = _seconds(row['duration'])
+            if position == (n - 1) // 2:
+                lower = value
+            if position == n // 2:
+                medians[key] = (lower + value) / 2
+            position += 1
+        return medians
+    
+    @staticmethod
+    def _batch_quote_response_time(period_start, period_end, role_type, provider_firm_ids, by_role):
+        """Hours from enquiry sent to the first quote submitted."""
+        first_quote_at = ProviderQuote.objects.filter(
+            enquiry=OuterRef('pk')
+        ).order_by('submitted_at').values('submitted_at')[:1]
+        enquiries = ProviderMetricsService._scope(
+            ProviderEnquiry.objects.all(), 'provider_firm_id', 'role_type', 'sent_at',
+            period_start, period_end, role_type, provider_firm_ids,
+        ).annotate(
+            first_quote_at=Subquery(first_quote_at),
+        ).filter(
+            first_quote_at__isnull=False,
+            sent_at__isnull=False,
+        ).annotate(
+            duration=ExpressionWrapper(F('first_quote_at') - F('sent_at'), output_field=DurationField()),
+        )
+        return ProviderMetricsService._duration_stats(
+            enquiries, 'provider_firm_id', 'role_type', by_role, role_type, HOUR_SECONDS
+        )
+    
+    @staticmethod
+    def _batch_quote_acceptance_rate(period_start, period_end, role_type, provider_firm_ids, by_role):
+        """Percentage of submitted quotes that were accepted."""
+        quotes = ProviderMetricsService._scope(
+            ProviderQuote.objects.all(), 'enquiry__provider_firm_id', 'role_type', 'submitted_at',
+            period_start, period_end, role_type, provider_firm_ids,
+        )
+        group_fields = ['enquiry__provider_firm_id', 'role_type'] if by_role else ['enquiry__provider_firm_id']
+        rows = quotes.values(*group_fields).order_by().annotate(
+            total=Count('pk'),
+            accepted=Count('pk', filter=Q(status='accepted')),
+        )
+        return {
+            (row['enquiry__provider_firm_id'], row['role_type'] if by_role else role_type): {
+                'average_value': row['accepted'] / row['total'] * 100 if row['total'] else 0,
+                'median_value': None,
+                'min_value': None,
+                'max_value': None,
+                'count': row['total'],
+                'accepted_count': row['accepted'],
             }
-        
+            for row in rows
+        }
+    
+    @staticmethod
+    def _batch_deliverable_delivery_time(period_start, period_end, role_type, provider_firm_ids, by_role,
+                                         deliverable_type=None):
+        """Days from provider selection (or upload, if never selected) to approval review."""
+        selected_at = DealProviderSelection.objects.filter(
+            deal=OuterRef('deal'),
+            role_type=OuterRef('role_type'),
+            provider_firm=OuterRef('provider_firm'),
+        ).values('selected_at')[:1]
+        deliverables = ProviderMetricsService._scope(
+            ProviderDeliverable.objects.filter(status='approved'), 'provider_firm_id', 'role_type', 'uploaded_at',
+            period_start, period_end, role_type, provider_firm_ids,
+        )
+        if deliverable_type:
+            deliverables = deliverables.filter(deliverable_type=deliverable_type)
+        deliverables = deliverables.filter(
+            reviewed_at__isnull=False,
+        ).annotate(
+            started_at=Coalesce(Subquery(selected_at), F('uploaded_at')),
+        ).filter(
+            started_at__isnull=False,
+        ).annotate(
+            duration=ExpressionWrapper(F('reviewed_at') - F('started_at'), output_field=DurationField()),
+        )
+        return ProviderMetricsService._duration_stats(
+            deliverables, 'provider_firm_id', 'role_type', by_role, role_type, DAY_SECONDS
+        )
+    
+    @staticmethod
+    def _batch_deliverable_rework_count(period_start, period_end, role_type, provider_firm_ids, by_role):
+        """Number (and rate) of rejected or revised deliverables."""
+        deliverables = ProviderMetricsService._scope(
+            ProviderDeliverable.objects.all(), 'provider_firm_id', 'role_type', 'uploaded_at',
+            period_start, period_end, role_type, provider_firm_ids,
+        )
+        group_fields = ['provider_firm_id', 'role_type'] if by_role else ['provider_firm_id']
+        rows = deliverables.values(*group_fields).order_by().annotate(
+            total=Count('pk'),
+            reworked=Count('pk', filter=Q(status__in=['rejected', 'revised'])),
+        )
         return {
-            'average_value': sum(response_times) / len(response_times),
-            'median_value': median(response_times),
-            'min_value': min(response_times),
-            'max_value': max(response_times),
-            'count': len(response_times),
+            (row['provider_firm_id'], row['role_type'] if by_role else role_type): {
+                'average_value': row['reworked'],  # Store rework count
+                'median_value': None,
+                'min_value': None,
+                'max_value': None,
+                'count': row['total'],
+                'rework_rate': row['reworked'] / row['total'] * 100 if row['total'] else 0,
+            }
+            for row in rows
         }
     
+    @staticmethod
+    def _batch_appointment_lead_time(period_start, period_end, role_type, provider_firm_ids, by_role):
+        """Hours from appointment proposal to confirmation."""
+        appointments = ProviderMetricsService._scope(
+            ProviderAppointment.objects.filter(status='confirmed'), 'provider_firm_id', 'role_type', 'created_at',
+            period_start, period_end, role_type, provider_firm_ids,
+        ).filter(
+            confirmed_at__isnull=False,
+            created_at__isnull=False,
+        ).annotate(
+            duration=ExpressionWrapper(F('confirmed_at') - F('created_at'), output_field=DurationField()),
+        )
+        return ProviderMetricsService._duration_stats(
+            appointments, 'provider_firm_id', 'role_type', by_role, role_type, HOUR_SECONDS
+        )
+    
+    # ------------------------------------------------------------------
+    # Per-firm helpers
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _single_metric(metric_type: str, provider_firm: ConsultantProfile, role_type: Optional[str],
+                       period_start: Optional[datetime], period_end: Optional[datetime],
+                       **kwargs) -> Dict[str, Any]:
+        metrics = ProviderMetricsService.compute_metrics(
+            period_start, period_end, role_type,
+            provider_firm_ids=[provider_firm.pk],
+            metric_types=[metric_type],
+            **kwargs
+        )
+        return metrics[(provider_firm.pk, role_type)][metric_type]
+    
+    @staticmethod
+    def calculate_quote_response_time(provider_firm: ConsultantProfile, role_type: Optional[str] = None, 
+                                     period_start: Optional[datetime] = None, 
+                                     period_end: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Calculate quote response time metrics for a provider firm.
+        Returns: average, median, min, max in hours, and count.
+        """
+        return ProviderMetricsService._single_metric(
+            'quote_response_time', provider_firm, role_type, period_start, period_end
+        )
+    
     @staticmethod
     def calculate_quote_acceptance_rate(provider_firm: ConsultantProfile, role_type: Optional[str] = None,
                                        period_start: Optional[datetime] = None,
@@ -73,29 +395,9 @@ class ProviderMetricsService:
         Calculate quote acceptance rate (percentage of quotes accepted).
         Returns: acceptance_rate (0-100), total_quotes, accepted_quotes.
         """
-        quotes = ProviderQuote.objects.filter(enquiry__provider_firm=provider_firm)
-        
-        if role_type:
-            quotes = quotes.filter(role_type=role_type)
-        
-        if period_start:
-            quotes = quotes.filter(submitted_at__gte=period_start)
-        if period_end:
-            quotes = quotes.filter(submitted_at__lte=period_end)
-        
-        total_quotes = quotes.count()
-        accepted_quotes = quotes.filter(status='accepted').count()
-        
-        acceptance_rate = (accepted_quotes / total_quotes * 100) if total_quotes > 0 else 0
-        
-        return {
-            'average_value': acceptance_rate,  # Store as percentage
-            'median_value': None,
-            'min_value': None,
-            'max_value': None,
-            'count': total_quotes,
-            'accepted_count': accepted_quotes,
-        }
+        return ProviderMetricsService._single_metric(
+            'quote_acceptance_rate', provider_firm, role_type, period_start, period_end
+        )
     
     @staticmethod
     def calculate_deliverable_delivery_time(provider_firm: ConsultantProfile, role_type: Optional[str] = None,
@@ -106,55 +408,10 @@ class ProviderMetricsService:
         Calculate deliverable delivery time (from instruction/selection to approval).
         Returns: average, median, min, max in days, and count.
         """
-        deliverables = ProviderDeliverable.objects.filter(
-            provider_firm=provider_firm,
-            status='approved'
+        return ProviderMetricsService._single_metric(
+            'deliverable_delivery_time', provider_firm, role_type, period_start, period_end,
+            deliverable_type=deliverable_type,
         )
-        
-        if role_type:
-            deliverables = deliverables.filter(role_type=role_type)
-        if deliverable_type:
-            deliverables = deliverables.filter(deliverable_type=deliverable_type)
-        if period_start:
-            deliverables = deliverables.filter(uploaded_at__gte=period_start)
-        if period_end:
-            deliverables = deliverables.filter(uploaded_at__lte=period_end)
-        
-        delivery_times = []
-        for deliverable in deliverables:
-            # Get when provider was selected/instructed
-            selection = DealProviderSelection.objects.filter(
-                deal=deliverable.deal,
-                role_type=deliverable.role_type,
-                provider_firm=provider_firm
-            ).first()
-            
-            if selection and selection.selected_at and deliverable.reviewed_at:
-                delta = deliverable.reviewed_at - selection.selected_at
-                days = delta.total_seconds() / (3600 * 24)
-                delivery_times.append(days)
-            elif deliverable.uploaded_at and deliverable.reviewed_at:
-                # Fallback: use uploaded_at to reviewed_at
-                delta = deliverable.reviewed_at - deliverable.uploaded_at
-                days = delta.total_seconds() / (3600 * 24)
-                delivery_times.append(days)
-        
-        if not delivery_times:
-            return {
-                'average_value': 0,
-                'median_value': 0,
-                'min_value': 0,
-                'max_value': 0,
-                'count': 0,
-            }
-        
-        return {
-            'average_value': sum(delivery_times) / len(delivery_times),
-            'median_value': median(delivery_times),
-            'min_value': min(delivery_times),
-            'max_value': max(delivery_times),
-            'count': len(delivery_times),
-        }
     
     @staticmethod
     def calculate_deliverable_rework_count(provider_firm: ConsultantProfile, role_type: Optional[str] = None,
@@ -164,27 +421,9 @@ class ProviderMetricsService:
         Calculate number of rejected/revised deliverables (rework).
         Returns: total_rework_count, rework_rate (percentage).
         """
-        deliverables = ProviderDeliverable.objects.filter(provider_firm=provider_firm)
-        
-        if role_type:
-            deliverables = deliverables.filter(role_type=role_type)
-        if period_start:
-            deliverables = deliverables.filter(uploaded_at__gte=period_start)
-        if period_end:
-            deliverables = deliverables.filter(uploaded_at__lte=period_end)
-        
-        total_deliverables = deliverables.count()
-        reworked = deliverables.filter(status__in=['rejected', 'revised']).count()
-        rework_rate = (reworked / total_deliverables * 100) if total_deliverables > 0 else 0
-        
-        return {
-            'average_value': reworked,  # Store rework count
-            'median_value': None,
-            'min_value': None,
-            'max_value': None,
-            'count': total_deliverables,
-            'rework_rate': rework_rate,
-        }
+        return ProviderMetricsService._single_metric(
+            'deliverable_rework_count', provider_firm, role_type, period_start, period_end
+        )
     
     @staticmethod
     def calculate_appointment_lead_time(provider_firm: ConsultantProfile, role_type: Optional[str] = None,
@@ -194,41 +433,9 @@ class ProviderMetricsService:
         Calculate appointment lead time (from proposal to confirmation).
         Returns: average, median, min, max in hours, and count.
         """
-        appointments = ProviderAppointment.objects.filter(
-            provider_firm=provider_firm,
-            status='confirmed'
+        return ProviderMetricsService._single_metric(
+            'appointment_lead_time', provider_firm, role_type, period_start, period_end
         )
-        
-        if role_type:
-            appointments = appointments.filter(role_type=role_type)
-        if period_start:
-            appointments = appointments.filter(created_at__gte=period_start)
-        if period_end:
-            appointments = appointments.filter(created_at__lte=period_end)
-        
-        lead_times = []
-        for appointment in appointments:
-            if appointment.confirmed_at and appointment.created_at:
-                delta = appointment.confirmed_at - appointment.created_at
-                hours = delta.total_seconds() / 3600
-                lead_times.append(hours)
-        
-        if not lead_times:
-            return {
-                'average_value': 0,
-                'median_value': 0,
-                'min_value': 0,
-                'max_value': 0,
-                'count': 0,
-            }
-        
-        return {
-            'average_value': sum(lead_times) / len(lead_times),
-            'median_value': median(lead_times),
-            'min_value': min(lead_times),
-            'max_value': max(lead_times),
-            'count': len(lead_times),
-        }
     
     @staticmethod
     def calculate_provider_metrics_for_deal(deal_id: str, provider_firm: ConsultantProfile, 
@@ -333,105 +540,126 @@ class ProviderMetricsService:
         if not period_end:
             period_end = timezone.now()
         
-        metrics = []
-        
-        # Quote response time
-        quote_response = ProviderMetricsService.calculate_quote_response_time(
-            provider_firm, role_type, period_start, period_end
-        )
-        if quote_response['count'] > 0:
-            metric, created = PerformanceMetric.objects.update_or_create(
-                provider_firm=provider_firm,
-                role_type=role_type,
-                metric_type='quote_response_time',
-                period_start=period_start.date(),
-                period_end=period_end.date(),
-                defaults={
-                    'average_value': quote_response['average_value'],
-                    'median_value': quote_response['median_value'],
-                    'min_value': quote_response['min_value'],
-                    'max_value': quote_response['max_value'],
-                    'count': quote_response['count'],
-                }
-            )
-            metrics.append(metric)
+        values_by_type = ProviderMetricsService.compute_metrics(
+            period_start, period_end, role_type, provider_firm_ids=[provider_firm.pk]
+        )[(provider_firm.pk, role_type)]
         
-        # Quote acceptance rate
-        acceptance = ProviderMetricsService.calculate_quote_acceptance_rate(
-            provider_firm, role_type, period_start, period_end
-        )
-        if acceptance['count'] > 0:
+        metrics = []
+        for metric_type in PROVIDER_METRIC_TYPES:
+            values = values_by_type[metric_type]
+            if values['count'] <= 0:
+                continue
             metric, created = PerformanceMetric.objects.update_or_create(
                 provider_firm=provider_firm,
                 role_type=role_type,
-                metric_type='quote_acceptance_rate',
+                metric_type=metric_type,
                 period_start=period_start.date(),
                 period_end=period_end.date(),
                 defaults={
-                    'average_value': acceptance['average_value'],
-                    'count': acceptance['count'],
+                    field: values[field]
+                    for field in ('average_value', 'median_value', 'min_value', 'max_value', 'count')
+                    if values[field] is not None
                 }
             )
             metrics.append(metric)
         
-        # Deliverable delivery time
-        delivery = ProviderMetricsService.calculate_deliverable_delivery_time(
-            provider_firm, role_type, None, period_start, period_end
-        )
-        if delivery['count'] > 0:
-            metric, created = PerformanceMetric.objects.update_or_create(
-                provider_firm=provider_firm,
-                role_type=role_type,
-                metric_type='deliverable_delivery_time',
-                period_start=period_start.date(),
-                period_end=period_end.date(),
-                defaults={
-                    'average_value': delivery['average_value'],
-                    'median_value': delivery['median_value'],
-                    'min_value': delivery['min_value'],
-                    'max_value': delivery['max_value'],
-                    'count': delivery['count'],
-                }
-            )
-            metrics.append(metric)
+        return metrics
+    
+    # ------------------------------------------------------------------
+    # Precomputed rolling rollups
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def rollup_performance_metrics(provider_firm_ids: List[int],
+                                   windows: Iterable[int] = ROLLUP_WINDOWS,
+                                   now: Optional[datetime] = None) -> int:
+        """
+        Upsert rolling-window PerformanceMetric rows for a chunk of provider firms.
         
-        # Deliverable rework count
-        rework = ProviderMetricsService.calculate_deliverable_rework_count(
-            provider_firm, role_type, period_start, period_end
-        )
-        if rework['count'] > 0:
-            metric, created = PerformanceMetric.objects.update_or_create(
-                provider_firm=provider_firm,
-                role_type=role_type,
-                metric_type='deliverable_rework_count',
-                period_start=period_start.date(),
-                period_end=period_end.date(),
-                defaults={
-                    'average_value': rework['average_value'],
-                    'count': rework['count'],
-                }
+        Every firm gets an all-roles row per metric and window (even with no
+        observations, so readers can tell "no data" from "not yet rolled up");
+        per-role rows are written where the role has data.  Returns the number
+        of rows written.
+        """
+        now = now or timezone.now()
+        rows = []
+        for window_days in windows:
+            period_start = now - timedelta(days=window_days)
+            for by_role in (False, True):
+                metrics = ProviderMetricsService.compute_metrics(
+                    period_start, now, provider_firm_ids=provider_firm_ids, by_role=by_role
+                )
+                for (firm_id, role), values_by_type in metrics.items():
+                    for metric_type, values in values_by_type.items():
+                        if by_role and values['count'] <= 0:
+                            continue
+                        rows.append(PerformanceMetric(
+                            provider_firm_id=firm_id,
+                            role_type=role,
+                            metric_type=metric_type,
+                            period_start=period_start.date(),
+                            period_end=now.date(),
+                            window_days=window_days,
+                            rollup_key=rollup_key(firm_id, role, metric_type, window_days),
+                            **{field: values[field] for field in ROLLUP_VALUE_FIELDS},
+                        ))
+        
+        with transaction.atomic():
+            PerformanceMetric.objects.bulk_create(
+                rows,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['rollup_key'],
+                update_fields=ROLLUP_VALUE_FIELDS + ['period_start', 'period_end', 'calculated_at'],
             )
-            metrics.append(metric)
-        
-        # Appointment lead time
-        appointment_lead = ProviderMetricsService.calculate_appointment_lead_time(
-            provider_firm, role_type, period_start, period_end
+        return len(rows)
+    
+    @staticmethod
+    def prune_rollups(refreshed_before: datetime, windows: Iterable[int] = ROLLUP_WINDOWS,
+                      provider_firm_ids: Optional[List[int]] = None) -> int:
+        """Delete rollup rows a run did not refresh (e.g. a role with no recent data)."""
+        stale = PerformanceMetric.objects.filter(
+            rollup_key__isnull=False,
+            window_days__in=list(windows),
+            calculated_at__lt=refreshed_before,
         )
-        if appointment_lead['count'] > 0:
-            metric, created = PerformanceMetric.objects.update_or_create(
-                provider_firm=provider_firm,
-                role_type=role_type,
-                metric_type='appointment_lead_time',
-                period_start=period_start.date(),
-                period_end=period_end.date(),
-                defaults={
-                    'average_value': appointment_lead['average_value'],
-                    'median_value': appointment_lead['median_value'],
-                    'min_value': appointment_lead['min_value'],
-                    'max_value': appointment_lead['max_value'],
-                    'count': appointment_lead['count'],
-                }
-            )
-            metrics.append(metric)
+        if provider_firm_ids is not None:
+            stale = stale.filter(provider_firm_id__in=provider_firm_ids)
+        deleted, _ = stale.delete()
+        return deleted
+    
+    @staticmethod
+    def get_rollup_metrics(provider_firm: ConsultantProfile, role_type: Optional[str],
+                           window_days: int) -> Optional[Dict[str, Any]]:
+        """
+        Return precomputed metrics for a firm and window with staleness metadata.
         
-        return metrics
+        Returns None when the firm has not been rolled up for this window, so
+        callers can fall back to a live computation.
+        """
+        rows = list(PerformanceMetric.objects.filter(
+            provider_firm=provider_firm,
+            window_days=window_days,
+            rollup_key__isnull=False,
+        ).filter(
+            Q(role_type__isnull=True) | Q(role_type=role_type) if role_type else Q(role_type__isnull=True)
+        ))
+        all_roles = [row for row in rows if row.role_type is None]
+        if not all_roles:
+            return None
+        
+        metrics = {metric_type: _empty_metric(metric_type) for metric_type in PROVIDER_METRIC_TYPES}
+        for row in rows:
+            if row.role_type == role_type and row.metric_type in metrics:
+                metrics[row.metric_type] = _metric_from_row(row)
+        
+        calculated_at = min(row.calculated_at for row in all_roles)
+        age = timezone.now() - calculated_at
+        return {
+            'metrics': metrics,
+            'period_start': all_roles[0].period_start,
+            'period_end': all_roles[0].period_end,
+            'calculated_at': calculated_at,
+            'age_seconds': int(age.total_seconds()),
+            'is_stale': age > ROLLUP_STALE_AFTER,
+        }
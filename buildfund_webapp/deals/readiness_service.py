@@ -0,0 +1,431 @@
+"""Service for maintaining deal completion readiness counters.
+
+Completion readiness used to be recalculated from the source tables (CPs,
+tasks, stages, provider selections and deliverables, requisitions) with a
+dozen or so COUNT/EXISTS queries on every read.  Instead, each source row
+contributes to a small set of counters on ``DealReadiness``; signal handlers
+apply the difference between a row's old and new contribution, and the score
+and completion blockers are derived from the counters alone.
+"""
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import (
+    Deal, DealCP, DealProviderSelection, DealReadiness, DealRequisition, DealStage, DealTask,
+    ProviderDeliverable,
+)
+
+COUNTER_FIELDS = [
+    'mandatory_cps_total',
+    'mandatory_cps_satisfied',
+    'mandatory_cps_cleared',
+    'critical_tasks_total',
+    'critical_tasks_completed',
+    'legal_tasks_total',
+    'legal_tasks_completed',
+    'kyc_stages_total',
+    'kyc_stages_completed',
+    'valuer_selections',
+    'valuation_reports_approved',
+    'ims_selections',
+    'ims_initial_reports_approved',
+    'lender_solicitor_selections',
+    'open_requisitions',
+]
+
+OPEN_REQUISITION_STATUSES = ('open', 'responded')
+CLEARED_CP_STATUSES = ('satisfied', 'approved')
+
+
+def is_legal_stage_name(name: Optional[str]) -> bool:
+    """Return True if a stage name marks the legal execution stage."""
+    return bool(name) and 'legals' in name.lower()
+
+
+def is_kyc_stage_name(name: Optional[str]) -> bool:
+    """Return True if a stage name marks the KYC/AML stage."""
+    return bool(name) and 'kyc' in name.lower()
+
+
+class ReadinessService:
+    """Maintain readiness counters and derive readiness from them."""
+
+    # ------------------------------------------------------------------
+    # Row contributions
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def contribution(instance) -> Counter:
+        """Return the counters a single source row contributes to its deal."""
+        counts: Counter = Counter()
+
+        if isinstance(instance, DealCP):
+            if instance.is_mandatory:
+                counts['mandatory_cps_total'] += 1
+                counts['mandatory_cps_satisfied'] += instance.status == 'satisfied'
+                counts['mandatory_cps_cleared'] += instance.status in CLEARED_CP_STATUSES
+
+        elif isinstance(instance, DealTask):
+            completed = instance.status == 'completed'
+            if instance.priority == 'critical':
+                counts['critical_tasks_total'] += 1
+                counts['critical_tasks_completed'] += completed
+            if instance.stage_id and ReadinessService._is_legal_stage(instance.stage_id):
+                counts['legal_tasks_total'] += 1
+                counts['legal_tasks_completed'] += completed
+
+        elif isinstance(instance, DealStage):
+            if is_kyc_stage_name(instance.name):
+                counts['kyc_stages_total'] += 1
+                counts['kyc_stages_completed'] += instance.status == 'completed'
+
+        elif isinstance(instance, DealProviderSelection):
+            if instance.role_type == 'valuer':
+                counts['valuer_selections'] += 1
+            elif instance.role_type == 'monitoring_surveyor':
+                counts['ims_selections'] += 1
+            elif instance.role_type == 'solicitor' and instance.acting_for_party == 'lender':
+                counts['lender_solicitor_selections'] += 1
+
+        elif isinstance(instance, ProviderDeliverable):
+            if instance.status == 'approved':
+                if instance.role_type == 'valuer' and instance.deliverable_type == 'valuation_report':
+                    counts['valuation_reports_approved'] += 1
+                elif instance.role_type == 'monitoring_surveyor' and instance.deliverable_type == 'ims_initial_report':
+                    counts['ims_initial_reports_approved'] += 1
+
+        elif isinstance(instance, DealRequisition):
+            if instance.status in OPEN_REQUISITION_STATUSES:
+                counts['open_requisitions'] += 1
+
+        return counts
+
+    @staticmethod
+    def _is_legal_stage(stage_id: int) -> bool:
+        name = DealStage.objects.filter(pk=stage_id).values_list('name', flat=True).first()
+        return is_legal_stage_name(name)
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def apply_change(previous_deal_id: Optional[int], previous: Counter,
+                     current_deal_id: Optional[int], current: Counter) -> None:
+        """Apply the difference between a row's old and new contribution."""
+        deltas: Dict[int, Counter] = defaultdict(Counter)
+        if previous_deal_id:
+            deltas[previous_deal_id].subtract(previous)
+        if current_deal_id:
+            deltas[current_deal_id].update(current)
+        for deal_id, delta in deltas.items():
+            ReadinessService.apply_delta(deal_id, delta)
+
+    @staticmethod
+    def apply_delta(deal_id: int, delta: Counter) -> None:
+        """
+        Add a counter delta to a deal's readiness row and refresh its score.
+
+        Deals without a counter row (not yet backfilled, or mid-delete) are
+        skipped; ``get_counters`` rebuilds them from source on first read.
+        """
+        changes = {field: F(field) + value for field, value in delta.items() if value}
+        if not changes:
+            return
+        updated = DealReadiness.objects.filter(deal_id=deal_id).update(updated_at=timezone.now(), **changes)
+        if updated:
+            ReadinessService.store_score(deal_id)
+
+    @staticmethod
+    def recount_legal_tasks(deal_id: int) -> None:
+        """Recount legal-stage tasks for a deal after a stage is renamed."""
+        counts = DealTask.objects.filter(
+            deal_id=deal_id,
+            stage__name__icontains='legals',
+        ).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+        )
+        updated = DealReadiness.objects.filter(deal_id=deal_id).update(
+            legal_tasks_total=counts['total'],
+            legal_tasks_completed=counts['completed'],
+            updated_at=timezone.now(),
+        )
+        if updated:
+            ReadinessService.store_score(deal_id)
+
+    @staticmethod
+    def store_score(deal_id: int) -> None:
+        """Write the derived score onto the Deal row for list views."""
+        row = DealReadiness.objects.select_related('deal').filter(deal_id=deal_id).first()
+        if row is None:
+            return
+        data = ReadinessService.score(row, row.deal.facility_type)
+        Deal.objects.filter(pk=deal_id).update(
+            completion_readiness_score=data['score'],
+            completion_readiness_breakdown=data,
+        )
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_counters(deal: Deal) -> DealReadiness:
+        """Return the deal's counter row, rebuilding it from source if missing."""
+        counters = DealReadiness.objects.filter(deal=deal).first()
+        if counters is None:
+            ReadinessService.recompute([deal.pk])
+            counters = DealReadiness.objects.get(deal=deal)
+        return counters
+
+    @staticmethod
+    def score(counters: DealReadiness, facility_type: str) -> Dict[str, Any]:
+        """Derive the completion readiness score (0-100) from counters."""
+        score = 0
+        breakdown = []
+        max_score = 100
+
+        # 1. Mandatory CPs satisfied (highest weight: 40 points)
+        total_mandatory = counters.mandatory_cps_total
+        satisfied_mandatory = counters.mandatory_cps_satisfied
+        if total_mandatory > 0:
+            cp_score = (satisfied_mandatory / total_mandatory) * 40
+            score += cp_score
+            if cp_score < 40:
+                breakdown.append({
+                    'category': 'Mandatory CPs',
+                    'current': satisfied_mandatory,
+                    'required': total_mandatory,
+                    'weight': 40,
+                })
+        else:
+            # No mandatory CPs yet (stage 6 not reached)
+            breakdown.append({
+                'category': 'Mandatory CPs',
+                'current': 0,
+                'required': 0,
+                'weight': 40,
+                'note': 'No mandatory CPs defined yet',
+            })
+
+        # 2. Critical path tasks complete (weight: 30 points)
+        total_critical = counters.critical_tasks_total
+        completed_critical = counters.critical_tasks_completed
+        if total_critical > 0:
+            task_score = (completed_critical / total_critical) * 30
+            score += task_score
+            if task_score < 30:
+                breakdown.append({
+                    'category': 'Critical Path Tasks',
+                    'current': completed_critical,
+                    'required': total_critical,
+                    'weight': 30,
+                })
+        else:
+            # No critical tasks defined yet
+            breakdown.append({
+                'category': 'Critical Path Tasks',
+                'current': 0,
+                'required': 0,
+                'weight': 30,
+                'note': 'No critical tasks defined yet',
+            })
+
+        # 3. Legal execution completeness (weight: 15 points)
+        total_legal = counters.legal_tasks_total
+        completed_legal = counters.legal_tasks_completed
+        if total_legal > 0:
+            legal_score = (completed_legal / total_legal) * 15
+            score += legal_score
+            if legal_score < 15:
+                breakdown.append({
+                    'category': 'Legal Execution',
+                    'current': completed_legal,
+                    'required': total_legal,
+                    'weight': 15,
+                })
+
+        # 4. KYC minimum clearance (weight: 10 points)
+        if counters.kyc_stages_total and counters.kyc_stages_completed:
+            score += 10
+        elif counters.kyc_stages_total:
+            breakdown.append({
+                'category': 'KYC Clearance',
+                'current': 0,
+                'required': 1,
+                'weight': 10,
+            })
+
+        # 5. Provider deliverables (weight: 20 points)
+        if counters.valuer_selections:
+            if counters.valuation_reports_approved:
+                score += 8  # Valuation report weight: 8 points
+            else:
+                breakdown.append({
+                    'category': 'Valuation Report',
+                    'current': 0,
+                    'required': 1,
+                    'weight': 8,
+                    'note': 'Final valuation report must be approved'
+                })
+        else:
+            breakdown.append({
+                'category': 'Valuation Report',
+                'current': 0,
+                'required': 0,
+                'weight': 8,
+                'note': 'No valuer selected'
+            })
+
+        if facility_type == 'development':
+            if counters.ims_selections:
+                if counters.ims_initial_reports_approved:
+                    score += 7  # IMS initial report weight: 7 points
+                else:
+                    breakdown.append({
+                        'category': 'IMS Initial Report',
+                        'current': 0,
+                        'required': 1,
+                        'weight': 7,
+                        'note': 'IMS initial report must be approved'
+                    })
+            else:
+                breakdown.append({
+                    'category': 'IMS Initial Report',
+                    'current': 0,
+                    'required': 0,
+                    'weight': 7,
+                    'note': 'No IMS selected'
+                })
+
+        # 6. Outstanding requisitions (weight: 5 points)
+        if counters.open_requisitions == 0:
+            score += 5
+        else:
+            breakdown.append({
+                'category': 'Outstanding Requisitions',
+                'current': counters.open_requisitions,
+                'required': 0,
+                'weight': 5,
+            })
+
+        return {
+            'score': round(score),
+            'max_score': max_score,
+            'breakdown': breakdown,
+            'calculated_at': counters.updated_at.isoformat() if counters.updated_at else timezone.now().isoformat(),
+        }
+
+    @staticmethod
+    def blockers(counters: DealReadiness, facility_type: str) -> Dict[str, Any]:
+        """Derive completion blockers (provider deliverables, CPs, requisitions) from counters."""
+        blockers = []
+
+        if counters.valuer_selections and not counters.valuation_reports_approved:
+            blockers.append('Final valuation report must be approved')
+
+        if (facility_type == 'development' and counters.ims_selections
+                and not counters.ims_initial_reports_approved):
+            blockers.append('IMS initial report must be approved')
+
+        if counters.mandatory_cps_total > 0 and counters.mandatory_cps_cleared < counters.mandatory_cps_total:
+            blockers.append(
+                f'All mandatory CPs must be satisfied '
+                f'({counters.mandatory_cps_cleared}/{counters.mandatory_cps_total})'
+            )
+
+        if counters.lender_solicitor_selections and counters.open_requisitions > 0:
+            blockers.append(f'All requisitions must be closed ({counters.open_requisitions} open)')
+
+        return {
+            'ready': len(blockers) == 0,
+            'blockers': blockers,
+            'checked_at': timezone.now().isoformat(),
+        }
+
+    # ------------------------------------------------------------------
+    # Bulk recompute
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def count_from_source(deal_ids: List[int]) -> Dict[int, Counter]:
+        """Count every readiness component for a batch of deals (one query per source table)."""
+        counters: Dict[int, Counter] = {deal_id: Counter() for deal_id in deal_ids}
+
+        def _merge(rows):
+            for row in rows:
+                deal_id = row.pop('deal_id')
+                counters[deal_id].update({key: value for key, value in row.items() if value})
+
+        _merge(DealCP.objects.filter(deal_id__in=deal_ids, is_mandatory=True).values('deal_id').annotate(
+            mandatory_cps_total=Count('id'),
+            mandatory_cps_satisfied=Count('id', filter=Q(status='satisfied')),
+            mandatory_cps_cleared=Count('id', filter=Q(status__in=CLEARED_CP_STATUSES)),
+        ).order_by())
+        _merge(DealTask.objects.filter(deal_id__in=deal_ids).values('deal_id').annotate(
+            critical_tasks_total=Count('id', filter=Q(priority='critical')),
+            critical_tasks_completed=Count('id', filter=Q(priority='critical', status='completed')),
+            legal_tasks_total=Count('id', filter=Q(stage__name__icontains='legals')),
+            legal_tasks_completed=Count('id', filter=Q(stage__name__icontains='legals', status='completed')),
+        ).order_by())
+        _merge(DealStage.objects.filter(deal_id__in=deal_ids, name__icontains='kyc').values('deal_id').annotate(
+            kyc_stages_total=Count('id'),
+            kyc_stages_completed=Count('id', filter=Q(status='completed')),
+        ).order_by())
+        _merge(DealProviderSelection.objects.filter(deal_id__in=deal_ids).values('deal_id').annotate(
+            valuer_selections=Count('id', filter=Q(role_type='valuer')),
+            ims_selections=Count('id', filter=Q(role_type='monitoring_surveyor')),
+            lender_solicitor_selections=Count('id', filter=Q(role_type='solicitor', acting_for_party='lender')),
+        ).order_by())
+        _merge(ProviderDeliverable.objects.filter(deal_id__in=deal_ids, status='approved').values('deal_id').annotate(
+            valuation_reports_approved=Count(
+                'id', filter=Q(role_type='valuer', deliverable_type='valuation_report')
+            ),
+            ims_initial_reports_approved=Count(
+                'id', filter=Q(role_type='monitoring_surveyor', deliverable_type='ims_initial_report')
+            ),
+        ).order_by())
+        _merge(DealRequisition.objects.filter(
+            deal_id__in=deal_ids, status__in=OPEN_REQUISITION_STATUSES
+        ).values('deal_id').annotate(open_requisitions=Count('id')).order_by())
+
+        return counters
+
+    @staticmethod
+    @transaction.atomic
+    def recompute(deal_ids: Iterable[int]) -> int:
+        """Rebuild counters and stored scores for a batch of deals; returns the batch size."""
+        deals = list(Deal.objects.filter(pk__in=list(deal_ids)).only('id', 'facility_type'))
+        if not deals:
+            return 0
+        counted = ReadinessService.count_from_source([deal.pk for deal in deals])
+
+        now = timezone.now()
+        rows = [
+            DealReadiness(
+                deal_id=deal.pk,
+                updated_at=now,
+                **{field: counted[deal.pk].get(field, 0) for field in COUNTER_FIELDS},
+            )
+            for deal in deals
+        ]
+        DealReadiness.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['deal'],
+            update_fields=COUNTER_FIELDS + ['updated_at'],
+        )
+
+        for deal, row in zip(deals, rows):
+            data = ReadinessService.score(row, deal.facility_type)
+            deal.completion_readiness_score = data['score']
+            deal.completion_readiness_breakdown = data
+        Deal.objects.bulk_update(deals, ['completion_readiness_score', 'completion_readiness_breakdown'])
+        return len(deals)
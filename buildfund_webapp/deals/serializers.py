@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import PrefetchDeclarationMixin, SparseFieldsetMixin
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Exists, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 
 from .models import (
     Deal, DealParty, DealStage, DealTask, DealCP, DealRequisition,
@@ -11,11 +14,29 @@ from .models import (
     ProviderEnquiry, ProviderQuote, DealProviderSelection, ProviderStageInstance,
     ProviderDeliverable, ProviderAppointment
 )
+from documents.models import Document, deferred_document_fields
 
 User = get_user_model()
 
+# Related columns read by the party name helpers below
+PARTY_NAME_RELATED = ['user', 'borrower_profile', 'lender_profile', 'consultant_profile']
 
-class DealSerializer(serializers.ModelSerializer):
+
+def _row_count(queryset, field):
+    """Correlated COUNT subquery; unlike Count() it is not inflated by joins in the outer query."""
+    counts = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _ids_only(lookup, model):
+    """Prefetch a many-to-many rendered as primary keys without loading the related rows."""
+    return Prefetch(lookup, queryset=model.objects.only('id'))
+
+
+class DealSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Deal model."""
     
     lender_name = serializers.CharField(source='lender.organisation_name', read_only=True)
@@ -33,9 +54,14 @@ class DealSerializer(serializers.ModelSerializer):
             'completion_readiness_breakdown', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'deal_id', 'accepted_at', 'created_at', 'updated_at']
+        select_related = {
+            'lender_name': ['lender'],
+            'borrower_name': ['borrower_company'],
+            'current_stage_name': ['current_stage'],
+        }
 
 
-class DealPartySerializer(serializers.ModelSerializer):
+class DealPartySerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealParty model."""
     
     user_name = serializers.SerializerMethodField()
@@ -51,7 +77,7 @@ class DealPartySerializer(serializers.ModelSerializer):
         if obj.lender_profile:
             return obj.lender_profile.organisation_name
         if obj.consultant_profile:
-            return f"{obj.consultant_profile.first_name} {obj.consultant_profile.last_name}".strip()
+            return obj.consultant_profile.organisation_name
         return "Unknown"
     
     def get_user_email(self, obj):
@@ -74,12 +100,16 @@ class DealPartySerializer(serializers.ModelSerializer):
             'invited_at', 'confirmed_at', 'access_granted_at',
             'acting_for_party', 'firm_name', 'sra_number', 'rics_number',
             'borrower_profile', 'lender_profile', 'consultant_profile',
-            'invited_by', 'created_at', 'updated_at',
+            'invited_by',
         ]
-        read_only_fields = ['id', 'invited_at', 'access_granted_at', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'invited_at', 'access_granted_at']
+        select_related = {
+            'user_name': PARTY_NAME_RELATED,
+            'user_email': PARTY_NAME_RELATED + ['borrower_profile__user', 'consultant_profile__user'],
+        }
 
 
-class DealStageSerializer(serializers.ModelSerializer):
+class DealStageSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealStage model."""
     
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -95,7 +125,7 @@ class DealStageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class DealTaskSerializer(serializers.ModelSerializer):
+class DealTaskSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealTask model."""
     
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -121,9 +151,11 @@ class DealTaskSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'completed_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'completed_at']
+        select_related = {'assignee_name': ['assignee_user', 'assignee_party__user']}
+        prefetch_related = {'dependencies': [_ids_only('dependencies', DealTask)]}
 
 
-class DealCPSerializer(serializers.ModelSerializer):
+class DealCPSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealCP (Conditions Precedent) model."""
     
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -138,9 +170,10 @@ class DealCPSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'satisfied_at', 'approved_at', 'rejected_at', 'created_at', 'updated_at']
+        prefetch_related = {'evidence_documents': [_ids_only('evidence_documents', Document)]}
 
 
-class DealRequisitionSerializer(serializers.ModelSerializer):
+class DealRequisitionSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealRequisition model."""
     
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -169,9 +202,14 @@ class DealRequisitionSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'requisition_number', 'responded_at', 'approved_at', 'created_at', 'updated_at']
+        select_related = {
+            'raised_by_name': ['raised_by__user'],
+            'responded_by_name': ['responded_by'],
+        }
+        prefetch_related = {'response_documents': [_ids_only('response_documents', Document)]}
 
 
-class DrawdownSerializer(serializers.ModelSerializer):
+class DrawdownSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Drawdown model."""
     
     lender_approval_status_display = serializers.CharField(source='get_lender_approval_status_display', read_only=True)
@@ -194,8 +232,11 @@ class DrawdownSerializer(serializers.ModelSerializer):
     
     def get_supporting_documents(self, obj):
         """Get supporting documents for this drawdown, grouped by category."""
-        from .models import DealDocumentLink
-        doc_links = DealDocumentLink.objects.filter(drawdown=obj).select_related('document', 'uploaded_by')
+        doc_links = getattr(obj, 'prefetched_supporting_documents', None)
+        if doc_links is None:
+            doc_links = DealDocumentLink.objects.filter(drawdown=obj).select_related('document', 'uploaded_by').defer(
+                *deferred_document_fields()
+            )
         return DealDocumentLinkSerializer(doc_links, many=True).data
     
     class Meta:
@@ -210,12 +251,26 @@ class DrawdownSerializer(serializers.ModelSerializer):
             'approved_by_name', 'approved_at', 'paid_at', 'payment_reference',
             'milestone', 'retention_amount', 'contingencies',
             'supporting_documents',
-            'created_at', 'updated_at',
+            'updated_at',
         ]
-        read_only_fields = ['id', 'requested_at', 'approved_at', 'paid_at', 'ms_reviewed_at', 'ms_approved_at', 'created_at', 'updated_at']
-
-
-class DealMessageThreadSerializer(serializers.ModelSerializer):
+        read_only_fields = ['id', 'requested_at', 'approved_at', 'paid_at', 'ms_reviewed_at', 'ms_approved_at', 'updated_at']
+        expandable_fields = ['supporting_documents']
+        select_related = {
+            'approved_by_name': ['approved_by'],
+            'ms_reviewed_by_name': ['ms_reviewed_by'],
+        }
+        prefetch_related = {
+            'supporting_documents': [Prefetch(
+                'supporting_documents',
+                queryset=DealDocumentLink.objects.select_related('document', 'uploaded_by').defer(
+                    *deferred_document_fields()
+                ).prefetch_related(_ids_only('visible_to_consultants', DealParty)),
+                to_attr='prefetched_supporting_documents',
+            )],
+        }
+
+
+class DealMessageThreadSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealMessageThread model."""
     
     thread_type_display = serializers.CharField(source='get_thread_type_display', read_only=True)
@@ -232,7 +287,8 @@ class DealMessageThreadSerializer(serializers.ModelSerializer):
     
     def get_message_count(self, obj):
         """Get count of messages in thread."""
-        return obj.messages.count()
+        total = getattr(obj, 'message_total', None)
+        return total if total is not None else obj.messages.count()
     
     def get_unread_count(self, obj):
         """Get count of unread messages (placeholder - would need read tracking)."""
@@ -263,9 +319,16 @@ class DealMessageThreadSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'last_message_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'last_message_at', 'message_count', 'unread_count', 'visible_to_party_names']
+        select_related = {'created_by_name': ['created_by']}
+        prefetch_related = {
+            # Both fields read the same prefetch, so it is applied once
+            'visible_to_parties': [Prefetch('visible_to_parties', queryset=DealParty.objects.select_related(*PARTY_NAME_RELATED))],
+            'visible_to_party_names': [Prefetch('visible_to_parties', queryset=DealParty.objects.select_related(*PARTY_NAME_RELATED))],
+        }
+        annotations = {'message_count': {'message_total': _row_count(DealMessage.objects.all(), 'thread')}}
 
 
-class DealMessageSerializer(serializers.ModelSerializer):
+class DealMessageSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealMessage model."""
     
     sender_name = serializers.SerializerMethodField()
@@ -312,9 +375,15 @@ class DealMessageSerializer(serializers.ModelSerializer):
             'message', 'attachments', 'is_own_message', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_own_message']
+        select_related = {
+            'sender_name': ['sender'] + [f'sender__{lookup}' for lookup in PARTY_NAME_RELATED],
+            'sender_role': ['sender'],
+            'sender_user_name': ['sender_user'],
+        }
+        prefetch_related = {'attachments': [_ids_only('attachments', Document)]}
 
 
-class DealDocumentLinkSerializer(serializers.ModelSerializer):
+class DealDocumentLinkSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealDocumentLink model."""
     
     uploaded_by_name = serializers.SerializerMethodField()
@@ -336,13 +405,15 @@ class DealDocumentLinkSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'deal', 'drawdown', 'document', 'document_category', 'document_category_display',
             'document_type_description', 'visibility', 'visibility_display', 'visible_to_consultants',
-            'uploaded_by', 'uploaded_by_name', 'uploaded_at', 'created_at',
+            'uploaded_by', 'uploaded_by_name', 'uploaded_at',
             'document_file_name', 'document_file_size', 'document_file_type',
         ]
-        read_only_fields = ['id', 'uploaded_at', 'created_at']
+        read_only_fields = ['id', 'uploaded_at']
+        select_related = {'uploaded_by_name': ['uploaded_by']}
+        prefetch_related = {'visible_to_consultants': [_ids_only('visible_to_consultants', DealParty)]}
 
 
-class DealDecisionSerializer(serializers.ModelSerializer):
+class DealDecisionSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealDecision model."""
     
     decision_type_display = serializers.CharField(source='get_decision_type_display', read_only=True)
@@ -371,9 +442,13 @@ class DealDecisionSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['id', 'created_at']
+        select_related = {
+            'made_by_name': ['made_by'],
+            'made_by_party_name': ['made_by_party__user'],
+        }
 
 
-class AuditEventSerializer(serializers.ModelSerializer):
+class AuditEventSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for AuditEvent model."""
     
     actor_user_name = serializers.SerializerMethodField()
@@ -401,16 +476,20 @@ class AuditEventSerializer(serializers.ModelSerializer):
             'diff_summary', 'metadata',
         ]
         read_only_fields = ['id', 'timestamp']
+        select_related = {
+            'actor_user_name': ['actor_user'],
+            'actor_party_name': ['actor_party__user'],
+        }
 
 
-class LawFirmSerializer(serializers.ModelSerializer):
+class LawFirmSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for LawFirm model."""
     
     class Meta:
         model = LawFirm
         fields = [
             'id', 'firm_name', 'sra_number', 'primary_contact_name',
-            'primary_contact_email', 'primary_contact_phone', 'address',
+            'primary_contact_email', 'primary_contact_phone',
             'coverage_regions', 'specialisms', 'compliance_validated',
             'compliance_validated_by', 'compliance_validated_at',
             'average_acknowledgment_hours', 'average_requisition_response_hours',
@@ -420,7 +499,7 @@ class LawFirmSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'compliance_validated_at', 'created_at', 'updated_at']
 
 
-class LawFirmPanelMembershipSerializer(serializers.ModelSerializer):
+class LawFirmPanelMembershipSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for LawFirmPanelMembership model."""
     
     firm_name = serializers.CharField(source='law_firm.firm_name', read_only=True)
@@ -440,9 +519,13 @@ class LawFirmPanelMembershipSerializer(serializers.ModelSerializer):
             'added_at', 'added_by', 'added_by_name',
         ]
         read_only_fields = ['id', 'added_at']
+        select_related = {
+            'firm_name': ['law_firm'],
+            'added_by_name': ['added_by'],
+        }
 
 
-class PerformanceMetricSerializer(serializers.ModelSerializer):
+class PerformanceMetricSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for PerformanceMetric model."""
     
     class Meta:
@@ -459,7 +542,7 @@ class PerformanceMetricSerializer(serializers.ModelSerializer):
 # Provider Workflow Serializers
 # ============================================================================
 
-class ProviderEnquirySerializer(serializers.ModelSerializer):
+class ProviderEnquirySerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ProviderEnquiry model."""
     
     provider_firm_name = serializers.CharField(source='provider_firm.organisation_name', read_only=True)
@@ -478,13 +561,19 @@ class ProviderEnquirySerializer(serializers.ModelSerializer):
             'acknowledgment_notes', 'has_quote', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'sent_at', 'viewed_at', 'acknowledged_at', 'created_at', 'updated_at']
+        select_related = {
+            'provider_firm_name': ['provider_firm'],
+            'deal_id_display': ['deal'],
+        }
+        annotations = {'has_quote': {'quote_exists': Exists(ProviderQuote.objects.filter(enquiry=OuterRef('pk')))}}
     
     def get_has_quote(self, obj):
         """Check if enquiry has an associated quote."""
-        return obj.quotes.exists()
+        exists = getattr(obj, 'quote_exists', None)
+        return exists if exists is not None else obj.quotes.exists()
 
 
-class ProviderQuoteSerializer(serializers.ModelSerializer):
+class ProviderQuoteSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ProviderQuote model."""
     
     enquiry_id = serializers.IntegerField(source='enquiry.id', read_only=True)
@@ -509,9 +598,16 @@ class ProviderQuoteSerializer(serializers.ModelSerializer):
             'enquiry_acknowledgment_notes', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'submitted_at', 'reviewed_at', 'accepted_at', 'created_at', 'updated_at']
+        select_related = {
+            'deal_id': ['enquiry__deal'],
+            'provider_firm_name': ['enquiry__provider_firm'],
+            'enquiry_acknowledged_at': ['enquiry'],
+            'enquiry_expected_quote_date': ['enquiry'],
+            'enquiry_acknowledgment_notes': ['enquiry'],
+        }
 
 
-class DealProviderSelectionSerializer(serializers.ModelSerializer):
+class DealProviderSelectionSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DealProviderSelection model."""
     
     provider_firm_name = serializers.CharField(source='provider_firm.organisation_name', read_only=True)
@@ -539,9 +635,15 @@ class DealProviderSelectionSerializer(serializers.ModelSerializer):
             'acting_for_party', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'selected_at', 'lender_approved_at', 'created_at', 'updated_at']
+        select_related = {
+            'provider_firm_name': ['provider_firm'],
+            'quote_amount': ['quote'],
+            'selected_by_name': ['selected_by'],
+            'lender_approved_by_name': ['lender_approved_by'],
+        }
 
 
-class ProviderStageInstanceSerializer(serializers.ModelSerializer):
+class ProviderStageInstanceSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ProviderStageInstance model."""
     
     provider_firm_name = serializers.CharField(source='provider_firm.organisation_name', read_only=True)
@@ -559,6 +661,20 @@ class ProviderStageInstanceSerializer(serializers.ModelSerializer):
             'next_stage', 'tasks', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'stage_entered_at', 'created_at', 'updated_at']
+        expandable_fields = ['tasks']
+        select_related = {'provider_firm_name': ['provider_firm']}
+        prefetch_related = {
+            'tasks': [
+                Prefetch('deal__parties', to_attr='prefetched_parties'),
+                Prefetch(
+                    'deal__tasks',
+                    queryset=DealTask.objects.select_related('stage', 'assignee_user', 'assignee_party__user')
+                    .prefetch_related(_ids_only('dependencies', DealTask))
+                    .order_by('due_date', 'priority', 'created_at'),
+                    to_attr='prefetched_tasks',
+                ),
+            ],
+        }
     
     def get_current_stage_display(self, obj):
         """Get display name for current stage."""
@@ -575,28 +691,39 @@ class ProviderStageInstanceSerializer(serializers.ModelSerializer):
     
     def get_tasks(self, obj):
         """Get tasks for this provider stage instance."""
-        from .models import DealTask, DealParty
-        
-        # Find provider's party
-        provider_party = DealParty.objects.filter(
-            deal=obj.deal,
-            consultant_profile=obj.provider_firm,
-            party_type=obj.role_type
-        ).first()
+        parties = getattr(obj.deal, 'prefetched_parties', None)
+        if parties is None:
+            provider_party = DealParty.objects.filter(
+                deal_id=obj.deal_id,
+                consultant_profile_id=obj.provider_firm_id,
+                party_type=obj.role_type
+            ).first()
+        else:
+            # Find provider's party
+            provider_party = min(
+                (party for party in parties
+                 if party.consultant_profile_id == obj.provider_firm_id and party.party_type == obj.role_type),
+                key=lambda party: party.pk,
+                default=None,
+            )
         
         if not provider_party:
             return []
         
         # Get tasks assigned to this provider party
-        tasks = DealTask.objects.filter(
-            deal=obj.deal,
-            assignee_party=provider_party
-        ).select_related('stage').order_by('due_date', 'priority', 'created_at')
+        tasks = getattr(obj.deal, 'prefetched_tasks', None)
+        if tasks is None:
+            tasks = DealTask.objects.filter(
+                deal_id=obj.deal_id,
+                assignee_party=provider_party
+            ).select_related('stage').order_by('due_date', 'priority', 'created_at')
+        else:
+            tasks = [task for task in tasks if task.assignee_party_id == provider_party.pk]
         
         return DealTaskSerializer(tasks, many=True, context=self.context).data
 
 
-class ProviderDeliverableSerializer(serializers.ModelSerializer):
+class ProviderDeliverableSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ProviderDeliverable model."""
     
     provider_firm_name = serializers.CharField(source='provider_firm.organisation_name', read_only=True)
@@ -629,11 +756,12 @@ class ProviderDeliverableSerializer(serializers.ModelSerializer):
     
     def get_has_revisions(self, obj):
         """Check if this deliverable has revisions."""
-        return obj.revisions.exists()
+        return self.get_revision_count(obj) > 0
     
     def get_revision_count(self, obj):
         """Get count of revisions."""
-        return obj.revisions.count()
+        total = getattr(obj, 'revision_total', None)
+        return total if total is not None else obj.revisions.count()
     
     class Meta:
         model = ProviderDeliverable
@@ -647,9 +775,21 @@ class ProviderDeliverableSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'uploaded_at', 'reviewed_at', 'version', 'version_history', 'created_at', 'updated_at']
-
-
-class ProviderAppointmentSerializer(serializers.ModelSerializer):
+        select_related = {
+            'provider_firm_name': ['provider_firm'],
+            'uploaded_by_name': ['uploaded_by'],
+            'reviewed_by_name': ['reviewed_by'],
+            'document_name': ['document'],
+            'document_size': ['document'],
+            'document_url': ['document'],
+        }
+        annotations = {
+            'has_revisions': {'revision_total': _row_count(ProviderDeliverable.objects.all(), 'parent_deliverable')},
+            'revision_count': {'revision_total': _row_count(ProviderDeliverable.objects.all(), 'parent_deliverable')},
+        }
+
+
+class ProviderAppointmentSerializer(PrefetchDeclarationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for ProviderAppointment model."""
     
     provider_firm_name = serializers.CharField(source='provider_firm.organisation_name', read_only=True)
@@ -721,3 +861,12 @@ class ProviderAppointmentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'confirmed_at', 'created_at', 'updated_at']
+        select_related = {
+            'provider_firm_name': ['provider_firm'],
+            'proposed_by_name': ['proposed_by'],
+            'confirmed_by_name': ['confirmed_by'],
+            'can_confirm': ['deal__borrower_company', 'deal__lender'],
+            'can_reschedule': ['deal__borrower_company', 'deal__lender', 'provider_firm'],
+            'can_cancel': ['deal__borrower_company', 'deal__lender', 'provider_firm'],
+            'can_complete': ['deal__lender', 'provider_firm'],
+        }
@@ -11,8 +11,10 @@ from django.conf import settings
 from .models import (
     Deal, DealParty, DealStage, DealTask, DealCP, DealRequisition,
     Drawdown, DealMessageThread, DealMessage, DealDocumentLink,
-    DealDecision, AuditEvent, LawFirm, ProviderDeliverable, DealProviderSelection
+    DealDecision, AuditEvent, LawFirm
 )
+from .criteria import DealState, compile_criterion, evaluate_criteria, get_next_stage
+from .readiness_service import ReadinessService
 from .workflow_templates import get_all_stage_templates
 from applications.models import Application
 
@@ -208,199 +210,9 @@ class DealService:
     
     @staticmethod
     def calculate_completion_readiness_score(deal: Deal) -> Dict[str, Any]:
-        """Calculate completion readiness score (0-100)."""
-        score = 0
-        breakdown = []
-        max_score = 100
-        
-        # 1. Mandatory CPs satisfied (highest weight: 40 points)
-        mandatory_cps = deal.conditions_precedent.filter(is_mandatory=True)
-        total_mandatory = mandatory_cps.count()
-        satisfied_mandatory = mandatory_cps.filter(status='satisfied').count()
-        
-        if total_mandatory > 0:
-            cp_score = (satisfied_mandatory / total_mandatory) * 40
-            score += cp_score
-            if cp_score < 40:
-                breakdown.append({
-                    'category': 'Mandatory CPs',
-                    'current': satisfied_mandatory,
-                    'required': total_mandatory,
-                    'weight': 40,
-                })
-        else:
-            # No mandatory CPs yet (stage 6 not reached)
-            breakdown.append({
-                'category': 'Mandatory CPs',
-                'current': 0,
-                'required': 0,
-                'weight': 40,
-                'note': 'No mandatory CPs defined yet',
-            })
-        
-        # 2. Critical path tasks complete (weight: 30 points)
-        critical_tasks = deal.tasks.filter(priority='critical')
-        total_critical = critical_tasks.count()
-        completed_critical = critical_tasks.filter(status='completed').count()
-        
-        if total_critical > 0:
-            task_score = (completed_critical / total_critical) * 30
-            score += task_score
-            if task_score < 30:
-                breakdown.append({
-                    'category': 'Critical Path Tasks',
-                    'current': completed_critical,
-                    'required': total_critical,
-                    'weight': 30,
-                })
-        else:
-            # No critical tasks defined yet
-            breakdown.append({
-                'category': 'Critical Path Tasks',
-                'current': 0,
-                'required': 0,
-                'weight': 30,
-                'note': 'No critical tasks defined yet',
-            })
-        
-        # 3. Legal execution completeness (weight: 15 points)
-        legal_stage = deal.stages.filter(name__icontains='legals').first()
-        if legal_stage:
-            legal_tasks = deal.tasks.filter(stage=legal_stage)
-            total_legal = legal_tasks.count()
-            completed_legal = legal_tasks.filter(status='completed').count()
-            
-            if total_legal > 0:
-                legal_score = (completed_legal / total_legal) * 15
-                score += legal_score
-                if legal_score < 15:
-                    breakdown.append({
-                        'category': 'Legal Execution',
-                        'current': completed_legal,
-                        'required': total_legal,
-                        'weight': 15,
-                    })
-        
-        # 4. KYC minimum clearance (weight: 10 points)
-        kyc_stage = deal.stages.filter(name__icontains='KYC').first()
-        if kyc_stage and kyc_stage.status == 'completed':
-            score += 10
-        elif kyc_stage:
-            breakdown.append({
-                'category': 'KYC Clearance',
-                'current': 0,
-                'required': 1,
-                'weight': 10,
-            })
-        
-        # 5. Provider deliverables (weight: 20 points)
-        # Check for required provider deliverables based on deal type and selected providers
-        provider_deliverable_score = 0
-        provider_deliverable_max = 20
-        
-        # Check if valuer is selected and if final valuation report is approved
-        valuer_selected = DealProviderSelection.objects.filter(
-            deal=deal,
-            role_type='valuer'
-        ).exists()
-        
-        if valuer_selected:
-            valuation_final = ProviderDeliverable.objects.filter(
-                deal=deal,
-                role_type='valuer',
-                deliverable_type='valuation_report',
-                status='approved'
-            ).exists()
-            if valuation_final:
-                provider_deliverable_score += 8  # Valuation report weight: 8 points
-            else:
-                breakdown.append({
-                    'category': 'Valuation Report',
-                    'current': 0,
-                    'required': 1,
-                    'weight': 8,
-                    'note': 'Final valuation report must be approved'
-                })
-        else:
-            # No valuer selected - check if deal requires valuation
-            # For now, assume all deals require valuation unless explicitly not required
-            breakdown.append({
-                'category': 'Valuation Report',
-                'current': 0,
-                'required': 0,
-                'weight': 8,
-                'note': 'No valuer selected'
-            })
-        
-        # Check if IMS is selected (development finance only) and if initial report is approved
-        if deal.facility_type == 'development':
-            ims_selected = DealProviderSelection.objects.filter(
-                deal=deal,
-                role_type='monitoring_surveyor'
-            ).exists()
-            
-            if ims_selected:
-                ims_initial = ProviderDeliverable.objects.filter(
-                    deal=deal,
-                    role_type='monitoring_surveyor',
-                    deliverable_type='ims_initial_report',
-                    status='approved'
-                ).exists()
-                if ims_initial:
-                    provider_deliverable_score += 7  # IMS initial report weight: 7 points
-                else:
-                    breakdown.append({
-                        'category': 'IMS Initial Report',
-                        'current': 0,
-                        'required': 1,
-                        'weight': 7,
-                        'note': 'IMS initial report must be approved'
-                    })
-            else:
-                breakdown.append({
-                    'category': 'IMS Initial Report',
-                    'current': 0,
-                    'required': 0,
-                    'weight': 7,
-                    'note': 'No IMS selected'
-                })
-        
-        # Check if legal CPs are satisfied (solicitor workspace)
-        solicitor_selected = DealProviderSelection.objects.filter(
-            deal=deal,
-            role_type='solicitor',
-            acting_for_party='lender'
-        ).exists()
-        
-        if solicitor_selected:
-            # Check if all mandatory CPs are satisfied (this is already checked above, but we can verify solicitor has marked them)
-            # For now, we'll rely on the CP satisfaction check above
-            # If we want to add a specific "solicitor confirmed CPs satisfied" deliverable, we can add it here
-            pass
-        
-        score += provider_deliverable_score
-        
-        # 6. Outstanding requisitions (weight: 5 points)
-        open_requisitions = deal.requisitions.filter(status__in=['open', 'responded'])
-        if open_requisitions.count() == 0:
-            score += 5
-        else:
-            breakdown.append({
-                'category': 'Outstanding Requisitions',
-                'current': open_requisitions.count(),
-                'required': 0,
-                'weight': 5,
-            })
-        
-        # Round score
-        score = round(score)
-        
-        return {
-            'score': score,
-            'max_score': max_score,
-            'breakdown': breakdown,
-            'calculated_at': timezone.now().isoformat(),
-        }
+        """Calculate completion readiness score (0-100) from the deal's readiness counters."""
+        counters = ReadinessService.get_counters(deal)
+        return ReadinessService.score(counters, deal.facility_type)
     
     @staticmethod
     def update_completion_readiness(deal: Deal):
@@ -416,196 +228,39 @@ class DealService:
         Check if deal is ready to complete by verifying all required provider deliverables.
         Returns dict with 'ready' boolean and 'blockers' list.
         """
-        blockers = []
-        
-        # Check if valuer is selected and final valuation report is approved
-        valuer_selected = DealProviderSelection.objects.filter(
-            deal=deal,
-            role_type='valuer'
-        ).exists()
-        
-        if valuer_selected:
-            valuation_final = ProviderDeliverable.objects.filter(
-                deal=deal,
-                role_type='valuer',
-                deliverable_type='valuation_report',
-                status='approved'
-            ).exists()
-            if not valuation_final:
-                blockers.append('Final valuation report must be approved')
-        
-        # Check if IMS is selected (development finance only) and initial report is approved
-        if deal.facility_type == 'development':
-            ims_selected = DealProviderSelection.objects.filter(
-                deal=deal,
-                role_type='monitoring_surveyor'
-            ).exists()
-            
-            if ims_selected:
-                ims_initial = ProviderDeliverable.objects.filter(
-                    deal=deal,
-                    role_type='monitoring_surveyor',
-                    deliverable_type='ims_initial_report',
-                    status='approved'
-                ).exists()
-                if not ims_initial:
-                    blockers.append('IMS initial report must be approved')
-        
-        # Check if all mandatory CPs are satisfied
-        mandatory_cps = deal.conditions_precedent.filter(is_mandatory=True)
-        if mandatory_cps.count() > 0:
-            satisfied_cps = mandatory_cps.filter(status__in=['satisfied', 'approved']).count()
-            if satisfied_cps < mandatory_cps.count():
-                blockers.append(f'All mandatory CPs must be satisfied ({satisfied_cps}/{mandatory_cps.count()})')
-        
-        # Check if solicitor has confirmed legal readiness (if solicitor selected)
-        solicitor_selected = DealProviderSelection.objects.filter(
-            deal=deal,
-            role_type='solicitor',
-            acting_for_party='lender'
-        ).exists()
-        
-        if solicitor_selected:
-            # Check if there are any open requisitions that block completion
-            open_requisitions = deal.requisitions.filter(status__in=['open', 'responded'])
-            if open_requisitions.count() > 0:
-                blockers.append(f'All requisitions must be closed ({open_requisitions.count()} open)')
-        
-        return {
-            'ready': len(blockers) == 0,
-            'blockers': blockers,
-            'checked_at': timezone.now().isoformat(),
-        }
+        counters = ReadinessService.get_counters(deal)
+        return ReadinessService.blockers(counters, deal.facility_type)
 
 
 class WorkflowEngine:
     """Workflow engine for managing deal progression."""
     
     @staticmethod
-    def check_stage_entry_criteria(deal: Deal, stage: DealStage) -> tuple[bool, list[str]]:
+    def check_stage_entry_criteria(deal: Deal, stage: DealStage,
+                                   state: Optional[DealState] = None) -> tuple[bool, list[str]]:
         """Check if entry criteria are met for a stage."""
-        unmet_criteria = []
-        
-        for criterion in stage.entry_criteria:
-            if not WorkflowEngine._evaluate_criterion(deal, criterion):
-                unmet_criteria.append(criterion)
-        
-        return len(unmet_criteria) == 0, unmet_criteria
+        return evaluate_criteria(stage.entry_criteria, state or DealState.load(deal))
     
     @staticmethod
-    def check_stage_exit_criteria(deal: Deal, stage: DealStage) -> tuple[bool, list[str]]:
+    def check_stage_exit_criteria(deal: Deal, stage: DealStage,
+                                  state: Optional[DealState] = None) -> tuple[bool, list[str]]:
         """Check if exit criteria are met for a stage."""
-        unmet_criteria = []
-        
-        for criterion in stage.exit_criteria:
-            if not WorkflowEngine._evaluate_criterion(deal, criterion):
-                unmet_criteria.append(criterion)
-        
-        return len(unmet_criteria) == 0, unmet_criteria
+        return evaluate_criteria(stage.exit_criteria, state or DealState.load(deal))
     
     @staticmethod
     def _evaluate_criterion(deal: Deal, criterion: str) -> bool:
         """Evaluate a single criterion."""
-        # Simple implementation - can be extended with more complex logic
-        criterion_lower = criterion.lower()
-        
-        # Check for stage completions
-        if 'stage' in criterion_lower or 'completed' in criterion_lower:
-            if 'kick-off' in criterion_lower:
-                kickoff_stage = deal.stages.filter(stage_number=1).first()
-                return kickoff_stage and kickoff_stage.status == 'completed'
-            elif 'kyc' in criterion_lower or 'aml' in criterion_lower:
-                kyc_stage = deal.stages.filter(stage_number=2).first()
-                return kyc_stage and kyc_stage.status == 'completed'
-            elif 'due diligence' in criterion_lower:
-                dd_stage = deal.stages.filter(stage_number=3).first()
-                return dd_stage and dd_stage.status == 'completed'
-            elif 'third-party' in criterion_lower or 'reports' in criterion_lower:
-                reports_stage = deal.stages.filter(stage_number=4).first()
-                return reports_stage and reports_stage.status == 'completed'
-            elif 'offer' in criterion_lower or 'facility letter' in criterion_lower:
-                offer_stage = deal.stages.filter(stage_number=5).first()
-                return offer_stage and offer_stage.status == 'completed'
-            elif 'mandatory cps' in criterion_lower or 'legals' in criterion_lower:
-                legal_stage = deal.stages.filter(stage_number=6).first()
-                if not legal_stage:
-                    return False
-                # Check if all mandatory CPs are satisfied
-                mandatory_cps = deal.conditions_precedent.filter(is_mandatory=True)
-                return mandatory_cps.count() > 0 and mandatory_cps.filter(status__in=['satisfied', 'approved']).count() == mandatory_cps.count()
-        
-        # Check for party appointments
-        if 'solicitor appointed' in criterion_lower:
-            return DealParty.objects.filter(
-                deal=deal,
-                party_type='solicitor',
-                acting_for_party='lender',
-                appointment_status='active',
-                is_active_lender_solicitor=True
-            ).exists()
-        elif 'valuer appointed' in criterion_lower:
-            return DealParty.objects.filter(
-                deal=deal,
-                party_type='valuer',
-                appointment_status='active'
-            ).exists()
-        elif 'ims' in criterion_lower or 'monitoring surveyor' in criterion_lower:
-            return DealParty.objects.filter(
-                deal=deal,
-                party_type='monitoring_surveyor',
-                appointment_status='active'
-            ).exists()
-        
-        # Check for provider deliverables
-        if 'valuation' in criterion_lower and ('final' in criterion_lower or 'issued' in criterion_lower or 'approved' in criterion_lower):
-            # Check if final valuation report is approved
-            return ProviderDeliverable.objects.filter(
-                deal=deal,
-                role_type='valuer',
-                deliverable_type='valuation_report',
-                status='approved'
-            ).exists()
-        
-        elif 'ims' in criterion_lower and ('initial' in criterion_lower or 'report' in criterion_lower) and ('issued' in criterion_lower or 'approved' in criterion_lower):
-            # Check if IMS initial report is approved (for development finance)
-            if deal.facility_type == 'development':
-                return ProviderDeliverable.objects.filter(
-                    deal=deal,
-                    role_type='monitoring_surveyor',
-                    deliverable_type='ims_initial_report',
-                    status='approved'
-                ).exists()
-            else:
-                # Not required for non-development deals
-                return True
-        
-        elif 'legal' in criterion_lower and ('cps' in criterion_lower or 'cp' in criterion_lower) and ('satisfied' in criterion_lower or 'ready' in criterion_lower):
-            # Check if all mandatory CPs are satisfied (legal workspace)
-            mandatory_cps = deal.conditions_precedent.filter(is_mandatory=True)
-            if mandatory_cps.count() == 0:
-                # No mandatory CPs defined yet
-                return False
-            return mandatory_cps.filter(status__in=['satisfied', 'approved']).count() == mandatory_cps.count()
-        
-        elif 'drawdown' in criterion_lower and 'certificate' in criterion_lower:
-            # Check if drawdown has IMS certificate (for specific drawdowns)
-            # This is checked per drawdown, not at deal level
-            # For now, return True if IMS is selected (certificate check happens at drawdown level)
-            return DealProviderSelection.objects.filter(
-                deal=deal,
-                role_type='monitoring_surveyor'
-            ).exists()
-        
-        # Default: assume criterion is met if no specific check matches
-        return True
+        return compile_criterion(criterion).evaluate(DealState.load(deal))
     
     @staticmethod
     @transaction.atomic
     def advance_to_next_stage(deal: Deal) -> Optional[DealStage]:
         """Advance deal to next stage if exit criteria are met."""
-        if not deal.current_stage:
+        state = DealState.load(deal)
+        
+        if not deal.current_stage_id:
             # Start with stage 1
-            first_stage = deal.stages.filter(stage_number=1).first()
+            first_stage = state.stages.get(1)
             if first_stage:
                 deal.current_stage = first_stage
                 first_stage.status = 'in_progress'
@@ -615,23 +270,27 @@ class WorkflowEngine:
                 return first_stage
             return None
         
+        current_stage = state.current_stage
+        if current_stage is None:
+            return None
+        
         # Check if current stage exit criteria are met
-        can_exit, unmet = WorkflowEngine.check_stage_exit_criteria(deal, deal.current_stage)
+        can_exit, unmet = evaluate_criteria(current_stage.exit_criteria, state)
         if not can_exit:
             return None
         
         # Complete current stage
-        deal.current_stage.status = 'completed'
-        deal.current_stage.completed_at = timezone.now()
-        deal.current_stage.save()
+        current_stage.status = 'completed'
+        current_stage.completed_at = timezone.now()
+        current_stage.save()
+        state.mark_stage_completed(current_stage.stage_number)
         
         # Find next stage
-        next_stage_number = deal.current_stage.stage_number + 1
-        next_stage = deal.stages.filter(stage_number=next_stage_number).first()
+        next_stage = get_next_stage(state)
         
         if next_stage:
             # Check entry criteria
-            can_enter, unmet = WorkflowEngine.check_stage_entry_criteria(deal, next_stage)
+            can_enter, unmet = evaluate_criteria(next_stage.entry_criteria, state)
             if can_enter:
                 deal.current_stage = next_stage
                 next_stage.status = 'in_progress'
@@ -652,3 +311,57 @@ class WorkflowEngine:
                 return next_stage
         
         return None
+    
+    @staticmethod
+    def advancement_report(deals) -> list[Dict[str, Any]]:
+        """
+        Report which deals can advance to their next stage.
+        
+        All deals are loaded in one prefetch pass and every entry/exit
+        criterion is answered from memory, so the query count does not
+        grow with the number of deals.
+        """
+        report = []
+        for deal in DealState.prefetch(deals.select_related(None).prefetch_related(None)):
+            state = DealState(deal)
+            current_stage = state.current_stage
+            entry = {
+                'deal_id': deal.deal_id,
+                'current_stage': current_stage.stage_number if current_stage else None,
+                'current_stage_name': current_stage.name if current_stage else None,
+                'next_stage': None,
+                'next_stage_name': None,
+                'can_advance': False,
+                'unmet_exit_criteria': [],
+                'unmet_entry_criteria': [],
+            }
+            
+            if current_stage is None:
+                # Deals that have not started can always enter stage 1
+                first_stage = state.stages.get(1)
+                if first_stage:
+                    entry.update({
+                        'next_stage': first_stage.stage_number,
+                        'next_stage_name': first_stage.name,
+                        'can_advance': True,
+                    })
+                report.append(entry)
+                continue
+            
+            can_exit, unmet_exit = evaluate_criteria(current_stage.exit_criteria, state)
+            entry['unmet_exit_criteria'] = unmet_exit
+            next_stage = get_next_stage(state)
+            if next_stage:
+                entry['next_stage'] = next_stage.stage_number
+                entry['next_stage_name'] = next_stage.name
+                if can_exit:
+                    # Entry criteria are judged as if the current stage were completed
+                    previous_status = current_stage.status
+                    state.mark_stage_completed(current_stage.stage_number)
+                    can_enter, unmet_entry = evaluate_criteria(next_stage.entry_criteria, state)
+                    current_stage.status = previous_status
+                    entry['unmet_entry_criteria'] = unmet_entry
+                    entry['can_advance'] = can_enter
+            report.append(entry)
+        
+        return report
@@ -1,7 +1,15 @@
 """Signals for deals module."""
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from applications.models import Application
+from consultants.models import ConsultantProfile
+from .access_service import DealAccessService
+from .provider_matching_service import invalidate_capability_index
+from .models import (
+    Deal, DealCP, DealParty, DealProviderSelection, DealReadiness, DealRequisition, DealStage, DealTask,
+    ProviderDeliverable, ProviderEnquiry, ProviderQuote,
+)
+from .readiness_service import ReadinessService, is_legal_stage_name
 from .services import DealService
 
 
@@ -20,3 +28,104 @@ def create_deal_on_acceptance(sender, instance, created, **kwargs):
                 import logging
                 logger = logging.getLogger(__name__)
                 logger.error(f"Signal: Failed to create deal on application acceptance: {e}", exc_info=True)
+
+
+# ============================================================================
+# DealAccess index maintenance
+# ============================================================================
+
+_ACCESS_KEY_FUNCTIONS = {
+    DealParty: DealAccessService.keys_for_party,
+    ProviderEnquiry: DealAccessService.keys_for_enquiry,
+    ProviderQuote: DealAccessService.keys_for_quote,
+    DealProviderSelection: DealAccessService.keys_for_selection,
+}
+
+
+def _capture_previous_access_keys(sender, instance, **kwargs):
+    """Remember the index keys of the stored row so FK changes drop old access."""
+    instance._previous_deal_access_keys = set()
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous is not None:
+            instance._previous_deal_access_keys = _ACCESS_KEY_FUNCTIONS[sender](previous)
+
+
+def _refresh_access_on_save(sender, instance, **kwargs):
+    """Refresh DealAccess rows affected by a saved row."""
+    keys = _ACCESS_KEY_FUNCTIONS[sender](instance)
+    keys |= getattr(instance, '_previous_deal_access_keys', set())
+    DealAccessService.schedule_refresh(keys)
+
+
+def _refresh_access_on_delete(sender, instance, **kwargs):
+    """Refresh DealAccess rows affected by a deleted row."""
+    DealAccessService.schedule_refresh(_ACCESS_KEY_FUNCTIONS[sender](instance))
+
+
+for _model in _ACCESS_KEY_FUNCTIONS:
+    pre_save.connect(_capture_previous_access_keys, sender=_model, dispatch_uid=f'deal_access_pre_save_{_model.__name__}')
+    post_save.connect(_refresh_access_on_save, sender=_model, dispatch_uid=f'deal_access_post_save_{_model.__name__}')
+    post_delete.connect(_refresh_access_on_delete, sender=_model, dispatch_uid=f'deal_access_post_delete_{_model.__name__}')
+
+
+# ============================================================================
+# Completion readiness counters
+# ============================================================================
+
+_READINESS_SOURCES = (DealCP, DealTask, DealStage, DealRequisition, DealProviderSelection, ProviderDeliverable)
+
+
+@receiver(post_save, sender=Deal, dispatch_uid='deal_readiness_create')
+def create_readiness_counters(sender, instance, created, **kwargs):
+    """Start every new deal with an empty readiness counter row."""
+    if created:
+        DealReadiness.objects.get_or_create(deal=instance)
+
+
+def _capture_previous_readiness(sender, instance, **kwargs):
+    """Remember the stored row's readiness contribution before it is overwritten."""
+    instance._previous_readiness = (None, None)
+    instance._previous_stage_name = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous is not None:
+            instance._previous_readiness = (previous.deal_id, ReadinessService.contribution(previous))
+            if sender is DealStage:
+                instance._previous_stage_name = previous.name
+
+
+def _apply_readiness_on_save(sender, instance, **kwargs):
+    """Apply the change in a saved row's readiness contribution."""
+    previous_deal_id, previous = getattr(instance, '_previous_readiness', (None, None))
+    ReadinessService.apply_change(
+        previous_deal_id, previous or {},
+        instance.deal_id, ReadinessService.contribution(instance),
+    )
+    # Renaming a stage into or out of "legals" moves its tasks between components
+    previous_name = getattr(instance, '_previous_stage_name', None)
+    if sender is DealStage and previous_name is not None:
+        if is_legal_stage_name(previous_name) != is_legal_stage_name(instance.name):
+            ReadinessService.recount_legal_tasks(instance.deal_id)
+
+
+def _apply_readiness_on_delete(sender, instance, **kwargs):
+    """Remove a deleted row's readiness contribution."""
+    ReadinessService.apply_change(instance.deal_id, ReadinessService.contribution(instance), None, {})
+
+
+for _model in _READINESS_SOURCES:
+    pre_save.connect(_capture_previous_readiness, sender=_model, dispatch_uid=f'deal_readiness_pre_save_{_model.__name__}')
+    post_save.connect(_apply_readiness_on_save, sender=_model, dispatch_uid=f'deal_readiness_post_save_{_model.__name__}')
+    post_delete.connect(_apply_readiness_on_delete, sender=_model, dispatch_uid=f'deal_readiness_post_delete_{_model.__name__}')
+
+
+# ============================================================================
+# Provider matching index
+# ============================================================================
+
+@receiver(post_save, sender=ConsultantProfile, dispatch_uid='provider_index_invalidate_on_save')
+@receiver(post_delete, sender=ConsultantProfile, dispatch_uid='provider_index_invalidate_on_delete')
+def invalidate_provider_index(sender, instance, **kwargs):
+    """Rebuild the provider capability index after any consultant profile change."""
+    invalidate_capability_index()
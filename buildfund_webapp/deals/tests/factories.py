@@ -0,0 +1,58 @@
+"""Minimal deal fixtures shared by the deals tests."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+
+from applications.models import Application
+from borrowers.models import BorrowerProfile
+from consultants.models import ConsultantProfile
+from lenders.models import LenderProfile
+from products.models import Product
+from projects.models import Project
+
+from deals.models import Deal
+
+
+def make_deals(n_deals: int = 3, prefix: str = "test") -> dict:
+    """
+    Create a lender, a borrower, a consultant and ``n_deals`` deals between them.
+
+    Returns a dict with ``lender``, ``borrower``, ``consultant`` (profiles),
+    their users ``lender_user``, ``borrower_user``, ``consultant_user``,
+    and ``deals``.
+    """
+    User = get_user_model()
+    lender_user = User.objects.create(username=f"{prefix}-lender")
+    lender = LenderProfile.objects.create(user=lender_user, organisation_name="Test Lender", contact_email="lender@test.invalid")
+    borrower_user = User.objects.create(username=f"{prefix}-borrower")
+    borrower = BorrowerProfile.objects.create(user=borrower_user, company_name="Test Borrower")
+    consultant_user = User.objects.create(username=f"{prefix}-consultant")
+    consultant = ConsultantProfile.objects.create(
+        user=consultant_user, organisation_name="Test Consultant",
+        primary_service="solicitor", contact_email="consultant@test.invalid",
+    )
+    product = Product.objects.create(
+        lender=lender, name="Test Product", funding_type="development_finance",
+        property_type="residential", min_loan_amount=1, max_loan_amount=10 ** 7,
+        interest_rate_min=1, interest_rate_max=10, term_min_months=1, term_max_months=24,
+        repayment_structure="interest_only",
+    )
+    deals = []
+    for i in range(n_deals):
+        project = Project.objects.create(
+            borrower=borrower, address="1 Test Street", town="Test", county="Test", postcode="TE1 1ST",
+            loan_amount_required=1000, funding_type="development_finance", property_type="residential",
+            development_extent="new_build", tenure="freehold", repayment_method="sale",
+        )
+        application = Application.objects.create(
+            project=project, lender=lender, product=product, proposed_loan_amount=1000, proposed_term_months=12,
+        )
+        deals.append(Deal.objects.create(
+            application=application, deal_id=f"{prefix.upper()}-{i:05d}", lender=lender,
+            borrower_company=borrower, facility_type="bridge",
+        ))
+    return {
+        "lender": lender, "borrower": borrower, "consultant": consultant,
+        "lender_user": lender_user, "borrower_user": borrower_user, "consultant_user": consultant_user,
+        "deals": deals,
+    }
@@ -0,0 +1,53 @@
+"""Tests for deal visibility through the DealAccess index."""
+from __future__ import annotations
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from deals.access_service import DealAccessService
+from deals.models import DealAccess, DealParty, ProviderEnquiry, ProviderQuote
+
+from .factories import make_deals
+
+
+class DealAccessScopeTests(TestCase):
+    def setUp(self):
+        self.fixture = make_deals(3, prefix="access")
+        self.consultant = self.fixture["consultant"]
+        self.user = self.fixture["consultant_user"]
+        self.party_deal, self.enquiry_deal, self.other_deal = self.fixture["deals"]
+        DealParty.objects.create(
+            deal=self.party_deal, consultant_profile=self.consultant,
+            party_type="valuer", appointment_status="active",
+        )
+        enquiry = ProviderEnquiry.objects.create(deal=self.enquiry_deal, provider_firm=self.consultant, role_type="valuer")
+        ProviderQuote.objects.create(enquiry=enquiry, role_type="valuer", price_gbp=1, lead_time_days=1)
+        DealAccessService.rebuild()
+
+    def test_index_records_every_reason(self):
+        reasons = dict(DealAccess.objects.filter(user=self.user).values_list("deal_id", "reasons"))
+        self.assertEqual(reasons[self.party_deal.pk], DealAccess.REASON_PARTY)
+        self.assertEqual(reasons[self.enquiry_deal.pk], DealAccess.REASON_ENQUIRY | DealAccess.REASON_QUOTE)
+        self.assertNotIn(self.other_deal.pk, reasons)
+
+    def test_enquiry_only_consultant_sees_the_deal(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get("/api/deals/deals/?fields=deal_id", HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {deal["deal_id"] for deal in response.data["results"]},
+            {self.party_deal.deal_id, self.enquiry_deal.deal_id},
+        )
+
+    def test_child_resources_require_a_party(self):
+        self.assertEqual(
+            set(DealAccessService.accessible_deals(self.user).values_list("pk", flat=True)),
+            {self.party_deal.pk},
+        )
+        self.assertTrue(DealAccessService.user_has_indexed_access(self.user, self.party_deal))
+        self.assertFalse(DealAccessService.user_has_indexed_access(self.user, self.enquiry_deal))
+
+    def test_owners_keep_access_to_child_resources(self):
+        for user in (self.fixture["lender_user"], self.fixture["borrower_user"]):
+            self.assertEqual(DealAccessService.accessible_deals(user).count(), 3)
@@ -0,0 +1,53 @@
+"""Query-count regression tests for consultant involvement on ``my-deals``."""
+from __future__ import annotations
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.testing import capture_sql
+
+from deals.access_service import DealAccessService
+from deals.involvement_service import ConsultantInvolvementService
+from deals.models import DealParty, DealProviderSelection, ProviderEnquiry, ProviderQuote
+
+from .factories import make_deals
+
+
+class ConsultantInvolvementQueryTests(TestCase):
+    def _involve(self, n_deals, prefix):
+        fixture = make_deals(n_deals, prefix=prefix)
+        consultant = fixture["consultant"]
+        for i, deal in enumerate(fixture["deals"]):
+            DealParty.objects.create(deal=deal, consultant_profile=consultant, party_type="valuer", appointment_status="active")
+            enquiry = ProviderEnquiry.objects.create(deal=deal, provider_firm=consultant, role_type="valuer")
+            if i % 2:
+                ProviderQuote.objects.create(enquiry=enquiry, role_type="valuer", price_gbp=1, lead_time_days=1)
+            if i % 3 == 0:
+                DealProviderSelection.objects.create(deal=deal, provider_firm=consultant, role_type="valuer")
+        DealAccessService.rebuild()
+        return fixture
+
+    def test_resolve_uses_three_queries_for_any_number_of_deals(self):
+        for n_deals, prefix in ((2, "few"), (15, "many")):
+            fixture = self._involve(n_deals, prefix)
+            deal_ids = [deal.pk for deal in fixture["deals"]]
+            with self.assertNumQueries(3):
+                resolved = ConsultantInvolvementService.resolve(fixture["consultant"], deal_ids)
+            self.assertEqual(set(resolved), set(deal_ids))
+            self.assertTrue(all(entry["involvement"]["via_party"] for entry in resolved.values()))
+
+    def test_my_deals_query_count_does_not_grow_with_deals(self):
+        counts = []
+        for n_deals, prefix in ((2, "few"), (15, "many")):
+            fixture = self._involve(n_deals, prefix)
+            client = APIClient()
+            client.force_authenticate(fixture["consultant_user"])
+            # Warm the request principal so both runs count the same work
+            client.get("/api/deals/deals/my-deals/", HTTP_HOST="localhost")
+            with capture_sql() as queries:
+                response = client.get("/api/deals/deals/my-deals/", HTTP_HOST="localhost")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), n_deals)
+            counts.append(len(queries))
+        self.assertGreater(counts[0], 0)
+        self.assertEqual(counts[0], counts[1])
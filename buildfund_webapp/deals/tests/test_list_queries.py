@@ -0,0 +1,93 @@
+"""Query-count regression tests for the deal list endpoints."""
+from __future__ import annotations
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.testing import capture_sql
+from documents.models import Document
+
+from deals.access_service import DealAccessService
+from deals.models import (
+    DealDocumentLink, DealMessage, DealMessageThread, DealParty, Drawdown,
+    ProviderDeliverable, ProviderEnquiry, ProviderQuote, ProviderStageInstance,
+)
+
+from .factories import make_deals
+
+ENDPOINTS = (
+    "deal-message-threads",
+    "deal-messages",
+    "provider-enquiries",
+    "provider-stages",
+    "provider-deliverables",
+    "drawdowns",
+)
+
+
+def _seed(n_deals: int, prefix: str) -> dict:
+    """``n_deals`` deals, each with one row (and its related rows) for every endpoint."""
+    fixture = make_deals(n_deals, prefix=prefix)
+    lender_user, consultant = fixture["lender_user"], fixture["consultant"]
+    for i, deal in enumerate(fixture["deals"]):
+        lender_party = DealParty.objects.create(
+            deal=deal, user=lender_user, lender_profile=fixture["lender"],
+            party_type="lender", appointment_status="active",
+        )
+        consultant_party = DealParty.objects.create(
+            deal=deal, consultant_profile=consultant, party_type="valuer", appointment_status="active",
+        )
+        document = Document.objects.create(
+            owner=lender_user, file_name=f"{prefix}-{i}.pdf", file_size=1, file_type="application/pdf", upload_path="",
+        )
+        thread = DealMessageThread.objects.create(deal=deal, subject="Progress", created_by=lender_user, is_private=True)
+        thread.visible_to_parties.add(lender_party, consultant_party)
+        message = DealMessage.objects.create(thread=thread, sender=lender_party, sender_user=lender_user, message="Hello")
+        message.attachments.add(document)
+        enquiry = ProviderEnquiry.objects.create(deal=deal, provider_firm=consultant, role_type="valuer")
+        ProviderQuote.objects.create(enquiry=enquiry, role_type="valuer", price_gbp=1, lead_time_days=1)
+        ProviderStageInstance.objects.create(deal=deal, provider_firm=consultant, role_type="valuer")
+        ProviderDeliverable.objects.create(
+            deal=deal, provider_firm=consultant, role_type="valuer", deliverable_type="valuation_report",
+            document=document, uploaded_by=fixture["consultant_user"],
+        )
+        drawdown = Drawdown.objects.create(
+            deal=deal, sequence_number=1, requested_amount=1, purpose="Groundworks", approved_by=lender_user,
+        )
+        DealDocumentLink.objects.create(deal=deal, document=document, drawdown=drawdown, uploaded_by=lender_user)
+    DealAccessService.rebuild()
+    return fixture
+
+
+class DealListQueryCountTests(TestCase):
+    def _counts(self, n_deals: int, prefix: str) -> dict:
+        fixture = _seed(n_deals, prefix)
+        client = APIClient()
+        client.force_authenticate(fixture["lender_user"])
+        counts = {}
+        for endpoint in ENDPOINTS:
+            url = f"/api/deals/{endpoint}/?expand=supporting_documents"
+            # Warm the request principal so both sizes count the same work
+            client.get(url, HTTP_HOST="localhost")
+            with capture_sql() as queries:
+                response = client.get(url, HTTP_HOST="localhost")
+            self.assertEqual(response.status_code, 200, endpoint)
+            self.assertEqual(len(response.data["results"]), n_deals, endpoint)
+            counts[endpoint] = len(queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        few = self._counts(3, "few")
+        many = self._counts(6, "many")
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint=endpoint):
+                self.assertEqual(few[endpoint], many[endpoint])
+
+    def test_previously_broken_list_endpoints_respond(self):
+        fixture = _seed(2, "smoke")
+        client = APIClient()
+        client.force_authenticate(fixture["lender_user"])
+        for endpoint in ("deal-parties", "deal-documents", "deal-requisitions", "law-firms", "drawdowns"):
+            with self.subTest(endpoint=endpoint):
+                response = client.get(f"/api/deals/{endpoint}/", HTTP_HOST="localhost")
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,160 @@
+"""Merged, cursor-paginated event stream for a deal's timeline.
+
+A deal's history lives in four tables (stages, tasks, decisions and audit
+events), each with its own timestamp column.  Rather than loading all four
+in full, each page runs one range query per source, bounded to the page
+size and ordered by ``(timestamp, id)`` so it is served by the
+``(deal, timestamp)`` indexes, and k-way merges the results.  Any page of
+``n`` events holds at most ``n`` rows from one source, so ``n + 1`` rows
+per source are always enough to fill the page and know whether more exist.
+
+Events are ordered newest first by ``(timestamp, type, id)``.  A cursor
+is that key, base64-encoded.  ``before`` pages towards older events and
+``after`` towards newer ones; each page reports the cursors for its first
+and last events.
+"""
+from __future__ import annotations
+
+import base64
+import heapq
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditEvent, DealDecision, DealStage, DealTask
+from .serializers import AuditEventSerializer, DealDecisionSerializer, DealStageSerializer, DealTaskSerializer
+
+
+@dataclass(frozen=True)
+class TimelineSource:
+    event_type: str
+    model: Any
+    timestamp_field: str
+    serializer_class: Any
+
+
+# Position in this list breaks ties between events with the same timestamp
+TIMELINE_SOURCES = [
+    TimelineSource('stage', DealStage, 'created_at', DealStageSerializer),
+    TimelineSource('task', DealTask, 'created_at', DealTaskSerializer),
+    TimelineSource('decision', DealDecision, 'created_at', DealDecisionSerializer),
+    TimelineSource('audit', AuditEvent, 'timestamp', AuditEventSerializer),
+]
+EVENT_TYPES = [source.event_type for source in TIMELINE_SOURCES]
+_RANK = {event_type: rank for rank, event_type in enumerate(EVENT_TYPES)}
+
+
+class InvalidTimelineCursor(ValueError):
+    """Raised for a cursor that was not produced by this service."""
+
+
+def encode_cursor(key: Tuple[Any, int, int]) -> str:
+    timestamp, rank, pk = key
+    raw = f"{timestamp.isoformat()}|{EVENT_TYPES[rank]}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, event_type, pk = raw.split('|')
+        key = (parse_datetime(timestamp), _RANK[event_type], int(pk))
+    except (ValueError, KeyError, UnicodeDecodeError):
+        raise InvalidTimelineCursor(cursor)
+    if key[0] is None:
+        raise InvalidTimelineCursor(cursor)
+    return key
+
+
+class DealTimelineService:
+    """Build one page of a deal's merged timeline."""
+
+    @staticmethod
+    def _range_filter(source: TimelineSource, rank: int, cursor, older: bool) -> Q:
+        """Rows whose ``(timestamp, rank, id)`` key lies strictly beyond the cursor."""
+        timestamp, cursor_rank, pk = cursor
+        field = source.timestamp_field
+        op = 'lt' if older else 'gt'
+        if rank == cursor_rank:
+            return Q(**{f'{field}__{op}': timestamp}) | Q(**{field: timestamp, f'id__{op}': pk})
+        # Another source at the same timestamp sorts wholly before or after the cursor
+        inclusive = (rank < cursor_rank) == older
+        return Q(**{f'{field}__{op}e' if inclusive else f'{field}__{op}': timestamp})
+
+    @classmethod
+    def _source_rows(cls, deal, source: TimelineSource, rank: int, cursor, older: bool, limit: int, context) -> Iterable:
+        field = source.timestamp_field
+        queryset = source.model.objects.filter(deal=deal)
+        if cursor is not None:
+            queryset = queryset.filter(cls._range_filter(source, rank, cursor, older))
+        direction = '-' if older else ''
+        queryset = queryset.order_by(f'{direction}{field}', f'{direction}id')
+        serializer = source.serializer_class(many=True, context=context).child
+        setup = getattr(serializer, 'setup_queryset', None)
+        if setup is not None:
+            queryset = setup(queryset)
+        return ((getattr(row, field), rank, row.pk, row) for row in queryset[:limit])
+
+    @classmethod
+    def page(
+        cls,
+        deal,
+        page_size: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        event_types: Optional[Iterable[str]] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Return ``{'results': [...], 'has_more': bool, 'first_cursor': ..., 'last_cursor': ...}``.
+
+        ``results`` are newest first, each ``{'type', 'timestamp', 'cursor', 'data'}``.
+        With ``after`` the page holds the oldest events newer than the cursor;
+        ``has_more`` then says whether newer events remain beyond the page.
+        """
+        if before and after:
+            raise InvalidTimelineCursor('before and after cannot be combined')
+        cursor = decode_cursor(before or after) if (before or after) else None
+        older = not after
+        wanted = set(event_types or EVENT_TYPES)
+        context = context or {}
+
+        streams = [
+            cls._source_rows(deal, source, rank, cursor, older, page_size + 1, context)
+            for rank, source in enumerate(TIMELINE_SOURCES)
+            if source.event_type in wanted
+        ]
+        merged = list(islice(heapq.merge(*streams, key=lambda row: row[:3], reverse=older), page_size + 1))
+        has_more = len(merged) > page_size
+        merged = merged[:page_size]
+        if not older:
+            merged.reverse()
+
+        # Serialize each source's rows together so list serializers run once per type
+        rows_by_rank: Dict[int, List[Any]] = {}
+        for _, rank, _, row in merged:
+            rows_by_rank.setdefault(rank, []).append(row)
+        data_by_key = {}
+        for rank, rows in rows_by_rank.items():
+            serialized = TIMELINE_SOURCES[rank].serializer_class(rows, many=True, context=context).data
+            for row, row_data in zip(rows, serialized):
+                data_by_key[(rank, row.pk)] = row_data
+
+        results = [
+            {
+                'type': EVENT_TYPES[rank],
+                'timestamp': timestamp,
+                'cursor': encode_cursor((timestamp, rank, pk)),
+                'data': data_by_key[(rank, pk)],
+            }
+            for timestamp, rank, pk, _ in merged
+        ]
+        return {
+            'results': results,
+            'has_more': has_more,
+            'first_cursor': results[0]['cursor'] if results else None,
+            'last_cursor': results[-1]['cursor'] if results else None,
+        }
@@ -5,134 +5,111 @@ from rest_framework import viewsets, permissions, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.conf import settings
 from django.db.models import Q, Prefetch, Max
 from django.utils import timezone
 
 from accounts.permissions import IsAdmin, IsLender
+from accounts.principal import get_principal
 from .models import (
-    Deal, DealParty, DealStage, DealTask, DealCP, DealRequisition,
+    Deal, DealParty, DealTask, DealCP, DealRequisition,
     Drawdown, DealMessageThread, DealMessage, DealDocumentLink,
-    DealDecision, AuditEvent, LawFirm, LawFirmPanelMembership,
+    AuditEvent, LawFirm, LawFirmPanelMembership,
     ProviderEnquiry, ProviderQuote, DealProviderSelection, ProviderStageInstance,
     ProviderDeliverable, ProviderAppointment
 )
-from documents.models import Document
+from documents.models import Document, deferred_document_fields
+from documents.pagination import DocumentCursorPagination
 from .serializers import (
     DealSerializer, DealPartySerializer, DealStageSerializer,
     DealTaskSerializer, DealCPSerializer, DealRequisitionSerializer,
     DrawdownSerializer, DealMessageThreadSerializer, DealMessageSerializer,
-    DealDocumentLinkSerializer, DealDecisionSerializer, AuditEventSerializer,
+    DealDocumentLinkSerializer,
     LawFirmSerializer, LawFirmPanelMembershipSerializer,
     ProviderEnquirySerializer, ProviderQuoteSerializer, DealProviderSelectionSerializer,
     ProviderStageInstanceSerializer, ProviderDeliverableSerializer, ProviderAppointmentSerializer
 )
 from rest_framework.parsers import MultiPartParser, FormParser
 from .services import DealService, WorkflowEngine
-from .provider_metrics_service import ProviderMetricsService
+from .provider_metrics_service import ROLLUP_WINDOWS, ProviderMetricsService
+from .involvement_service import ConsultantInvolvementService
+from .access_service import DealAccessService
+from .readiness_service import ReadinessService
+from .timeline_service import EVENT_TYPES as TIMELINE_EVENT_TYPES, DealTimelineService, InvalidTimelineCursor
+from .pagination import DealCursorPagination
+from core.pagination import NewestFirstCursorPagination
+from core.views import DeclaredQuerysetMixin
 from consultants.models import ConsultantProfile
 
 
-class DealViewSet(viewsets.ModelViewSet):
+class DealViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Deal CRUD operations."""
     
     serializer_class = DealSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DealCursorPagination
     lookup_field = 'deal_id'  # Use deal_id instead of pk for URL lookups
     
     def get_queryset(self):
         """Filter deals based on user role and permissions."""
         user = self.request.user
+        principal = get_principal(user)
         
         # Admin sees all deals
-        if IsAdmin().has_permission(self.request, self):
+        if principal.is_admin:
             return Deal.objects.select_related(
                 'lender', 'borrower_company', 'current_stage', 'application'
-            ).prefetch_related('parties', 'stages', 'tasks').all()
+            ).all()
         
         # Lender sees their deals
-        if hasattr(user, 'lenderprofile'):
-            return Deal.objects.filter(lender=user.lenderprofile).select_related(
+        if principal.is_lender:
+            return Deal.objects.filter(lender_id=principal.lender_profile_id).select_related(
                 'lender', 'borrower_company', 'current_stage', 'application'
-            ).prefetch_related('parties', 'stages', 'tasks').all()
+            ).all()
         
         # Borrower sees their deals
-        if hasattr(user, 'borrowerprofile'):
-            return Deal.objects.filter(borrower_company=user.borrowerprofile).select_related(
+        if principal.is_borrower:
+            return Deal.objects.filter(borrower_company_id=principal.borrower_profile_id).select_related(
                 'lender', 'borrower_company', 'current_stage', 'application'
-            ).prefetch_related('parties', 'stages', 'tasks').all()
+            ).all()
         
-        # Consultant sees deals they're involved with (via DealParty, ProviderEnquiry, ProviderQuote, or DealProviderSelection)
-        if hasattr(user, 'consultantprofile'):
-            consultant_profile = user.consultantprofile
-            
-            # Get deals via DealParty
-            deals_via_party = Deal.objects.filter(
-                parties__consultant_profile=consultant_profile,
-                parties__appointment_status='active'
-            )
-            
-            # Get deals via ProviderEnquiry (quote requests sent to them)
-            deals_via_enquiry = Deal.objects.filter(
-                provider_enquiries__provider_firm=consultant_profile
-            )
-            
-            # Get deals via ProviderQuote (quotes they submitted)
-            # ProviderQuote.enquiry -> ProviderEnquiry.deal, and ProviderEnquiry.provider_firm = consultant
-            deals_via_quote = Deal.objects.filter(
-                provider_enquiries__provider_firm=consultant_profile,
-                provider_enquiries__quotes__isnull=False
-            )
-            
-            # Get deals via DealProviderSelection (they were selected)
-            deals_via_selection = Deal.objects.filter(
-                provider_selections__provider_firm=consultant_profile
-            )
-            
-            # Combine all deals
-            all_deals = (
-                deals_via_party |
-                deals_via_enquiry |
-                deals_via_quote |
-                deals_via_selection
-            ).distinct()
-            
-            return all_deals.select_related(
+        # Consultant sees deals they're involved with (via DealParty, ProviderEnquiry, ProviderQuote, or DealProviderSelection),
+        # resolved through the DealAccess index (unique per user/deal, so no DISTINCT is needed)
+        if principal.is_consultant:
+            return Deal.objects.filter(access_entries__user=user).select_related(
                 'lender', 'borrower_company', 'current_stage', 'application'
-            ).prefetch_related('parties', 'stages', 'tasks')
+            )
         
         return Deal.objects.none()
     
     @action(detail=True, methods=['get'])
-    def readiness_score(self, request, pk=None):
-        """Get completion readiness score for a deal."""
+    def readiness_score(self, request, deal_id=None):
+        """Get completion readiness score for a deal (derived from readiness counters)."""
         deal = self.get_object()
-        DealService.update_completion_readiness(deal)
-        deal.refresh_from_db()
+        readiness = DealService.calculate_completion_readiness_score(deal)
         return Response({
-            'score': deal.completion_readiness_score,
-            'breakdown': deal.completion_readiness_breakdown,
+            'score': readiness['score'],
+            'breakdown': readiness,
         })
     
     @action(detail=True, methods=['get'], url_path='completion-readiness')
-    def completion_readiness(self, request, pk=None):
+    def completion_readiness(self, request, deal_id=None):
         """Check if deal is ready to complete (includes provider deliverables check)."""
         deal = self.get_object()
-        readiness_check = DealService.check_completion_readiness(deal)
-        # Also update the score
-        DealService.update_completion_readiness(deal)
-        deal.refresh_from_db()
+        counters = ReadinessService.get_counters(deal)
+        readiness = ReadinessService.score(counters, deal.facility_type)
         return Response({
-            **readiness_check,
-            'score': deal.completion_readiness_score,
-            'breakdown': deal.completion_readiness_breakdown,
+            **ReadinessService.blockers(counters, deal.facility_type),
+            'score': readiness['score'],
+            'breakdown': readiness,
         })
     
     @action(detail=True, methods=['post'])
-    def advance_stage(self, request, pk=None):
+    def advance_stage(self, request, deal_id=None):
         """Advance deal to next stage."""
         deal = self.get_object()
-        workflow = WorkflowEngine(deal)
-        next_stage = workflow.advance_to_next_stage()
+        next_stage = WorkflowEngine.advance_to_next_stage(deal)
         
         if next_stage:
             return Response({
@@ -145,20 +122,67 @@ class DealViewSet(viewsets.ModelViewSet):
             'message': 'Cannot advance: exit criteria not met or already at final stage',
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['get'], url_path='advance-report')
+    def advance_report(self, request):
+        """
+        Report which of the user's deals can advance to their next stage.
+        
+        Optional query params: ``can_advance=true|false`` filters the page's
+        results; ``page_size`` as for my_deals.
+        """
+        paginator = DealCursorPagination()
+        page = paginator.paginate_queryset(self.get_queryset(), request, view=self)
+        report = WorkflowEngine.advancement_report(Deal.objects.filter(pk__in=[deal.pk for deal in page]))
+        
+        can_advance = request.query_params.get('can_advance')
+        if can_advance is not None:
+            wanted = can_advance.lower() in ('1', 'true', 'yes')
+            report = [entry for entry in report if entry['can_advance'] == wanted]
+        
+        return paginator.get_paginated_response(report)
+    
     @action(detail=True, methods=['get'], url_path='timeline')
     def timeline(self, request, deal_id=None):
-        """Get deal timeline with all events."""
+        """
+        Get one page of the deal's stages, tasks, decisions and audit events, newest first.
+
+        Query params: ``before``/``after`` take an event ``cursor`` and page
+        towards older/newer events; ``types`` is a comma-separated subset of
+        ``stage,task,decision,audit``; ``page_size`` defaults to 50.
+        """
         deal = self.get_object()
-        stages = DealStage.objects.filter(deal=deal).order_by('stage_number')
-        tasks = DealTask.objects.filter(deal=deal).order_by('created_at')
-        decisions = DealDecision.objects.filter(deal=deal).order_by('made_at')
-        audit_events = AuditEvent.objects.filter(deal=deal).order_by('timestamp')
+        params = request.query_params
+        event_types = [name.strip() for name in params.get('types', '').split(',') if name.strip()]
+        unknown = set(event_types) - set(TIMELINE_EVENT_TYPES)
+        if unknown:
+            return Response(
+                {'error': f"Unknown event types: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            page_size = min(max(int(params.get('page_size', 50)), 1), getattr(settings, 'API_MAX_PAGE_SIZE', 200))
+        except ValueError:
+            page_size = 50
+        try:
+            page = DealTimelineService.page(
+                deal,
+                page_size,
+                before=params.get('before'),
+                after=params.get('after'),
+                event_types=event_types,
+                context=self.get_serializer_context(),
+            )
+        except InvalidTimelineCursor:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
         
+        url = remove_query_param(remove_query_param(request.build_absolute_uri(), 'before'), 'after')
+        paging_newer = 'after' in params
+        has_older = page['has_more'] if not paging_newer else bool(page['results'])
+        has_newer = page['has_more'] if paging_newer else 'before' in params
         return Response({
-            'stages': DealStageSerializer(stages, many=True).data,
-            'tasks': DealTaskSerializer(tasks, many=True).data,
-            'decisions': DealDecisionSerializer(decisions, many=True).data,
-            'audit_events': AuditEventSerializer(audit_events, many=True).data,
+            'next': replace_query_param(url, 'before', page['last_cursor']) if has_older and page['results'] else None,
+            'previous': replace_query_param(url, 'after', page['first_cursor']) if has_newer and page['results'] else None,
+            'results': page['results'],
         })
     
     @action(detail=False, methods=['get'], url_path='my-deals')
@@ -175,70 +199,26 @@ class DealViewSet(viewsets.ModelViewSet):
         consultant_profile = user.consultantprofile
         
         # Get all deals the consultant is involved with
-        deals = self.get_queryset()
-        
-        # Enrich with involvement details
-        enriched_deals = []
-        for deal in deals:
-            # Check involvement type
-            involvement = {
-                'via_party': DealParty.objects.filter(
-                    deal=deal,
-                    consultant_profile=consultant_profile,
-                    appointment_status='active'
-                ).exists(),
-                'via_enquiry': ProviderEnquiry.objects.filter(
-                    deal=deal,
-                    provider_firm=consultant_profile
-                ).exists(),
-                'via_quote': ProviderQuote.objects.filter(
-                    enquiry__deal=deal,
-                    enquiry__provider_firm=consultant_profile
-                ).exists(),
-                'via_selection': DealProviderSelection.objects.filter(
-                    deal=deal,
-                    provider_firm=consultant_profile
-                ).exists(),
-            }
-            
-            # Get role type if selected
-            role_type = None
-            selection = DealProviderSelection.objects.filter(
-                deal=deal,
-                provider_firm=consultant_profile
-            ).first()
-            if selection:
-                role_type = selection.role_type
-            
-            # Get party info if exists
-            party = DealParty.objects.filter(
-                deal=deal,
-                consultant_profile=consultant_profile
-            ).first()
-            if party:
-                role_type = role_type or party.party_type
-                involvement['party_type'] = party.party_type
-                involvement['acting_for_party'] = party.acting_for_party
-                involvement['appointment_status'] = party.appointment_status
-            
-            # Get active enquiry if exists
-            enquiry = ProviderEnquiry.objects.filter(
-                deal=deal,
-                provider_firm=consultant_profile
-            ).first()
-            if enquiry:
-                involvement['enquiry_status'] = enquiry.status
-                involvement['enquiry_role_type'] = enquiry.role_type
-            
-            deal_data = DealSerializer(deal).data
-            deal_data['consultant_involvement'] = involvement
-            deal_data['consultant_role_type'] = role_type
-            enriched_deals.append(deal_data)
+        deals = self.setup_serializer_queryset(self.get_queryset(), many=True)
+        
+        paginator = DealCursorPagination()
+        page = paginator.paginate_queryset(deals, request, view=self)
         
-        return Response(enriched_deals)
+        # Resolve involvement for the whole page in a fixed number of queries
+        involvement_by_deal = ConsultantInvolvementService.resolve(
+            consultant_profile, [deal.pk for deal in page]
+        )
+        
+        enriched_deals = DealSerializer(page, many=True).data
+        for deal, deal_data in zip(page, enriched_deals):
+            resolved = involvement_by_deal[deal.pk]
+            deal_data['consultant_involvement'] = resolved['involvement']
+            deal_data['consultant_role_type'] = resolved['role_type']
+        
+        return paginator.get_paginated_response(enriched_deals)
 
 
-class DealPartyViewSet(viewsets.ModelViewSet):
+class DealPartyViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for DealParty management."""
     
     serializer_class = DealPartySerializer
@@ -263,23 +243,20 @@ class DealPartyViewSet(viewsets.ModelViewSet):
             return DealParty.objects.select_related('user', 'deal').all()
         
         # Users see parties for deals they have access to
-        deals = Deal.objects.filter(
-            Q(lender__user=user) | 
-            Q(borrower_company__user=user) |
-            Q(parties__user=user, parties__is_active=True)
-        ).distinct()
+        deals = DealAccessService.accessible_deals(user)
         
         return DealParty.objects.filter(deal__in=deals).select_related('user', 'deal')
     
     def _user_has_deal_access(self, user, deal):
         """Check if user has access to a deal."""
-        if IsAdmin().has_permission(self.request, self):
+        principal = get_principal(user)
+        if principal.is_admin:
             return True
-        if hasattr(user, 'lenderprofile') and deal.lender == user.lenderprofile:
+        if principal.is_lender and deal.lender_id == principal.lender_profile_id:
             return True
-        if hasattr(user, 'borrowerprofile') and deal.borrower_company == user.borrowerprofile:
+        if principal.is_borrower and deal.borrower_company_id == principal.borrower_profile_id:
             return True
-        if DealParty.objects.filter(deal=deal, user=user, is_active=True).exists():
+        if DealAccessService.user_has_indexed_access(user, deal):
             return True
         return False
     
@@ -524,7 +501,7 @@ class DealPartyViewSet(viewsets.ModelViewSet):
         return Response(DealPartySerializer(deal_party).data)
 
 
-class DealTaskViewSet(viewsets.ModelViewSet):
+class DealTaskViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for DealTask management."""
     
     serializer_class = DealTaskSerializer
@@ -550,11 +527,7 @@ class DealTaskViewSet(viewsets.ModelViewSet):
         
         # Filter by user access to deals
         if not IsAdmin().has_permission(self.request, self):
-            deals = Deal.objects.filter(
-                Q(lender__user=user) |
-                Q(borrower_company__user=user) |
-                Q(parties__user=user, parties__is_active=True)
-            ).distinct()
+            deals = DealAccessService.accessible_deals(user)
             qs = qs.filter(deal__in=deals)
         
         return qs
@@ -575,7 +548,7 @@ class DealTaskViewSet(viewsets.ModelViewSet):
         return Response(DealTaskSerializer(task).data)
 
 
-class DealCPViewSet(viewsets.ModelViewSet):
+class DealCPViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Conditions Precedent management."""
     
     serializer_class = DealCPSerializer
@@ -597,11 +570,7 @@ class DealCPViewSet(viewsets.ModelViewSet):
                 qs = qs.none()
         
         if not IsAdmin().has_permission(self.request, self):
-            deals = Deal.objects.filter(
-                Q(lender__user=user) |
-                Q(borrower_company__user=user) |
-                Q(parties__user=user, parties__is_active=True)
-            ).distinct()
+            deals = DealAccessService.accessible_deals(user)
             qs = qs.filter(deal__in=deals)
         
         return qs
@@ -640,7 +609,7 @@ class DealCPViewSet(viewsets.ModelViewSet):
         return Response(DealCPSerializer(cp).data)
 
 
-class DealRequisitionViewSet(viewsets.ModelViewSet):
+class DealRequisitionViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Legal Requisitions."""
     
     serializer_class = DealRequisitionSerializer
@@ -662,14 +631,10 @@ class DealRequisitionViewSet(viewsets.ModelViewSet):
                 qs = qs.none()
         
         if not IsAdmin().has_permission(self.request, self):
-            deals = Deal.objects.filter(
-                Q(lender__user=user) |
-                Q(borrower_company__user=user) |
-                Q(parties__user=user, parties__is_active=True)
-            ).distinct()
+            deals = DealAccessService.accessible_deals(user)
             qs = qs.filter(deal__in=deals)
         
-        return qs.order_by('-raised_at')
+        return qs.order_by('-created_at')
     
     def perform_create(self, serializer):
         """Set raised_by to lender solicitor and generate requisition_number."""
@@ -717,7 +682,7 @@ class DealRequisitionViewSet(viewsets.ModelViewSet):
         return Response(DealRequisitionSerializer(requisition).data)
 
 
-class DrawdownViewSet(viewsets.ModelViewSet):
+class DrawdownViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Drawdown management (development finance only)."""
     
     serializer_class = DrawdownSerializer
@@ -739,11 +704,7 @@ class DrawdownViewSet(viewsets.ModelViewSet):
                 qs = qs.none()
         
         if not IsAdmin().has_permission(self.request, self):
-            deals = Deal.objects.filter(
-                Q(lender__user=user) |
-                Q(borrower_company__user=user) |
-                Q(parties__user=user, parties__is_active=True)
-            ).distinct()
+            deals = DealAccessService.accessible_deals(user)
             qs = qs.filter(deal__in=deals)
         
         return qs.order_by('sequence_number')
@@ -1023,7 +984,7 @@ class DrawdownViewSet(viewsets.ModelViewSet):
         return Response(DrawdownSerializer(drawdown).data)
 
 
-class DealMessageThreadViewSet(viewsets.ModelViewSet):
+class DealMessageThreadViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Deal message threads."""
     
     serializer_class = DealMessageThreadSerializer
@@ -1034,7 +995,7 @@ class DealMessageThreadViewSet(viewsets.ModelViewSet):
         user = self.request.user
         deal_id_param = self.request.query_params.get('deal_id')
         
-        qs = DealMessageThread.objects.select_related('deal', 'created_by').prefetch_related('visible_to_parties')
+        qs = DealMessageThread.objects.select_related('deal', 'created_by')
         
         if deal_id_param:
             # Look up Deal by deal_id (string) not id (integer)
@@ -1046,11 +1007,7 @@ class DealMessageThreadViewSet(viewsets.ModelViewSet):
         
         if not IsAdmin().has_permission(self.request, self):
             # Get deals user has access to
-            deals = Deal.objects.filter(
-                Q(lender__user=user) |
-                Q(borrower_company__user=user) |
-                Q(parties__user=user, parties__is_active=True)
-            ).distinct()
+            deals = DealAccessService.accessible_deals(user)
             qs = qs.filter(deal__in=deals)
             
             # Filter by party visibility
@@ -1138,11 +1095,12 @@ class DealMessageThreadViewSet(viewsets.ModelViewSet):
         thread.save()
 
 
-class DealMessageViewSet(viewsets.ModelViewSet):
-    """ViewSet for Deal messages."""
+class DealMessageViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
+    """ViewSet for Deal messages (newest first; clients reverse a page for display)."""
     
     serializer_class = DealMessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NewestFirstCursorPagination
     
     def get_queryset(self):
         """Filter messages based on thread access and user permissions."""
@@ -1210,7 +1168,7 @@ class DealMessageViewSet(viewsets.ModelViewSet):
         serializer.save(sender=user_party, sender_user=self.request.user)
 
 
-class LawFirmViewSet(viewsets.ModelViewSet):
+class LawFirmViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Law Firm management."""
     
     serializer_class = LawFirmSerializer
@@ -1219,14 +1177,15 @@ class LawFirmViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Lenders see their panel firms, admin sees all."""
         user = self.request.user
+        principal = get_principal(user)
         
-        if IsAdmin().has_permission(self.request, self):
+        if principal.is_admin:
             return LawFirm.objects.all()
         
-        if hasattr(user, 'lenderprofile'):
+        if principal.is_lender:
             # Return firms in lender's panel
             panel_firm_ids = LawFirmPanelMembership.objects.filter(
-                lender=user.lenderprofile,
+                lender_id=principal.lender_profile_id,
                 is_active=True
             ).values_list('law_firm_id', flat=True)
             return LawFirm.objects.filter(id__in=panel_firm_ids)
@@ -1234,7 +1193,7 @@ class LawFirmViewSet(viewsets.ModelViewSet):
         return LawFirm.objects.none()
 
 
-class LawFirmPanelMembershipViewSet(viewsets.ModelViewSet):
+class LawFirmPanelMembershipViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Law Firm Panel management."""
     
     serializer_class = LawFirmPanelMembershipSerializer
@@ -1243,24 +1202,26 @@ class LawFirmPanelMembershipViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Lenders see their panel memberships."""
         user = self.request.user
+        principal = get_principal(user)
         
-        if IsAdmin().has_permission(self.request, self):
+        if principal.is_admin:
             return LawFirmPanelMembership.objects.select_related('lender', 'law_firm').all()
         
-        if hasattr(user, 'lenderprofile'):
+        if principal.is_lender:
             return LawFirmPanelMembership.objects.filter(
-                lender=user.lenderprofile
+                lender_id=principal.lender_profile_id
             ).select_related('lender', 'law_firm')
         
         return LawFirmPanelMembership.objects.none()
 
 
-class DealDocumentLinkViewSet(viewsets.ModelViewSet):
+class DealDocumentLinkViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Deal Document management with secure access."""
     
     serializer_class = DealDocumentLinkSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    pagination_class = DocumentCursorPagination
     
     def get_queryset(self):
         """Filter documents based on user's deal access and visibility."""
@@ -1268,7 +1229,9 @@ class DealDocumentLinkViewSet(viewsets.ModelViewSet):
         deal_id_param = self.request.query_params.get('deal_id')
         category = self.request.query_params.get('category')
         
-        qs = DealDocumentLink.objects.select_related('deal', 'document', 'uploaded_by')
+        qs = DealDocumentLink.objects.select_related('deal', 'document', 'uploaded_by').defer(
+            *deferred_document_fields()
+        )
         
         if deal_id_param:
             # Look up Deal by deal_id (string) not id (integer)
@@ -1282,11 +1245,7 @@ class DealDocumentLinkViewSet(viewsets.ModelViewSet):
         
         # Filter by user access to deals
         if not IsAdmin().has_permission(self.request, self):
-            deals = Deal.objects.filter(
-                Q(lender__user=user) |
-                Q(borrower_company__user=user) |
-                Q(parties__user=user, parties__is_active=True)
-            ).distinct()
+            deals = DealAccessService.accessible_deals(user)
             qs = qs.filter(deal__in=deals)
         
         return qs.order_by('-uploaded_at')
@@ -1373,20 +1332,21 @@ class DealDocumentLinkViewSet(viewsets.ModelViewSet):
     
     def _user_can_view_document(self, user, doc_link):
         """Check if user can view this document based on visibility rules."""
+        principal = get_principal(user)
         deal = doc_link.deal
         
         # Admin can see all
-        if IsAdmin().has_permission(self.request, self):
+        if principal.is_admin:
             return True
         
         # Check visibility setting
         if doc_link.visibility == 'borrower_only':
-            return hasattr(user, 'borrowerprofile') and deal.borrower_company == user.borrowerprofile
+            return principal.is_borrower and deal.borrower_company_id == principal.borrower_profile_id
         elif doc_link.visibility == 'lender_only':
-            return hasattr(user, 'lenderprofile') and deal.lender == user.lenderprofile
+            return principal.is_lender and deal.lender_id == principal.lender_profile_id
         elif doc_link.visibility == 'shared':
-            return (hasattr(user, 'borrowerprofile') and deal.borrower_company == user.borrowerprofile) or \
-                   (hasattr(user, 'lenderprofile') and deal.lender == user.lenderprofile)
+            return (principal.is_borrower and deal.borrower_company_id == principal.borrower_profile_id) or \
+                   (principal.is_lender and deal.lender_id == principal.lender_profile_id)
         elif doc_link.visibility == 'consultant_scoped':
             party = DealParty.objects.filter(deal=deal, user=user, appointment_status='active').first()
             return party and doc_link.visible_to_consultants.filter(id=party.id).exists()
@@ -1414,7 +1374,7 @@ class DealDocumentLinkViewSet(viewsets.ModelViewSet):
 # Provider Workflow ViewSets
 # ============================================================================
 
-class ProviderEnquiryViewSet(viewsets.ModelViewSet):
+class ProviderEnquiryViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for ProviderEnquiry (quote requests)."""
     
     serializer_class = ProviderEnquirySerializer
@@ -1423,6 +1383,7 @@ class ProviderEnquiryViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter enquiries based on user role."""
         user = self.request.user
+        principal = get_principal(user)
         deal_id = self.request.query_params.get('deal_id')
         role_type = self.request.query_params.get('role_type')
         
@@ -1441,16 +1402,16 @@ class ProviderEnquiryViewSet(viewsets.ModelViewSet):
             qs = qs.filter(role_type=role_type)
         
         # Lender sees enquiries for their deals
-        if hasattr(user, 'lenderprofile'):
-            qs = qs.filter(deal__lender=user.lenderprofile)
+        if principal.is_lender:
+            qs = qs.filter(deal__lender_id=principal.lender_profile_id)
         
         # Borrower sees enquiries for their deals
-        elif hasattr(user, 'borrowerprofile'):
-            qs = qs.filter(deal__borrower_company=user.borrowerprofile)
+        elif principal.is_borrower:
+            qs = qs.filter(deal__borrower_company_id=principal.borrower_profile_id)
         
         # Consultant sees enquiries sent to them
-        elif hasattr(user, 'consultantprofile'):
-            qs = qs.filter(provider_firm=user.consultantprofile)
+        elif principal.is_consultant:
+            qs = qs.filter(provider_firm_id=principal.consultant_profile_id)
         
         # Admin sees all
         elif user.is_staff:
@@ -2267,9 +2228,55 @@ class ProviderEnquiryViewSet(viewsets.ModelViewSet):
             'role_type': role_type,
             'borrower_has_solicitor': False,
         })
+    
+    @action(detail=False, methods=['get'], url_path='matching-providers-bulk')
+    def matching_providers_bulk(self, request):
+        """
+        Get top matching providers for many deals at once (lender dashboard).
+        
+        Query params: ``role_type`` (required), ``deal_ids`` (comma-separated
+        deal references; defaults to the lender's active deals), ``limit``.
+        """
+        from .provider_matching_service import DealProviderMatchingService
+        
+        role_type = request.query_params.get('role_type')
+        limit = int(request.query_params.get('limit', 5))
+        deal_refs = [ref for ref in request.query_params.get('deal_ids', '').split(',') if ref]
+        
+        if not role_type:
+            return Response(
+                {'error': 'role_type is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if IsAdmin().has_permission(request, self):
+            deals = Deal.objects.all()
+        elif hasattr(request.user, 'lenderprofile'):
+            deals = Deal.objects.filter(lender=request.user.lenderprofile)
+        else:
+            return Response(
+                {'error': 'Only lenders can view matching providers'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if deal_refs:
+            deals = deals.filter(deal_id__in=deal_refs)
+        else:
+            deals = deals.filter(status='active')
+        deals = list(deals.only('id', 'deal_id'))
+        
+        matches = DealProviderMatchingService().match_deals(deals, role_type, limit=limit)
+        
+        return Response({
+            'role_type': role_type,
+            'results': [
+                {'deal_id': deal.deal_id, 'matching_providers': matches.get(deal.pk, [])}
+                for deal in deals
+            ],
+        })
 
 
-class ProviderQuoteViewSet(viewsets.ModelViewSet):
+class ProviderQuoteViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for ProviderQuote."""
     
     serializer_class = ProviderQuoteSerializer
@@ -2278,6 +2285,7 @@ class ProviderQuoteViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter quotes based on user role."""
         user = self.request.user
+        principal = get_principal(user)
         enquiry_id = self.request.query_params.get('enquiry_id')
         deal_id = self.request.query_params.get('deal_id')
         role_type = self.request.query_params.get('role_type')
@@ -2298,16 +2306,16 @@ class ProviderQuoteViewSet(viewsets.ModelViewSet):
             qs = qs.filter(role_type=role_type)
         
         # Lender sees quotes for their deals
-        if hasattr(user, 'lenderprofile'):
-            qs = qs.filter(enquiry__deal__lender=user.lenderprofile)
+        if principal.is_lender:
+            qs = qs.filter(enquiry__deal__lender_id=principal.lender_profile_id)
         
         # Borrower sees quotes for their deals
-        elif hasattr(user, 'borrowerprofile'):
-            qs = qs.filter(enquiry__deal__borrower_company=user.borrowerprofile)
+        elif principal.is_borrower:
+            qs = qs.filter(enquiry__deal__borrower_company_id=principal.borrower_profile_id)
         
         # Consultant sees their own quotes
-        elif hasattr(user, 'consultantprofile'):
-            qs = qs.filter(enquiry__provider_firm=user.consultantprofile)
+        elif principal.is_consultant:
+            qs = qs.filter(enquiry__provider_firm_id=principal.consultant_profile_id)
         
         # Admin sees all
         elif user.is_staff:
@@ -2482,7 +2490,7 @@ class ProviderQuoteViewSet(viewsets.ModelViewSet):
         return Response(ProviderQuoteSerializer(quote).data)
 
 
-class DealProviderSelectionViewSet(viewsets.ModelViewSet):
+class DealProviderSelectionViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for DealProviderSelection."""
     
     serializer_class = DealProviderSelectionSerializer
@@ -2491,6 +2499,7 @@ class DealProviderSelectionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter selections based on user role."""
         user = self.request.user
+        principal = get_principal(user)
         deal_id = self.request.query_params.get('deal_id')
         role_type = self.request.query_params.get('role_type')
         
@@ -2507,16 +2516,16 @@ class DealProviderSelectionViewSet(viewsets.ModelViewSet):
             qs = qs.filter(role_type=role_type)
         
         # Lender sees selections for their deals
-        if hasattr(user, 'lenderprofile'):
-            qs = qs.filter(deal__lender=user.lenderprofile)
+        if principal.is_lender:
+            qs = qs.filter(deal__lender_id=principal.lender_profile_id)
         
         # Borrower sees selections for their deals
-        elif hasattr(user, 'borrowerprofile'):
-            qs = qs.filter(deal__borrower_company=user.borrowerprofile)
+        elif principal.is_borrower:
+            qs = qs.filter(deal__borrower_company_id=principal.borrower_profile_id)
         
         # Consultant sees selections where they are selected
-        elif hasattr(user, 'consultantprofile'):
-            qs = qs.filter(provider_firm=user.consultantprofile)
+        elif principal.is_consultant:
+            qs = qs.filter(provider_firm_id=principal.consultant_profile_id)
         
         # Admin sees all
         elif user.is_staff:
@@ -2621,7 +2630,7 @@ class DealProviderSelectionViewSet(viewsets.ModelViewSet):
         # TODO: Send notifications
 
 
-class ProviderStageInstanceViewSet(viewsets.ModelViewSet):
+class ProviderStageInstanceViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for ProviderStageInstance."""
     
     serializer_class = ProviderStageInstanceSerializer
@@ -2630,6 +2639,7 @@ class ProviderStageInstanceViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter stage instances based on user role."""
         user = self.request.user
+        principal = get_principal(user)
         deal_id = self.request.query_params.get('deal_id')
         role_type = self.request.query_params.get('role_type')
         
@@ -2646,16 +2656,16 @@ class ProviderStageInstanceViewSet(viewsets.ModelViewSet):
             qs = qs.filter(role_type=role_type)
         
         # Lender sees stages for their deals
-        if hasattr(user, 'lenderprofile'):
-            qs = qs.filter(deal__lender=user.lenderprofile)
+        if principal.is_lender:
+            qs = qs.filter(deal__lender_id=principal.lender_profile_id)
         
         # Borrower sees stages for their deals
-        elif hasattr(user, 'borrowerprofile'):
-            qs = qs.filter(deal__borrower_company=user.borrowerprofile)
+        elif principal.is_borrower:
+            qs = qs.filter(deal__borrower_company_id=principal.borrower_profile_id)
         
         # Consultant sees their own stages
-        elif hasattr(user, 'consultantprofile'):
-            qs = qs.filter(provider_firm=user.consultantprofile)
+        elif principal.is_consultant:
+            qs = qs.filter(provider_firm_id=principal.consultant_profile_id)
         
         # Admin sees all
         elif user.is_staff:
@@ -2760,7 +2770,7 @@ class ProviderStageInstanceViewSet(viewsets.ModelViewSet):
         return Response(ProviderStageInstanceSerializer(stage_instance).data)
 
 
-class ProviderDeliverableViewSet(viewsets.ModelViewSet):
+class ProviderDeliverableViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for ProviderDeliverable."""
     
     serializer_class = ProviderDeliverableSerializer
@@ -2770,10 +2780,13 @@ class ProviderDeliverableViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter deliverables based on user role."""
         user = self.request.user
+        principal = get_principal(user)
         deal_id = self.request.query_params.get('deal_id')
         role_type = self.request.query_params.get('role_type')
         
-        qs = ProviderDeliverable.objects.select_related('deal', 'provider_firm', 'document').all()
+        qs = ProviderDeliverable.objects.select_related('deal', 'provider_firm', 'document').defer(
+            *deferred_document_fields()
+        )
         
         if deal_id:
             try:
@@ -2786,16 +2799,16 @@ class ProviderDeliverableViewSet(viewsets.ModelViewSet):
             qs = qs.filter(role_type=role_type)
         
         # Lender sees deliverables for their deals
-        if hasattr(user, 'lenderprofile'):
-            qs = qs.filter(deal__lender=user.lenderprofile)
+        if principal.is_lender:
+            qs = qs.filter(deal__lender_id=principal.lender_profile_id)
         
         # Borrower sees deliverables for their deals (read-only)
-        elif hasattr(user, 'borrowerprofile'):
-            qs = qs.filter(deal__borrower_company=user.borrowerprofile)
+        elif principal.is_borrower:
+            qs = qs.filter(deal__borrower_company_id=principal.borrower_profile_id)
         
         # Consultant sees their own deliverables
-        elif hasattr(user, 'consultantprofile'):
-            qs = qs.filter(provider_firm=user.consultantprofile)
+        elif principal.is_consultant:
+            qs = qs.filter(provider_firm_id=principal.consultant_profile_id)
         
         # Admin sees all
         elif user.is_staff:
@@ -2924,7 +2937,7 @@ class ProviderDeliverableViewSet(viewsets.ModelViewSet):
         return Response(ProviderDeliverableSerializer(deliverable).data)
 
 
-class ProviderAppointmentViewSet(viewsets.ModelViewSet):
+class ProviderAppointmentViewSet(DeclaredQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for ProviderAppointment."""
     
     serializer_class = ProviderAppointmentSerializer
@@ -2933,6 +2946,7 @@ class ProviderAppointmentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter appointments based on user role."""
         user = self.request.user
+        principal = get_principal(user)
         deal_id = self.request.query_params.get('deal_id')
         role_type = self.request.query_params.get('role_type')
         
@@ -2949,16 +2963,16 @@ class ProviderAppointmentViewSet(viewsets.ModelViewSet):
             qs = qs.filter(role_type=role_type)
         
         # Lender sees appointments for their deals
-        if hasattr(user, 'lenderprofile'):
-            qs = qs.filter(deal__lender=user.lenderprofile)
+        if principal.is_lender:
+            qs = qs.filter(deal__lender_id=principal.lender_profile_id)
         
         # Borrower sees appointments for their deals
-        elif hasattr(user, 'borrowerprofile'):
-            qs = qs.filter(deal__borrower_company=user.borrowerprofile)
+        elif principal.is_borrower:
+            qs = qs.filter(deal__borrower_company_id=principal.borrower_profile_id)
         
         # Consultant sees their own appointments
-        elif hasattr(user, 'consultantprofile'):
-            qs = qs.filter(provider_firm=user.consultantprofile)
+        elif principal.is_consultant:
+            qs = qs.filter(provider_firm_id=principal.consultant_profile_id)
         
         # Admin sees all
         elif user.is_staff:
@@ -3212,41 +3226,35 @@ class ProviderMetricsViewSet(viewsets.ViewSet):
         role_type = request.query_params.get('role_type')
         period_days = int(request.query_params.get('period_days', 90))
         
-        period_start = timezone.now() - timezone.timedelta(days=period_days)
-        period_end = timezone.now()
-        
-        # Calculate metrics
-        metrics = {}
-        
-        # Quote response time
-        quote_response = ProviderMetricsService.calculate_quote_response_time(
-            provider_firm, role_type, period_start, period_end
-        )
-        metrics['quote_response_time'] = quote_response
+        # Serve the precomputed rollup for standard windows; compute live otherwise
+        live = request.query_params.get('live', '').lower() in ('1', 'true', 'yes')
+        rollup = None
+        if period_days in ROLLUP_WINDOWS and not live:
+            rollup = ProviderMetricsService.get_rollup_metrics(provider_firm, role_type, period_days)
         
-        # Quote acceptance rate
-        acceptance = ProviderMetricsService.calculate_quote_acceptance_rate(
-            provider_firm, role_type, period_start, period_end
-        )
-        metrics['quote_acceptance_rate'] = acceptance
-        
-        # Deliverable delivery time
-        delivery = ProviderMetricsService.calculate_deliverable_delivery_time(
-            provider_firm, role_type, None, period_start, period_end
-        )
-        metrics['deliverable_delivery_time'] = delivery
+        if rollup is not None:
+            return Response({
+                'provider_firm': {
+                    'id': provider_firm.id,
+                    'name': provider_firm.organisation_name,
+                },
+                'role_type': role_type,
+                'period_start': rollup['period_start'],
+                'period_end': rollup['period_end'],
+                'metrics': rollup['metrics'],
+                'source': 'precomputed',
+                'calculated_at': rollup['calculated_at'],
+                'age_seconds': rollup['age_seconds'],
+                'is_stale': rollup['is_stale'],
+            })
         
-        # Deliverable rework count
-        rework = ProviderMetricsService.calculate_deliverable_rework_count(
-            provider_firm, role_type, period_start, period_end
-        )
-        metrics['deliverable_rework_count'] = rework
+        period_start = timezone.now() - timezone.timedelta(days=period_days)
+        period_end = timezone.now()
         
-        # Appointment lead time
-        appointment_lead = ProviderMetricsService.calculate_appointment_lead_time(
-            provider_firm, role_type, period_start, period_end
-        )
-        metrics['appointment_lead_time'] = appointment_lead
+        # Calculate all metrics in one batched pass
+        metrics = ProviderMetricsService.compute_metrics(
+            period_start, period_end, role_type, provider_firm_ids=[provider_firm.id]
+        )[(provider_firm.id, role_type)]
         
         return Response({
             'provider_firm': {
@@ -3256,5 +3264,9 @@ class ProviderMetricsViewSet(viewsets.ViewSet):
             'role_type': role_type,
             'period_start': period_start,
             'period_end': period_end,
-            'metrics': metrics
+            'metrics': metrics,
+            'source': 'live',
+            'calculated_at': period_end,
+            'age_seconds': 0,
+            'is_stale': False,
         })
@@ -35,6 +35,7 @@ pip install -r requirements.txt
 echo ""
 echo "2. Running database migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo ""
 echo "3. Collecting static files..."
@@ -1,105 +1,383 @@
-"""Document encryption service for secure file storage."""
+"""Document encryption service for secure file storage.
+
+Files are written in a streaming envelope format:
+
+* a fresh 256-bit data key per file, wrapped with AES-GCM under the master
+  key and stored in the header together with the master key's id, so the
+  master key can be rotated by re-wrapping headers only;
+* the plaintext split into fixed-size chunks, each sealed with AES-256-GCM
+  under the data key.  The nonce is a per-file random prefix, the chunk
+  index and a final-chunk flag, so chunks cannot be reordered, dropped or
+  truncated without failing authentication.
+
+Because chunks have a fixed size, any byte range can be decrypted by
+reading only the chunks that cover it.  Files produced by earlier versions
+(a single Fernet token) are still readable.
+
+Header layout (84 bytes)::
+
+    magic "BFDE" | version (1) | key id (8) | wrapped data key (60)
+    | chunk size (4, big-endian) | nonce prefix (7)
+"""
 from __future__ import annotations
 
+import base64
+import hashlib
 import os
+import struct
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional
+
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from django.conf import settings
 
+from .storage import iter_chunks
+
+MAGIC = b"BFDE"
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 64 * 1024
+TAG_SIZE = 16
+KEY_ID_SIZE = 8
+NONCE_PREFIX_SIZE = 7
+WRAPPED_KEY_SIZE = 12 + 32 + TAG_SIZE
+HEADER = struct.Struct(f">4sB{KEY_ID_SIZE}s{WRAPPED_KEY_SIZE}sI{NONCE_PREFIX_SIZE}s")
+HEADER_SIZE = HEADER.size
+
+# Fernet tokens are base64 of a 0x80 version byte
+LEGACY_PREFIX = b"gAAAAA"
+
+
+@dataclass
+class EnvelopeHeader:
+    key_id: bytes
+    wrapped_key: bytes
+    chunk_size: int
+    nonce_prefix: bytes
+
+    def pack(self) -> bytes:
+        return HEADER.pack(MAGIC, FORMAT_VERSION, self.key_id, self.wrapped_key, self.chunk_size, self.nonce_prefix)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "EnvelopeHeader":
+        if len(data) != HEADER_SIZE:
+            raise ValueError("Encrypted file is truncated")
+        magic, version, key_id, wrapped_key, chunk_size, nonce_prefix = HEADER.unpack(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a streaming-encrypted document")
+        return cls(key_id, wrapped_key, chunk_size, nonce_prefix)
+
+    @property
+    def aad(self) -> bytes:
+        # Everything except the key fields, so re-wrapping keeps chunks valid
+        return MAGIC + bytes([FORMAT_VERSION]) + struct.pack(">I", self.chunk_size) + self.nonce_prefix
+
+    def nonce(self, index: int, final: bool) -> bytes:
+        return self.nonce_prefix + struct.pack(">I", index) + (b"\x01" if final else b"\x00")
+
+
+class EncryptedStream:
+    """
+    Iterable of ciphertext blocks for a plaintext stream.
+
+    The SHA-256 and size of the plaintext are computed in the same pass and
+    are available once iteration has finished.
+    """
+
+    def __init__(self, aead: AESGCM, header: EnvelopeHeader, content):
+        self._aead = aead
+        self._header = header
+        self._content = content
+        self._digest = hashlib.sha256()
+        self.size = 0
+        self.finished = False
+
+    @property
+    def sha256(self) -> str:
+        if not self.finished:
+            raise RuntimeError("The stream has not been fully consumed")
+        return self._digest.hexdigest()
+
+    def __iter__(self) -> Iterator[bytes]:
+        header = self._header
+        yield header.pack()
+        index = 0
+        pending = b""
+        buffered = bytearray()
+        for piece in iter_chunks(self._content, header.chunk_size):
+            buffered += piece
+            while len(buffered) >= header.chunk_size:
+                # Hold one chunk back: only the last chunk is sealed as final
+                if pending:
+                    yield self._seal(pending, index, final=False)
+                    index += 1
+                pending = bytes(buffered[:header.chunk_size])
+                del buffered[:header.chunk_size]
+        if buffered:
+            if pending:
+                yield self._seal(pending, index, final=False)
+                index += 1
+            pending = bytes(buffered)
+        yield self._seal(pending, index, final=True)
+        self.finished = True
+
+    def _seal(self, plaintext: bytes, index: int, final: bool) -> bytes:
+        self._digest.update(plaintext)
+        self.size += len(plaintext)
+        return self._aead.encrypt(self._header.nonce(index, final), plaintext, self._header.aad)
+
+
+def derive_master_key(key: str) -> bytes:
+    """Derive the 256-bit key-wrapping key from a Fernet-format secret."""
+    return HKDF(
+        algorithm=hashes.SHA256(), length=32, salt=None, info=b"buildfund-document-kek"
+    ).derive(base64.urlsafe_b64decode(key.encode()))
+
+
+def master_key_id(master_key: bytes) -> bytes:
+    return hashlib.sha256(master_key).digest()[:KEY_ID_SIZE]
+
 
 class DocumentEncryption:
     """Service for encrypting and decrypting documents."""
-    
-    def __init__(self):
-        """Initialize encryption service with key from environment."""
-        encryption_key = os.environ.get('DOCUMENT_ENCRYPTION_KEY')
+
+    def __init__(self, key: Optional[str] = None, retired_keys: Iterable[str] = (), storage_path=None):
+        """
+        Initialize encryption service with key from environment.
+
+        ``DOCUMENT_ENCRYPTION_RETIRED_KEYS`` (comma-separated) lists previous
+        keys that can still decrypt files until they are re-wrapped.
+        """
+        encryption_key = key or os.environ.get('DOCUMENT_ENCRYPTION_KEY')
         if not encryption_key:
             raise ValueError(
                 "DOCUMENT_ENCRYPTION_KEY environment variable is required. "
                 "Generate one with: python -c \"from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())\""
             )
+        if not retired_keys:
+            retired_keys = [k for k in os.environ.get('DOCUMENT_ENCRYPTION_RETIRED_KEYS', '').split(',') if k.strip()]
         self.cipher = Fernet(encryption_key.encode())
-        self.storage_path = Path(settings.MEDIA_ROOT) / 'encrypted_documents'
+        self.legacy_ciphers = [self.cipher] + [Fernet(k.strip().encode()) for k in retired_keys]
+
+        master_key = derive_master_key(encryption_key)
+        self.key_id = master_key_id(master_key)
+        self.master_keys: Dict[bytes, bytes] = {self.key_id: master_key}
+        for retired in retired_keys:
+            retired_master = derive_master_key(retired.strip())
+            self.master_keys.setdefault(master_key_id(retired_master), retired_master)
+
+        self.storage_path = Path(storage_path or Path(settings.MEDIA_ROOT) / 'encrypted_documents')
         self.storage_path.mkdir(parents=True, exist_ok=True)
-    
+
+    # ------------------------------------------------------------------
+    # Envelope keys
+    # ------------------------------------------------------------------
+
+    def _wrap(self, data_key: bytes) -> bytes:
+        nonce = os.urandom(12)
+        return nonce + AESGCM(self.master_keys[self.key_id]).encrypt(nonce, data_key, b"data-key" + self.key_id)
+
+    def _unwrap_data_key(self, header: EnvelopeHeader) -> bytes:
+        master_key = self.master_keys.get(header.key_id)
+        if master_key is None:
+            raise ValueError(f"Unknown encryption key id {header.key_id.hex()}")
+        nonce, sealed = header.wrapped_key[:12], header.wrapped_key[12:]
+        try:
+            return AESGCM(master_key).decrypt(nonce, sealed, b"data-key" + header.key_id)
+        except InvalidTag:
+            raise ValueError("Failed to unwrap the document data key")
+
+    def _unwrap(self, header: EnvelopeHeader) -> AESGCM:
+        return AESGCM(self._unwrap_data_key(header))
+
+    @staticmethod
+    def read_header(fileobj: BinaryIO) -> EnvelopeHeader:
+        fileobj.seek(0)
+        return EnvelopeHeader.unpack(fileobj.read(HEADER_SIZE))
+
+    # ------------------------------------------------------------------
+    # Streaming API
+    # ------------------------------------------------------------------
+
+    def encrypt_stream(self, content, chunk_size: int = DEFAULT_CHUNK_SIZE) -> EncryptedStream:
+        """Return an iterable that encrypts content (file, chunk iterable or bytes) chunk by chunk."""
+        data_key = AESGCM.generate_key(bit_length=256)
+        header = EnvelopeHeader(
+            key_id=self.key_id,
+            wrapped_key=self._wrap(data_key),
+            chunk_size=chunk_size,
+            nonce_prefix=os.urandom(NONCE_PREFIX_SIZE),
+        )
+        return EncryptedStream(AESGCM(data_key), header, content)
+
+    def _open_chunk(self, aead: AESGCM, header: EnvelopeHeader, sealed: bytes, index: int, final: bool) -> bytes:
+        try:
+            return aead.decrypt(header.nonce(index, final), sealed, header.aad)
+        except InvalidTag:
+            raise ValueError(f"Encrypted chunk {index} failed authentication")
+
+    def decrypt_stream(self, fileobj: BinaryIO) -> Iterator[bytes]:
+        """Yield decrypted chunks of a streaming-encrypted file."""
+        header = self.read_header(fileobj)
+        aead = self._unwrap(header)
+        sealed_size = header.chunk_size + TAG_SIZE
+        index = 0
+        sealed = fileobj.read(sealed_size)
+        while True:
+            following = fileobj.read(sealed_size)
+            yield self._open_chunk(aead, header, sealed, index, final=not following)
+            if not following:
+                return
+            sealed = following
+            index += 1
+
+    def plaintext_size(self, fileobj: BinaryIO) -> int:
+        """Return the decrypted size of a streaming-encrypted file without decrypting it."""
+        header = self.read_header(fileobj)
+        body = fileobj.seek(0, os.SEEK_END) - HEADER_SIZE
+        chunks = max(1, -(-body // (header.chunk_size + TAG_SIZE)))
+        return body - chunks * TAG_SIZE
+
+    def decrypt_range(self, fileobj: BinaryIO, start: int, end: int) -> Iterator[bytes]:
+        """Yield the plaintext bytes start..end (inclusive), decrypting only the chunks covering them."""
+        size = self.plaintext_size(fileobj)
+        header = self.read_header(fileobj)
+        if start < 0 or start > end or end >= size:
+            raise ValueError("Range not satisfiable")
+        aead = self._unwrap(header)
+        sealed_size = header.chunk_size + TAG_SIZE
+        last_index = max(0, -(-size // header.chunk_size) - 1)
+        for index in range(start // header.chunk_size, end // header.chunk_size + 1):
+            fileobj.seek(HEADER_SIZE + index * sealed_size)
+            plaintext = self._open_chunk(aead, header, fileobj.read(sealed_size), index, final=index == last_index)
+            offset = index * header.chunk_size
+            yield plaintext[max(start - offset, 0):end - offset + 1]
+
+    def rewrap(self, fileobj: BinaryIO) -> bool:
+        """
+        Re-wrap a file's data key under the current master key, in place.
+
+        Only the header is rewritten.  Returns False if the file already
+        uses the current key.
+        """
+        header = self.read_header(fileobj)
+        if header.key_id == self.key_id:
+            return False
+        data_key = self._unwrap_data_key(header)
+        header.key_id = self.key_id
+        header.wrapped_key = self._wrap(data_key)
+        fileobj.seek(0)
+        fileobj.write(header.pack())
+        return True
+
+    @staticmethod
+    def is_legacy(fileobj: BinaryIO) -> bool:
+        """Return True for files written as a single Fernet token."""
+        fileobj.seek(0)
+        return fileobj.read(len(LEGACY_PREFIX)) == LEGACY_PREFIX
+
+    def iter_decrypted_file(self, encrypted_path: str, start: Optional[int] = None, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the decrypted content (or an inclusive byte range of it) of an encrypted file."""
+        with open(encrypted_path, 'rb') as f:
+            if self.is_legacy(f):
+                f.seek(0)
+                content = self.decrypt_legacy(f.read())
+                yield content[start or 0:None if end is None else end + 1]
+                return
+            if start is None and end is None:
+                yield from self.decrypt_stream(f)
+            else:
+                size = self.plaintext_size(f)
+                yield from self.decrypt_range(f, start or 0, size - 1 if end is None else end)
+
+    def decrypt_legacy(self, token: bytes) -> bytes:
+        for cipher in self.legacy_ciphers:
+            try:
+                return cipher.decrypt(token)
+            except Exception:
+                continue
+        raise ValueError("Failed to decrypt file: no configured key matches")
+
+    # ------------------------------------------------------------------
+    # File API
+    # ------------------------------------------------------------------
+
     def encrypt_file(self, file_path: str) -> tuple[str, str]:
         """
         Encrypt a file and store it securely.
-        
+
         Args:
             file_path: Path to the file to encrypt
-            
+
         Returns:
             Tuple of (encrypted_file_path, encryption_metadata)
         """
         file_path_obj = Path(file_path)
         if not file_path_obj.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-        
-        # Read file content
-        with open(file_path_obj, 'rb') as f:
-            file_content = f.read()
-        
-        # Encrypt content
-        encrypted_content = self.cipher.encrypt(file_content)
-        
-        # Generate secure filename
-        import hashlib
-        file_hash = hashlib.sha256(file_content).hexdigest()
-        encrypted_filename = f"{file_hash}.enc"
-        encrypted_path = self.storage_path / encrypted_filename
-        
-        # Write encrypted file
-        with open(encrypted_path, 'wb') as f:
-            f.write(encrypted_content)
-        
+
+        # Encrypt and hash in one pass into a temporary file, then name it by hash
+        fd, tmp_name = tempfile.mkstemp(dir=self.storage_path, suffix='.tmp')
+        try:
+            with open(file_path_obj, 'rb') as source, os.fdopen(fd, 'wb') as out:
+                stream = self.encrypt_stream(source)
+                for block in stream:
+                    out.write(block)
+            file_hash = stream.sha256
+            encrypted_filename = f"{file_hash}.enc"
+            encrypted_path = self.storage_path / encrypted_filename
+            os.replace(tmp_name, encrypted_path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
         # Return metadata (original filename, hash, etc.)
         metadata = {
             'original_filename': file_path_obj.name,
             'file_hash': file_hash,
             'encrypted_filename': encrypted_filename,
         }
-        
+
         return str(encrypted_path), str(metadata)
-    
+
     def decrypt_file(self, encrypted_path: str, output_path: str = None) -> bytes:
         """
         Decrypt a file.
-        
+
+        Loads the whole file; use ``iter_decrypted_file`` to stream it.
+
         Args:
             encrypted_path: Path to encrypted file
             output_path: Optional path to save decrypted file (if None, returns bytes)
-            
+
         Returns:
             Decrypted file content as bytes
         """
         encrypted_path_obj = Path(encrypted_path)
         if not encrypted_path_obj.exists():
             raise FileNotFoundError(f"Encrypted file not found: {encrypted_path}")
-        
-        # Read encrypted content
-        with open(encrypted_path_obj, 'rb') as f:
-            encrypted_content = f.read()
-        
-        # Decrypt content
-        try:
-            decrypted_content = self.cipher.decrypt(encrypted_content)
-        except Exception as e:
-            raise ValueError(f"Failed to decrypt file: {str(e)}")
-        
+
+        decrypted_content = b"".join(self.iter_decrypted_file(str(encrypted_path_obj)))
+
         # Save to output path if provided
         if output_path:
             output_path_obj = Path(output_path)
             output_path_obj.parent.mkdir(parents=True, exist_ok=True)
             with open(output_path_obj, 'wb') as f:
                 f.write(decrypted_content)
-        
+
         return decrypted_content
-    
+
     def encrypt_bytes(self, data: bytes) -> bytes:
         """Encrypt bytes data."""
         return self.cipher.encrypt(data)
-    
+
     def decrypt_bytes(self, encrypted_data: bytes) -> bytes:
         """Decrypt bytes data."""
         return self.cipher.decrypt(encrypted_data)
@@ -0,0 +1,86 @@
+"""Benchmark document encryption: whole-file Fernet vs streaming chunked envelopes."""
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from cryptography.fernet import Fernet
+from django.core.management.base import BaseCommand
+
+from documents.encryption import DEFAULT_CHUNK_SIZE, DocumentEncryption
+
+
+class Command(BaseCommand):
+    help = (
+        "Encrypt and decrypt a synthetic file with the legacy Fernet path and the streaming "
+        "chunked format, reporting throughput, peak Python memory and on-disk size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=int, default=64, help='Synthetic file size in MB (default: 64).')
+        parser.add_argument(
+            '--chunk-kb', type=int, default=DEFAULT_CHUNK_SIZE // 1024,
+            help=f'Streaming chunk size in KB (default: {DEFAULT_CHUNK_SIZE // 1024}).',
+        )
+
+    def handle(self, *args, **options):
+        size = options['size_mb'] * 1024 * 1024
+        chunk_size = options['chunk_kb'] * 1024
+        with tempfile.TemporaryDirectory() as tmp:
+            encryption = DocumentEncryption(
+                key=os.environ.get('DOCUMENT_ENCRYPTION_KEY') or Fernet.generate_key().decode(),
+                storage_path=tmp,
+            )
+            source = os.path.join(tmp, 'plain.bin')
+            with open(source, 'wb') as f:
+                for _ in range(0, size, 1024 * 1024):
+                    f.write(os.urandom(1024 * 1024))
+            self.stdout.write(f"Synthetic file: {options['size_mb']} MB, chunk size {options['chunk_kb']} KB")
+
+            legacy_path = os.path.join(tmp, 'legacy.enc')
+            self._report('fernet   encrypt', size, lambda: self._fernet_encrypt(encryption, source, legacy_path))
+            self._report('fernet   decrypt', size, lambda: encryption.decrypt_file(legacy_path))
+
+            stream_path = os.path.join(tmp, 'stream.enc')
+            self._report('streaming encrypt', size, lambda: self._stream_encrypt(encryption, source, stream_path, chunk_size))
+            self._report('streaming decrypt', size, lambda: self._drain(encryption.iter_decrypted_file(stream_path)))
+            self._report(
+                'streaming 1MB range', 1024 * 1024,
+                lambda: self._drain(encryption.iter_decrypted_file(stream_path, size // 2, size // 2 + 1024 * 1024 - 1)),
+            )
+
+            self.stdout.write(
+                f"on-disk overhead  fernet={os.path.getsize(legacy_path) / size - 1:+.1%} "
+                f"streaming={os.path.getsize(stream_path) / size - 1:+.2%}"
+            )
+
+    def _report(self, label, size, run):
+        tracemalloc.start()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"{label:<20} {size / (1024 * 1024) / elapsed:8.1f} MB/s  peak memory {peak / (1024 * 1024):7.1f} MB"
+        )
+
+    @staticmethod
+    def _fernet_encrypt(encryption, source, destination):
+        with open(source, 'rb') as f:
+            token = encryption.cipher.encrypt(f.read())
+        with open(destination, 'wb') as f:
+            f.write(token)
+
+    @staticmethod
+    def _stream_encrypt(encryption, source, destination, chunk_size):
+        with open(source, 'rb') as f, open(destination, 'wb') as out:
+            for block in encryption.encrypt_stream(f, chunk_size=chunk_size):
+                out.write(block)
+
+    @staticmethod
+    def _drain(blocks):
+        for _ in blocks:
+            pass
@@ -0,0 +1,74 @@
+"""Move legacy inline Document.file_content blobs into document storage.
+
+Safe to re-run: documents that already have a storage key are skipped::
+
+    python manage.py migrate_document_blobs --batch-size 100
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.models import Document
+from documents.storage import get_document_storage
+
+
+class Command(BaseCommand):
+    help = "Stream inline Document.file_content blobs into the document storage backend, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Documents per batch (default: 100).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many blobs would be moved without writing anything.',
+        )
+        parser.add_argument(
+            '--keep-blobs',
+            action='store_true',
+            help='Leave file_content in place after copying it to storage.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = Document.objects.filter(storage_key='', file_content__isnull=False).order_by('pk')
+
+        if options['dry_run']:
+            self.stdout.write(f"{pending.count()} documents have inline blobs to move.")
+            return
+
+        storage = get_document_storage()
+        started = time.perf_counter()
+        moved = 0
+        moved_bytes = 0
+        last_pk = 0
+        # Keyset batching over ids only; each blob is loaded on its own so at
+        # most one is held in memory at a time
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            for pk in batch:
+                content = Document.objects.filter(pk=pk).values_list('file_content', flat=True).first()
+                if content is None:
+                    continue
+                blob = storage.save(bytes(content))
+                updates = {'storage_key': blob.key, 'content_sha256': blob.sha256, 'file_size': blob.size}
+                if not options['keep_blobs']:
+                    updates['file_content'] = None
+                Document.objects.filter(pk=pk, storage_key='').update(**updates)
+                moved += 1
+                moved_bytes += blob.size
+            last_pk = batch[-1]
+            self.stdout.write(f"Moved {moved} blobs...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved} blobs ({moved_bytes / (1024 * 1024):.1f} MB) to storage "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
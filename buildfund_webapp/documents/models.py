@@ -1,6 +1,8 @@
 """Model definition for uploaded documents."""
 from __future__ import annotations
 
+from io import BytesIO
+
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
@@ -40,6 +42,36 @@ class DocumentType(models.Model):
         return f"{self.name} ({self.get_category_display()})"
 
 
+# Columns that can be large and are not needed for listings
+DOCUMENT_BLOB_FIELDS = ("file_content", "ai_assessment")
+
+
+def deferred_document_fields(prefix: str = "document") -> tuple:
+    """
+    Return the blob columns of a related Document for ``QuerySet.defer()``.
+
+    ``select_related('document')`` loads every column of the joined row
+    regardless of the Document manager, so callers defer them explicitly.
+    """
+    return tuple(f"{prefix}__{field}" for field in DOCUMENT_BLOB_FIELDS)
+
+
+class DocumentQuerySet(models.QuerySet):
+    def without_blobs(self):
+        return self.defer(*DOCUMENT_BLOB_FIELDS)
+
+    def with_blobs(self):
+        """Load every column, including the ones deferred by default."""
+        return self.defer(None)
+
+
+class DocumentManager(models.Manager.from_queryset(DocumentQuerySet)):
+    """Default manager that leaves blob and large JSON columns out of queries."""
+
+    def get_queryset(self):
+        return super().get_queryset().without_blobs()
+
+
 class Document(models.Model):
     """Represents an uploaded file owned by a user."""
 
@@ -92,9 +124,19 @@ class Document(models.Model):
     )
     ai_assessed_at = models.DateTimeField(null=True, blank=True)
     
-    # File storage (for production, use S3 or similar)
-    file_content = models.BinaryField(null=True, blank=True, help_text="File content (for small files only)")
+    # File storage: bytes live in the document storage backend under storage_key
+    storage_key = models.CharField(
+        max_length=128,
+        blank=True,
+        db_index=True,
+        help_text="Key of the file content in the document storage backend"
+    )
+    content_sha256 = models.CharField(max_length=64, blank=True)
+    # Legacy inline content; moved to storage by migrate_document_blobs
+    file_content = models.BinaryField(null=True, blank=True, help_text="Legacy inline file content")
     
+    objects = DocumentManager()
+
     class Meta:
         ordering = ["-uploaded_at"]
     
@@ -109,4 +151,28 @@ class Document(models.Model):
         if notes:
             self.validation_notes = notes
         self.validated_at = timezone.now()
-        self.save()
\ No newline at end of file
+        self.save()
+
+    def store_content(self, content) -> None:
+        """Stream content into document storage and record its key, size and hash."""
+        from .storage import get_document_storage
+
+        blob = get_document_storage().save(content)
+        self.storage_key = blob.key
+        self.content_sha256 = blob.sha256
+        self.file_size = blob.size
+        self.file_content = None
+
+    @property
+    def has_content(self) -> bool:
+        return bool(self.storage_key) or self.file_content is not None
+
+    def open_content(self):
+        """Open the file content for binary reading, from storage or the legacy blob."""
+        if self.storage_key:
+            from .storage import get_document_storage
+
+            return get_document_storage().open(self.storage_key)
+        if self.file_content is not None:
+            return BytesIO(bytes(self.file_content))
+        raise FileNotFoundError(f"Document {self.pk} has no stored content")
\ No newline at end of file
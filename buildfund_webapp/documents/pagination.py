@@ -0,0 +1,16 @@
+"""Pagination classes for document listing endpoints."""
+from __future__ import annotations
+
+from rest_framework.pagination import CursorPagination
+
+
+class DocumentCursorPagination(CursorPagination):
+    """
+    Cursor pagination for document lists, newest uploads first.
+
+    Used with metadata-only querysets so a page never carries file content.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-uploaded_at', '-id')
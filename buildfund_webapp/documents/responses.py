@@ -0,0 +1,90 @@
+"""Streaming HTTP responses for stored document content."""
+from __future__ import annotations
+
+import re
+from typing import Optional, Tuple
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+from .storage import CHUNK_SIZE
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header into inclusive (start, end) offsets.
+
+    Returns None when the header is absent, malformed or asks for several
+    ranges (the full content is served instead), and raises ValueError when
+    the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def _read_range(handle, start: int, end: int):
+    try:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def document_response(request, document, disposition: str = "attachment") -> HttpResponse:
+    """
+    Stream a document's content, honouring single byte ranges.
+
+    Full downloads use ``FileResponse``; ranged requests get a 206
+    ``StreamingHttpResponse`` that reads only the requested bytes.
+    """
+    etag = f'"{document.content_sha256}"' if document.content_sha256 else None
+    if etag and etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    size = document.file_size
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if not if_range or if_range == etag:
+        try:
+            byte_range = parse_range(request.headers.get("Range", ""), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    handle = document.open_content()
+    if byte_range is None:
+        response = FileResponse(handle, content_type=document.file_type)
+        response["Content-Length"] = str(size)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(handle, start, end), status=206, content_type=document.file_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    response["Accept-Ranges"] = "bytes"
+    response["Content-Disposition"] = f'{disposition}; filename="{document.file_name}"'
+    if etag:
+        response["ETag"] = etag
+    return response
@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 
 from .models import Document
 
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document model."""
 
     class Meta:
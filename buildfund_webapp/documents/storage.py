@@ -0,0 +1,139 @@
+"""Pluggable blob storage for uploaded documents.
+
+Document bytes live outside the database.  ``DOCUMENT_STORAGE_BACKEND`` names
+the storage class; the default ``LocalContentAddressedStorage`` writes each
+blob once under its SHA-256, streaming uploads to disk in chunks while
+hashing so a large upload is never held in memory.  An S3-compatible backend
+only needs to implement ``BaseDocumentStorage``.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterable, Union
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_BACKEND = "documents.storage.LocalContentAddressedStorage"
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    key: str
+    size: int
+    sha256: str
+
+
+class BaseDocumentStorage:
+    """Interface every document storage backend implements."""
+
+    def save(self, content: Union[BinaryIO, Iterable[bytes], bytes]) -> StoredBlob:
+        """Store content (a file object, an iterable of chunks, or bytes) and return its key."""
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        """Open a stored blob for binary reading."""
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+def iter_chunks(content: Union[BinaryIO, Iterable[bytes], bytes], chunk_size: int = CHUNK_SIZE) -> Iterable[bytes]:
+    """Yield byte chunks from an uploaded file, file object, chunk iterable or bytes."""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        view = memoryview(content)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+    elif hasattr(content, "chunks"):
+        # Django UploadedFile: reads from memory or the temporary upload file
+        yield from content.chunks(chunk_size)
+    elif hasattr(content, "read"):
+        while True:
+            chunk = content.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from content
+
+
+class LocalContentAddressedStorage(BaseDocumentStorage):
+    """
+    Store blobs on the local filesystem under their SHA-256.
+
+    Files are sharded as ``ab/cd/<sha256>``.  Identical uploads share one
+    file; writes go to a temporary file in the same directory tree and are
+    renamed into place, so readers never see a partial blob.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root or getattr(settings, "DOCUMENT_STORAGE_ROOT", settings.BASE_DIR / "document_storage"))
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid storage key '{key}'")
+        return self.root / key[:2] / key[2:4] / key
+
+    def save(self, content):
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in iter_chunks(content):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            key = digest.hexdigest()
+            final = self.path(key)
+            if final.exists():
+                os.unlink(tmp_name)
+            else:
+                final.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, final)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return StoredBlob(key=key, size=size, sha256=key)
+
+    def open(self, key):
+        return open(self.path(key), "rb")
+
+    def size(self, key):
+        return self.path(key).stat().st_size
+
+    def exists(self, key):
+        return self.path(key).exists()
+
+    def delete(self, key):
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+@lru_cache(maxsize=None)
+def _load_storage(path: str) -> BaseDocumentStorage:
+    return import_string(path)()
+
+
+def get_document_storage() -> BaseDocumentStorage:
+    """Return the configured document storage backend."""
+    return _load_storage(getattr(settings, "DOCUMENT_STORAGE_BACKEND", DEFAULT_BACKEND))
@@ -0,0 +1,49 @@
+"""Document listings must never read the blob columns."""
+from __future__ import annotations
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from applications.models import ApplicationDocument
+from core.testing import capture_sql
+from deals.access_service import DealAccessService
+from deals.models import DealDocumentLink
+from deals.tests.factories import make_deals
+from documents.models import DOCUMENT_BLOB_FIELDS, Document
+
+
+class DocumentListingSQLTests(TestCase):
+    def setUp(self):
+        fixture = make_deals(1, prefix="listing")
+        self.user = fixture["lender_user"]
+        self.deal = fixture["deals"][0]
+        for i in range(3):
+            document = Document.objects.create(
+                owner=self.user, file_name=f"statement-{i}.pdf", file_size=3, file_type="application/pdf",
+                upload_path="", file_content=b"pdf", ai_assessment={"risk": "low"},
+            )
+            ApplicationDocument.objects.create(application=self.deal.application, document=document, uploaded_by=self.user)
+            DealDocumentLink.objects.create(deal=self.deal, document=document, uploaded_by=self.user)
+        DealAccessService.rebuild()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertListingSkipsBlobs(self, url):
+        with capture_sql() as queries:
+            response = self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 3)
+        selects = [sql for sql in queries if sql.lstrip().upper().startswith("SELECT")]
+        self.assertTrue(selects)
+        for sql in selects:
+            for column in DOCUMENT_BLOB_FIELDS:
+                self.assertNotIn(column, sql)
+
+    def test_document_list(self):
+        self.assertListingSkipsBlobs("/api/documents/")
+
+    def test_application_document_list(self):
+        self.assertListingSkipsBlobs(f"/api/applications/{self.deal.application_id}/documents/")
+
+    def test_deal_document_link_list(self):
+        self.assertListingSkipsBlobs("/api/deals/deal-documents/")
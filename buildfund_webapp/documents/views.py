@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 
 from .models import Document, DocumentType
+from .pagination import DocumentCursorPagination
 from .serializers import DocumentSerializer
 
 
@@ -16,9 +17,10 @@ class DocumentViewSet(viewsets.ModelViewSet):
     serializer_class = DocumentSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    pagination_class = DocumentCursorPagination
 
     def get_queryset(self):
-        """Return documents owned by the current user."""
+        """Return documents owned by the current user (blob columns deferred)."""
         return Document.objects.filter(owner=self.request.user).order_by('-uploaded_at')
     
     def list(self, request, *args, **kwargs):
@@ -1,9 +1,10 @@
 """Serializers for funding requests."""
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from .models import FundingRequest
 
 
-class FundingRequestSerializer(serializers.ModelSerializer):
+class FundingRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for FundingRequest."""
     
     funding_type_display = serializers.CharField(source="get_funding_type_display", read_only=True)
@@ -5,6 +5,8 @@ from rest_framework.response import Response
 from django.db.models import Q
 from decimal import Decimal
 
+from accounts.principal import get_principal
+
 from .models import FundingRequest
 from .serializers import FundingRequestSerializer
 from products.models import Product
@@ -18,8 +20,9 @@ class FundingRequestViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        if hasattr(user, "borrowerprofile"):
-            return FundingRequest.objects.filter(borrower=user.borrowerprofile)
+        principal = get_principal(user)
+        if principal.is_borrower:
+            return FundingRequest.objects.filter(borrower_id=principal.borrower_profile_id)
         elif user.is_staff:
             return FundingRequest.objects.all()
         return FundingRequest.objects.none()
@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 
 from .models import LenderProfile
 
 
-class LenderProfileSerializer(serializers.ModelSerializer):
+class LenderProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializes LenderProfile for API representation."""
     
     user = serializers.SerializerMethodField()
@@ -27,6 +27,8 @@ class LenderProfileViewSet(
 
     serializer_class = LenderProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    # The list holds at most the user's own profile
+    pagination_class = None
 
     def get_queryset(self):
         return LenderProfile.objects.filter(user=self.request.user)
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Cached access to the Google Maps web services.
+
+Responses are cached under a key built from the endpoint and the
+normalised query ("10 Downing St,  London" and "10 downing st, london"
+share an entry).  A bounded in-process LRU answers repeat lookups without
+a network round trip; behind it the ``api`` cache shares entries between
+workers with a long TTL.  Only successful responses (``OK`` and
+``ZERO_RESULTS``) are cached.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+
+from core.cache import API_CACHE
+from core.http import get_client
+
+DEFAULT_TTL = 30 * 24 * 60 * 60
+AUTOCOMPLETE_TTL = 24 * 60 * 60
+CACHEABLE_STATUSES = {"OK", "ZERO_RESULTS"}
+
+_QUERY_SEPARATORS = re.compile(r"[\s,]+")
+
+
+def call_google_api(endpoint: str, params: dict[str, str]) -> tuple[int, dict]:
+    """Call a Google Maps endpoint with the configured API key.
+
+    Returns a tuple of (status_code, response_json).
+    """
+    api_key = settings.GOOGLE_API_KEY
+    if not api_key:
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {
+            "error": "GOOGLE_API_KEY is not configured on the server."
+        }
+    params = params.copy()
+    params["key"] = api_key
+    try:
+        resp = get_client("google_maps").get(endpoint, params=params, timeout=5)
+        data = resp.json()
+        return resp.status_code, data
+    except Exception as exc:
+        return status.HTTP_502_BAD_GATEWAY, {"error": f"Failed to call Google API: {exc}"}
+
+
+def normalize_query(value: str) -> str:
+    """Case-fold and collapse separators so equivalent queries share a cache entry."""
+    return _QUERY_SEPARATORS.sub(" ", value.casefold()).strip()
+
+
+def cache_key(endpoint: str, params: Dict[str, str]) -> str:
+    normalized = "&".join(f"{name}={normalize_query(str(value))}" for name, value in sorted(params.items()))
+    digest = hashlib.sha256(f"{endpoint}?{normalized}".encode()).hexdigest()
+    return f"geocode:{digest}"
+
+
+class GeocodeCache:
+    """Bounded in-process LRU in front of the shared ``api`` cache."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+        shared = caches[API_CACHE].get(key)
+        if shared is None:
+            return None
+        expires_at, value = shared
+        self._remember(key, expires_at, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        expires_at = time.time() + ttl
+        caches[API_CACHE].set(key, (expires_at, value), ttl)
+        self._remember(key, expires_at, value)
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        caches[API_CACHE].delete(key)
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop the in-process entries; the shared cache is left alone."""
+        with self._lock:
+            self._entries.clear()
+
+
+geocode_cache = GeocodeCache(getattr(settings, "GEOCODE_CACHE_MAX_ENTRIES", 10000))
+
+
+def cached_google_api(endpoint: str, params: Dict[str, str], ttl: Optional[int] = None) -> Tuple[int, dict]:
+    """``call_google_api`` behind the geocode cache."""
+    key = cache_key(endpoint, params)
+    data = geocode_cache.get(key)
+    if data is not None:
+        # Callers annotate responses, so never hand out the cached object itself
+        return status.HTTP_200_OK, copy.deepcopy(data)
+    status_code, data = call_google_api(endpoint, params)
+    if status_code == status.HTTP_200_OK and data.get("status") in CACHEABLE_STATUSES:
+        geocode_cache.set(key, copy.deepcopy(data), ttl or getattr(settings, "GEOCODE_CACHE_TTL", DEFAULT_TTL))
+    return status_code, data
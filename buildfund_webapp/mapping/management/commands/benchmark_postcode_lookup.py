@@ -0,0 +1,86 @@
+"""Benchmark postcode lookups against the local index and the geocode cache."""
+from __future__ import annotations
+
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from mapping.geocoding import GeocodeCache, cache_key
+from mapping.postcode_index import PostcodeIndex, write_index
+
+ENDPOINT = "https://maps.googleapis.com/maps/api/geocode/json"
+
+
+def _synthetic_rows(count, seed=0):
+    """Generate plausible (postcode, town, county, lat, lng) rows."""
+    rng = random.Random(seed)
+    towns = [(f"Town {i}", f"County {i % 48}") for i in range(1500)]
+    letters = string.ascii_uppercase
+    for _ in range(count):
+        outward = f"{rng.choice(letters)}{rng.choice(letters)}{rng.randint(1, 99)}"
+        inward = f"{rng.randint(0, 9)}{rng.choice(letters)}{rng.choice(letters)}"
+        town, county = rng.choice(towns)
+        yield f"{outward} {inward}", town, county, rng.uniform(49.9, 58.7), rng.uniform(-6.4, 1.8)
+
+
+class Command(BaseCommand):
+    help = "Measure postcode lookup latency for the local index, the in-process LRU and the shared cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--postcodes', type=int, default=1_700_000)
+        parser.add_argument('--lookups', type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "postcodes.idx"
+            started = time.perf_counter()
+            rows = list(_synthetic_rows(options['postcodes']))
+            count = write_index(path, rows)
+            self.stdout.write(
+                f"Built index of {count} postcodes ({path.stat().st_size / 1_048_576:.1f} MB) "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+
+            index = PostcodeIndex(path)
+            rng = random.Random(1)
+            sample = [rng.choice(rows)[0] for _ in range(options['lookups'])]
+            del rows
+
+            started = time.perf_counter()
+            hits = sum(index.lookup(postcode) is not None for postcode in sample)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"postcode index: {elapsed / len(sample) * 1e6:.2f} µs/lookup ({hits} hits)")
+
+            misses = [f"ZZ{i} 9ZZ" for i in range(len(sample))]
+            started = time.perf_counter()
+            for postcode in misses:
+                index.lookup(postcode)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"postcode index miss: {elapsed / len(misses) * 1e6:.2f} µs/lookup")
+            index.close()
+
+        response = {"status": "OK", "results": [{"formatted_address": "Town, AB1 2CD, UK"}]}
+        distinct = sorted(set(sample))[:10_000]
+        keys = [cache_key(ENDPOINT, {"address": f"{postcode}, UK"}) for postcode in distinct]
+        geocode_cache = GeocodeCache(len(keys))
+        for key in keys:
+            geocode_cache.set(key, response, 3600)
+
+        started = time.perf_counter()
+        for postcode in distinct:
+            geocode_cache.get(cache_key(ENDPOINT, {"address": f"{postcode}, UK"}))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"geocode cache (LRU hit): {elapsed / len(distinct) * 1e6:.2f} µs/lookup")
+
+        geocode_cache.clear()
+        started = time.perf_counter()
+        for postcode in distinct:
+            geocode_cache.get(cache_key(ENDPOINT, {"address": f"{postcode}, UK"}))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"geocode cache (shared cache hit): {elapsed / len(distinct) * 1e6:.2f} µs/lookup")
+        for key in keys:
+            geocode_cache.delete(key)
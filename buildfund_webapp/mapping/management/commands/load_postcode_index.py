@@ -0,0 +1,84 @@
+"""Build the local postcode index from a bulk postcode dataset.
+
+Accepts any CSV with postcode, town, county and coordinate columns, such as
+the ONS Postcode Directory or Code-Point Open joined to place names::
+
+    python manage.py load_postcode_index ONSPD.csv --town-column=osward_name \
+        --county-column=oscty_name --latitude-column=lat --longitude-column=long \
+        --terminated-column=doterm
+"""
+from __future__ import annotations
+
+import csv
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mapping.postcode_index import get_postcode_index, write_index
+
+
+class Command(BaseCommand):
+    help = "Build the memory-mapped postcode index used by postcode lookup and address verification."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='Path to the postcode dataset CSV.')
+        parser.add_argument(
+            '--output',
+            help='Index file to write (defaults to POSTCODE_INDEX_PATH).',
+        )
+        parser.add_argument('--postcode-column', default='postcode')
+        parser.add_argument('--town-column', default='town')
+        parser.add_argument('--county-column', default='county')
+        parser.add_argument('--latitude-column', default='latitude')
+        parser.add_argument('--longitude-column', default='longitude')
+        parser.add_argument(
+            '--terminated-column',
+            help='Skip rows where this column is non-empty (e.g. a termination date).',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.POSTCODE_INDEX_PATH
+        started = time.perf_counter()
+        skipped = 0
+
+        def rows():
+            nonlocal skipped
+            with open(options['csv_path'], newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                columns = [options[name] for name in (
+                    'postcode_column', 'town_column', 'county_column', 'latitude_column', 'longitude_column',
+                )]
+                missing = [column for column in columns if column not in (reader.fieldnames or [])]
+                if missing:
+                    raise CommandError(f"Missing columns in {options['csv_path']}: {', '.join(missing)}")
+                terminated = options['terminated_column']
+                for row in reader:
+                    if terminated and row.get(terminated, '').strip():
+                        skipped += 1
+                        continue
+                    try:
+                        lat = float(row[options['latitude_column']])
+                        lng = float(row[options['longitude_column']])
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    postcode = row[options['postcode_column']].strip()
+                    if not postcode:
+                        skipped += 1
+                        continue
+                    yield (
+                        postcode,
+                        row[options['town_column']].strip(),
+                        row[options['county_column']].strip(),
+                        lat,
+                        lng,
+                    )
+
+        count = write_index(output, rows())
+        # Let this process pick up the new file on its next lookup
+        get_postcode_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} postcodes ({skipped} rows skipped) into {output} "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
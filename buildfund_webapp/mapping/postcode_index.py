@@ -0,0 +1,166 @@
+"""Local UK postcode index backed by a memory-mapped file.
+
+The index is built from a bulk postcode dataset (e.g. the ONS Postcode
+Directory) by ``python manage.py load_postcode_index`` and written to
+``POSTCODE_INDEX_PATH``.  File layout (little-endian)::
+
+    header   magic "BFPC" | version u16 | count u32 | places length u32
+    keys     count x 7 bytes: postcode without spaces, upper case, space padded, sorted
+    records  count x (lat i32, lng i32, place u32); coordinates in micro-degrees
+    places   JSON list of [town, county]
+
+Lookups binary-search the key block in place, so the index costs no heap
+memory beyond the small places table and answers in microseconds.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+MAGIC = b"BFPC"
+VERSION = 1
+HEADER = struct.Struct("<4sHII")
+KEY_SIZE = 7
+RECORD = struct.Struct("<iiI")
+COORDINATE_SCALE = 1_000_000
+
+_index: Optional["PostcodeIndex"] = None
+_index_lock = threading.Lock()
+
+
+def postcode_key(postcode: str) -> bytes:
+    """Return the fixed-width index key for a postcode."""
+    return re.sub(r"\s+", "", postcode.upper()).encode("ascii", "ignore")[:KEY_SIZE].ljust(KEY_SIZE)
+
+
+def format_postcode(key: bytes) -> str:
+    compact = key.decode("ascii").strip()
+    return f"{compact[:-3]} {compact[-3:]}"
+
+
+@dataclass(frozen=True)
+class PostcodeEntry:
+    postcode: str
+    town: str
+    county: str
+    lat: float
+    lng: float
+
+
+class _Keys:
+    """Sequence view over the sorted key block, for ``bisect``."""
+
+    def __init__(self, buffer, offset: int, count: int):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position: int) -> bytes:
+        start = self._offset + position * KEY_SIZE
+        return self._buffer[start:start + KEY_SIZE]
+
+
+class PostcodeIndex:
+    """Read-only postcode lookups over a memory-mapped index file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.mtime = os.fstat(f.fileno()).st_mtime_ns
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, places_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a postcode index")
+        self.count = count
+        self._keys = _Keys(self._mmap, HEADER.size, count)
+        self._records_offset = HEADER.size + count * KEY_SIZE
+        places_offset = self._records_offset + count * RECORD.size
+        self._places = json.loads(self._mmap[places_offset:places_offset + places_length])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, postcode: str) -> Optional[PostcodeEntry]:
+        key = postcode_key(postcode)
+        position = bisect.bisect_left(self._keys, key)
+        if position >= self.count or self._keys[position] != key:
+            return None
+        lat, lng, place = RECORD.unpack_from(self._mmap, self._records_offset + position * RECORD.size)
+        town, county = self._places[place]
+        return PostcodeEntry(
+            postcode=format_postcode(key),
+            town=town,
+            county=county,
+            lat=lat / COORDINATE_SCALE,
+            lng=lng / COORDINATE_SCALE,
+        )
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def write_index(path, rows: Iterable[Tuple[str, str, str, float, float]]) -> int:
+    """
+    Build an index file from (postcode, town, county, lat, lng) rows.
+
+    The file is written next to its destination and renamed into place, so
+    running workers never see a partial index.  Returns the entry count.
+    """
+    entries: Dict[bytes, Tuple[int, int, int]] = {}
+    places: List[Tuple[str, str]] = []
+    place_ids: Dict[Tuple[str, str], int] = {}
+    for postcode, town, county, lat, lng in rows:
+        place = (town, county)
+        if place not in place_ids:
+            place_ids[place] = len(places)
+            places.append(place)
+        entries[postcode_key(postcode)] = (
+            round(lat * COORDINATE_SCALE), round(lng * COORDINATE_SCALE), place_ids[place]
+        )
+
+    keys = sorted(entries)
+    places_blob = json.dumps(places, separators=(",", ":")).encode()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys), len(places_blob)))
+        f.write(b"".join(keys))
+        for key in keys:
+            f.write(RECORD.pack(*entries[key]))
+        f.write(places_blob)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def get_postcode_index() -> Optional[PostcodeIndex]:
+    """Return the configured postcode index, or None if no index file exists."""
+    global _index
+    path = getattr(settings, "POSTCODE_INDEX_PATH", None)
+    if not path or not os.path.exists(path):
+        return None
+    # Reopen when the loader has replaced the file
+    mtime = os.stat(path).st_mtime_ns
+    if _index is None or _index.path != Path(path) or _index.mtime != mtime:
+        with _index_lock:
+            if _index is None or _index.path != Path(path) or _index.mtime != mtime:
+                _index = PostcodeIndex(path)
+    return _index
+
+
+def lookup_postcode(postcode: str) -> Optional[PostcodeEntry]:
+    index = get_postcode_index()
+    return index.lookup(postcode) if index is not None else None
@@ -10,32 +10,13 @@ All inputs are validated and sanitized to prevent injection attacks.
 
 from __future__ import annotations
 
-import requests
-from django.conf import settings
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from core.validators import sanitize_string, validate_postcode
 
-
-def call_google_api(endpoint: str, params: dict[str, str]) -> tuple[int, dict]:
-    """Call a Google Maps endpoint with the configured API key.
-
-    Returns a tuple of (status_code, response_json).
-    """
-    api_key = settings.GOOGLE_API_KEY
-    if not api_key:
-        return status.HTTP_500_INTERNAL_SERVER_ERROR, {
-            "error": "GOOGLE_API_KEY is not configured on the server."
-        }
-    params = params.copy()
-    params["key"] = api_key
-    try:
-        resp = requests.get(endpoint, params=params, timeout=5)
-        data = resp.json()
-        return resp.status_code, data
-    except Exception as exc:
-        return status.HTTP_502_BAD_GATEWAY, {"error": f"Failed to call Google API: {exc}"}
+from .geocoding import AUTOCOMPLETE_TTL, cached_google_api
+from .postcode_index import lookup_postcode
 
 
 class AutocompleteView(APIView):
@@ -55,7 +36,7 @@ class AutocompleteView(APIView):
             return Response({"error": "Invalid query parameter"}, status=status.HTTP_400_BAD_REQUEST)
         
         endpoint = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
-        status_code, data = call_google_api(endpoint, {"input": query})
+        status_code, data = cached_google_api(endpoint, {"input": query}, ttl=AUTOCOMPLETE_TTL)
         return Response(data, status=status_code)
 
 
@@ -76,7 +57,7 @@ class GeocodeView(APIView):
             return Response({"error": "Invalid address parameter"}, status=status.HTTP_400_BAD_REQUEST)
         
         endpoint = "https://maps.googleapis.com/maps/api/geocode/json"
-        status_code, data = call_google_api(endpoint, {"address": address})
+        status_code, data = cached_google_api(endpoint, {"address": address})
         return Response(data, status=status_code)
 
 
@@ -103,12 +84,16 @@ class ReverseGeocodeView(APIView):
         
         endpoint = "https://maps.googleapis.com/maps/api/geocode/json"
         latlng = f"{lat},{lng}"
-        status_code, data = call_google_api(endpoint, {"latlng": latlng})
+        status_code, data = cached_google_api(endpoint, {"latlng": latlng})
         return Response(data, status=status_code)
 
 
 class PostcodeLookupView(APIView):
-    """Look up address details from a UK postcode using Google Geocoding API."""
+    """Look up address details from a UK postcode.
+
+    Postcodes in the local postcode index are answered without calling
+    Google; anything else falls back to the Geocoding API.
+    """
 
     permission_classes = [permissions.IsAuthenticated]
 
@@ -125,11 +110,15 @@ class PostcodeLookupView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
+        entry = lookup_postcode(postcode_formatted)
+        if entry is not None:
+            return Response(self._index_response(entry))
+        
         # Add UK country restriction for better results
         address_query = f"{postcode_formatted}, UK"
         
         endpoint = "https://maps.googleapis.com/maps/api/geocode/json"
-        status_code, data = call_google_api(endpoint, {"address": address_query})
+        status_code, data = cached_google_api(endpoint, {"address": address_query})
         
         # Extract structured address components
         if status_code == 200 and data.get("status") == "OK" and data.get("results"):
@@ -157,4 +146,33 @@ class PostcodeLookupView(APIView):
             
             data["address_components"] = address_components
         
-        return Response(data, status=status_code)
\ No newline at end of file
+        return Response(data, status=status_code)
+
+    @staticmethod
+    def _index_response(entry) -> dict:
+        """Shape a postcode index entry like a Geocoding API response."""
+        formatted_address = ", ".join(part for part in (entry.town, entry.postcode, "UK") if part)
+        location = {"lat": entry.lat, "lng": entry.lng}
+        components = [
+            {"long_name": entry.town, "short_name": entry.town, "types": ["postal_town"]},
+            {"long_name": entry.county, "short_name": entry.county, "types": ["administrative_area_level_2", "political"]},
+            {"long_name": entry.postcode, "short_name": entry.postcode, "types": ["postal_code"]},
+            {"long_name": "United Kingdom", "short_name": "GB", "types": ["country", "political"]},
+        ]
+        return {
+            "status": "OK",
+            "source": "postcode_index",
+            "results": [{
+                "formatted_address": formatted_address,
+                "geometry": {"location": location},
+                "address_components": [c for c in components if c["long_name"]],
+            }],
+            "address_components": {
+                "town": entry.town,
+                "county": entry.county,
+                "postcode": entry.postcode,
+                "country": "United Kingdom",
+                "formatted_address": formatted_address,
+                "location": location,
+            },
+        }
@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from core.validators import sanitize_string
 from .models import Message, MessageAttachment
 from documents.serializers import DocumentSerializer
 
 
-class MessageAttachmentSerializer(serializers.ModelSerializer):
+class MessageAttachmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for message attachments."""
     
     document = DocumentSerializer(read_only=True)
@@ -18,7 +19,7 @@ class MessageAttachmentSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Message model."""
     
     sender_username = serializers.CharField(source="sender.username", read_only=True)
@@ -10,6 +10,7 @@ from django.db.models import Q
 from .models import Message, MessageAttachment
 from .serializers import MessageSerializer, MessageCreateSerializer, MessageAttachmentSerializer
 from accounts.permissions import IsBorrower, IsLender
+from core.pagination import NewestFirstCursorPagination
 
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -17,6 +18,7 @@ class MessageViewSet(viewsets.ModelViewSet):
     
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NewestFirstCursorPagination
     
     def get_queryset(self):
         """Return messages where user is sender or recipient."""
@@ -1,7 +1,7 @@
 """Admin configuration for onboarding app."""
 
 from django.contrib import admin
-from .models import OnboardingProgress, OnboardingData, OnboardingSession
+from .models import OnboardingProgress, OnboardingData, OnboardingSession, OnboardingMessage
 
 
 @admin.register(OnboardingProgress)
@@ -58,3 +58,16 @@ class OnboardingSessionAdmin(admin.ModelAdmin):
     list_filter = ("is_active", "current_step", "started_at")
     search_fields = ("user__email", "user__username", "session_id")
     readonly_fields = ("session_id", "started_at", "last_activity")
+
+
+@admin.register(OnboardingMessage)
+class OnboardingMessageAdmin(admin.ModelAdmin):
+    list_display = (
+        "session",
+        "sender",
+        "created_at",
+    )
+    list_filter = ("sender", "created_at")
+    search_fields = ("session__session_id", "session__user__email", "message")
+    raw_id_fields = ("session",)
+    readonly_fields = ("created_at",)
@@ -0,0 +1,93 @@
+"""Benchmark the onboarding chatbot engine: scripted chat turns per second, per role."""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from onboarding.views import OnboardingViewSet
+
+# Answers typed at each step, in order when a step is asked more than once.
+# Address and company lookups are skipped so no upstream API is called.
+SCRIPT = {
+    "welcome": ["Yes, let's start"],
+    "profile_name": ["Jane"],
+    "profile_last_name": ["Doe"],
+    "profile_dob": ["01/02/1980"],
+    "contact_email": ["jane@bench.invalid"],
+    "contact_phone": ["+44 7700 900000"],
+    "address_collection": ["skip"],
+    "address_verification": ["No, let me enter it manually"],
+    "address_confirmation": ["1 High Street", "Flat 2", "Leeds", "West Yorkshire", "LS1 1AA", "United Kingdom"],
+    "company_collection": ["skip"],
+    "company_verification": ["skip"],
+    "company_confirmation": ["Bench Developments Ltd"],
+    "directors_list": ["I need to check the list"],
+    "director_details": ["Jane Doe, 01/02/1980, British"],
+    "kyc_nationality": ["British"],
+    "kyc_national_insurance": ["QQ123456C"],
+    "kyc_source_of_funds": ["Savings"],
+    "financial_income": ["£85,000"],
+    "financial_employment": ["Self-employed"],
+    "financial_employment_details": ["Bench Developments, Director"],
+    "financial_expenses": ["2,500"],
+    "financial_existing_debts": ["12000"],
+    "financial_assets": ["450000"],
+    "experience_collection": ["7"],
+    "fca_registration": ["Yes"],
+    "fca_registration_number": ["123456"],
+    "fca_permissions": ["Mortgage Lending"],
+    "financial_licences": ["Consumer Credit"],
+    "financial_capital_requirements": ["1,000,000"],
+    "financial_lending_capacity": ["50,000,000"],
+    "key_personnel": ["A. Smith, CEO"],
+    "consultant_services": ["Valuation"],
+    "consultant_qualifications": ["MRICS"],
+    "consultant_registration": ["RICS 0012345"],
+    "consultant_insurance": ["£5m PI cover"],
+    "consultant_coverage": ["Yorkshire"],
+    "documents_collection": ["done"],
+}
+ROLES = ["Borrower", "Lender", "Consultant"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Play scripted onboarding conversations through the chatbot engine (answer handling "
+        "and next question, without the database) and report chat turns per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conversations', type=int, default=500, help='Conversations per role (default: 500).')
+
+    def handle(self, *args, **options):
+        view = OnboardingViewSet()
+        # Resolve the lazy Companies House client once, outside the timings
+        view.hmrc_service
+        for role in ROLES:
+            turns = 0
+            started = time.perf_counter()
+            for _ in range(options['conversations']):
+                turns += self._converse(view, role)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{role:10s} {turns // options['conversations']:3d} turns/conversation  "
+                f"{turns / elapsed:9.0f} turns/s  {elapsed / turns * 1e6:7.1f} µs/turn"
+            )
+
+    @staticmethod
+    def _converse(view, role):
+        """Play one conversation from the welcome step to the documents step; returns the turns taken."""
+        step, collected_data, asked, turns = "welcome", {}, {}, 0
+        view.chatbot_service.get_next_question(step, role, collected_data)
+        while step not in ("complete", "paused") and turns < 100:
+            answers = SCRIPT.get(step, ["skip"])
+            message = answers[min(asked.get(step, 0), len(answers) - 1)]
+            asked[step] = asked.get(step, 0) + 1
+            next_step = view._process_response(step, message, collected_data, role, None, None)
+            view.chatbot_service.get_next_question(next_step, role, collected_data)
+            turns += 1
+            if step == "documents_collection":
+                break
+            step = next_step
+        return turns
@@ -0,0 +1,59 @@
+"""Move legacy OnboardingSession.conversation_history lists into OnboardingMessage rows.
+
+Safe to re-run: each batch inserts its messages and empties the sessions'
+lists in one transaction, so split sessions are skipped next time::
+
+    python manage.py split_onboarding_histories --batch-size 500
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from onboarding.models import OnboardingSession
+from onboarding.services import ConversationHistoryService
+
+
+class Command(BaseCommand):
+    help = "Split inline onboarding conversation histories into append-only message rows, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Sessions per batch (default: 500).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many sessions would be split without writing anything.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = OnboardingSession.objects.exclude(conversation_history=[]).order_by('pk')
+
+        if options['dry_run']:
+            self.stdout.write(f"{pending.count()} sessions have inline conversation histories to split.")
+            return
+
+        started = time.perf_counter()
+        sessions_split = 0
+        messages_created = 0
+        last_pk = 0
+        # Keyset batching; only the columns the split needs are loaded
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk).only('pk', 'started_at', 'conversation_history')[:batch_size])
+            if not batch:
+                break
+            messages_created += ConversationHistoryService.split_legacy(batch)
+            sessions_split += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"Split {sessions_split} sessions...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Split {sessions_split} sessions into {messages_created} messages "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
@@ -279,6 +279,7 @@ class OnboardingSession(models.Model):
     )
     session_id = models.CharField(max_length=100, unique=True)
     current_step = models.CharField(max_length=50, blank=True)
+    # Legacy: turns are stored in OnboardingMessage; `split_onboarding_histories` moves old ones
     conversation_history = models.JSONField(default=list, blank=True)
     collected_data = models.JSONField(default=dict, blank=True)
     started_at = models.DateTimeField(auto_now_add=True)
@@ -290,3 +291,40 @@ class OnboardingSession(models.Model):
     
     def __str__(self) -> str:
         return f"Session({self.user.email} - {self.session_id[:8]})"
+
+
+class OnboardingMessage(models.Model):
+    """One turn of an onboarding chat session; rows are only ever appended."""
+    
+    SENDER_CHOICES = [
+        ("bot", "Bot"),
+        ("user", "User"),
+    ]
+    
+    session = models.ForeignKey(
+        OnboardingSession,
+        on_delete=models.CASCADE,
+        related_name="messages"
+    )
+    sender = models.CharField(max_length=10, choices=SENDER_CHOICES)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        # Legacy turns are split in after newer ones may exist, so time orders, id breaks ties
+        ordering = ["session", "created_at", "id"]
+        indexes = [
+            models.Index(fields=["session", "created_at", "id"]),
+        ]
+    
+    def as_history_item(self) -> dict:
+        """The message in the shape the chat API has always returned."""
+        return {
+            "id": self.id,
+            "type": self.sender,
+            "message": self.message,
+            "timestamp": self.created_at.isoformat(),
+        }
+    
+    def __str__(self) -> str:
+        return f"Message({self.session_id} - {self.sender})"
@@ -0,0 +1,904 @@
+"""Declarative onboarding step graph, compiled once per role.
+
+The chatbot's steps, questions and answer validation are plain data here:
+``ROLE_STEPS`` orders the steps for each role, ``QUESTIONS`` and
+``FUNDING_TYPE_QUESTIONS`` hold the question templates and ``ANSWERS``
+says which field each answer fills and how it is parsed.  At import,
+``compile_step_graph`` turns them into one ``StepGraph`` per role with the
+next step, the progress shown and the placeholders each question needs
+already worked out, so a chat turn is a few dict lookups.
+
+Steps whose answers need more than storing one field (lookups, loops over
+directors, funding-type branches) are handled by ``OnboardingViewSet``.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+# Onboarding steps for each role - FCA Compliant
+# Order: Personal Info → Contact → Address → Company → Directors → KYC/Financial → Documents
+BORROWER_STEPS = (
+    "welcome",
+    # Personal Information (FCA Requirement)
+    "profile_name",
+    "profile_last_name",
+    "profile_dob",
+    "contact_email",
+    "contact_phone",
+    # Address Information (FCA Requirement)
+    "address_collection",
+    "address_verification",
+    "address_confirmation",
+    # Company Information (FCA Requirement)
+    "company_collection",
+    "company_verification",
+    "company_confirmation",
+    # Directors Information (FCA Requirement - HMRC Validation)
+    "directors_list",
+    "director_details",  # Loop for each director
+    # KYC and Financial Information (FCA Requirement for Borrowers)
+    "kyc_nationality",
+    "kyc_national_insurance",
+    "kyc_source_of_funds",
+    "financial_income",
+    "financial_employment",
+    "financial_employment_details",
+    "financial_expenses",
+    "financial_existing_debts",
+    "financial_assets",
+    "experience_collection",
+    # Documents (FCA Requirement)
+    "documents_collection",
+    "review",
+    "complete",
+)
+
+LENDER_STEPS = (
+    "welcome",
+    # Personal Information (FCA Requirement)
+    "profile_name",
+    "profile_last_name",
+    "profile_dob",
+    "contact_email",
+    "contact_phone",
+    # Address Information (FCA Requirement)
+    "address_collection",
+    "address_verification",
+    "address_confirmation",
+    # Company Information (FCA Requirement)
+    "company_collection",
+    "company_verification",
+    "company_confirmation",
+    # Directors Information (FCA Requirement - HMRC Validation)
+    "directors_list",
+    "director_details",  # Loop for each director
+    # FCA Registration and Financial Information (FCA Requirement for Lenders)
+    "fca_registration",
+    "fca_registration_number",
+    "fca_permissions",
+    "financial_licences",
+    "financial_capital_requirements",
+    "financial_lending_capacity",
+    "key_personnel",
+    "kyc_source_of_funds",
+    # Documents (FCA Requirement)
+    "documents_collection",
+    "review",
+    "complete",
+)
+
+ADMIN_STEPS = (
+    "welcome",
+    "profile_name",
+    "contact_phone",
+    "complete",
+)
+
+CONSULTANT_STEPS = (
+    "welcome",
+    # Personal Information (FCA Requirement)
+    "profile_name",
+    "profile_last_name",
+    "profile_dob",
+    "contact_email",
+    "contact_phone",
+    # Address Information (FCA Requirement)
+    "address_collection",
+    "address_verification",
+    "address_confirmation",
+    # Company Information (FCA Requirement)
+    "company_collection",
+    "company_verification",
+    "company_confirmation",
+    # Professional Information
+    "consultant_services",
+    "consultant_qualifications",
+    "consultant_registration",
+    "consultant_insurance",
+    "consultant_coverage",
+    # Documents (FCA Requirement)
+    "documents_collection",
+    "review",
+    "complete",
+)
+
+ROLE_STEPS = {
+    "Borrower": BORROWER_STEPS,
+    "Lender": LENDER_STEPS,
+    "Admin": ADMIN_STEPS,
+    "Consultant": CONSULTANT_STEPS,
+}
+
+# Display name -> funding type code, in the order the options are offered
+FUNDING_TYPE_CODES = {
+    "Development Finance": "development_finance",
+    "Senior Debt/Development Finance": "senior_debt",
+    "Commercial Mortgages": "commercial_mortgage",
+    "Mortgage Finance": "mortgage",
+    "Equity Finance": "equity",
+    "Revenue Based Funding": "revenue_based",
+    "Merchant Cash Advance": "merchant_cash_advance",
+    "Term Loans (Peer-to-Peer)": "term_loan_p2p",
+    "Bank Overdraft": "bank_overdraft",
+    "Business Credit Cards": "business_credit_card",
+    "Intellectual Property (IP) Funding": "ip_funding",
+    "Stock Finance": "stock_finance",
+    "Asset Finance": "asset_finance",
+    "Factoring / Invoice Discounting": "factoring",
+    "Trade Finance": "trade_finance",
+    "Export Finance": "export_finance",
+    "Public Sector Funding (Start Up Loan)": "public_sector_startup",
+}
+
+FUNDING_TYPE_QUESTION = """💰 **WHAT TYPE OF FUNDING DO YOU NEED?**
+
+BuildFund specializes in Property & Development Finance, but we also support various alternative business finance options. Please select the type of funding that best matches your needs:
+
+**Property & Development Finance:**
+• Development Finance - For property development projects
+• Senior Debt/Development Finance - Senior debt for development
+• Commercial Mortgages - Mortgages for commercial property
+• Mortgage Finance - Traditional mortgage finance
+• Equity Finance - Equity investment
+
+**Alternative Business Finance:**
+• Revenue Based Funding - Funding based on recurring revenue
+• Merchant Cash Advance - Quick capital based on card sales
+• Term Loans (Peer-to-Peer) - P2P loans with competitive rates
+• Bank Overdraft - Flexible overdraft facility
+• Business Credit Cards - Business credit cards
+
+**Asset-Based Finance:**
+• Intellectual Property (IP) Funding - Finance secured against IP assets
+• Stock Finance - Finance against inventory
+• Asset Finance - Finance for equipment, vehicles, machinery
+• Factoring / Invoice Discounting - Release cash from invoices
+
+**Trade & Export:**
+• Trade Finance - Finance for import/export transactions
+• Export Finance - Specialized finance for export transactions
+
+**Public Sector:**
+• Public Sector Funding (Start Up Loan) - Government-backed startup loans
+
+**Which type of funding do you need?**"""
+
+PROPERTY_FINANCE_QUESTIONS = (
+    {
+        "step": "property_address",
+        "question": "What is the address of the property?",
+        "field": "property_address",
+        "type": "text",
+        "required": True,
+    },
+    {
+        "step": "property_value",
+        "question": "What is the current or estimated property value? (Enter amount in GBP)",
+        "field": "property_value",
+        "type": "number",
+        "required": True,
+    },
+    {
+        "step": "loan_purpose",
+        "question": "What is the purpose of the loan? (e.g., Purchase, Refinance, Development)",
+        "field": "loan_purpose",
+        "type": "text",
+        "required": True,
+    },
+)
+
+# Extra questions asked after a funding type is selected, by funding type code
+FUNDING_TYPE_QUESTIONS = {
+    "revenue_based": (
+        {
+            "step": "revenue_based_monthly_revenue",
+            "question": "What is your average monthly recurring revenue? (Enter amount in GBP)",
+            "field": "monthly_revenue",
+            "type": "number",
+            "required": True,
+        },
+        {
+            "step": "revenue_based_revenue_growth",
+            "question": "What is your year-over-year revenue growth percentage? (e.g., 25 for 25%)",
+            "field": "revenue_growth_percentage",
+            "type": "number",
+            "required": False,
+        },
+        {
+            "step": "revenue_based_customer_base",
+            "question": "How many active customers/clients do you have?",
+            "field": "customer_count",
+            "type": "number",
+            "required": False,
+        },
+    ),
+    "merchant_cash_advance": (
+        {
+            "step": "mca_monthly_card_sales",
+            "question": "What is your average monthly card sales/processing volume? (Enter amount in GBP)",
+            "field": "monthly_card_sales",
+            "type": "number",
+            "required": True,
+        },
+        {
+            "step": "mca_processor",
+            "question": "Who is your payment processor? (e.g., Stripe, Square, Worldpay)",
+            "field": "payment_processor",
+            "type": "text",
+            "required": False,
+        },
+    ),
+    "ip_funding": (
+        {
+            "step": "ip_type",
+            "question": "What type of IP assets do you have? (Select all that apply: Patents, Trademarks, Copyrights, Trade Secrets)",
+            "field": "ip_types",
+            "type": "text",
+            "required": True,
+        },
+        {
+            "step": "ip_valuation",
+            "question": "Do you have a professional IP valuation? If yes, what is the estimated value? (Enter amount in GBP, or 'no' if not valued)",
+            "field": "ip_valuation",
+            "type": "text",
+            "required": False,
+        },
+    ),
+    "stock_finance": (
+        {
+            "step": "stock_value",
+            "question": "What is the current value of your inventory/stock? (Enter amount in GBP)",
+            "field": "stock_value",
+            "type": "number",
+            "required": True,
+        },
+        {
+            "step": "stock_turnover",
+            "question": "What is your average stock turnover period? (Enter number of days)",
+            "field": "stock_turnover_days",
+            "type": "number",
+            "required": False,
+        },
+    ),
+    "asset_finance": (
+        {
+            "step": "asset_type",
+            "question": "What type of assets do you need to finance? (e.g., Equipment, Vehicles, Machinery)",
+            "field": "asset_type",
+            "type": "text",
+            "required": True,
+        },
+        {
+            "step": "asset_value",
+            "question": "What is the total value of assets you need to finance? (Enter amount in GBP)",
+            "field": "asset_value",
+            "type": "number",
+            "required": True,
+        },
+    ),
+    "factoring": (
+        {
+            "step": "factoring_invoice_value",
+            "question": "What is the total value of your outstanding invoices? (Enter amount in GBP)",
+            "field": "outstanding_invoice_value",
+            "type": "number",
+            "required": True,
+        },
+        {
+            "step": "factoring_payment_terms",
+            "question": "What are your typical customer payment terms? (e.g., 30 days, 60 days)",
+            "field": "payment_terms_days",
+            "type": "number",
+            "required": False,
+        },
+    ),
+    "trade_finance": (
+        {
+            "step": "trade_transaction_value",
+            "question": "What is the value of the trade transaction you need to finance? (Enter amount in GBP)",
+            "field": "trade_transaction_value",
+            "type": "number",
+            "required": True,
+        },
+        {
+            "step": "trade_countries",
+            "question": "Which countries are involved in the trade? (e.g., UK to USA)",
+            "field": "trade_countries",
+            "type": "text",
+            "required": False,
+        },
+    ),
+    "export_finance": (
+        {
+            "step": "export_value",
+            "question": "What is the value of the export transaction? (Enter amount in GBP)",
+            "field": "export_value",
+            "type": "number",
+            "required": True,
+        },
+        {
+            "step": "export_destination",
+            "question": "What is the destination country for the export?",
+            "field": "export_destination",
+            "type": "text",
+            "required": True,
+        },
+    ),
+    # Property/development finance types are asked about the property
+    "development_finance": PROPERTY_FINANCE_QUESTIONS,
+    "senior_debt": PROPERTY_FINANCE_QUESTIONS,
+    "commercial_mortgage": PROPERTY_FINANCE_QUESTIONS,
+    "mortgage": PROPERTY_FINANCE_QUESTIONS,
+}
+FUNDING_STEPS = frozenset(
+    question["step"] for questions in FUNDING_TYPE_QUESTIONS.values() for question in questions
+)
+
+QUESTIONS = {
+    "welcome": {
+        "question": """Hi! 👋 Welcome to BuildFund. I'm here to help you complete your FCA-compliant funding application.
+
+To build a complete application for {finance_kind} finance, I'll need to collect the following information:
+
+📋 **Required Information:**
+1. **Personal Information** - Name, date of birth, contact details
+2. **Address & Contact** - Full address, email, phone number
+3. **Company Information** - Company registration, details (validated with Companies House)
+4. **Directors Information** - Details for all company directors (HMRC validated)
+5. **Financial Information** - Income, expenses, assets, liabilities
+6. **Asset & Liability Statement** - Complete financial position
+7. **Experience & Portfolio** - Past experience and current assets/portfolio
+8. **Supporting Documents** - ID, bank statements, company accounts, etc.
+
+This process typically takes 15-20 minutes. You can save your progress at any time.
+
+**Ready to begin?**""",
+        "step": "welcome",
+        "field": "welcome_acknowledged",
+        "type": "select",
+        "options": ["Yes, let's start", "I need more information", "Maybe later"],
+        "required": True,
+    },
+    # Personal Information (FCA Requirement)
+    "profile_name": {
+        "question": "Great! Let's start with your personal information. What's your first name?",
+        "step": "profile_name",
+        "field": "first_name",
+        "type": "text",
+        "required": True,
+    },
+    "profile_last_name": {
+        "question": "Thank you! What's your last name?",
+        "step": "profile_last_name",
+        "field": "last_name",
+        "type": "text",
+        "required": True,
+    },
+    "profile_dob": {
+        "question": "Perfect! Now, what's your date of birth? (Please enter in format: DD/MM/YYYY)",
+        "step": "profile_dob",
+        "field": "date_of_birth",
+        "type": "date",
+        "required": True,
+        "validation": {"format": "DD/MM/YYYY"},
+    },
+    "contact_email": {
+        "question": "What's your contact email address? (This will be used for important communications)",
+        "step": "contact_email",
+        "field": "email",
+        "type": "email",
+        "required": True,
+    },
+    "contact_phone": {
+        "question": "What's your phone number? (Please include country code, e.g., +44 for UK)",
+        "step": "contact_phone",
+        "field": "phone_number",
+        "type": "phone",
+        "required": True,
+    },
+    "address_collection": {
+        "question": "Now let's get your address. What's your postcode?",
+        "step": "address_collection",
+        "field": "postcode",
+        "type": "text",
+        "required": True,
+    },
+    "address_verification": {
+        "question": "I found your address. Is this correct? {formatted_address}",
+        "step": "address_verification",
+        "field": "address_confirmed",
+        "type": "select",
+        "options": ["Yes, that's correct", "No, let me enter it manually"],
+        "required": True,
+    },
+    "address_confirmation": {
+        "question": "{address_manual_prompt}",
+        "step": "address_confirmation",
+        "field": "address_line_1",
+        "type": "text",
+        "required": True,
+    },
+    # Company Information (FCA Requirement - Companies House Validation)
+    "company_collection": {
+        "question": "Do you have a UK company registration number? (If yes, please provide it. If no, type 'skip')",
+        "step": "company_collection",
+        "field": "company_registration_number",
+        "type": "text",
+        "required": False,
+    },
+    "company_verification": {
+        "question": "I've verified your company with Companies House. Is {company_name} correct?",
+        "step": "company_verification",
+        "field": "company_confirmed",
+        "type": "select",
+        "options": ["Yes, that's correct", "No, that's wrong"],
+        "required": True,
+    },
+    "company_confirmation": {
+        "question": "Please confirm your company name as registered with Companies House:",
+        "step": "company_confirmation",
+        "field": "company_name",
+        "type": "text",
+        "required": True,
+    },
+    # Directors Information (FCA Requirement - HMRC Validation)
+    "directors_list": {
+        "question": "I've retrieved the list of directors from Companies House. We need to collect details for each director. {directors_list}",
+        "step": "directors_list",
+        "field": "directors_acknowledged",
+        "type": "select",
+        "options": ["Yes, I'm ready to provide director details", "I need to check the list"],
+        "required": True,
+    },
+    "director_details": {
+        "question": "Please provide details for director {director_index}: Full name, Date of Birth (DD/MM/YYYY), and Nationality. Format: Name, DOB, Nationality",
+        "step": "director_details",
+        "field": "director_details",
+        "type": "text",
+        "required": True,
+    },
+    # KYC Information (FCA Requirement for Borrowers)
+    "kyc_nationality": {
+        "question": "What's your nationality?",
+        "step": "kyc_nationality",
+        "field": "nationality",
+        "type": "text",
+        "required": True,
+    },
+    "kyc_national_insurance": {
+        "question": "What's your UK National Insurance Number? (If you don't have one, type 'skip')",
+        "step": "kyc_national_insurance",
+        "field": "national_insurance_number",
+        "type": "text",
+        "required": False,
+    },
+    "kyc_source_of_funds": {
+        "question": "What is the source of funds for your loan application? (e.g., savings, sale of property, inheritance, etc.)",
+        "step": "kyc_source_of_funds",
+        "field": "source_of_funds",
+        "type": "text",
+        "required": True,
+    },
+    # Financial Information (FCA Requirement for Borrowers)
+    "financial_income": {
+        "question": "What's your annual income? (Please enter the amount in GBP, e.g., 50000)",
+        "step": "financial_income",
+        "field": "annual_income",
+        "type": "number",
+        "required": True,
+    },
+    "financial_employment": {
+        "question": "What's your employment status?",
+        "step": "financial_employment",
+        "field": "employment_status",
+        "type": "select",
+        "options": ["Employed", "Self-employed", "Retired", "Student", "Unemployed", "Other"],
+        "required": True,
+    },
+    "financial_employment_details": {
+        "question": "Please provide your employment details: Company name and position (or type 'skip' if not applicable)",
+        "step": "financial_employment_details",
+        "field": "employment_details",
+        "type": "text",
+        "required": False,
+    },
+    "financial_expenses": {
+        "question": "What are your approximate monthly expenses? (Please enter the amount in GBP)",
+        "step": "financial_expenses",
+        "field": "monthly_expenses",
+        "type": "number",
+        "required": False,
+    },
+    "financial_existing_debts": {
+        "question": "Do you have any existing debts? If yes, please enter the total amount in GBP (or 0 if none)",
+        "step": "financial_existing_debts",
+        "field": "existing_debts",
+        "type": "number",
+        "required": False,
+    },
+    "financial_assets": {
+        "question": "What is the approximate value of your assets? (Please enter the amount in GBP, e.g., property, savings, investments)",
+        "step": "financial_assets",
+        "field": "total_assets",
+        "type": "number",
+        "required": False,
+    },
+    "experience_collection": {
+        "question": "How many years of experience do you have in property development or business finance?",
+        "step": "experience_collection",
+        "field": "experience_years",
+        "type": "number",
+        "required": True,
+    },
+    "experience_projects": {
+        "question": "How many projects have you completed? (Enter number, or 0 if this is your first)",
+        "step": "experience_projects",
+        "field": "previous_projects",
+        "type": "number",
+        "required": True,
+    },
+    "portfolio_current_assets": {
+        "question": "Do you have a current property portfolio or business assets? If yes, please describe (e.g., '3 residential properties, 1 commercial property', or 'none')",
+        "step": "portfolio_current_assets",
+        "field": "portfolio_description",
+        "type": "text",
+        "required": False,
+    },
+    "portfolio_property_details": {
+        "question": "Please provide details about your current property portfolio: Property addresses, values, and any mortgages (or type 'none' if not applicable)",
+        "step": "portfolio_property_details",
+        "field": "portfolio_property_details",
+        "type": "text",
+        "required": False,
+    },
+    # Funding Type Selection (NEW)
+    "funding_type_selection": {
+        "question": FUNDING_TYPE_QUESTION,
+        "step": "funding_type_selection",
+        "field": "funding_type",
+        "type": "select",
+        "options": list(FUNDING_TYPE_CODES),
+        "required": True,
+    },
+    # FCA Registration and Financial Information (FCA Requirement for Lenders)
+    "fca_registration": {
+        "question": "Are you registered with the Financial Conduct Authority (FCA)?",
+        "step": "fca_registration",
+        "field": "has_fca_registration",
+        "type": "select",
+        "options": ["Yes", "No"],
+        "required": True,
+    },
+    "fca_registration_number": {
+        "question": "What's your FCA registration number?",
+        "step": "fca_registration_number",
+        "field": "fca_registration_number",
+        "type": "text",
+        "required": False,
+    },
+    "fca_permissions": {
+        "question": "What FCA permissions does your organisation hold? (Please list them, e.g., Consumer Credit, Mortgage Lending, etc.)",
+        "step": "fca_permissions",
+        "field": "fca_permissions",
+        "type": "text",
+        "required": False,
+    },
+    "financial_licences": {
+        "question": "What other financial licences does your organisation hold? (Please list them, or type 'none')",
+        "step": "financial_licences",
+        "field": "financial_licences",
+        "type": "text",
+        "required": False,
+    },
+    "financial_capital_requirements": {
+        "question": "What is your organisation's regulatory capital requirement? (Please enter the amount in GBP)",
+        "step": "financial_capital_requirements",
+        "field": "regulatory_capital",
+        "type": "number",
+        "required": False,
+    },
+    "financial_lending_capacity": {
+        "question": "What is your organisation's total lending capacity? (Please enter the amount in GBP)",
+        "step": "financial_lending_capacity",
+        "field": "lending_capacity",
+        "type": "number",
+        "required": False,
+    },
+    "key_personnel": {
+        "question": "Who are the key personnel in your organisation? (Please provide names and positions, or type 'skip')",
+        "step": "key_personnel",
+        "field": "key_personnel",
+        "type": "text",
+        "required": False,
+    },
+    "documents_collection": {
+        "question": "{documents_question}",
+        "step": "documents_collection",
+        "field": "documents",
+        "type": "file",
+        "required": True,
+        "multiple": True,
+    },
+    "review": {
+        "question": """Great! We've collected all the information needed for your FCA-compliant funding application. Let me summarize what we have:
+
+{summary}
+
+**Next Steps:**
+- Review the information above
+- If everything is correct, we'll proceed to document upload
+- If you need to make changes, we can go back and update any section
+
+Does everything look correct?""",
+        "step": "review",
+        "field": "review_confirmed",
+        "type": "select",
+        "options": ["Yes, everything is correct", "No, I need to make changes"],
+        "required": True,
+    },
+    "complete": {
+        "question": "Perfect! 🎉 Your profile is now complete. You can now submit applications and access all features. Is there anything else you'd like to update?",
+        "step": "complete",
+        "field": "complete",
+        "type": "select",
+        "options": ["No, I'm done", "Yes, I want to update something"],
+        "required": False,
+    },
+}
+
+REQUIRED_DOCUMENTS = {
+    "Borrower": (
+        {
+            "name": "Proof of Identity",
+            "description": "Passport or UK driving licence (front and back)",
+            "required_for": "FCA KYC compliance - Identity verification",
+            "category": "identity"
+        },
+        {
+            "name": "Proof of Address",
+            "description": "Utility bill or bank statement (dated within last 3 months)",
+            "required_for": "FCA KYC compliance - Address verification",
+            "category": "address"
+        },
+        {
+            "name": "Bank Statements",
+            "description": "Last 3 months of business/personal bank statements",
+            "required_for": "Financial assessment and affordability check",
+            "category": "financial"
+        },
+        {
+            "name": "Company Accounts",
+            "description": "Latest company accounts (last 2-3 years if available)",
+            "required_for": "Company financial assessment (if applicable)",
+            "category": "company",
+            "required_if": "company_registration_number"
+        },
+        {
+            "name": "Certificate of Incorporation",
+            "description": "Company certificate of incorporation",
+            "required_for": "Company verification (if applicable)",
+            "category": "company",
+            "required_if": "company_registration_number"
+        },
+    ),
+}
+
+# Address fields collected one per turn at ``address_confirmation``, with their prompts
+ADDRESS_FIELD_PROMPTS = (
+    ("address_line_1", "Please provide your Address Line 1 (street name and number):"),
+    ("address_line_2", "Address Line 2 (optional - apartment, suite, etc. or type 'skip'):"),
+    ("town", "What's your town or city?"),
+    ("county", "What's your county?"),
+    ("postcode", "What's your postcode?"),
+    ("country", "What's your country? (default: United Kingdom, or type 'skip' to use default):"),
+)
+ADDRESS_LOOKUP_FAILED_PROMPT = "I couldn't find your address automatically. Let's enter it manually. "
+ADDRESS_COMPLETE_PROMPT = "Address collection complete. Moving to next step..."
+
+# Lower-cased replies with a fixed meaning at any step
+SKIP_REPLIES = frozenset(["skip", "none", "n/a", "not applicable"])
+START_REPLIES = frozenset(["yes, let's start", "yes", "ok", "sure", "let's go"])
+PAUSE_REPLIES = frozenset(["maybe later", "later", "not now"])
+CONFIRM_REPLIES = frozenset(["yes", "yes, that's correct", "correct", "yes that's correct"])
+DIRECTORS_READY_REPLIES = frozenset(["yes", "yes, i'm ready", "ready", "yes i'm ready to provide director details"])
+NOT_PROVIDED_REPLIES = frozenset(["skip", "none", "n/a", "no"])
+
+# Question steps that do not show the progress line
+NO_PROGRESS_STEPS = frozenset(["welcome", "complete", "review"])
+
+# Placeholders filled per role when the graph is compiled; the rest are filled per turn
+ROLE_PLACEHOLDERS = {
+    "finance_kind": lambda role: "development" if role == "Borrower" else "lending",
+}
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_MONEY_SYMBOLS = re.compile(r"[,£]")
+_KEEP = object()
+
+
+def parse_amount(message: str) -> float:
+    """A GBP amount, ignoring thousands separators and the pound sign."""
+    return float(_MONEY_SYMBOLS.sub("", message))
+
+
+def parse_count(message: str) -> int:
+    return int(message)
+
+
+def parse_date(message: str) -> str:
+    """A DD/MM/YYYY date, as ISO YYYY-MM-DD."""
+    return datetime.strptime(message, "%d/%m/%Y").strftime("%Y-%m-%d")
+
+
+def parse_yes(message: str) -> bool:
+    return message.lower().strip() in ("yes", "y")
+
+
+@dataclass(frozen=True)
+class Answer:
+    """How the answer to a step is stored in the session's collected data."""
+
+    field: str
+    # Validator turning the message into the stored value; None stores it as typed
+    parse: Optional[Callable[[str], Any]] = None
+    # Stored when ``parse`` rejects the message; by default the field is left unset
+    invalid: Any = _KEEP
+    # Lower-cased replies that store nothing
+    ignore: FrozenSet[str] = frozenset()
+
+    def apply(self, message: str, message_lower: str, collected_data: Dict[str, Any]) -> None:
+        if message_lower in self.ignore:
+            return
+        if self.parse is None:
+            collected_data[self.field] = message
+            return
+        try:
+            collected_data[self.field] = self.parse(message)
+        except (TypeError, ValueError):
+            if self.invalid is not _KEEP:
+                collected_data[self.field] = self.invalid
+
+
+ANSWERS = {
+    "profile_name": Answer("first_name"),
+    "profile_last_name": Answer("last_name"),
+    "profile_dob": Answer("date_of_birth", parse_date),
+    "contact_email": Answer("email"),
+    "contact_phone": Answer("phone_number"),
+    "company_confirmation": Answer("company_name"),
+    # KYC and Financial Information (Borrowers)
+    "kyc_nationality": Answer("nationality"),
+    "kyc_national_insurance": Answer("national_insurance_number"),
+    "kyc_source_of_funds": Answer("source_of_funds"),
+    "financial_income": Answer("annual_income", parse_amount),
+    "financial_employment": Answer("employment_status"),
+    "financial_expenses": Answer("monthly_expenses", parse_amount),
+    "financial_existing_debts": Answer("existing_debts", parse_amount, invalid=0),
+    "financial_assets": Answer("total_assets", parse_amount),
+    # Asset & Liability Statement
+    "assets_real_estate": Answer("assets_real_estate", parse_amount, invalid=0),
+    "assets_investments": Answer("assets_investments", parse_amount, invalid=0),
+    "assets_other": Answer("assets_other", parse_amount, invalid=0),
+    "liabilities_mortgages": Answer("liabilities_mortgages", parse_amount, invalid=0),
+    "liabilities_loans": Answer("liabilities_loans", parse_amount, invalid=0),
+    "liabilities_other": Answer("liabilities_other", parse_amount, invalid=0),
+    "experience_collection": Answer("experience_years", parse_count),
+    "experience_projects": Answer("previous_projects", parse_count, invalid=0),
+    "portfolio_current_assets": Answer("portfolio_description", ignore=NOT_PROVIDED_REPLIES),
+    "portfolio_property_details": Answer("portfolio_property_details", ignore=NOT_PROVIDED_REPLIES),
+    # FCA and Financial Information (Lenders)
+    "fca_registration": Answer("has_fca_registration", parse_yes),
+    "fca_registration_number": Answer("fca_registration_number"),
+    "fca_permissions": Answer("fca_permissions"),
+    "financial_licences": Answer("financial_licences"),
+    "financial_capital_requirements": Answer("regulatory_capital", parse_amount),
+    "financial_lending_capacity": Answer("lending_capacity", parse_amount),
+    "key_personnel": Answer("key_personnel"),
+    **{
+        question["step"]: Answer(question["field"], parse_amount if question["type"] == "number" else None)
+        for questions in FUNDING_TYPE_QUESTIONS.values()
+        for question in questions
+    },
+}
+
+
+@dataclass(frozen=True)
+class CompiledQuestion:
+    # The question with the role's progress fields; "question" is filled per turn
+    template: Dict[str, Any]
+    text: str
+    # Placeholders in ``text`` to fill from the collected data, in order
+    placeholders: Tuple[str, ...]
+    suffix: str
+
+
+@dataclass(frozen=True)
+class StepGraph:
+    """One role's onboarding flow as lookup tables."""
+
+    role: str
+    steps: Tuple[str, ...]
+    index: Dict[str, int]
+    next: Dict[str, str]
+    skip: Dict[str, str]
+    questions: Dict[str, CompiledQuestion]
+
+    def next_step(self, step: str) -> str:
+        """The step after ``step``; steps outside the role's flow continue from the first step."""
+        if step in self.next:
+            return self.next[step]
+        return self.next[self.steps[0]] if self.steps else "complete"
+
+    def skip_step(self, step: str) -> str:
+        """Like ``next_step``, but skipping the last step stays on it."""
+        if step in self.skip:
+            return self.skip[step]
+        return self.steps[1] if len(self.steps) > 1 else step
+
+    def goto(self, target: str, step: str) -> str:
+        """``target`` if the role has that step, otherwise the step after ``step``."""
+        return target if target in self.index else self.next_step(step)
+
+
+def compile_question(role: str, steps: Tuple[str, ...], question: Dict[str, Any]) -> CompiledQuestion:
+    index = steps.index(question["step"]) if question["step"] in steps else 0
+    total = len(steps)
+    progress = int((index / total) * 100) if total else 0
+    text = question["question"]
+    for name, fill in ROLE_PLACEHOLDERS.items():
+        text = text.replace("{" + name + "}", fill(role))
+    suffix = ""
+    if question["step"] not in NO_PROGRESS_STEPS:
+        suffix = f"\n\n📊 Progress: {progress}% complete ({index + 1} of {total} steps)"
+    return CompiledQuestion(
+        template={**question, "progress": progress, "step_number": index + 1, "total_steps": total},
+        text=text,
+        placeholders=tuple(dict.fromkeys(_PLACEHOLDER.findall(text))),
+        suffix=suffix,
+    )
+
+
+def compile_step_graph(role: str, steps: Tuple[str, ...]) -> StepGraph:
+    last = len(steps) - 1
+    questions = dict(QUESTIONS)
+    for funding_questions in FUNDING_TYPE_QUESTIONS.values():
+        questions.update((question["step"], question) for question in funding_questions)
+    return StepGraph(
+        role=role,
+        steps=steps,
+        index={step: i for i, step in enumerate(steps)},
+        next={step: steps[i + 1] if i < last else "complete" for i, step in enumerate(steps)},
+        skip={step: steps[i + 1] if i < last else step for i, step in enumerate(steps)},
+        questions={step: compile_question(role, steps, question) for step, question in questions.items()},
+    )
+
+
+STEP_GRAPHS = {role: compile_step_graph(role, steps) for role, steps in ROLE_STEPS.items()}
+_NO_STEPS = compile_step_graph("", ())
+
+
+def get_step_graph(role: str) -> StepGraph:
+    """The compiled flow for a role; unknown roles get an empty one."""
+    return STEP_GRAPHS.get(role, _NO_STEPS)
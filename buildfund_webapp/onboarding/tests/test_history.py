@@ -0,0 +1,59 @@
+"""Tests for onboarding conversation storage and legacy history splitting."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from onboarding.models import OnboardingMessage, OnboardingSession
+from onboarding.services import ConversationHistoryService
+
+LEGACY_HISTORY = [
+    {"type": "bot", "message": "legacy q1", "timestamp": "2025-01-01T10:00:00+00:00"},
+    {"type": "user", "message": "legacy a1", "timestamp": "2025-01-01T10:01:00+00:00"},
+]
+
+
+class ConversationHistoryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(username="onboarding-user")
+        self.session = OnboardingSession.objects.create(
+            user=self.user, session_id="legacy-session", conversation_history=LEGACY_HISTORY,
+        )
+
+    def _messages(self):
+        return [item["message"] for item in ConversationHistoryService.page(self.session)[0]]
+
+    def test_legacy_turns_split_late_sort_before_newer_turns(self):
+        ConversationHistoryService.append(self.session, ("bot", "new question"), ("user", "new answer"))
+        ConversationHistoryService.split_legacy(OnboardingSession.objects.filter(pk=self.session.pk))
+        self.assertEqual(self._messages(), ["legacy q1", "legacy a1", "new question", "new answer"])
+
+    def test_before_cursor_pages_in_conversation_order(self):
+        ConversationHistoryService.append(self.session, ("bot", "new question"), ("user", "new answer"))
+        ConversationHistoryService.split_legacy_session(self.session)
+        latest, has_more = ConversationHistoryService.page(self.session, limit=2)
+        self.assertTrue(has_more)
+        self.assertEqual([item["message"] for item in latest], ["new question", "new answer"])
+        older, has_more = ConversationHistoryService.page(self.session, limit=2, before=latest[0]["id"])
+        self.assertFalse(has_more)
+        self.assertEqual([item["message"] for item in older], ["legacy q1", "legacy a1"])
+
+    def test_stale_sessions_are_not_split_twice(self):
+        stale = list(OnboardingSession.objects.filter(pk=self.session.pk))
+        self.assertEqual(ConversationHistoryService.split_legacy(stale), 2)
+        self.assertEqual(ConversationHistoryService.split_legacy(stale), 0)
+        self.assertEqual(OnboardingMessage.objects.filter(session=self.session).count(), 2)
+
+    def test_chat_post_splits_legacy_history_before_appending(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(
+            "/api/onboarding/chat/",
+            {"message": "hello", "session_id": self.session.session_id},
+            format="json",
+            HTTP_HOST="localhost",
+        )
+        self.assertEqual(response.status_code, 200)
+        messages = [item["message"] for item in response.data["conversation_history"]]
+        self.assertEqual(messages[:3], ["legacy q1", "legacy a1", "hello"])
@@ -15,9 +15,22 @@ from .serializers import (
     OnboardingSessionSerializer,
     ChatbotMessageSerializer,
 )
-from .services import OnboardingChatbotService, AddressVerificationService
+from .services import OnboardingChatbotService, AddressVerificationService, ConversationHistoryService
+from .step_graph import (
+    ANSWERS,
+    CONFIRM_REPLIES,
+    DIRECTORS_READY_REPLIES,
+    FUNDING_STEPS,
+    PAUSE_REPLIES,
+    SKIP_REPLIES,
+    START_REPLIES,
+    StepGraph,
+    get_step_graph,
+    parse_date,
+)
 from verification.services import HMRCVerificationService
-from accounts.models import Role, UserRole
+from accounts.models import Role
+from accounts.principal import get_principal
 from consultants.models import ConsultantProfile
 
 
@@ -60,23 +73,19 @@ class OnboardingViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["get"])
     def progress(self, request):
         """Get current user's onboarding progress."""
-        from accounts.models import UserRole
-        
         try:
             progress, _ = OnboardingProgress.objects.get_or_create(user=request.user)
             
             # Determine user role and recalculate progress
             user_role = None
             try:
-                user_roles = UserRole.objects.filter(user=request.user).select_related("role")
-                if user_roles.exists():
-                    role_names = [ur.role.name for ur in user_roles]
-                    if "Borrower" in role_names:
-                        user_role = 'borrower'
-                    elif "Lender" in role_names:
-                        user_role = 'lender'
-                    elif "Consultant" in role_names:
-                        user_role = 'consultant'
+                principal = get_principal(request.user)
+                if principal.has_role(Role.BORROWER):
+                    user_role = 'borrower'
+                elif principal.has_role(Role.LENDER):
+                    user_role = 'lender'
+                elif principal.has_role(Role.CONSULTANT):
+                    user_role = 'consultant'
             except Exception as e:
                 print(f"Error determining user role: {e}")
                 pass
@@ -126,16 +135,14 @@ class OnboardingViewSet(viewsets.ViewSet):
         progress, _ = OnboardingProgress.objects.get_or_create(user=user)
         
         # Get user role
-        user_roles = UserRole.objects.filter(user=user).select_related("role")
+        principal = get_principal(user)
         user_role = "Borrower"  # Default
-        if user_roles.exists():
-            role_names = [ur.role.name for ur in user_roles]
-            if "Lender" in role_names:
-                user_role = "Lender"
-            elif "Consultant" in role_names:
-                user_role = "Consultant"
-            elif "Admin" in role_names:
-                user_role = "Admin"
+        if principal.has_role(Role.LENDER):
+            user_role = "Lender"
+        elif principal.has_role(Role.CONSULTANT):
+            user_role = "Consultant"
+        elif principal.has_role(Role.ADMIN):
+            user_role = "Admin"
         
         if request.method == "GET":
             # Start or resume conversation
@@ -143,11 +150,13 @@ class OnboardingViewSet(viewsets.ViewSet):
             
             if session_id:
                 try:
-                    session = OnboardingSession.objects.get(session_id=session_id, user=user, is_active=True)
+                    session = OnboardingSession.objects.defer("conversation_history").get(
+                        session_id=session_id, user=user, is_active=True
+                    )
                 except OnboardingSession.DoesNotExist:
                     session = None
             else:
-                session = OnboardingSession.objects.filter(user=user, is_active=True).first()
+                session = OnboardingSession.objects.defer("conversation_history").filter(user=user, is_active=True).first()
             
             if not session:
                 # Create new session
@@ -157,15 +166,18 @@ class OnboardingViewSet(viewsets.ViewSet):
                     current_step=progress.current_step or "welcome",
                 )
             
+            # Only the latest page of the conversation is loaded; older turns come from chat_history
+            ConversationHistoryService.split_legacy_session(session)
+            conversation_history, has_more_history = ConversationHistoryService.page(session)
+            
             # Check if there's existing progress
             has_existing_progress = (
                 progress.completion_percentage > 0 or
-                (session.conversation_history and len(session.conversation_history) > 0)
+                len(conversation_history) > 0
             )
             
             # Get next question
             steps = self.chatbot_service.get_steps_for_role(user_role)
-            current_step_index = steps.index(session.current_step) if session.current_step in steps else 0
             
             if progress.is_complete:
                 current_step = "complete"
@@ -186,8 +198,6 @@ class OnboardingViewSet(viewsets.ViewSet):
                 }
             
             # Handle conversation history - show welcome back message if resuming
-            conversation_history = list(session.conversation_history) if session.conversation_history else []
-            
             if has_existing_progress and conversation_history:
                 # Check if welcome back message already exists (to avoid duplicates)
                 has_welcome_back = any(
@@ -220,6 +230,7 @@ class OnboardingViewSet(viewsets.ViewSet):
                 "question": question_data,
                 "progress": OnboardingProgressSerializer(progress).data,
                 "conversation_history": conversation_history,
+                "has_more_history": has_more_history,
                 "is_resuming": has_existing_progress,
             })
         
@@ -236,7 +247,7 @@ class OnboardingViewSet(viewsets.ViewSet):
             # Get or create session
             if session_id:
                 try:
-                    session = OnboardingSession.objects.get(session_id=session_id, user=user)
+                    session = OnboardingSession.objects.defer("conversation_history").get(session_id=session_id, user=user)
                 except OnboardingSession.DoesNotExist:
                     session = OnboardingSession.objects.create(
                         user=user,
@@ -244,7 +255,7 @@ class OnboardingViewSet(viewsets.ViewSet):
                         current_step=step,
                     )
             else:
-                session = OnboardingSession.objects.filter(user=user, is_active=True).first()
+                session = OnboardingSession.objects.defer("conversation_history").filter(user=user, is_active=True).first()
                 if not session:
                     session = OnboardingSession.objects.create(
                         user=user,
@@ -252,14 +263,10 @@ class OnboardingViewSet(viewsets.ViewSet):
                         current_step=step,
                     )
             
-            # Update conversation history
-            if not session.conversation_history:
-                session.conversation_history = []
-            session.conversation_history.append({
-                "type": "user",
-                "message": message,
-                "timestamp": timezone.now().isoformat(),
-            })
+            # Turns are appended to the message table once the reply is known;
+            # a legacy history is split first so it stays ahead of them
+            ConversationHistoryService.split_legacy_session(session)
+            turns = [("user", message)]
             
             # Process response based on current step
             # Use session.current_step instead of step from request (more reliable)
@@ -278,14 +285,14 @@ class OnboardingViewSet(viewsets.ViewSet):
                     "session_id": session.session_id,
                     "question": self.chatbot_service.get_next_question(current_step, user_role, collected_data),
                     "progress": OnboardingProgressSerializer(progress).data,
-                    "conversation_history": session.conversation_history,
+                    "conversation_history": ConversationHistoryService.page(session)[0],
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
             # Update session
             session.current_step = next_step
             session.collected_data = collected_data
             session.last_activity = timezone.now()
-            session.save()
+            session.save(update_fields=["current_step", "collected_data", "last_activity"])
             
             # Update progress
             try:
@@ -315,569 +322,387 @@ class OnboardingViewSet(viewsets.ViewSet):
             
             # Add bot response to conversation
             if question_data:
-                session.conversation_history.append({
-                    "type": "bot",
-                    "message": question_data.get("question", ""),
-                    "timestamp": timezone.now().isoformat(),
-                })
-                session.save()
+                turns.append(("bot", question_data.get("question", "")))
+            ConversationHistoryService.append(session, *turns)
             
+            conversation_history, has_more_history = ConversationHistoryService.page(session)
             return Response({
                 "session_id": session.session_id,
                 "question": question_data,
                 "progress": OnboardingProgressSerializer(progress).data,
-                "conversation_history": session.conversation_history,
+                "conversation_history": conversation_history,
+                "has_more_history": has_more_history,
             })
     
+    @action(detail=False, methods=["get"], url_path="chat-history")
+    def chat_history(self, request):
+        """
+        Page back through a chat session's turns, oldest first within a page.
+        
+        Query params: ``session_id`` (default: the active session), ``before``
+        (a message ``id`` from the previous page) and ``limit``.
+        """
+        sessions = OnboardingSession.objects.defer("conversation_history").filter(user=request.user)
+        session_id = request.query_params.get("session_id")
+        session = sessions.filter(session_id=session_id).first() if session_id else sessions.filter(is_active=True).first()
+        if session is None:
+            return Response({"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            before = int(request.query_params["before"]) if request.query_params.get("before") else None
+            limit = min(max(int(request.query_params.get("limit", 50)), 1), 200)
+        except ValueError:
+            return Response({"error": "before and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        messages, has_more = ConversationHistoryService.page(session, limit=limit, before=before)
+        return Response({
+            "session_id": session.session_id,
+            "messages": messages,
+            "has_more": has_more,
+            "before": messages[0]["id"] if has_more and messages else None,
+        })
+    
+    # Steps whose answers need more than one validated field (see step_graph.ANSWERS)
+    STEP_HANDLERS = {
+        "address_collection": "_answer_address_collection",
+        "address_verification": "_answer_address_verification",
+        "address_confirmation": "_answer_address_confirmation",
+        "company_collection": "_answer_company_collection",
+        "company_verification": "_answer_company_verification",
+        "directors_list": "_answer_directors_list",
+        "director_details": "_answer_director_details",
+        "financial_employment_details": "_answer_employment_details",
+        "assets_liabilities_summary": "_answer_assets_liabilities_summary",
+        "funding_type_selection": "_answer_funding_type_selection",
+        "documents_collection": "_answer_documents_collection",
+        **{step: "_answer_funding_question" for step in FUNDING_STEPS},
+    }
+    
     def _process_response(self, step: str, message: str, collected_data: dict, user_role: str, progress: OnboardingProgress, user) -> str:
-        """Process user response and update collected data."""
-        steps = self.chatbot_service.get_steps_for_role(user_role)
-        if not steps:
+        """Process user response and update collected data; returns the next step."""
+        graph = get_step_graph(user_role)
+        if not graph.steps:
             return "complete"  # No steps defined, mark as complete
         
-        # Safely get current index
-        try:
-            current_index = steps.index(step) if step in steps else 0
-        except (ValueError, AttributeError):
-            current_index = 0
-            step = steps[0] if steps else "complete"
-        
         # Handle special responses
         message_lower = message.lower().strip()
-        if message_lower in ["skip", "none", "n/a", "not applicable"]:
+        if message_lower in SKIP_REPLIES:
             # Skip optional fields
-            if current_index < len(steps) - 1:
-                return steps[current_index + 1]
-            return step
-        
-        if message_lower in ["yes, let's start", "yes", "ok", "sure", "let's go"]:
-            if step == "welcome":
-                return steps[1] if len(steps) > 1 else "complete"
-        
-        if message_lower in ["maybe later", "later", "not now"]:
+            return graph.skip_step(step)
+        if message_lower in START_REPLIES and step == "welcome":
+            return graph.next_step(step)
+        if message_lower in PAUSE_REPLIES:
             return "paused"
         
-        # Process step-specific responses
-        if step == "profile_name":
-            collected_data["first_name"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
+        handler = self.STEP_HANDLERS.get(step)
+        if handler is not None:
+            return getattr(self, handler)(graph, step, message, message_lower, collected_data, user_role)
         
-        elif step == "profile_last_name":
-            collected_data["last_name"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "profile_dob":
-            # Parse date (DD/MM/YYYY)
-            try:
-                from datetime import datetime
-                date_obj = datetime.strptime(message, "%d/%m/%Y")
-                collected_data["date_of_birth"] = date_obj.strftime("%Y-%m-%d")
-            except:
-                pass  # Invalid date, will ask again
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "contact_email":
-            collected_data["email"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "contact_phone":
-            collected_data["phone_number"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "address_collection":
-            collected_data["postcode"] = message
-            # Use postcode lookup to get address details
-            try:
-                import requests
-                from django.conf import settings
+        # Store the validated answer, if the step collects one, and move to the next step
+        answer = ANSWERS.get(step)
+        if answer is not None:
+            answer.apply(message, message_lower, collected_data)
+        return graph.next_step(step)
+    
+    def _answer_address_collection(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        """Look the postcode up and offer the address found."""
+        collected_data["postcode"] = message
+        # Use postcode lookup to get address details
+        try:
+            from django.conf import settings
+            from mapping.geocoding import cached_google_api
+            
+            api_key = settings.GOOGLE_API_KEY
+            if api_key:
+                # Call Google Geocoding API for postcode lookup
+                url = "https://maps.googleapis.com/maps/api/geocode/json"
+                params = {
+                    "address": f"{message}, UK",
+                    "region": "gb",
+                }
+                status_code, data = cached_google_api(url, params)
+                if status_code != 200:
+                    raise Exception(data.get("error") or f"Geocoding API returned {status_code}")
                 
-                api_key = settings.GOOGLE_API_KEY
-                if api_key:
-                    # Call Google Geocoding API for postcode lookup
-                    url = "https://maps.googleapis.com/maps/api/geocode/json"
-                    params = {
-                        "address": f"{message}, UK",
-                        "key": api_key,
-                        "region": "gb",
+                if data.get("status") == "OK" and data.get("results"):
+                    result = data["results"][0]
+                    formatted_address = result.get("formatted_address", "")
+                    
+                    # Extract address components
+                    components = {}
+                    for component in result.get("address_components", []):
+                        types = component.get("types", [])
+                        if "postal_town" in types or "locality" in types:
+                            components["town"] = component.get("long_name")
+                        elif "administrative_area_level_2" in types:
+                            components["county"] = component.get("long_name")
+                        elif "postal_code" in types:
+                            components["postcode"] = component.get("long_name")
+                        elif "country" in types:
+                            components["country"] = component.get("long_name")
+                        elif "street_number" in types:
+                            components["street_number"] = component.get("long_name")
+                        elif "route" in types:
+                            components["route"] = component.get("long_name")
+                    
+                    # Store verification data with formatted address
+                    collected_data["address_verification_data"] = {
+                        "verified": True,
+                        "formatted_address": formatted_address,
+                        "components": components,
+                        "confidence_score": 0.9,
+                        "message": "Address found via postcode lookup",
                     }
-                    response = requests.get(url, params=params, timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
                     
-                    if data.get("status") == "OK" and data.get("results"):
-                        result = data["results"][0]
-                        formatted_address = result.get("formatted_address", "")
-                        
-                        # Extract address components
-                        components = {}
-                        for component in result.get("address_components", []):
-                            types = component.get("types", [])
-                            if "postal_town" in types or "locality" in types:
-                                components["town"] = component.get("long_name")
-                            elif "administrative_area_level_2" in types:
-                                components["county"] = component.get("long_name")
-                            elif "postal_code" in types:
-                                components["postcode"] = component.get("long_name")
-                            elif "country" in types:
-                                components["country"] = component.get("long_name")
-                            elif "street_number" in types:
-                                components["street_number"] = component.get("long_name")
-                            elif "route" in types:
-                                components["route"] = component.get("long_name")
-                        
-                        # Store verification data with formatted address
-                        collected_data["address_verification_data"] = {
-                            "verified": True,
-                            "formatted_address": formatted_address,
-                            "components": components,
-                            "confidence_score": 0.9,
-                            "message": "Address found via postcode lookup",
-                        }
-                        
-                        # Store address components in collected_data for later use
-                        if components.get("town"):
-                            collected_data["town"] = components["town"]
-                        if components.get("county"):
-                            collected_data["county"] = components["county"]
-                        
-                        return "address_verification"
-                    else:
-                        # Postcode lookup failed
-                        collected_data["address_verification_data"] = {
-                            "verified": False,
-                            "formatted_address": None,
-                            "message": f"Could not find address for postcode: {data.get('status', 'Unknown error')}",
-                        }
+                    # Store address components in collected_data for later use
+                    if components.get("town"):
+                        collected_data["town"] = components["town"]
+                    if components.get("county"):
+                        collected_data["county"] = components["county"]
+                    
+                    return "address_verification"
                 else:
-                    # No API key
+                    # Postcode lookup failed
                     collected_data["address_verification_data"] = {
                         "verified": False,
                         "formatted_address": None,
-                        "message": "Address verification service not configured",
+                        "message": f"Could not find address for postcode: {data.get('status', 'Unknown error')}",
                     }
-            except Exception as e:
-                import traceback
-                print(f"Error in postcode lookup: {e}")
-                print(traceback.format_exc())
+            else:
+                # No API key
                 collected_data["address_verification_data"] = {
                     "verified": False,
                     "formatted_address": None,
-                    "message": f"Error looking up address: {str(e)}",
+                    "message": "Address verification service not configured",
                 }
-            
-            # If we got a formatted address, go to verification step
-            if collected_data.get("address_verification_data", {}).get("verified"):
-                return "address_verification"
-            
-            # API failed or no results - fall back to manual address collection
-            # Set flag to indicate manual entry is needed
-            collected_data["address_manual_entry_required"] = True
-            collected_data["address_lookup_failed"] = True
-            # Go to address confirmation step to collect address manually
-            return "address_confirmation" if "address_confirmation" in steps else (steps[current_index + 1] if current_index < len(steps) - 1 else "complete")
-        
-        elif step == "address_verification":
-            if message_lower in ["yes", "yes, that's correct", "correct", "yes that's correct"]:
-                # Use the verified address
-                addr_data = collected_data.get("address_verification_data", {})
-                components = addr_data.get("components", {})
-                collected_data["address_line_1"] = components.get("route", "") or addr_data.get("formatted_address", "").split(",")[0]
-                collected_data["town"] = components.get("town", "")
-                collected_data["county"] = components.get("county", "")
-                collected_data["postcode"] = components.get("postcode", "") or collected_data.get("postcode", "")
-                return "address_confirmation" if "address_confirmation" in steps else (steps[current_index + 1] if current_index < len(steps) - 1 else "complete")
-            else:
-                # User wants to enter manually
-                return "address_confirmation" if "address_confirmation" in steps else (steps[current_index + 1] if current_index < len(steps) - 1 else "complete")
-        
-        elif step == "address_confirmation":
-            # Track which address field we're collecting
-            address_fields_collected = collected_data.get("address_fields_collected", [])
-            
-            # Determine which field to collect next
-            if "address_line_1" not in address_fields_collected:
-                collected_data["address_line_1"] = message
-                address_fields_collected.append("address_line_1")
-                collected_data["address_fields_collected"] = address_fields_collected
-                # Stay on this step to collect next field
-                return "address_confirmation"
-            elif "address_line_2" not in address_fields_collected:
-                # Address line 2 is optional, but we'll ask anyway
-                collected_data["address_line_2"] = message if message_lower not in ["skip", "none", "n/a", ""] else ""
-                address_fields_collected.append("address_line_2")
-                collected_data["address_fields_collected"] = address_fields_collected
-                return "address_confirmation"
-            elif "town" not in address_fields_collected:
-                collected_data["town"] = message
-                address_fields_collected.append("town")
-                collected_data["address_fields_collected"] = address_fields_collected
-                return "address_confirmation"
-            elif "county" not in address_fields_collected:
-                collected_data["county"] = message
-                address_fields_collected.append("county")
-                collected_data["address_fields_collected"] = address_fields_collected
-                return "address_confirmation"
-            elif "postcode" not in address_fields_collected or not collected_data.get("postcode"):
-                # Use postcode from address_collection if available, otherwise collect it
-                if not collected_data.get("postcode"):
-                    collected_data["postcode"] = message
-                address_fields_collected.append("postcode")
-                collected_data["address_fields_collected"] = address_fields_collected
-                return "address_confirmation"
-            elif "country" not in address_fields_collected:
-                collected_data["country"] = message if message_lower not in ["skip", "none", "n/a", ""] else "United Kingdom"
-                address_fields_collected.append("country")
-                collected_data["address_fields_collected"] = address_fields_collected
-                # All fields collected, move to next step
-                return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-            else:
-                # All fields collected, move to next step
-                return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "company_collection":
-            if message_lower not in ["skip", "none", "n/a"]:
-                collected_data["company_registration_number"] = message
-                # Verify company with Companies House
-                if self.hmrc_service:
-                    company_name = collected_data.get("company_name", "")
-                    verification = self.hmrc_service.verify_company(message, company_name)
-                    collected_data["company_verification_data"] = verification
-                    
-                    # Get directors list from Companies House
-                    if verification.get("verified"):
-                        company_info = verification.get("company_info", {})
-                        company_number = message
-                        officers_data = self.hmrc_service.get_company_officers(company_number)
-                        if "error" not in officers_data:
-                            directors = officers_data.get("items", [])
-                            collected_data["company_verification_data"]["directors"] = directors
-                            collected_data["company_verification_data"]["company_info"] = company_info
-                            return "company_verification"
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "company_verification":
-            if message_lower in ["yes", "yes, that's correct", "correct", "yes that's correct"]:
-                # Store company name from verification
-                comp_data = collected_data.get("company_verification_data", {})
-                comp_info = comp_data.get("company_info", {})
-                collected_data["company_name"] = comp_info.get("company_name", "")
-                return "company_confirmation" if "company_confirmation" in steps else (steps[current_index + 1] if current_index < len(steps) - 1 else "complete")
-            else:
-                return "company_collection"  # Go back to ask for company number again
-        
-        elif step == "company_confirmation":
-            collected_data["company_name"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "directors_list":
-            if message_lower in ["yes", "yes, i'm ready", "ready", "yes i'm ready to provide director details"]:
-                # Initialize directors collection
-                collected_data["directors_collected"] = []
-                directors = collected_data.get("company_verification_data", {}).get("directors", [])
-                if directors:
-                    return "director_details"  # Start collecting director details
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "director_details":
-            # Parse director details: "Name, DOB, Nationality"
-            directors_collected = collected_data.get("directors_collected", [])
-            directors = collected_data.get("company_verification_data", {}).get("directors", [])
-            
-            # Parse the input
-            parts = [p.strip() for p in message.split(",")]
-            director_data = {
-                "name": parts[0] if len(parts) > 0 else message,
-                "date_of_birth": parts[1] if len(parts) > 1 else None,
-                "nationality": parts[2] if len(parts) > 2 else None,
+        except Exception as e:
+            import traceback
+            print(f"Error in postcode lookup: {e}")
+            print(traceback.format_exc())
+            collected_data["address_verification_data"] = {
+                "verified": False,
+                "formatted_address": None,
+                "message": f"Error looking up address: {str(e)}",
             }
-            
-            # Verify director with HMRC if service available
-            if self.hmrc_service and collected_data.get("company_registration_number"):
-                company_number = collected_data["company_registration_number"]
-                dob_str = None
-                if director_data["date_of_birth"]:
-                    try:
-                        from datetime import datetime
-                        dob_obj = datetime.strptime(director_data["date_of_birth"], "%d/%m/%Y")
-                        dob_str = dob_obj.strftime("%Y-%m-%d")
-                    except:
-                        pass
-                
-                verification = self.hmrc_service.verify_director(
-                    company_number,
-                    director_data["name"],
-                    dob_str
-                )
-                director_data["verification"] = verification
-            
-            directors_collected.append(director_data)
-            collected_data["directors_collected"] = directors_collected
-            
-            # Check if we need to collect more directors
-            if len(directors_collected) < len(directors):
-                return "director_details"  # Continue collecting
-            else:
-                # All directors collected, move to next step
-                return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        # KYC and Financial Information (Borrowers)
-        elif step == "kyc_nationality":
-            collected_data["nationality"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "kyc_national_insurance":
-            if message_lower not in ["skip", "none", "n/a"]:
-                collected_data["national_insurance_number"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "kyc_source_of_funds":
-            collected_data["source_of_funds"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_income":
-            try:
-                collected_data["annual_income"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                pass
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_employment":
-            collected_data["employment_status"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_employment_details":
-            if message_lower not in ["skip", "none", "n/a"]:
-                # Parse "Company Name, Position"
-                parts = [p.strip() for p in message.split(",")]
-                collected_data["employment_company"] = parts[0] if len(parts) > 0 else message
-                collected_data["employment_position"] = parts[1] if len(parts) > 1 else ""
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_expenses":
-            try:
-                collected_data["monthly_expenses"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                pass
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_existing_debts":
-            try:
-                collected_data["existing_debts"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                collected_data["existing_debts"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_assets":
-            try:
-                collected_data["total_assets"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                pass
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        # Asset & Liability Statement
-        elif step == "assets_real_estate":
-            try:
-                collected_data["assets_real_estate"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                collected_data["assets_real_estate"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "assets_investments":
-            try:
-                collected_data["assets_investments"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                collected_data["assets_investments"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "assets_other":
-            try:
-                collected_data["assets_other"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                collected_data["assets_other"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "liabilities_mortgages":
-            try:
-                collected_data["liabilities_mortgages"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                collected_data["liabilities_mortgages"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "liabilities_loans":
-            try:
-                collected_data["liabilities_loans"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                collected_data["liabilities_loans"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "liabilities_other":
-            try:
-                collected_data["liabilities_other"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                collected_data["liabilities_other"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "assets_liabilities_summary":
-            if message_lower in ["yes", "yes, that's correct", "correct", "yes that's correct"]:
-                # Store calculated values
-                total_assets = (
-                    float(collected_data.get("assets_real_estate", 0) or 0) +
-                    float(collected_data.get("assets_investments", 0) or 0) +
-                    float(collected_data.get("assets_other", 0) or 0) +
-                    float(collected_data.get("total_assets", 0) or 0)
-                )
-                total_liabilities = (
-                    float(collected_data.get("liabilities_mortgages", 0) or 0) +
-                    float(collected_data.get("liabilities_loans", 0) or 0) +
-                    float(collected_data.get("liabilities_other", 0) or 0) +
-                    float(collected_data.get("existing_debts", 0) or 0)
-                )
-                collected_data["total_assets_calculated"] = total_assets
-                collected_data["total_liabilities_calculated"] = total_liabilities
-                collected_data["net_worth_calculated"] = total_assets - total_liabilities
-                return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-            else:
-                # Go back to assets section
-                return "assets_real_estate"
-        
-        elif step == "experience_collection":
-            try:
-                collected_data["experience_years"] = int(message)
-            except:
-                pass
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "experience_projects":
-            try:
-                collected_data["previous_projects"] = int(message)
-            except:
-                collected_data["previous_projects"] = 0
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "portfolio_current_assets":
-            if message_lower not in ["skip", "none", "n/a", "no"]:
-                collected_data["portfolio_description"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "portfolio_property_details":
-            if message_lower not in ["skip", "none", "n/a", "no"]:
-                collected_data["portfolio_property_details"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "funding_type_selection":
-            # Store selected funding type
-            collected_data["funding_type"] = message
-            # Get funding type specific questions
-            funding_questions = self.chatbot_service.get_funding_type_specific_questions(message)
-            if funding_questions:
-                # Store questions to ask
-                collected_data["funding_type_questions"] = funding_questions
-                collected_data["current_funding_question_index"] = 0
-                # Move to first funding-specific question
-                return funding_questions[0]["step"]
-            else:
-                # No additional questions, proceed to documents
-                return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        # Handle funding type specific questions dynamically
-        elif step.startswith("revenue_based_") or step.startswith("mca_") or step.startswith("ip_") or \
-             step.startswith("stock_") or step.startswith("asset_") or step.startswith("factoring_") or \
-             step.startswith("trade_") or step.startswith("export_") or step.startswith("property_"):
-            # Find the question in funding_type_questions
-            funding_questions = collected_data.get("funding_type_questions", [])
-            current_index_funding = collected_data.get("current_funding_question_index", 0)
-            
-            # Store the answer
-            for q in funding_questions:
-                if q["step"] == step:
-                    field = q.get("field")
-                    if field:
-                        if q["type"] == "number":
-                            try:
-                                collected_data[field] = float(message.replace(",", "").replace("£", ""))
-                            except:
-                                pass
-                        else:
-                            collected_data[field] = message
-                    break
-            
-            # Move to next funding question or proceed
-            current_index_funding += 1
-            collected_data["current_funding_question_index"] = current_index_funding
-            
-            if current_index_funding < len(funding_questions):
-                # More questions to ask
-                return funding_questions[current_index_funding]["step"]
-            else:
-                # All funding questions answered, proceed to documents
-                return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
         
-        # FCA and Financial Information (Lenders)
-        elif step == "fca_registration":
-            collected_data["has_fca_registration"] = message_lower in ["yes", "y"]
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
+        # If we got a formatted address, go to verification step
+        if collected_data.get("address_verification_data", {}).get("verified"):
+            return "address_verification"
         
-        elif step == "fca_registration_number":
-            if message_lower not in ["skip", "none", "n/a"]:
-                collected_data["fca_registration_number"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "fca_permissions":
-            if message_lower not in ["skip", "none", "n/a"]:
-                collected_data["fca_permissions"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_licences":
-            if message_lower not in ["skip", "none", "n/a"]:
-                collected_data["financial_licences"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_capital_requirements":
-            try:
-                collected_data["regulatory_capital"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                pass
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "financial_lending_capacity":
-            try:
-                collected_data["lending_capacity"] = float(message.replace(",", "").replace("£", ""))
-            except:
-                pass
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-        
-        elif step == "key_personnel":
-            if message_lower not in ["skip", "none", "n/a"]:
-                collected_data["key_personnel"] = message
-            return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
+        # API failed or no results - fall back to manual address collection
+        # Set flag to indicate manual entry is needed
+        collected_data["address_manual_entry_required"] = True
+        collected_data["address_lookup_failed"] = True
+        # Go to address confirmation step to collect address manually
+        return graph.goto("address_confirmation", step)
+    
+    def _answer_address_verification(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        if message_lower in CONFIRM_REPLIES:
+            # Use the verified address
+            addr_data = collected_data.get("address_verification_data", {})
+            components = addr_data.get("components", {})
+            collected_data["address_line_1"] = components.get("route", "") or addr_data.get("formatted_address", "").split(",")[0]
+            collected_data["town"] = components.get("town", "")
+            collected_data["county"] = components.get("county", "")
+            collected_data["postcode"] = components.get("postcode", "") or collected_data.get("postcode", "")
+            return graph.goto("address_confirmation", step)
+        else:
+            # User wants to enter manually
+            return graph.goto("address_confirmation", step)
+    
+    def _answer_address_confirmation(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        """Collect the address one field per turn, staying on this step until done."""
+        # Track which address field we're collecting
+        address_fields_collected = collected_data.get("address_fields_collected", [])
+        
+        # Determine which field to collect next
+        if "address_line_1" not in address_fields_collected:
+            collected_data["address_line_1"] = message
+            address_fields_collected.append("address_line_1")
+            collected_data["address_fields_collected"] = address_fields_collected
+            # Stay on this step to collect next field
+            return "address_confirmation"
+        elif "address_line_2" not in address_fields_collected:
+            # Address line 2 is optional, but we'll ask anyway
+            collected_data["address_line_2"] = message if message_lower not in ["skip", "none", "n/a", ""] else ""
+            address_fields_collected.append("address_line_2")
+            collected_data["address_fields_collected"] = address_fields_collected
+            return "address_confirmation"
+        elif "town" not in address_fields_collected:
+            collected_data["town"] = message
+            address_fields_collected.append("town")
+            collected_data["address_fields_collected"] = address_fields_collected
+            return "address_confirmation"
+        elif "county" not in address_fields_collected:
+            collected_data["county"] = message
+            address_fields_collected.append("county")
+            collected_data["address_fields_collected"] = address_fields_collected
+            return "address_confirmation"
+        elif "postcode" not in address_fields_collected or not collected_data.get("postcode"):
+            # Use postcode from address_collection if available, otherwise collect it
+            if not collected_data.get("postcode"):
+                collected_data["postcode"] = message
+            address_fields_collected.append("postcode")
+            collected_data["address_fields_collected"] = address_fields_collected
+            return "address_confirmation"
+        elif "country" not in address_fields_collected:
+            collected_data["country"] = message if message_lower not in ["skip", "none", "n/a", ""] else "United Kingdom"
+            address_fields_collected.append("country")
+            collected_data["address_fields_collected"] = address_fields_collected
+            # All fields collected, move to next step
+            return graph.next_step(step)
+        else:
+            # All fields collected, move to next step
+            return graph.next_step(step)
+    
+    def _answer_company_collection(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        """Verify the company with Companies House and fetch its directors."""
+        if message_lower not in SKIP_REPLIES:
+            collected_data["company_registration_number"] = message
+            # Verify company with Companies House
+            if self.hmrc_service:
+                company_name = collected_data.get("company_name", "")
+                verification = self.hmrc_service.verify_company(message, company_name)
+                collected_data["company_verification_data"] = verification
+                
+                # Get directors list from Companies House
+                if verification.get("verified"):
+                    company_info = verification.get("company_info", {})
+                    company_number = message
+                    officers_data = self.hmrc_service.get_company_officers(company_number)
+                    if "error" not in officers_data:
+                        directors = officers_data.get("items", [])
+                        collected_data["company_verification_data"]["directors"] = directors
+                        collected_data["company_verification_data"]["company_info"] = company_info
+                        return "company_verification"
+        return graph.next_step(step)
+    
+    def _answer_company_verification(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        if message_lower in CONFIRM_REPLIES:
+            # Store company name from verification
+            comp_data = collected_data.get("company_verification_data", {})
+            comp_info = comp_data.get("company_info", {})
+            collected_data["company_name"] = comp_info.get("company_name", "")
+            return graph.goto("company_confirmation", step)
+        else:
+            return "company_collection"  # Go back to ask for company number again
+    
+    def _answer_directors_list(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        if message_lower in DIRECTORS_READY_REPLIES:
+            # Initialize directors collection
+            collected_data["directors_collected"] = []
+            directors = collected_data.get("company_verification_data", {}).get("directors", [])
+            if directors:
+                return "director_details"  # Start collecting director details
+        return graph.next_step(step)
+    
+    def _answer_director_details(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        """Parse "Name, DOB, Nationality" and verify the director; loops until all are collected."""
+        # Parse director details: "Name, DOB, Nationality"
+        directors_collected = collected_data.get("directors_collected", [])
+        directors = collected_data.get("company_verification_data", {}).get("directors", [])
+        
+        # Parse the input
+        parts = [p.strip() for p in message.split(",")]
+        director_data = {
+            "name": parts[0] if len(parts) > 0 else message,
+            "date_of_birth": parts[1] if len(parts) > 1 else None,
+            "nationality": parts[2] if len(parts) > 2 else None,
+        }
+        
+        # Verify director with HMRC if service available
+        if self.hmrc_service and collected_data.get("company_registration_number"):
+            company_number = collected_data["company_registration_number"]
+            dob_str = None
+            if director_data["date_of_birth"]:
+                try:
+                    dob_str = parse_date(director_data["date_of_birth"])
+                except ValueError:
+                    pass
+            
+            verification = self.hmrc_service.verify_director(
+                company_number,
+                director_data["name"],
+                dob_str
+            )
+            director_data["verification"] = verification
         
-        elif step == "documents_collection":
-            # Check if documents were uploaded
-            # This step is handled by file upload, but we need to verify documents are uploaded
-            # For now, if user sends a message, check document status
-            if message_lower in ["done", "finished", "complete", "all uploaded", "uploaded"]:
-                # Check if all required documents are uploaded
-                doc_status = self.chatbot_service.check_uploaded_documents(collected_data, user_role)
-                if doc_status["all_uploaded"]:
-                    return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-                else:
-                    # Still missing documents, stay on this step
-                    return "documents_collection"
-            else:
-                # User might be trying to skip or provide text response
-                # Check document status
-                doc_status = self.chatbot_service.check_uploaded_documents(collected_data, user_role)
-                if doc_status["all_uploaded"]:
-                    # All documents uploaded, can proceed
-                    return steps[current_index + 1] if current_index < len(steps) - 1 else "complete"
-                else:
-                    # Missing documents, remind and stay on this step
-                    return "documents_collection"
+        directors_collected.append(director_data)
+        collected_data["directors_collected"] = directors_collected
         
-        # Default: move to next step
-        if current_index < len(steps) - 1:
-            return steps[current_index + 1]
-        return "complete"
+        # Check if we need to collect more directors
+        if len(directors_collected) < len(directors):
+            return "director_details"  # Continue collecting
+        else:
+            # All directors collected, move to next step
+            return graph.next_step(step)
+    
+    def _answer_employment_details(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        if message_lower not in SKIP_REPLIES:
+            # Parse "Company Name, Position"
+            parts = [p.strip() for p in message.split(",")]
+            collected_data["employment_company"] = parts[0] if len(parts) > 0 else message
+            collected_data["employment_position"] = parts[1] if len(parts) > 1 else ""
+        return graph.next_step(step)
+    
+    def _answer_assets_liabilities_summary(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        if message_lower in CONFIRM_REPLIES:
+            # Store calculated values
+            total_assets = (
+                float(collected_data.get("assets_real_estate", 0) or 0) +
+                float(collected_data.get("assets_investments", 0) or 0) +
+                float(collected_data.get("assets_other", 0) or 0) +
+                float(collected_data.get("total_assets", 0) or 0)
+            )
+            total_liabilities = (
+                float(collected_data.get("liabilities_mortgages", 0) or 0) +
+                float(collected_data.get("liabilities_loans", 0) or 0) +
+                float(collected_data.get("liabilities_other", 0) or 0) +
+                float(collected_data.get("existing_debts", 0) or 0)
+            )
+            collected_data["total_assets_calculated"] = total_assets
+            collected_data["total_liabilities_calculated"] = total_liabilities
+            collected_data["net_worth_calculated"] = total_assets - total_liabilities
+            return graph.next_step(step)
+        else:
+            # Go back to assets section
+            return "assets_real_estate"
+    
+    def _answer_funding_type_selection(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        # Store selected funding type
+        collected_data["funding_type"] = message
+        # Get funding type specific questions
+        funding_questions = self.chatbot_service.get_funding_type_specific_questions(message)
+        if funding_questions:
+            # Store questions to ask
+            collected_data["funding_type_questions"] = funding_questions
+            collected_data["current_funding_question_index"] = 0
+            # Move to first funding-specific question
+            return funding_questions[0]["step"]
+        else:
+            # No additional questions, proceed to documents
+            return graph.next_step(step)
+    
+    def _answer_funding_question(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        """Store a funding-type question's answer, then ask the next one or move on."""
+        funding_questions = collected_data.get("funding_type_questions", [])
+        if any(question.get("step") == step for question in funding_questions):
+            ANSWERS[step].apply(message, message_lower, collected_data)
+        
+        current_index_funding = collected_data.get("current_funding_question_index", 0) + 1
+        collected_data["current_funding_question_index"] = current_index_funding
+        if current_index_funding < len(funding_questions):
+            # More questions to ask
+            return funding_questions[current_index_funding]["step"]
+        # All funding questions answered, proceed to documents
+        return graph.next_step(step)
+    
+    def _answer_documents_collection(self, graph: StepGraph, step: str, message: str, message_lower: str, collected_data: dict, user_role: str) -> str:
+        """Documents arrive by upload; any message moves on once all required ones are in."""
+        doc_status = self.chatbot_service.check_uploaded_documents(collected_data, user_role)
+        if doc_status["all_uploaded"]:
+            return graph.next_step(step)
+        # Missing documents, remind and stay on this step
+        return "documents_collection"
     
     def _update_progress(self, progress: OnboardingProgress, collected_data: dict, user_role: str, user=None):
         """Update onboarding progress based on collected data."""
@@ -908,11 +733,9 @@ class OnboardingViewSet(viewsets.ViewSet):
             
             # Auto-create ConsultantProfile if onboarding is complete and user is a Consultant
             if progress.is_complete and user:
-                user_roles = UserRole.objects.filter(user=user).select_related("role")
-                if user_roles.exists():
-                    role_names = [ur.role.name for ur in user_roles]
-                    if "Consultant" in role_names and not hasattr(user, "consultantprofile"):
-                        self._create_consultant_profile(user, collected_data)
+                principal = get_principal(user)
+                if principal.has_role(Role.CONSULTANT) and not principal.is_consultant:
+                    self._create_consultant_profile(user, collected_data)
         except Exception as e:
             import traceback
             print(f"Error in _update_progress: {e}")
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 
 from .models import PrivateEquityOpportunity, PrivateEquityInvestment
 
 
-class PrivateEquityOpportunitySerializer(serializers.ModelSerializer):
+class PrivateEquityOpportunitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for creating and retrieving private equity opportunities.
     The borrower field is read-only; it is set to the current borrower
@@ -54,7 +55,7 @@ class PrivateEquityOpportunitySerializer(serializers.ModelSerializer):
         )
 
 
-class PrivateEquityInvestmentSerializer(serializers.ModelSerializer):
+class PrivateEquityInvestmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for investor investments into private equity opportunities.
     The lender is set from the current user; status is read-only.
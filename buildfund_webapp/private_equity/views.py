@@ -7,6 +7,7 @@ from rest_framework.decorators import action  # type: ignore
 from rest_framework.response import Response
 
 from accounts.permissions import IsAdmin, IsBorrower, IsLender
+from accounts.principal import get_principal
 from rest_framework.exceptions import PermissionDenied
 
 from .models import PrivateEquityOpportunity, PrivateEquityInvestment
@@ -30,11 +31,12 @@ class PrivateEquityOpportunityViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        principal = get_principal(user)
         # Borrowers see their own opportunities (no certification needed for their own)
-        if hasattr(user, "borrowerprofile"):
-            return PrivateEquityOpportunity.objects.filter(borrower=user.borrowerprofile)
+        if principal.is_borrower:
+            return PrivateEquityOpportunity.objects.filter(borrower_id=principal.borrower_profile_id)
         # Admins see all (no certification needed)
-        if IsAdmin().has_permission(self.request, self):
+        if principal.is_admin:
             return PrivateEquityOpportunity.objects.all()
         # Others (lenders/investors) need FCA certification to view approved opportunities
         if not check_certification(user):
@@ -80,19 +82,20 @@ class PrivateEquityInvestmentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        if hasattr(user, "lenderprofile"):
+        principal = get_principal(user)
+        if principal.is_lender:
             # Lenders need FCA certification to create/view investments
             if not check_certification(user):
                 raise PermissionDenied(
                     "FCA self-certification is required to access Private Equity investments. "
                     "Please complete the self-certification process first."
                 )
-            return PrivateEquityInvestment.objects.filter(lender=user.lenderprofile)
-        if hasattr(user, "borrowerprofile"):
+            return PrivateEquityInvestment.objects.filter(lender_id=principal.lender_profile_id)
+        if principal.is_borrower:
             # Borrowers see investments on their opportunities (no certification needed for their own)
-            return PrivateEquityInvestment.objects.filter(opportunity__borrower=user.borrowerprofile)
+            return PrivateEquityInvestment.objects.filter(opportunity__borrower_id=principal.borrower_profile_id)
         # Admins see all (no certification needed)
-        if IsAdmin().has_permission(self.request, self):
+        if principal.is_admin:
             return PrivateEquityInvestment.objects.all()
         # Others see none
         return PrivateEquityInvestment.objects.none()
@@ -108,6 +111,5 @@ class PrivateEquityInvestmentViewSet(viewsets.ModelViewSet):
 
     class AdminOrOwnerPermission(permissions.BasePermission):
         def has_object_permission(self, request, view, obj):
-            return IsAdmin().has_permission(request, view) or (
-                hasattr(request.user, "lenderprofile") and obj.lender == request.user.lenderprofile
-            )
\ No newline at end of file
+            principal = get_principal(request.user)
+            return principal.is_admin or (principal.is_lender and obj.lender_id == principal.lender_profile_id)
\ No newline at end of file
@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from core.validators import sanitize_string, validate_numeric_input
 
 from .models import Product, FavouriteProduct
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializes Product for API representation and creation."""
 
     class Meta:
@@ -136,7 +137,7 @@ class ProductSerializer(serializers.ModelSerializer):
         return data
 
 
-class FavouriteProductSerializer(serializers.ModelSerializer):
+class FavouriteProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for FavouriteProduct."""
     
     product = ProductSerializer(read_only=True)
@@ -6,6 +6,7 @@ from rest_framework.decorators import action  # type: ignore
 from rest_framework.response import Response
 
 from accounts.permissions import IsAdmin, IsLender
+from accounts.principal import get_principal
 
 from .models import Product, FavouriteProduct
 from .serializers import ProductSerializer, FavouriteProductSerializer
@@ -31,16 +32,23 @@ class ProductViewSet(viewsets.ModelViewSet):
         - Lenders see only their own products.
         - Administrators see all products regardless of status.
         - Other authenticated users see only active products.
+
+        ``?status=`` narrows any of these to one status.
         """
-        user = self.request.user
+        principal = get_principal(self.request.user)
         # Lender: only own products
-        if hasattr(user, "lenderprofile"):
-            return Product.objects.filter(lender=user.lenderprofile).select_related('lender')
+        if principal.is_lender:
+            qs = Product.objects.filter(lender_id=principal.lender_profile_id)
         # Admin: all products
-        if IsAdmin().has_permission(self.request, self):
-            return Product.objects.all().select_related('lender')
+        elif principal.is_admin:
+            qs = Product.objects.all()
         # Others: active only
-        return Product.objects.filter(status="active").select_related('lender')
+        else:
+            qs = Product.objects.filter(status="active")
+        status_param = self.request.query_params.get("status")
+        if status_param:
+            qs = qs.filter(status=status_param)
+        return qs.select_related('lender')
 
     def get_permissions(self):
         """Assign custom permissions based on action."""
@@ -103,9 +111,9 @@ class FavouriteProductViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return favourite products for the current borrower."""
-        user = self.request.user
-        if hasattr(user, "borrowerprofile"):
-            qs = FavouriteProduct.objects.filter(borrower=user.borrowerprofile).select_related(
+        principal = get_principal(self.request.user)
+        if principal.is_borrower:
+            qs = FavouriteProduct.objects.filter(borrower_id=principal.borrower_profile_id).select_related(
                 "product", "product__lender", "project"
             )
             # Filter by project if project_id is provided
@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from core.validators import sanitize_string, validate_postcode, validate_numeric_input
 
 from .models import Project
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializes Project model for API operations."""
     
     project_reference = serializers.CharField(read_only=True, allow_null=True, allow_blank=True, required=False)
@@ -7,6 +7,7 @@ from rest_framework.decorators import action  # type: ignore
 from rest_framework.response import Response
 
 from accounts.permissions import IsAdmin
+from accounts.principal import get_principal
 
 from .models import Project
 from .serializers import ProjectSerializer
@@ -16,7 +17,7 @@ class IsBorrower(permissions.BasePermission):
     """Allows access only to users with a borrower profile."""
 
     def has_permission(self, request, view) -> bool:
-        return request.user.is_authenticated and hasattr(request.user, "borrowerprofile")
+        return get_principal(request.user).is_borrower
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -45,17 +46,24 @@ class ProjectViewSet(viewsets.ModelViewSet):
         - Borrowers see only their own projects.
         - Administrators see all projects regardless of status.
         - Other authenticated users see only approved projects.
+
+        ``?status=`` narrows any of these to one status.
         """
-        user = self.request.user
+        principal = get_principal(self.request.user)
         try:
             # Borrower: only own projects
-            if hasattr(user, "borrowerprofile"):
-                return Project.objects.filter(borrower=user.borrowerprofile).select_related('borrower', 'borrower__user')
+            if principal.is_borrower:
+                qs = Project.objects.filter(borrower_id=principal.borrower_profile_id)
             # Admin: view all projects
-            if IsAdmin().has_permission(self.request, self):
-                return Project.objects.all().select_related('borrower', 'borrower__user')
+            elif principal.is_admin:
+                qs = Project.objects.all()
             # Others: approved projects only
-            return Project.objects.filter(status="approved").select_related('borrower', 'borrower__user')
+            else:
+                qs = Project.objects.filter(status="approved")
+            status_param = self.request.query_params.get("status")
+            if status_param:
+                qs = qs.filter(status=status_param)
+            return qs.select_related('borrower', 'borrower__user')
         except Exception as e:
             # Log error and return empty queryset to prevent 500
             import logging
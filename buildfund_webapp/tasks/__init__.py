@@ -0,0 +1,9 @@
+"""Background task queue.
+
+Work that should not run inside a web request (LLM calls, bulk imports) is
+enqueued as a ``BackgroundTask`` row and executed by the ``run_task_worker``
+management command.  Handlers are registered with ``register_task`` in each
+app's ``tasks.py`` module, which is discovered when Django starts.  The
+backend is selected with the ``TASKS_BACKEND`` setting so another broker can
+be swapped in later without touching callers.
+"""
@@ -0,0 +1,13 @@
+"""Admin configuration for the background task queue."""
+
+from django.contrib import admin
+
+from .models import BackgroundTask
+
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "reference", "status", "attempts", "run_after", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("reference",)
+    readonly_fields = ("created_at", "updated_at")
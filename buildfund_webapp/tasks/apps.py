@@ -0,0 +1,12 @@
+"""App configuration for the background task queue."""
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "tasks"
+
+    def ready(self):
+        # Import every installed app's tasks.py so its handlers register
+        autodiscover_modules("tasks")
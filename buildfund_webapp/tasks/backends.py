@@ -0,0 +1,73 @@
+"""Pluggable backends for enqueuing background tasks.
+
+``TASKS_BACKEND`` names the backend class.  ``DatabaseBackend`` (the
+default) stores tasks for the ``run_task_worker`` command; ``ImmediateBackend``
+runs them inline, which is useful in development without a worker.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BackgroundTask
+from .registry import get_task
+
+DEFAULT_BACKEND = "tasks.backends.DatabaseBackend"
+
+
+class BaseTaskBackend:
+    """Interface every task backend implements."""
+
+    def enqueue(self, name: str, payload: Dict[str, Any], reference: str = "",
+                run_after: Optional[datetime] = None) -> BackgroundTask:
+        raise NotImplementedError
+
+
+class DatabaseBackend(BaseTaskBackend):
+    """Store the task in the database for a worker process to claim."""
+
+    def enqueue(self, name, payload, reference="", run_after=None):
+        definition = get_task(name)
+        return BackgroundTask.objects.create(
+            name=name,
+            payload=payload,
+            reference=reference,
+            run_after=run_after or timezone.now(),
+            max_attempts=definition.max_attempts,
+        )
+
+
+class ImmediateBackend(DatabaseBackend):
+    """Record the task and run it in the calling process straight away."""
+
+    def enqueue(self, name, payload, reference="", run_after=None):
+        from .worker import TaskWorker
+
+        task = super().enqueue(name, payload, reference, run_after)
+        worker = TaskWorker(worker_id="immediate")
+        # Take the lease first: the worker only records outcomes for tasks it holds
+        claimed = worker.claim_task(task)
+        if claimed is not None:
+            worker.execute(claimed)
+        task.refresh_from_db()
+        return task
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path: str) -> BaseTaskBackend:
+    return import_string(path)()
+
+
+def get_backend() -> BaseTaskBackend:
+    return _load_backend(getattr(settings, "TASKS_BACKEND", DEFAULT_BACKEND))
+
+
+def enqueue(name: str, payload: Optional[Dict[str, Any]] = None, reference: str = "",
+            run_after: Optional[datetime] = None) -> BackgroundTask:
+    """Enqueue a registered task with the configured backend."""
+    return get_backend().enqueue(name, payload or {}, reference=reference, run_after=run_after)
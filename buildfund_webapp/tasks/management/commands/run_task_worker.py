@@ -0,0 +1,55 @@
+"""Run a background task worker."""
+from __future__ import annotations
+
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.worker import TaskWorker
+
+
+class Command(BaseCommand):
+    help = "Claim and execute queued background tasks (run one or more of these alongside the web workers)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty (default: 1).',
+        )
+        parser.add_argument(
+            '--max-tasks',
+            type=int,
+            default=None,
+            help='Exit after executing this many tasks.',
+        )
+        parser.add_argument(
+            '--worker-id',
+            default=None,
+            help='Identifier recorded on claimed tasks (default: hostname:pid).',
+        )
+
+    def handle(self, *args, **options):
+        worker = TaskWorker(worker_id=options['worker_id'])
+
+        def _stop(signum, frame):
+            # Finish the current task, then exit
+            self.stdout.write("Stopping after the current task...")
+            worker.should_stop = True
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(f"Task worker {worker.worker_id} started.")
+        executed = worker.run(
+            burst=options['burst'],
+            sleep=options['sleep'],
+            max_tasks=options['max_tasks'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Task worker {worker.worker_id} executed {executed} tasks."))
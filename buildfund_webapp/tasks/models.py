@@ -0,0 +1,54 @@
+"""Models for the database-backed task queue."""
+from __future__ import annotations
+
+from django.db import models
+
+
+class BackgroundTask(models.Model):
+    """A unit of deferred work picked up by the task worker."""
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    name = models.CharField(max_length=100, help_text="Registered handler name")
+    payload = models.JSONField(default=dict, blank=True, help_text="Keyword arguments for the handler")
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        db_index=True,
+        help_text="Identifier of the object this task works on (e.g. underwriter_report:42)",
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+
+    # Scheduling and retries
+    run_after = models.DateTimeField(help_text="Earliest time the task may run")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+
+    # Worker lease
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    # Outcome
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"BackgroundTask({self.name} #{self.id} - {self.status})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
@@ -0,0 +1,44 @@
+"""Registry of background task handlers."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler when retrying the task cannot succeed."""
+
+
+@dataclass(frozen=True)
+class TaskDefinition:
+    name: str
+    func: Callable[..., object]
+    max_attempts: int = 3
+    retry_delay_seconds: int = 30
+
+    def retry_delay(self, attempts: int) -> int:
+        """Exponential backoff: delay, 2x delay, 4x delay, ..."""
+        return self.retry_delay_seconds * (2 ** max(attempts - 1, 0))
+
+
+_registry: Dict[str, TaskDefinition] = {}
+
+
+def register_task(name: str, max_attempts: int = 3, retry_delay_seconds: int = 30):
+    """
+    Register a function as the handler for a named task.
+
+    The handler is called with the task payload as keyword arguments; its
+    return value (if JSON-serialisable) is stored as the task result.
+    """
+    def decorator(func):
+        _registry[name] = TaskDefinition(name, func, max_attempts, retry_delay_seconds)
+        return func
+    return decorator
+
+
+def get_task(name: str) -> TaskDefinition:
+    try:
+        return _registry[name]
+    except KeyError:
+        raise PermanentTaskError(f"No handler registered for task '{name}'")
@@ -0,0 +1,35 @@
+"""Tests for the task backends."""
+from __future__ import annotations
+
+from django.test import TestCase
+
+from tasks.backends import ImmediateBackend
+from tasks.registry import register_task
+from tasks.worker import TaskWorker
+
+CALLS = []
+
+
+@register_task("tests.echo", max_attempts=2)
+def echo(value):
+    CALLS.append(value)
+    return {"echo": value}
+
+
+class ImmediateBackendTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_runs_the_task_and_records_its_result(self):
+        task = ImmediateBackend().enqueue("tests.echo", {"value": 7})
+        self.assertEqual(CALLS, [7])
+        self.assertEqual(task.status, "succeeded")
+        self.assertEqual(task.result, {"echo": 7})
+        self.assertEqual(task.attempts, 1)
+        self.assertEqual(task.locked_by, "")
+        self.assertIsNotNone(task.finished_at)
+
+    def test_worker_does_not_rerun_an_immediate_task(self):
+        ImmediateBackend().enqueue("tests.echo", {"value": 1})
+        self.assertEqual(TaskWorker(worker_id="test").run(burst=True), 0)
+        self.assertEqual(CALLS, [1])
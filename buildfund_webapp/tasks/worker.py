@@ -0,0 +1,152 @@
+"""Worker that claims and executes database-backed tasks."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BackgroundTask
+from .registry import PermanentTaskError, get_task
+
+logger = logging.getLogger(__name__)
+
+# A running task whose lease is older than this is assumed orphaned by a dead worker
+DEFAULT_VISIBILITY_TIMEOUT = 600
+
+
+def _json_safe(value: Any) -> Any:
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class TaskWorker:
+    """Claim due tasks one at a time and run their handlers."""
+
+    def __init__(self, worker_id: Optional[str] = None, visibility_timeout: Optional[int] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.visibility_timeout = visibility_timeout or getattr(
+            settings, "TASKS_VISIBILITY_TIMEOUT", DEFAULT_VISIBILITY_TIMEOUT
+        )
+        self.should_stop = False
+
+    def claim(self) -> Optional[BackgroundTask]:
+        """
+        Claim the next due task, or return None if the queue is idle.
+
+        Claiming is a conditional UPDATE on the row's previous state, so
+        concurrent workers on any database backend never run the same task.
+        """
+        now = timezone.now()
+        stale_before = now - timedelta(seconds=self.visibility_timeout)
+        candidates = BackgroundTask.objects.filter(
+            Q(status="queued", run_after__lte=now) |
+            Q(status="running", locked_at__lt=stale_before)
+        ).order_by("run_after", "id").values_list("pk", "status", "locked_at")[:10]
+
+        for pk, status, locked_at in candidates:
+            task = self._claim_row(pk, status, locked_at, now)
+            if task is not None:
+                return task
+        return None
+
+    def claim_task(self, task: BackgroundTask) -> Optional[BackgroundTask]:
+        """
+        Claim one specific task that is still queued, regardless of ``run_after``.
+
+        Returns the claimed row, or None if another worker got to it first.
+        """
+        return self._claim_row(task.pk, "queued", None, timezone.now())
+
+    def _claim_row(self, pk: int, status: str, locked_at, now) -> Optional[BackgroundTask]:
+        claimed = BackgroundTask.objects.filter(pk=pk, status=status, locked_at=locked_at).update(
+            status="running",
+            locked_by=self.worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return BackgroundTask.objects.get(pk=pk)
+        return None
+
+    def execute(self, task: BackgroundTask) -> BackgroundTask:
+        """Run a claimed task and record its outcome (success, retry or failure)."""
+        started = time.perf_counter()
+        try:
+            if task.attempts > task.max_attempts:
+                raise PermanentTaskError(f"Gave up after {task.max_attempts} attempts")
+            definition = get_task(task.name)
+            result = definition.func(**task.payload)
+        except PermanentTaskError as e:
+            self._finish(task, "failed", error=str(e))
+        except Exception as e:
+            logger.error(f"Task {task.name} #{task.pk} failed (attempt {task.attempts}): {e}", exc_info=True)
+            if task.attempts < task.max_attempts:
+                delay = definition.retry_delay(task.attempts)
+                self._update(
+                    task,
+                    status="queued",
+                    run_after=timezone.now() + timedelta(seconds=delay),
+                    last_error=str(e),
+                    locked_by="",
+                    locked_at=None,
+                )
+            else:
+                self._finish(task, "failed", error=str(e))
+        else:
+            self._finish(task, "succeeded", result=_json_safe(result))
+        logger.info(f"Task {task.name} #{task.pk} ran in {time.perf_counter() - started:.2f}s")
+        return task
+
+    def run(self, burst: bool = False, sleep: float = 1.0, max_tasks: Optional[int] = None) -> int:
+        """
+        Process tasks until stopped.
+
+        With ``burst`` the worker exits once the queue is idle; otherwise it
+        polls every ``sleep`` seconds.  Returns the number of tasks executed.
+        """
+        executed = 0
+        while not self.should_stop:
+            close_old_connections()
+            task = self.claim()
+            if task is None:
+                if burst:
+                    break
+                time.sleep(sleep)
+                continue
+            self.execute(task)
+            executed += 1
+            if max_tasks is not None and executed >= max_tasks:
+                break
+        return executed
+
+    def _finish(self, task: BackgroundTask, status: str, result: Any = None, error: str = "") -> None:
+        self._update(
+            task,
+            status=status,
+            result=result,
+            last_error=error,
+            finished_at=timezone.now(),
+            locked_by="",
+            locked_at=None,
+        )
+
+    def _update(self, task: BackgroundTask, **fields) -> None:
+        # Only write if we still hold the lease (it may have been reclaimed as stale)
+        BackgroundTask.objects.filter(pk=task.pk, locked_by=self.worker_id).update(
+            updated_at=timezone.now(), **fields
+        )
+        for field, value in fields.items():
+            setattr(task, field, value)
@@ -7,12 +7,13 @@ handle validation of incoming data when generating new reports.
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 
 from .models import UnderwritingReport
 from projects.models import Project
 
 
-class UnderwritingReportSerializer(serializers.ModelSerializer):
+class UnderwritingReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for existing underwriting reports."""
 
     class Meta:
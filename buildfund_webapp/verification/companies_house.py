@@ -0,0 +1,200 @@
+"""Shared Companies House API client with a keyed response cache.
+
+Both ``HMRCVerificationService`` and ``borrowers.services.CompaniesHouseService``
+go through this client, so a company looked up by onboarding, verification,
+the consultant import and the borrower wizard is fetched upstream once.
+
+* Responses are cached in the ``api`` cache per path and query, with a TTL
+  chosen by endpoint (a company profile changes less often than its filing
+  history).
+* Stale entries carrying an ETag are revalidated with ``If-None-Match``; a
+  304 refreshes the entry without transferring the body.
+* 404s are cached for a short time so repeated lookups of a mistyped
+  company number do not reach the API.
+* Concurrent lookups of the same resource in one process share a single
+  upstream request.
+* If the API fails and a stale entry exists, the stale entry is served.
+"""
+from __future__ import annotations
+
+import base64
+import copy
+import hashlib
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+
+from core.cache import API_CACHE
+from core.http import get_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.company-information.service.gov.uk"
+
+# Freshness per endpoint, in seconds; the first matching pattern wins
+ENDPOINT_TTLS = (
+    ("profile", re.compile(r"^/company/[^/]+$"), 12 * 60 * 60),
+    ("officers", re.compile(r"^/company/[^/]+/officers$"), 6 * 60 * 60),
+    ("pscs", re.compile(r"^/company/[^/]+/persons-with-significant-control$"), 6 * 60 * 60),
+    ("charges", re.compile(r"^/company/[^/]+/charges$"), 6 * 60 * 60),
+    ("filing_history", re.compile(r"^/company/[^/]+/filing-history$"), 60 * 60),
+    ("search", re.compile(r"^/search/"), 15 * 60),
+)
+DEFAULT_TTL = 60 * 60
+NOT_FOUND_TTL = 15 * 60
+# How long a stale entry is kept for revalidation and as an error fallback
+STALE_RETENTION = 7 * 24 * 60 * 60
+
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+class CompaniesHouseError(Exception):
+    """An upstream request failed; ``status_code`` is None for network errors."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, data: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.data = data or {}
+
+
+def endpoint_name(path: str) -> str:
+    for name, pattern, _ in ENDPOINT_TTLS:
+        if pattern.match(path):
+            return name
+    return "other"
+
+
+def endpoint_ttl(path: str) -> int:
+    for _, pattern, ttl in ENDPOINT_TTLS:
+        if pattern.match(path):
+            return ttl
+    return DEFAULT_TTL
+
+
+def cache_key(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    query = urlencode(sorted((params or {}).items()))
+    digest = hashlib.sha256(f"{path}?{query}".encode()).hexdigest()
+    return f"companies_house:response:{digest}"
+
+
+class CompaniesHouseClient:
+    """Authenticated, cached access to the Companies House public data API."""
+
+    def __init__(self, api_key: str):
+        # Companies House uses HTTP Basic Auth with the API key as username and an empty password
+        credentials = base64.b64encode(f"{api_key.strip()}:".encode()).decode()
+        self.headers = {
+            "Authorization": f"Basic {credentials}",
+            "Accept": "application/json",
+        }
+        self.base_url = getattr(settings, "COMPANIES_HOUSE_API_URL", DEFAULT_BASE_URL).rstrip("/")
+        # Pooled connections, concurrency cap, retries and metrics are shared per process
+        self.http = get_client("companies_house")
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    @contextmanager
+    def stream(self, path: str, timeout: int = 30):
+        """Stream an uncached response (e.g. a filing document), holding a host slot until it is read."""
+        with self.http.stream(self.url(path), headers=self.headers, timeout=timeout, endpoint="document") as response:
+            response.raise_for_status()
+            yield response
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: int = 10) -> Dict[str, Any]:
+        """
+        Return the JSON body for a GET request, from the cache when fresh.
+
+        Raises ``CompaniesHouseError`` for error responses (including cached 404s).
+        """
+        key = cache_key(path, params)
+        entry = caches[API_CACHE].get(key)
+        if entry is None or entry["expires_at"] <= time.time():
+            entry = self._coalesced(key, lambda: self._refresh(key, path, params, timeout, entry))
+        if entry["status"] == 404:
+            raise CompaniesHouseError(
+                f"404 Client Error: Not Found for url: {self.url(path)}", status_code=404, data=entry["data"]
+            )
+        return copy.deepcopy(entry["data"])
+
+    @staticmethod
+    def _coalesced(key: str, fetch):
+        """Run fetch once per key at a time; concurrent callers wait for and share its result."""
+        with _inflight_lock:
+            future = _inflight.get(key)
+            leader = future is None
+            if leader:
+                future = _inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fetch()
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+
+    def _refresh(self, key, path, params, timeout, stale) -> Dict[str, Any]:
+        # Another thread may have refreshed the entry while this one waited
+        current = caches[API_CACHE].get(key)
+        if current is not None and current["expires_at"] > time.time():
+            return current
+        stale = current or stale
+
+        headers = dict(self.headers)
+        if stale and stale.get("etag"):
+            headers["If-None-Match"] = stale["etag"]
+        try:
+            response = self.http.get(
+                self.url(path), headers=headers, params=params, timeout=timeout, endpoint=endpoint_name(path)
+            )
+        except requests.RequestException as exc:
+            if stale and stale["status"] == 200:
+                logger.warning(f"Companies House request failed, serving stale {path}: {exc}")
+                return stale
+            raise CompaniesHouseError(str(exc))
+
+        if response.status_code == 304 and stale:
+            entry = {**stale, "expires_at": time.time() + endpoint_ttl(path)}
+        elif response.status_code == 404:
+            entry = {"status": 404, "data": self._json(response), "etag": None, "expires_at": time.time() + NOT_FOUND_TTL}
+        elif response.ok:
+            entry = {
+                "status": 200,
+                "data": response.json(),
+                "etag": response.headers.get("ETag"),
+                "expires_at": time.time() + endpoint_ttl(path),
+            }
+        else:
+            if stale and stale["status"] == 200 and response.status_code >= 500:
+                logger.warning(f"Companies House returned {response.status_code}, serving stale {path}")
+                return stale
+            try:
+                response.raise_for_status()
+            except requests.HTTPError as exc:
+                raise CompaniesHouseError(str(exc), status_code=response.status_code, data=self._json(response))
+
+        caches[API_CACHE].set(key, entry, STALE_RETENTION)
+        return entry
+
+    @staticmethod
+    def _json(response: requests.Response) -> Dict[str, Any]:
+        try:
+            data = response.json()
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
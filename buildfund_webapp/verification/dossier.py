@@ -0,0 +1,257 @@
+"""Company dossier: Companies House data fetched concurrently and kept as a snapshot.
+
+A dossier combines the company profile, officers, PSCs, filing history and
+charges.  The five calls run in parallel on a shared pool, each with its
+own deadline; the profile is required, the other sections are optional and
+are recorded as ``missing`` when they fail or miss their deadline.  Calls
+that overrun keep running in the background and still fill the response
+cache in ``verification.companies_house``, so the next rebuild finds them.
+
+The assembled dossier is stored in ``CompanyDossier`` keyed by company
+number.  A complete dossier is reused until ``COMPANY_DOSSIER_TTL``
+expires, a partial one only for ``COMPANY_DOSSIER_PARTIAL_TTL``; each
+rebuild increments its version.  Bumping ``FORMAT_VERSION`` invalidates
+dossiers built with an older layout.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CompanyDossier
+from .services import HMRCVerificationService
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+# Section name -> HMRCVerificationService method; the profile is required
+SECTIONS = {
+    "company_info": "get_company_info",
+    "officers": "get_company_officers",
+    "pscs": "get_company_pscs",
+    "filing_history": "get_company_filing_history",
+    "charges": "get_company_charges",
+}
+REQUIRED_SECTIONS = {"company_info"}
+# The profile may take as long as the client's own request timeout
+REQUIRED_DEADLINE = 10
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class CompanyDossierError(Exception):
+    """The company profile could not be fetched and no earlier dossier exists."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Shared so calls that miss their deadline do not block the request on pool shutdown
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "COMPANIES_HOUSE_MAX_CONCURRENCY", 8),
+                thread_name_prefix="company-dossier",
+            )
+        return _executor
+
+
+def _available(data: Dict[str, Any]) -> Dict[str, Any]:
+    """A fetched list resource, or an empty one if the fetch failed."""
+    return {"items": []} if "error" in data else data
+
+
+def active_directors(officers_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Directors that have not resigned."""
+    return [
+        {
+            "name": officer.get("name", ""),
+            "nationality": officer.get("nationality", ""),
+            "occupation": officer.get("occupation", ""),
+            "appointed_on": officer.get("appointed_on", ""),
+        }
+        for officer in officers_data.get("items", [])
+        if officer.get("officer_role") == "director" and not officer.get("resigned_on")
+    ]
+
+
+def active_pscs(pscs_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Persons with significant control that have not ceased."""
+    return [
+        {
+            "name": psc.get("name", ""),
+            "kind": psc.get("kind", ""),
+            "natures_of_control": psc.get("natures_of_control", []),
+        }
+        for psc in pscs_data.get("items", [])
+        if psc.get("ceased_on") is None
+    ]
+
+
+def classify_filings(filing_history: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group filings by document kind; accounts are limited to the latest three."""
+    documents = {
+        "incorporation_cert": [],
+        "accounts": [],
+        "charges": [],
+        "confirmation_statements": [],
+    }
+    for filing in filing_history.get("items", []):
+        category = filing.get("category", "").lower()
+        description = filing.get("description", "")
+        doc_info = {
+            "transaction_id": filing.get("transaction_id", ""),
+            "description": description,
+            "date": filing.get("date", ""),
+            "category": category,
+        }
+        if "incorporation" in category or "certificate" in description.lower():
+            documents["incorporation_cert"].append(doc_info)
+        elif "accounts" in category or "micro" in category:
+            documents["accounts"].append(doc_info)
+        elif "charge" in category:
+            documents["charges"].append(doc_info)
+        elif "confirmation" in category or "annual return" in description.lower():
+            documents["confirmation_statements"].append(doc_info)
+    documents["accounts"] = sorted(documents["accounts"], key=lambda x: x.get("date", ""), reverse=True)[:3]
+    return documents
+
+
+class CompanyDossierService:
+    """Read company dossiers from their snapshot, rebuilding them when expired."""
+
+    def __init__(self, hmrc_service: Optional[HMRCVerificationService] = None):
+        self._hmrc_service = hmrc_service
+
+    @property
+    def hmrc_service(self) -> HMRCVerificationService:
+        # Created on first upstream call, so reading a snapshot needs no API key
+        if self._hmrc_service is None:
+            self._hmrc_service = HMRCVerificationService()
+        return self._hmrc_service
+
+    @staticmethod
+    def get_snapshot(company_number: str) -> Optional[CompanyDossier]:
+        """The stored dossier if it is still fresh, in one query."""
+        return CompanyDossier.objects.filter(
+            company_number=company_number,
+            format_version=FORMAT_VERSION,
+            expires_at__gt=timezone.now(),
+        ).first()
+
+    def get(self, company_number: str, refresh: bool = False) -> CompanyDossier:
+        """
+        Return the dossier for a company, rebuilding it if missing, expired or ``refresh``.
+
+        If the profile cannot be fetched, an expired dossier is served
+        rather than failing; ``CompanyDossierError`` is raised only when
+        there is none.
+        """
+        if not refresh:
+            snapshot = self.get_snapshot(company_number)
+            if snapshot is not None:
+                return snapshot
+        sources, missing = self.fetch(company_number)
+        if "error" in sources["company_info"]:
+            stale = CompanyDossier.objects.filter(company_number=company_number).first()
+            if stale is not None:
+                logger.warning(
+                    f"Companies House profile unavailable for {company_number}, serving dossier v{stale.version}"
+                )
+                return stale
+            raise CompanyDossierError(sources["company_info"].get("error", "Unknown error"))
+        return self.store(company_number, sources, missing)
+
+    def fetch(self, company_number: str) -> Tuple[Dict[str, Any], List[str]]:
+        """Fetch every section concurrently; returns ``(sources, missing)``."""
+        service = self.hmrc_service
+        executor = _get_executor()
+        futures = {
+            name: executor.submit(getattr(service, method), company_number)
+            for name, method in SECTIONS.items()
+        }
+        optional_deadline = getattr(settings, "COMPANY_DOSSIER_DEADLINE", 4)
+        started = time.monotonic()
+        sources, missing = {}, []
+        for name, future in futures.items():
+            deadline = REQUIRED_DEADLINE if name in REQUIRED_SECTIONS else optional_deadline
+            try:
+                sources[name] = future.result(timeout=max(0, started + deadline - time.monotonic()))
+            except FutureTimeoutError:
+                sources[name] = {"error": f"Timed out after {deadline}s", "status_code": None}
+            except Exception as e:
+                sources[name] = {"error": str(e), "status_code": None}
+            if "error" in sources[name] and name not in REQUIRED_SECTIONS:
+                # Optional sections are left out rather than failing the dossier
+                logger.warning(f"Failed to fetch {name} for company {company_number}: {sources[name]['error']}")
+                missing.append(name)
+        return sources, missing
+
+    def build_details(self, company_number: str, sources: Dict[str, Any]) -> Dict[str, Any]:
+        """Classify the upstream responses into the payload served by the verification API."""
+        company_info = sources["company_info"]
+        directors = active_directors(_available(sources["officers"]))
+        documents = classify_filings(_available(sources["filing_history"]))
+
+        charges_summary = None
+        if "error" not in sources["charges"]:
+            summary = self.hmrc_service.summarize_charges(sources["charges"])
+            by_status = summary.get("charges_summary") or {}
+            # Format for frontend - flatten the charges_summary structure
+            charges_summary = {
+                "total_charges": summary.get("total_charges", 0),
+                "active_charges": summary.get("active_charges", 0),
+                "satisfied_charges": summary.get("satisfied_charges", 0),
+                "charges": (by_status.get("active", []) + by_status.get("satisfied", []))[:10],
+            }
+
+        return {
+            "company_number": company_number,
+            "company_name": company_info.get("company_name", ""),
+            "company_type": company_info.get("company_type", ""),
+            "company_status": company_info.get("company_status", ""),
+            "date_of_creation": company_info.get("date_of_creation", ""),
+            "incorporation_date": company_info.get("date_of_creation", ""),
+            "registered_address": company_info.get("registered_office_address", {}),
+            "directors": directors,
+            "active_directors": directors,
+            "pscs": active_pscs(_available(sources["pscs"])),
+            "charges_summary": charges_summary,
+            "incorporation_certificates": documents["incorporation_cert"],
+            "accounts_documents": documents["accounts"],
+            "charges_documents": documents["charges"],
+            "confirmation_statements": documents["confirmation_statements"],
+            "documents": documents,
+        }
+
+    def store(self, company_number: str, sources: Dict[str, Any], missing: List[str]) -> CompanyDossier:
+        """Save a rebuilt dossier as the next version of the company's snapshot."""
+        now = timezone.now()
+        ttl = getattr(settings, "COMPANY_DOSSIER_PARTIAL_TTL" if missing else "COMPANY_DOSSIER_TTL", 300 if missing else 6 * 60 * 60)
+        fields = {
+            "format_version": FORMAT_VERSION,
+            "details": self.build_details(company_number, sources),
+            # The filing history is only needed classified, and can be long
+            "sources": {name: data for name, data in sources.items() if name != "filing_history"},
+            "missing": missing,
+            "fetched_at": now,
+            "expires_at": now + timedelta(seconds=ttl),
+        }
+        with transaction.atomic():
+            dossier, created = CompanyDossier.objects.select_for_update().get_or_create(
+                company_number=company_number, defaults=fields
+            )
+            if not created:
+                for name, value in fields.items():
+                    setattr(dossier, name, value)
+                dossier.version += 1
+                dossier.save()
+        return dossier
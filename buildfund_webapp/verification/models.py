@@ -60,3 +60,21 @@ class DirectorVerification(models.Model):
     
     def __str__(self) -> str:
         return f"DirectorVerification({self.director_name} - {self.status})"
+
+
+class CompanyDossier(models.Model):
+    """Assembled Companies House data for a company, rebuilt when it expires."""
+    
+    company_number = models.CharField(max_length=20, unique=True)
+    version = models.PositiveIntegerField(default=1, help_text="Incremented each time the dossier is rebuilt")
+    format_version = models.PositiveSmallIntegerField(help_text="Dossier layout the data was built with")
+    details = models.JSONField(default=dict, blank=True, help_text="Classified company details as served to clients")
+    sources = models.JSONField(default=dict, blank=True, help_text="Upstream responses the details were built from")
+    missing = models.JSONField(default=list, blank=True, help_text="Optional sections that could not be fetched in time")
+    fetched_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self) -> str:
+        return f"CompanyDossier({self.company_number} v{self.version})"
@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from .models import CompanyVerification, DirectorVerification
 
 
-class CompanyVerificationSerializer(serializers.ModelSerializer):
+class CompanyVerificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for CompanyVerification model."""
     
     class Meta:
@@ -32,7 +33,7 @@ class CompanyVerificationSerializer(serializers.ModelSerializer):
         ]
 
 
-class DirectorVerificationSerializer(serializers.ModelSerializer):
+class DirectorVerificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DirectorVerification model."""
     
     class Meta:
@@ -6,12 +6,13 @@ import requests
 from typing import Dict, Any, Optional
 from django.conf import settings
 
+from documents.storage import CHUNK_SIZE, get_document_storage
+from .companies_house import CompaniesHouseClient, CompaniesHouseError
+
 
 class HMRCVerificationService:
     """Service for verifying company and director information via HMRC API."""
     
-    BASE_URL = "https://api.company-information.service.gov.uk"
-    
     def __init__(self):
         """Initialize the service with API key from environment."""
         api_key = os.environ.get("HMRC_API_KEY")
@@ -20,15 +21,17 @@ class HMRCVerificationService:
                 "HMRC_API_KEY environment variable is required. "
                 "Set it in your .env file or environment variables."
             )
-        
-        # Companies House API uses HTTP Basic Auth with API key as username and empty password
-        import base64
-        credentials = f"{api_key}:"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Authorization": f"Basic {encoded_credentials}",
-            "Accept": "application/json",
-        }
+        self.client = CompaniesHouseClient(api_key)
+    
+    def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fetch a (cached) API resource, returning an error dict on failure."""
+        try:
+            return self.client.get_json(path, params=params)
+        except CompaniesHouseError as e:
+            return {
+                "error": str(e),
+                "status_code": e.status_code,
+            }
     
     def get_company_info(self, company_number: str) -> Dict[str, Any]:
         """
@@ -43,17 +46,7 @@ class HMRCVerificationService:
         Raises:
             requests.RequestException: If API request fails
         """
-        url = f"{self.BASE_URL}/company/{company_number}"
-        
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {
-                "error": str(e),
-                "status_code": getattr(e.response, "status_code", None),
-            }
+        return self._get_json(f"/company/{company_number}")
     
     def get_company_officers(self, company_number: str) -> Dict[str, Any]:
         """
@@ -68,17 +61,7 @@ class HMRCVerificationService:
         Raises:
             requests.RequestException: If API request fails
         """
-        url = f"{self.BASE_URL}/company/{company_number}/officers"
-        
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {
-                "error": str(e),
-                "status_code": getattr(e.response, "status_code", None),
-            }
+        return self._get_json(f"/company/{company_number}/officers")
     
     def verify_company(self, company_number: str, company_name: str) -> Dict[str, Any]:
         """
@@ -190,62 +173,59 @@ class HMRCVerificationService:
     
     def get_company_filing_history(self, company_number: str) -> Dict[str, Any]:
         """Get company filing history from Companies House."""
-        url = f"{self.BASE_URL}/company/{company_number}/filing-history"
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {
-                "error": str(e),
-                "status_code": getattr(e.response, "status_code", None),
-            }
+        return self._get_json(f"/company/{company_number}/filing-history")
     
     def get_company_pscs(self, company_number: str) -> Dict[str, Any]:
         """Get persons with significant control (PSCs) from Companies House."""
-        url = f"{self.BASE_URL}/company/{company_number}/persons-with-significant-control"
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {
-                "error": str(e),
-                "status_code": getattr(e.response, "status_code", None),
-            }
+        return self._get_json(f"/company/{company_number}/persons-with-significant-control")
     
     def get_company_document(self, company_number: str, transaction_id: str) -> Dict[str, Any]:
         """Download a company document from Companies House."""
-        url = f"{self.BASE_URL}/company/{company_number}/filing-history/{transaction_id}/document"
+        path = f"/company/{company_number}/filing-history/{transaction_id}/document"
         try:
-            response = requests.get(url, headers=self.headers, timeout=30, stream=True)
-            response.raise_for_status()
-            import base64
-            document_data = base64.b64encode(response.content).decode('utf-8')
-            return {
-                "document_data": document_data,
-                "content_type": response.headers.get("Content-Type", "application/pdf"),
-                "filename": response.headers.get("Content-Disposition", "").split("filename=")[-1].strip('"') if "Content-Disposition" in response.headers else f"document_{transaction_id}.pdf",
-            }
+            with self.client.stream(path) as response:
+                import base64
+                document_data = base64.b64encode(response.content).decode('utf-8')
+                return {
+                    "document_data": document_data,
+                    "content_type": response.headers.get("Content-Type", "application/pdf"),
+                    "filename": self._document_filename(response, transaction_id),
+                }
         except requests.RequestException as e:
             return {
                 "error": str(e),
                 "status_code": getattr(e.response, "status_code", None),
             }
     
-    def get_company_charges(self, company_number: str) -> Dict[str, Any]:
-        """Get company charges (mortgages, debentures) from Companies House."""
-        url = f"{self.BASE_URL}/company/{company_number}/charges"
+    def save_company_document(self, company_number: str, transaction_id: str) -> Dict[str, Any]:
+        """Stream a company document from Companies House into document storage."""
+        path = f"/company/{company_number}/filing-history/{transaction_id}/document"
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            with self.client.stream(path) as response:
+                blob = get_document_storage().save(response.iter_content(CHUNK_SIZE))
+                return {
+                    "storage_key": blob.key,
+                    "content_sha256": blob.sha256,
+                    "file_size": blob.size,
+                    "content_type": response.headers.get("Content-Type", "application/pdf"),
+                    "filename": self._document_filename(response, transaction_id),
+                }
         except requests.RequestException as e:
             return {
                 "error": str(e),
                 "status_code": getattr(e.response, "status_code", None),
             }
     
+    @staticmethod
+    def _document_filename(response: requests.Response, transaction_id: str) -> str:
+        if "Content-Disposition" in response.headers:
+            return response.headers["Content-Disposition"].split("filename=")[-1].strip('"')
+        return f"document_{transaction_id}.pdf"
+    
+    def get_company_charges(self, company_number: str) -> Dict[str, Any]:
+        """Get company charges (mortgages, debentures) from Companies House."""
+        return self._get_json(f"/company/{company_number}/charges")
+    
     def search_companies_by_name(self, company_name: str, items_per_page: int = 20) -> Dict[str, Any]:
         """
         Search for companies by name using Companies House API.
@@ -263,21 +243,12 @@ class HMRCVerificationService:
                 "items_per_page": int
             }
         """
-        url = f"{self.BASE_URL}/search/companies"
         params = {
             "q": company_name,
             "items_per_page": min(items_per_page, 100)  # API limit is 100
         }
         
-        try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {
-                "error": str(e),
-                "status_code": getattr(e.response, "status_code", None),
-            }
+        return self._get_json("/search/companies", params=params)
     
     def summarize_charges(self, charges_data: Dict[str, Any]) -> Dict[str, Any]:
         """Summarize charges data for display."""
@@ -7,9 +7,11 @@ from rest_framework.response import Response
 from django.utils import timezone
 from core.validators import validate_company_number, sanitize_string
 from accounts.permissions import IsBorrower as IsBorrowerPermission
+from accounts.principal import get_principal
 from accounts.throttles import VerificationThrottle
 
 from .models import CompanyVerification, DirectorVerification
+from .dossier import CompanyDossierError, CompanyDossierService
 from .services import HMRCVerificationService
 from .serializers import CompanyVerificationSerializer, DirectorVerificationSerializer
 
@@ -23,9 +25,10 @@ class CompanyVerificationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return verifications for the current borrower."""
-        if hasattr(self.request.user, "borrowerprofile"):
+        principal = get_principal(self.request.user)
+        if principal.is_borrower:
             return CompanyVerification.objects.filter(
-                borrower_profile=self.request.user.borrowerprofile
+                borrower_profile_id=principal.borrower_profile_id
             )
         return CompanyVerification.objects.none()
     
@@ -135,7 +138,12 @@ class CompanyVerificationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated])
     def get_full_company_details(self, request):
-        """Get full company details including officers, PSCs, and filing history."""
+        """
+        Get full company details including officers, PSCs, and filing history.
+        
+        Served from the company's dossier snapshot, which is rebuilt when it
+        expires or when ``refresh=true`` is passed.
+        """
         company_number = request.query_params.get("company_number")
         if not company_number:
             return Response(
@@ -151,144 +159,28 @@ class CompanyVerificationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         
+        refresh = request.query_params.get("refresh", "").lower() in ("1", "true", "yes")
         try:
-            service = HMRCVerificationService()
-        except ValueError as e:
+            dossier = CompanyDossierService().get(company_number, refresh=refresh)
+        except ValueError:
             # API key not configured
             return Response(
                 {"error": "Company verification service is not configured. Please contact support."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-        
-        # Get all company data
-        company_info = service.get_company_info(company_number)
-        if "error" in company_info:
+        except CompanyDossierError as e:
             return Response(
-                {"error": f"Failed to fetch company information: {company_info.get('error', 'Unknown error')}"},
+                {"error": f"Failed to fetch company information: {e}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         
-        officers_data = service.get_company_officers(company_number)
-        if "error" in officers_data:
-            # Log but continue - officers are optional
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Failed to fetch officers for company {company_number}: {officers_data.get('error')}")
-            officers_data = {"items": []}
-        
-        pscs_data = service.get_company_pscs(company_number)
-        if "error" in pscs_data:
-            # Log but continue - PSCs are optional
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Failed to fetch PSCs for company {company_number}: {pscs_data.get('error')}")
-            pscs_data = {"items": []}
-        
-        filing_history = service.get_company_filing_history(company_number)
-        if "error" in filing_history:
-            # Log but continue - filing history is optional
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Failed to fetch filing history for company {company_number}: {filing_history.get('error')}")
-            filing_history = {"items": []}
-        
-        # Filter active directors (not resigned)
-        active_directors = []
-        if "items" in officers_data:
-            for officer in officers_data["items"]:
-                if officer.get("officer_role") == "director" and not officer.get("resigned_on"):
-                    active_directors.append({
-                        "name": officer.get("name", ""),
-                        "nationality": officer.get("nationality", ""),
-                        "occupation": officer.get("occupation", ""),
-                        "appointed_on": officer.get("appointed_on", ""),
-                    })
-        
-        # Get PSCs
-        pscs = []
-        if "items" in pscs_data:
-            for psc in pscs_data["items"]:
-                if psc.get("ceased_on") is None:  # Only active PSCs
-                    pscs.append({
-                        "name": psc.get("name", ""),
-                        "kind": psc.get("kind", ""),
-                        "natures_of_control": psc.get("natures_of_control", []),
-                    })
-        
-        # Organize filing history documents
-        documents = {
-            "incorporation_cert": [],
-            "accounts": [],
-            "charges": [],
-            "confirmation_statements": [],
-        }
-        
-        if "items" in filing_history:
-            for filing in filing_history["items"]:
-                category = filing.get("category", "").lower()
-                transaction_id = filing.get("transaction_id", "")
-                description = filing.get("description", "")
-                date = filing.get("date", "")
-                
-                doc_info = {
-                    "transaction_id": transaction_id,
-                    "description": description,
-                    "date": date,
-                    "category": category,
-                }
-                
-                if "incorporation" in category or "certificate" in description.lower():
-                    documents["incorporation_cert"].append(doc_info)
-                elif "accounts" in category or "micro" in category:
-                    documents["accounts"].append(doc_info)
-                elif "charge" in category:
-                    documents["charges"].append(doc_info)
-                elif "confirmation" in category or "annual return" in description.lower():
-                    documents["confirmation_statements"].append(doc_info)
-        
-        # Limit accounts to last 3 years
-        documents["accounts"] = sorted(documents["accounts"], key=lambda x: x.get("date", ""), reverse=True)[:3]
-        
-        # Get charges summary
-        charges_data = service.get_company_charges(company_number)
-        charges_summary = None
-        if "error" not in charges_data:
-            summary = service.summarize_charges(charges_data)
-            # Format for frontend - flatten the charges_summary structure
-            charges_summary = {
-                "total_charges": summary.get("total_charges", 0),
-                "active_charges": summary.get("active_charges", 0),
-                "satisfied_charges": summary.get("satisfied_charges", 0),
-                "charges": (summary.get("charges_summary", {}).get("active", []) + 
-                           summary.get("charges_summary", {}).get("satisfied", []))[:10],  # Limit to 10 for display
-            }
-        
         # Format response to match frontend expectations
-        response_data = {
-            "company_number": company_number,
-            "company_name": company_info.get("company_name", ""),
-            "company_type": company_info.get("company_type", ""),
-            "company_status": company_info.get("company_status", ""),
-            "date_of_creation": company_info.get("date_of_creation", ""),
-            "incorporation_date": company_info.get("date_of_creation", ""),
-            "registered_address": company_info.get("registered_office_address", {}),
-            "directors": active_directors,
-            "active_directors": active_directors,
-            "pscs": pscs,
-            "charges_summary": charges_summary,
-            "incorporation_certificates": documents.get("incorporation_cert", []),
-            "accounts_documents": documents.get("accounts", []),
-            "charges_documents": documents.get("charges", []),
-            "confirmation_statements": documents.get("confirmation_statements", []),
-            "documents": {
-                "incorporation_cert": documents.get("incorporation_cert", []),
-                "accounts": documents.get("accounts", []),
-                "charges": documents.get("charges", []),
-                "confirmation_statements": documents.get("confirmation_statements", []),
-            },
-        }
-        
-        return Response(response_data)
+        return Response({
+            **dossier.details,
+            "dossier_version": dossier.version,
+            "fetched_at": dossier.fetched_at,
+            "missing_sections": dossier.missing,
+        })
     
     @action(detail=False, methods=["post"])
     def download_company_document(self, request):
@@ -331,9 +223,10 @@ class DirectorVerificationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return verifications for the current borrower."""
-        if hasattr(self.request.user, "borrowerprofile"):
+        principal = get_principal(self.request.user)
+        if principal.is_borrower:
             return DirectorVerification.objects.filter(
-                borrower_profile=self.request.user.borrowerprofile
+                borrower_profile_id=principal.borrower_profile_id
             )
         return DirectorVerification.objects.none()
     
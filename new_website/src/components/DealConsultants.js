@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import { tokenStorage } from '../utils/tokenStorage';
 import Button from './Button';
@@ -86,8 +87,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadParties() {
     try {
-      const res = await api.get(`/api/deals/deal-parties/?deal_id=${dealId}`);
-      setParties(res.data?.results || res.data || []);
+      setParties(await fetchAllPages(`/api/deals/deal-parties/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load parties:', err);
       setParties([]);
@@ -98,8 +98,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadConsultants() {
     try {
-      const res = await api.get('/api/consultants/consultant-profiles/');
-      setConsultants(res.data || []);
+      setConsultants(await fetchAllPages('/api/consultants/consultant-profiles/'));
     } catch (err) {
       console.error('Failed to load consultants:', err);
       setConsultants([]);
@@ -108,8 +107,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadEnquiries() {
     try {
-      const res = await api.get(`/api/deals/provider-enquiries/?deal_id=${dealId}`);
-      setEnquiries(res.data?.results || res.data || []);
+      setEnquiries(await fetchAllPages(`/api/deals/provider-enquiries/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load enquiries:', err);
       setEnquiries([]);
@@ -118,8 +116,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadQuotes() {
     try {
-      const res = await api.get(`/api/deals/provider-quotes/?deal_id=${dealId}`);
-      setQuotes(res.data?.results || res.data || []);
+      setQuotes(await fetchAllPages(`/api/deals/provider-quotes/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load quotes:', err);
       setQuotes([]);
@@ -128,8 +125,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadSelections() {
     try {
-      const res = await api.get(`/api/deals/deal-provider-selections/?deal_id=${dealId}`);
-      setSelections(res.data?.results || res.data || []);
+      setSelections(await fetchAllPages(`/api/deals/deal-provider-selections/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load selections:', err);
       setSelections([]);
@@ -138,8 +134,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadProviderStages() {
     try {
-      const res = await api.get(`/api/deals/provider-stages/?deal_id=${dealId}`);
-      setProviderStages(res.data.results || res.data || []);
+      setProviderStages(await fetchAllPages(`/api/deals/provider-stages/?deal_id=${dealId}&expand=tasks`));
     } catch (err) {
       console.error('Failed to load provider stages:', err);
       setProviderStages([]);
@@ -148,8 +143,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadDeliverables() {
     try {
-      const res = await api.get(`/api/deals/provider-deliverables/?deal_id=${dealId}`);
-      setDeliverables(res.data.results || res.data || []);
+      setDeliverables(await fetchAllPages(`/api/deals/provider-deliverables/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load deliverables:', err);
       setDeliverables([]);
@@ -158,8 +152,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadAppointments() {
     try {
-      const res = await api.get(`/api/deals/provider-appointments/?deal_id=${dealId}`);
-      setAppointments(res.data.results || res.data || []);
+      setAppointments(await fetchAllPages(`/api/deals/provider-appointments/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load appointments:', err);
       setAppointments([]);
@@ -168,8 +161,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadMessageThreads() {
     try {
-      const res = await api.get(`/api/deals/deal-message-threads/?deal_id=${dealId}`);
-      setMessageThreads(res.data.results || res.data || []);
+      setMessageThreads(await fetchAllPages(`/api/deals/deal-message-threads/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load message threads:', err);
       setMessageThreads([]);
@@ -178,8 +170,8 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
 
   async function loadThreadMessages(threadId) {
     try {
-      const res = await api.get(`/api/deals/deal-messages/?thread_id=${threadId}`);
-      const messages = res.data.results || res.data || [];
+      // Pages come newest first; show them oldest first
+      const messages = (await fetchAllPages(`/api/deals/deal-messages/?thread_id=${threadId}`)).reverse();
       setThreadMessages(messages);
       // Also set enquiry/quote messages if we're in those modals
       if (enquiryDetailModal.open) {
@@ -380,8 +372,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
       else if (enquiry.role_type === 'solicitor') threadType = 'legal';
 
       // Try to find existing thread
-      const threadsRes = await api.get(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=${threadType}`);
-      const threads = threadsRes.data.results || threadsRes.data || [];
+      const threads = await fetchAllPages(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=${threadType}`);
       
       // Find or create thread for this enquiry
       let thread = threads.find(t => t.subject && t.subject.includes(enquiry.provider_firm_name));
@@ -430,8 +421,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
       else if (quote.role_type === 'solicitor') threadType = 'legal';
 
       // Try to find existing thread
-      const threadsRes = await api.get(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=${threadType}`);
-      const threads = threadsRes.data.results || threadsRes.data || [];
+      const threads = await fetchAllPages(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=${threadType}`);
       
       // Find or create thread for this quote
       let thread = threads.find(t => t.subject && t.subject.includes(quote.provider_firm_name));
@@ -3533,8 +3523,7 @@ function ConsultantsTab({ dealId, deal, onUpdate }) {
                 onClick={async () => {
                   try {
                     // Create or get general message thread with borrower
-                    const threadsRes = await api.get(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=general`);
-                    const threads = threadsRes.data.results || threadsRes.data || [];
+                    const threads = await fetchAllPages(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=general`);
                     let borrowerThread = threads[0];
                     
                     if (!borrowerThread) {
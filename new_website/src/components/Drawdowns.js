@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from './Button';
 import Badge from './Badge';
@@ -47,8 +48,7 @@ function Drawdowns({ dealId, deal, onUpdate }) {
 
   async function loadDrawdowns() {
     try {
-      const res = await api.get(`/api/deals/drawdowns/?deal_id=${dealId}`);
-      setDrawdowns(res.data || []);
+      setDrawdowns(await fetchAllPages(`/api/deals/drawdowns/?deal_id=${dealId}&expand=supporting_documents`));
     } catch (err) {
       console.error('Failed to load drawdowns:', err);
       setDrawdowns([]);
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from './Button';
 import Badge from './Badge';
@@ -31,8 +32,7 @@ function LegalWorkspace({ dealId, deal, onUpdate }) {
 
   async function loadCPs() {
     try {
-      const res = await api.get(`/api/deals/deal-cps/?deal_id=${dealId}`);
-      setCps(res.data || []);
+      setCps(await fetchAllPages(`/api/deals/deal-cps/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load CPs:', err);
       setCps([]);
@@ -43,8 +43,7 @@ function LegalWorkspace({ dealId, deal, onUpdate }) {
 
   async function loadRequisitions() {
     try {
-      const res = await api.get(`/api/deals/deal-requisitions/?deal_id=${dealId}`);
-      setRequisitions(res.data || []);
+      setRequisitions(await fetchAllPages(`/api/deals/deal-requisitions/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load requisitions:', err);
       setRequisitions([]);
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -31,8 +32,7 @@ function AdminBorrowerReview() {
       const url = statusFilter 
         ? `/api/borrowers/admin/reviews/?status=${statusFilter}`
         : '/api/borrowers/admin/reviews/';
-      const res = await api.get(url);
-      setProfiles(res.data || []);
+      setProfiles(await fetchAllPages(url));
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to load borrower profiles');
     } finally {
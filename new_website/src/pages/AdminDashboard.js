@@ -5,6 +5,7 @@ import { theme, commonStyles } from '../styles/theme';
 import StatCard from '../components/StatCard';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
+import { fetchAllPages } from '../utils/pagination';
 
 function AdminDashboard() {
   const navigate = useNavigate();
@@ -19,7 +20,6 @@ function AdminDashboard() {
   });
   const [projects, setProjects] = useState([]);
   const [products, setProducts] = useState([]);
-  const [applications, setApplications] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -27,33 +27,24 @@ function AdminDashboard() {
     setError(null);
     setLoading(true);
     try {
-      const [projRes, prodRes, appRes] = await Promise.all([
-        api.get('/api/projects/'),
-        api.get('/api/products/'),
-        api.get('/api/applications/'),
+      // Counts come from the server; only the rows awaiting review are listed
+      const [statsRes, pendingProjectRows, pendingProductRows] = await Promise.all([
+        api.get('/api/accounts/admin/users/platform_stats/'),
+        fetchAllPages('/api/projects/', { params: { status: 'pending_review', page_size: 200 } }),
+        fetchAllPages('/api/products/', { params: { status: 'pending', page_size: 200 } }),
       ]);
-      
-      const allProjects = projRes.data || [];
-      const allProducts = prodRes.data || [];
-      const allApplications = appRes.data || [];
-
-      setProjects(allProjects);
-      setProducts(allProducts);
-      setApplications(allApplications);
 
-      const pendingProjects = allProjects.filter((p) => p.status === 'pending_review').length;
-      const approvedProjects = allProjects.filter((p) => p.status === 'approved').length;
-      const pendingProducts = allProducts.filter((p) => p.status === 'pending').length;
-      const activeProducts = allProducts.filter((p) => p.status === 'active').length;
+      setProjects(pendingProjectRows);
+      setProducts(pendingProductRows);
 
       setStats({
-        totalProjects: allProjects.length,
-        pendingProjects,
-        approvedProjects,
-        totalProducts: allProducts.length,
-        pendingProducts,
-        activeProducts,
-        totalApplications: allApplications.length,
+        totalProjects: statsRes.data.total_projects,
+        pendingProjects: statsRes.data.pending_projects,
+        approvedProjects: statsRes.data.approved_projects,
+        totalProducts: statsRes.data.total_products,
+        pendingProducts: statsRes.data.pending_products,
+        activeProducts: statsRes.data.active_products,
+        totalApplications: statsRes.data.total_applications,
       });
     } catch (err) {
       console.error('AdminDashboard loadData error:', err);
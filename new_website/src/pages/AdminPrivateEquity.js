@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -18,8 +19,7 @@ function AdminPrivateEquity() {
     setError(null);
     setLoading(true);
     try {
-      const res = await api.get('/api/private-equity/opportunities/');
-      setOpportunities(res.data || []);
+      setOpportunities(await fetchAllPages('/api/private-equity/opportunities/'));
     } catch (err) {
       console.error('AdminPrivateEquity fetchOpportunities error:', err);
       const errorMsg = err.response?.data?.detail || 
@@ -3,6 +3,7 @@ import { useParams, Link, useNavigate } from 'react-router-dom';
 import api from '../api';
 import { theme, commonStyles } from '../styles/theme';
 import { tokenStorage } from '../utils/tokenStorage';
+import { fetchAllPages } from '../utils/pagination';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
 import ApplicationProgress from '../components/ApplicationProgress';
@@ -55,8 +56,9 @@ function ApplicationDetail() {
       if (appRes.data.project) {
         // Get the latest underwriting report for this project
         const reportsRes = await api.get(`/api/underwriting/reports/?project=${appRes.data.project}`);
-        if (reportsRes.data && reportsRes.data.length > 0) {
-          const latestReport = reportsRes.data[0];
+        const reports = reportsRes.data?.results || reportsRes.data || [];
+        if (reports.length > 0) {
+          const latestReport = reports[0];
           setUnderwriting({
             content: latestReport.content,
             summary: latestReport.content?.substring(0, 500) + '...',
@@ -82,16 +84,16 @@ function ApplicationDetail() {
     setLoading(true);
     setError(null);
     try {
-      const [appRes, historyRes, docsRes, messagesRes] = await Promise.all([
+      const [appRes, historyRes, docs, messageList] = await Promise.all([
         api.get(`/api/applications/${id}/`),
         api.get(`/api/applications/${id}/status_history/`).catch(() => ({ data: [] })),
-        api.get(`/api/applications/${id}/documents/`).catch(() => ({ data: [] })),
-        api.get(`/api/messages/?application=${id}`).catch(() => ({ data: [] })),
+        fetchAllPages(`/api/applications/${id}/documents/`).catch(() => []),
+        fetchAllPages(`/api/messages/?application=${id}`).catch(() => []),
       ]);
       setApplication(appRes.data);
       setStatusHistory(historyRes.data || []);
-      setDocuments(docsRes.data || []);
-      setMessages(messagesRes.data || []);
+      setDocuments(docs);
+      setMessages(messageList);
       
       // Load underwriting if lender
       if (role === 'Lender') {
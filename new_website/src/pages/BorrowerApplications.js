@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Badge from '../components/Badge';
 import Button from '../components/Button';
@@ -15,9 +15,7 @@ function BorrowerApplications() {
       setLoading(true);
       setError(null);
       try {
-        const res = await api.get('/api/applications/');
-        // Handle both array and paginated responses
-        const apps = res.data?.results || res.data || [];
+        const apps = await fetchAllPages('/api/applications/?expand=project_details,lender_details,product_details');
         setApplications(apps);
       } catch (err) {
         console.error('BorrowerApplications fetchApplications error:', err);
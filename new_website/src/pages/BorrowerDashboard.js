@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import StatCard from '../components/StatCard';
 import Button from '../components/Button';
@@ -43,8 +44,7 @@ function BorrowerDashboard({ onboardingProgress, onStartOnboarding, onStartChatb
       let projects = [];
       try {
         console.log('Fetching projects from:', `${api.defaults.baseURL}/api/projects/`);
-        const projectsRes = await api.get('/api/projects/');
-        projects = projectsRes.data || [];
+        projects = await fetchAllPages('/api/projects/');
         console.log('Projects loaded successfully:', projects.length);
       } catch (err) {
         console.error('Failed to load projects:', err);
@@ -105,8 +105,7 @@ function BorrowerDashboard({ onboardingProgress, onStartOnboarding, onStartChatb
       // Load applications
       let applications = [];
       try {
-        const applicationsRes = await api.get('/api/applications/');
-        applications = applicationsRes.data || [];
+        applications = await fetchAllPages('/api/applications/?expand=project_details,lender_details');
       } catch (err) {
         console.error('Failed to load applications:', err);
         // Don't fail completely if applications fail, just log it
@@ -116,8 +115,7 @@ function BorrowerDashboard({ onboardingProgress, onStartOnboarding, onStartChatb
       // Load private equity opportunities (optional)
       let opportunities = [];
       try {
-        const peRes = await api.get('/api/private-equity/opportunities/');
-        opportunities = peRes.data || [];
+        opportunities = await fetchAllPages('/api/private-equity/opportunities/');
       } catch (err) {
         // Don't fail completely if PE fails, just continue with 0
         // Don't log out on 401/403 - these are optional
@@ -168,8 +166,7 @@ function BorrowerDashboard({ onboardingProgress, onStartOnboarding, onStartChatb
       let savedProducts = [];
       let savedCount = 0;
       try {
-        const favouritesRes = await api.get('/api/products/favourites/');
-        savedProducts = favouritesRes.data?.results || favouritesRes.data || [];
+        savedProducts = await fetchAllPages('/api/products/favourites/');
         savedCount = savedProducts.length;
       } catch (err) {
         // Continue without saved products
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate, useSearchParams } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Select from '../components/Select';
 import Button from '../components/Button';
@@ -49,8 +50,7 @@ function BorrowerMatches() {
 
   async function fetchProjects() {
     try {
-      const res = await api.get('/api/projects/');
-      setProjects(res.data || []);
+      setProjects(await fetchAllPages('/api/projects/'));
     } catch (err) {
       setError('Failed to load projects');
     }
@@ -104,8 +104,7 @@ function BorrowerMatches() {
     setFavouritesLoading(true);
     setError(null);
     try {
-      const res = await api.get('/api/products/favourites/');
-      const favs = res.data?.results || res.data || [];
+      const favs = await fetchAllPages('/api/products/favourites/');
       setFavourites(favs);
     } catch (err) {
       console.error('Failed to load favourites:', err);
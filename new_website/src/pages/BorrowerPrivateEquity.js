@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Input from '../components/Input';
 import Textarea from '../components/Textarea';
@@ -23,8 +24,7 @@ function BorrowerPrivateEquity() {
   useEffect(() => {
     async function fetchOpportunities() {
       try {
-        const res = await api.get('/api/private-equity/opportunities/');
-        setOpportunities(res.data || []);
+        setOpportunities(await fetchAllPages('/api/private-equity/opportunities/'));
       } catch (err) {
         setError('Failed to load opportunities');
       }
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -14,8 +14,7 @@ function BorrowerProjects() {
     async function fetchProjects() {
       setLoading(true);
       try {
-        const response = await api.get('/api/projects/');
-        setProjects(response.data || []);
+        setProjects(await fetchAllPages('/api/projects/'));
       } catch (e) {
         console.error(e);
         setError('Failed to load projects');
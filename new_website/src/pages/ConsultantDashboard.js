@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -63,14 +64,14 @@ function ConsultantDashboard({ defaultTab }) {
     try {
       // Load profile
       const profileRes = await api.get('/api/consultants/profiles/');
-      if (profileRes.data && profileRes.data.length > 0) {
-        setProfile(profileRes.data[0]);
+      const profiles = profileRes.data?.results || profileRes.data || [];
+      if (profiles.length > 0) {
+        setProfile(profiles[0]);
       }
 
       // Load service opportunities (legacy - application-based)
       try {
-        const servicesRes = await api.get('/api/consultants/services/');
-        setServices(servicesRes.data.results || servicesRes.data || []);
+        setServices(await fetchAllPages('/api/consultants/services/'));
       } catch (err) {
         console.warn('Failed to load legacy services:', err);
         setServices([]);
@@ -78,8 +79,7 @@ function ConsultantDashboard({ defaultTab }) {
 
       // Load enquiries (deal-based quote requests) - NEW SYSTEM
       try {
-        const enquiriesRes = await api.get('/api/deals/provider-enquiries/');
-        setEnquiries(enquiriesRes.data.results || enquiriesRes.data || []);
+        setEnquiries(await fetchAllPages('/api/deals/provider-enquiries/'));
       } catch (err) {
         console.warn('Failed to load enquiries:', err);
         setEnquiries([]);
@@ -87,14 +87,12 @@ function ConsultantDashboard({ defaultTab }) {
 
       // Load quotes (deal-based ProviderQuote records)
       try {
-        const quotesRes = await api.get('/api/deals/provider-quotes/');
-        setQuotes(quotesRes.data.results || quotesRes.data || []);
+        setQuotes(await fetchAllPages('/api/deals/provider-quotes/'));
       } catch (err) {
         console.warn('Failed to load deal quotes, trying legacy endpoint:', err);
         // Fallback to legacy quotes endpoint
         try {
-          const legacyQuotesRes = await api.get('/api/consultants/quotes/');
-          setQuotes(legacyQuotesRes.data.results || legacyQuotesRes.data || []);
+          setQuotes(await fetchAllPages('/api/consultants/quotes/'));
         } catch (legacyErr) {
           console.warn('Failed to load legacy quotes:', legacyErr);
           setQuotes([]);
@@ -102,13 +100,11 @@ function ConsultantDashboard({ defaultTab }) {
       }
 
       // Load appointments
-      const appointmentsRes = await api.get('/api/consultants/appointments/');
-      setAppointments(appointmentsRes.data.results || appointmentsRes.data || []);
+      setAppointments(await fetchAllPages('/api/consultants/appointments/'));
 
       // Load my deals (deals consultant is involved with)
       try {
-        const dealsRes = await api.get('/api/deals/deals/my-deals/');
-        setMyDeals(dealsRes.data || []);
+        setMyDeals(await fetchAllPages('/api/deals/deals/my-deals/'));
       } catch (err) {
         console.warn('Failed to load my deals:', err);
         setMyDeals([]);
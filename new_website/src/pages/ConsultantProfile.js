@@ -19,7 +19,8 @@ function ConsultantProfile() {
   const fetchProfile = async () => {
     try {
       const response = await api.get('/api/consultants/profiles/');
-      const data = Array.isArray(response.data) ? response.data[0] : response.data;
+      const profiles = response.data?.results || response.data;
+      const data = Array.isArray(profiles) ? profiles[0] : profiles;
       setProfile(data);
     } catch (err) {
       console.error('Failed to fetch profile:', err);
@@ -123,7 +123,8 @@ function ConsultantProfileWizard() {
   const fetchProfile = async () => {
     try {
       const response = await api.get('/api/consultants/profiles/');
-      const data = Array.isArray(response.data) ? response.data[0] : response.data;
+      const profiles = response.data?.results || response.data;
+      const data = Array.isArray(profiles) ? profiles[0] : profiles;
       if (data) {
         setProfile(data);
         // Pre-fill form data
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import { tokenStorage } from '../utils/tokenStorage';
 import Button from '../components/Button';
@@ -83,9 +84,18 @@ function DealRoom() {
 
   async function loadTimeline() {
     try {
-      const res = await api.get(`/api/deals/deals/${dealId}/timeline/`);
-      setStages(res.data.stages || []);
-      setTasks(res.data.tasks || []);
+      // The timeline is paged newest first; walk it back for every stage and task event
+      const events = [];
+      let before = null;
+      do {
+        const params = { types: 'stage,task', page_size: 200, ...(before ? { before } : {}) };
+        const res = await api.get(`/api/deals/deals/${dealId}/timeline/`, { params });
+        const results = res.data?.results || [];
+        events.push(...results);
+        before = res.data?.next && results.length ? results[results.length - 1].cursor : null;
+      } while (before);
+      setStages(events.filter(e => e.type === 'stage').map(e => e.data).sort((a, b) => a.stage_number - b.stage_number));
+      setTasks(events.filter(e => e.type === 'task').map(e => e.data).reverse());
     } catch (err) {
       console.error('Failed to load timeline:', err);
       // Don't fail completely if timeline fails
@@ -118,8 +128,7 @@ function DealRoom() {
 
   async function loadProviderStages() {
     try {
-      const res = await api.get(`/api/deals/provider-stages/?deal_id=${dealId}`);
-      setProviderStages(res.data.results || res.data || []);
+      setProviderStages(await fetchAllPages(`/api/deals/provider-stages/?deal_id=${dealId}&expand=tasks`));
     } catch (err) {
       console.error('Failed to load provider stages:', err);
       setProviderStages([]);
@@ -140,8 +149,7 @@ function DealRoom() {
 
   async function loadDocuments() {
     try {
-      const res = await api.get(`/api/deals/deal-documents/?deal_id=${dealId}`);
-      setDocuments(res.data || []);
+      setDocuments(await fetchAllPages(`/api/deals/deal-documents/?deal_id=${dealId}`));
     } catch (err) {
       console.error('Failed to load documents:', err);
       setDocuments([]);
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -21,25 +21,7 @@ function DealsList() {
     
     try {
       console.log('[DealsList] Fetching deals from /api/deals/deals/');
-      const response = await api.get('/api/deals/deals/');
-      
-      console.log('[DealsList] Response received:', {
-        status: response.status,
-        dataType: typeof response.data,
-        isArray: Array.isArray(response.data),
-        dataLength: Array.isArray(response.data) ? response.data.length : 'N/A',
-        data: response.data
-      });
-
-      // Handle response data
-      let dealsData = [];
-      
-      if (Array.isArray(response.data)) {
-        dealsData = response.data;
-      } else if (response.data && typeof response.data === 'object') {
-        // Handle paginated responses
-        dealsData = response.data.results || response.data.data || [];
-      }
+      const dealsData = await fetchAllPages('/api/deals/deals/');
 
       console.log('[DealsList] Processed deals data:', {
         count: dealsData.length,
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 
 function Documents() {
@@ -15,9 +15,7 @@ function Documents() {
     setLoading(true);
     setError(null);
     try {
-      const res = await api.get('/api/documents/');
-      // Handle both array and paginated responses
-      const docs = res.data?.results || res.data || [];
+      const docs = await fetchAllPages('/api/documents/');
       setDocuments(docs);
     } catch (err) {
       console.error('Documents loadDocuments error:', err);
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Badge from '../components/Badge';
 import Button from '../components/Button';
@@ -16,8 +16,7 @@ function LenderApplications() {
       setLoading(true);
       setError(null);
       try {
-        const res = await api.get('/api/applications/');
-        setApplications(res.data || []);
+        setApplications(await fetchAllPages('/api/applications/?expand=project_details,product_details'));
       } catch (err) {
         console.error('LenderApplications fetchApplications error:', err);
         setError('Failed to load applications');
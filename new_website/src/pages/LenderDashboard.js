@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import StatCard from '../components/StatCard';
 import Button from '../components/Button';
@@ -35,8 +36,7 @@ function LenderDashboard({ onboardingProgress, onStartOnboarding, onStartChatbot
       // Load products (required)
       let products = [];
       try {
-        const productsRes = await api.get('/api/products/');
-        products = productsRes.data || [];
+        products = await fetchAllPages('/api/products/');
       } catch (err) {
         console.error('Failed to load products:', err);
         throw new Error(`Failed to load products: ${err.response?.data?.detail || err.message || 'Unknown error'}`);
@@ -45,8 +45,7 @@ function LenderDashboard({ onboardingProgress, onStartOnboarding, onStartChatbot
       // Load applications (required)
       let applications = [];
       try {
-        const applicationsRes = await api.get('/api/applications/');
-        applications = applicationsRes.data || [];
+        applications = await fetchAllPages('/api/applications/?expand=project_details,product_details');
       } catch (err) {
         console.error('Failed to load applications:', err);
         throw new Error(`Failed to load applications: ${err.response?.data?.detail || err.message || 'Unknown error'}`);
@@ -55,8 +54,7 @@ function LenderDashboard({ onboardingProgress, onStartOnboarding, onStartChatbot
       // Load investments (optional - don't fail if this fails)
       let investments = [];
       try {
-        const investmentsRes = await api.get('/api/private-equity/investments/');
-        investments = investmentsRes.data || [];
+        investments = await fetchAllPages('/api/private-equity/investments/');
       } catch (err) {
         console.warn('Failed to load investments (optional):', err);
         // Continue without investments - this is optional
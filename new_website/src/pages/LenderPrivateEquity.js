@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Input from '../components/Input';
 import Button from '../components/Button';
@@ -47,8 +48,7 @@ function LenderPrivateEquity() {
 
   async function fetchOpportunities() {
     try {
-      const res = await api.get('/api/private-equity/opportunities/');
-      setOpportunities(res.data || []);
+      setOpportunities(await fetchAllPages('/api/private-equity/opportunities/'));
     } catch (err) {
       if (err.response?.status === 403) {
         // Permission denied - not certified
@@ -61,8 +61,7 @@ function LenderPrivateEquity() {
 
   async function fetchInvestments() {
     try {
-      const res = await api.get('/api/private-equity/investments/');
-      setInvestments(res.data || []);
+      setInvestments(await fetchAllPages('/api/private-equity/investments/'));
     } catch (err) {
       // No need to set error here
     }
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -19,8 +20,7 @@ function LenderProducts() {
   async function fetchProducts() {
     setLoading(true);
     try {
-      const response = await api.get('/api/products/');
-      setProducts(response.data || []);
+      setProducts(await fetchAllPages('/api/products/'));
     } catch (e) {
       console.error(e);
       setError('Failed to load products');
@@ -1,6 +1,7 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { useSearchParams } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Textarea from '../components/Textarea';
@@ -35,8 +36,7 @@ function Messages() {
 
   async function loadApplications() {
     try {
-      const res = await api.get('/api/applications/');
-      setApplications(res.data || []);
+      setApplications(await fetchAllPages('/api/applications/?expand=project_details,borrower_details,lender_details,product_details'));
     } catch (err) {
       console.error('Messages loadApplications error:', err);
     }
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, Link, useNavigate } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -41,8 +42,7 @@ function ProjectDetail() {
   async function loadSavedProducts() {
     setLoadingSavedProducts(true);
     try {
-      const res = await api.get(`/api/products/favourites/?project_id=${id}`);
-      const favs = res.data?.results || res.data || [];
+      const favs = await fetchAllPages(`/api/products/favourites/?project_id=${id}`);
       setSavedProducts(favs);
     } catch (err) {
       console.error('Failed to load saved products:', err);
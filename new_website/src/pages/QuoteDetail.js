@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate, useLocation } from 'react-router-dom';
 import api from '../api';
+import { fetchAllPages } from '../utils/pagination';
 import { theme, commonStyles } from '../styles/theme';
 import Button from '../components/Button';
 import Badge from '../components/Badge';
@@ -80,8 +81,7 @@ function QuoteDetail() {
       else if (quote.role_type === 'solicitor') threadType = 'legal';
 
       // Find or create thread
-      const threadsRes = await api.get(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=${threadType}`);
-      const threads = threadsRes.data.results || threadsRes.data || [];
+      const threads = await fetchAllPages(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=${threadType}`);
       
       let thread = threads.find(t => t.subject && t.subject.includes(quote.provider_firm_name));
       
@@ -110,8 +110,8 @@ function QuoteDetail() {
 
   async function loadMessages(threadId) {
     try {
-      const res = await api.get(`/api/deals/deal-messages/?thread_id=${threadId}`);
-      setMessages(res.data.results || res.data || []);
+      // Pages come newest first; show them oldest first
+      setMessages((await fetchAllPages(`/api/deals/deal-messages/?thread_id=${threadId}`)).reverse());
     } catch (err) {
       console.error('Failed to load messages:', err);
       setMessages([]);
@@ -181,8 +181,7 @@ function QuoteDetail() {
       // TODO: Implement proper forwarding mechanism
       
       // Create a general message thread with borrower if it doesn't exist
-      const threadsRes = await api.get(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=general`);
-      const threads = threadsRes.data.results || threadsRes.data || [];
+      const threads = await fetchAllPages(`/api/deals/deal-message-threads/?deal_id=${dealId}&thread_type=general`);
       let borrowerThread = threads[0];
       
       if (!borrowerThread && threads.length === 0) {
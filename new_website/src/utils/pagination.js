@@ -0,0 +1,26 @@
+import api from '../api';
+
+/**
+ * Helpers for the API's paginated list responses.
+ *
+ * List endpoints return `{ next, previous, results }` a page at a time
+ * (some older endpoints still return a bare array).  `listResults` reads
+ * one response either way; `fetchAllPages` follows `next` until the list
+ * is complete, for views that need every row.
+ */
+
+export const listResults = (data) => (Array.isArray(data) ? data : data?.results || []);
+
+export async function fetchAllPages(url, config = {}) {
+  const rows = [];
+  let next = url;
+  let params = config.params;
+  while (next) {
+    const response = await api.get(next, { ...config, params });
+    rows.push(...listResults(response.data));
+    next = Array.isArray(response.data) ? null : response.data?.next || null;
+    // `next` already carries the query string
+    params = undefined;
+  }
+  return rows;
+}